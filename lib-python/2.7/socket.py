@@ -96,6 +96,17 @@ except ImportError:
     errno = None
 EBADF = getattr(errno, 'EBADF', 9)
 EINTR = getattr(errno, 'EINTR', 4)
+EAGAIN = getattr(errno, 'EAGAIN', 11)
+EINVAL = getattr(errno, 'EINVAL', 22)
+ENOSYS = getattr(errno, 'ENOSYS', 38)
+
+try:
+    from __pypy__.os import sendfile as _os_sendfile
+except ImportError:
+    _os_sendfile = None
+
+class _GiveupOnSendfile(Exception):
+    pass
 
 __all__ = ["getfqdn", "create_connection"]
 __all__.extend(os._get_exports_list(_socket))
@@ -277,6 +288,144 @@ class _socketobject(object):
     type = property(lambda self: self._sock.type, doc="the socket type")
     proto = property(lambda self: self._sock.proto, doc="the socket protocol")
 
+    if hasattr(_realsocket, 'recvmsg_into'):     # PyPy extensions
+        def sendmsg(self, *args):
+            return self._sock.sendmsg(*args)
+        sendmsg.__doc__ = _realsocket.sendmsg.__doc__
+
+        def recvmsg(self, *args):
+            return self._sock.recvmsg(*args)
+        recvmsg.__doc__ = _realsocket.recvmsg.__doc__
+
+        def recvmsg_into(self, *args):
+            return self._sock.recvmsg_into(*args)
+        recvmsg_into.__doc__ = _realsocket.recvmsg_into.__doc__
+
+    if hasattr(_realsocket, 'recvmmsg_into'):    # PyPy extensions, Linux
+        def sendmmsg(self, *args):
+            return self._sock.sendmmsg(*args)
+        sendmmsg.__doc__ = _realsocket.sendmmsg.__doc__
+
+        def recvmmsg_into(self, *args):
+            return self._sock.recvmmsg_into(*args)
+        recvmmsg_into.__doc__ = _realsocket.recvmmsg_into.__doc__
+
+    def sendfile(self, file, offset=0, count=None):
+        """sendfile(file[, offset[, count]]) -> sent
+
+        Send a file until EOF is reached, using os.sendfile() when
+        available (PyPy's __pypy__.os.sendfile) so that the data does not
+        go through user space.  Otherwise the file is mmapped and sent
+        with send(), or read and sent if it cannot be mmapped.  'file' must
+        be a regular file object opened in binary mode.  If 'offset' is
+        given the file is sent from that position, and 'count' is the
+        total number of bytes to send.  On return, or in case of an error,
+        the file position is updated to point after the last byte sent.
+        Non-blocking sockets are not supported.  Returns the number of
+        bytes sent.
+        """
+        if self.gettimeout() == 0:
+            raise ValueError("non-blocking sockets are not supported")
+        if count is not None:
+            if not isinstance(count, (int, long)):
+                raise TypeError("count must be a positive integer (got %r)"
+                                % (count,))
+            if count <= 0:
+                raise ValueError("count must be a positive integer (got %r)"
+                                 % (count,))
+        if self.type != SOCK_STREAM:
+            raise ValueError("only SOCK_STREAM type sockets are supported")
+        try:
+            fileno = file.fileno()
+            fsize = os.fstat(fileno).st_size
+        except (AttributeError, IOError, OSError):
+            return self._sendfile_use_read(file, offset, count)
+        if _os_sendfile is not None:
+            try:
+                return self._sendfile_use_sendfile(fileno, fsize, file,
+                                                   offset, count)
+            except _GiveupOnSendfile:
+                pass
+        return self._sendfile_use_mmap(fileno, fsize, file, offset, count)
+
+    def _sendfile_use_sendfile(self, fileno, fsize, file, offset, count):
+        if not fsize:
+            return 0
+        sockno = self.fileno()
+        timeout = self.gettimeout()
+        blocksize = min(count or fsize, 2 ** 30)
+        total_sent = 0
+        try:
+            while True:
+                if count:
+                    blocksize = min(count - total_sent, blocksize)
+                    if blocksize <= 0:
+                        break
+                if timeout is not None:
+                    import select
+                    if not select.select([], [sockno], [], timeout)[1]:
+                        raise _socket.timeout('timed out')
+                try:
+                    sent = _os_sendfile(sockno, fileno, offset, blocksize)
+                except OSError as e:
+                    if e.errno in (EAGAIN, EINTR):
+                        continue
+                    if total_sent == 0 and e.errno in (EINVAL, ENOSYS):
+                        # not supported for this kind of file
+                        raise _GiveupOnSendfile
+                    raise error(e.errno, e.strerror)
+                if sent == 0:
+                    break      # EOF
+                offset += sent
+                total_sent += sent
+            return total_sent
+        finally:
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset)
+
+    def _sendfile_use_mmap(self, fileno, fsize, file, offset, count):
+        end = fsize if count is None else min(fsize, offset + count)
+        if end <= offset:
+            return 0
+        import mmap
+        try:
+            m = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (mmap.error, EnvironmentError, ValueError):
+            return self._sendfile_use_read(file, offset, count)
+        total_sent = 0
+        try:
+            pos = offset
+            while pos < end:
+                sent = self._sock.send(buffer(m, pos, min(end - pos, 65536)))
+                pos += sent
+                total_sent += sent
+            return total_sent
+        finally:
+            m.close()
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset + total_sent)
+
+    def _sendfile_use_read(self, file, offset, count):
+        if offset:
+            file.seek(offset)
+        blocksize = min(count, 65536) if count else 65536
+        total_sent = 0
+        try:
+            while True:
+                if count:
+                    blocksize = min(count - total_sent, blocksize)
+                    if blocksize <= 0:
+                        break
+                data = file.read(blocksize)
+                if not data:
+                    break
+                self._sock.sendall(data)
+                total_sent += len(data)
+            return total_sent
+        finally:
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset + total_sent)
+
     # Delegate many calls to the raw socket object.
     _s = ("def %(name)s(self, %(args)s): return self._sock.%(name)s(%(args)s)\n\n"
           "%(name)s.__doc__ = _realsocket.%(name)s.__doc__\n")
@@ -0,0 +1,96 @@
+""" Precompile the .py files of one or more directory trees to .pyc files,
+using several processes, and report the throughput:
+
+    pypy -m pypy_tools.precompile [-j N] [-f] [-q] dir...
+
+On PyPy the files are compiled and written by imp._compile_pyc(), i.e. by
+the same interp-level code that an import uses; elsewhere py_compile is
+used.  Up-to-date .pyc files are skipped unless -f is given.
+"""
+from __future__ import print_function
+import sys, os, imp, time, argparse, py_compile
+import multiprocessing
+
+
+def find_sources(dirs, force):
+    magic = imp.get_magic()
+    sources = []
+    for dirname in dirs:
+        for dirpath, dirnames, filenames in os.walk(dirname):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                if not fn.endswith('.py'):
+                    continue
+                path = os.path.join(dirpath, fn)
+                if force or not pyc_is_up_to_date(path, magic):
+                    sources.append(path)
+    return sources
+
+def pyc_is_up_to_date(path, magic):
+    try:
+        mtime = int(os.stat(path).st_mtime)
+        with open(path + 'c', 'rb') as f:
+            header = f.read(8)
+    except (OSError, IOError):
+        return False
+    expected = magic + chr(mtime & 0xff) + chr((mtime >> 8) & 0xff) + \
+               chr((mtime >> 16) & 0xff) + chr((mtime >> 24) & 0xff)
+    return header == expected
+
+def compile_one(path):
+    """Returns (path, source size, error message or None)"""
+    try:
+        if hasattr(imp, '_compile_pyc'):
+            size = imp._compile_pyc(path)
+        else:
+            py_compile.compile(path, doraise=True)
+            size = os.path.getsize(path)
+    except (SyntaxError, py_compile.PyCompileError, EnvironmentError) as e:
+        return path, 0, '%s: %s' % (e.__class__.__name__, e)
+    return path, size, None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('dirs', nargs='+', metavar='dir')
+    parser.add_argument('-j', '--jobs', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='number of processes (default: number of CPUs)')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='recompile even if the .pyc files are up to date')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='only print errors and the summary')
+    args = parser.parse_args(argv)
+
+    t0 = time.time()
+    sources = find_sources(args.dirs, args.force)
+    t1 = time.time()
+    if args.jobs > 1 and len(sources) > 1:
+        pool = multiprocessing.Pool(args.jobs)
+        results = pool.imap_unordered(compile_one, sources, chunksize=8)
+    else:
+        pool = None
+        results = (compile_one(path) for path in sources)
+    nbytes = nerrors = 0
+    for path, size, error in results:
+        if error is not None:
+            nerrors += 1
+            print('*** %s: %s' % (path, error), file=sys.stderr)
+        else:
+            nbytes += size
+            if not args.quiet:
+                print('Compiled', path)
+    if pool is not None:
+        pool.close()
+        pool.join()
+    t2 = time.time()
+
+    elapsed = max(t2 - t1, 1e-6)
+    print('%d files (%.1f MB) compiled in %.2f seconds with %d processes, '
+          '%d errors' % (len(sources) - nerrors, nbytes / (1024. * 1024.),
+                         elapsed, max(args.jobs, 1), nerrors))
+    print('%.0f files/s, %.2f MB/s (scanning took %.2f seconds)' % (
+        len(sources) / elapsed, nbytes / (1024. * 1024.) / elapsed, t1 - t0))
+    return 1 if nerrors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@ from os.path import join, dirname
 import pypy
 from pypy.interpreter import gateway
 from pypy.interpreter.error import OperationError
+from pypy.interpreter.importtime import ImportTimeTracer
 from pypy.tool.ann_override import PyPyAnnotatorPolicy
 from rpython.config.config import to_optparse, make_dict, SUPPRESS_USAGE
 from rpython.config.config import ConflictConfigError
@@ -65,6 +66,7 @@ def create_entry_point(space, w_dict):
             argv = argv[:1] + argv[3:]
         try:
             try:
+                space.fromcache(ImportTimeTracer).enable_from_env()
                 space.startup()
                 w_executable = space.newtext(argv[0])
                 w_argv = space.newlist([space.newtext(s) for s in argv[1:]])
@@ -35,6 +35,11 @@ PyPy options and arguments:
                      a warning if they are not closed explicitly
 -X faulthandler    : attempt to display tracebacks when PyPy crashes
 -X jit-off         : turn the JIT off, equivalent to --jit off
+-X defer-pyc       : write the .pyc files of imported modules only at exit
+                     instead of during import; also PYPY_DEFER_PYC=x
+-X importtime[=file] : write the time spent in each import to stderr (or
+                     to file); also PYPY_IMPORTTIME=file, which also
+                     covers the modules imported before the options are read
 """
 # Missing vs CPython: PYTHONHOME, PYTHONCASEOK
 USAGE2 = """
@@ -47,6 +52,8 @@ PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
 PYPY_DISABLE_JIT: if set to a non-empty value, disable JIT.
+PYPY_IMPORTTIME: file (or '-' for stderr) to which the time spent in each
+               import is written.
 """
 
 try:
@@ -276,6 +283,16 @@ def run_faulthandler():
         except ValueError:
             pass      # ignore "2 is not a valid file descriptor"
 
+def defer_pyc_writes():
+    import imp
+    if hasattr(imp, '_defer_pyc_writes'):
+        imp._defer_pyc_writes(True)
+
+def trace_import_time(filename):
+    import imp
+    if hasattr(imp, '_trace_import_time'):
+        imp._trace_import_time(filename)
+
 def set_runtime_options(options, Xparam, *args):
     if Xparam == 'track-resources':
         sys.pypy_set_track_resources(True)
@@ -283,9 +300,14 @@ def set_runtime_options(options, Xparam, *args):
         run_faulthandler()
     elif Xparam == 'jit-off':
         set_jit_option(options, 'off')
+    elif Xparam == 'defer-pyc':
+        defer_pyc_writes()
+    elif Xparam == 'importtime' or Xparam.startswith('importtime='):
+        trace_import_time(Xparam[len('importtime='):] or '-')
     else:
         print >> sys.stderr, 'usage: %s -X [options]' % (get_sys_executable(),)
-        print >> sys.stderr, '[options] can be: track-resources, faulthandler, jit-off'
+        print >> sys.stderr, ('[options] can be: track-resources, faulthandler, '
+                              'jit-off, defer-pyc, importtime[=file]')
         raise SystemExit
 
 class CommandLineError(Exception):
@@ -560,6 +582,8 @@ def parse_command_line(argv):
         parse_env('PYTHONOPTIMIZE', "optimize", options)
         if getenv('PYPY_DISABLE_JIT'):
             set_jit_option(options, 'off')
+        if getenv('PYPY_DEFER_PYC'):
+            defer_pyc_writes()
     if (options["interactive"] or
         (not options["ignore_environment"] and getenv('PYTHONINSPECT'))):
         options["inspect"] = 1
@@ -0,0 +1,95 @@
+"""
+Tracing of the time spent importing modules and running the startup() of
+built-in modules, similar to CPython 3's "-X importtime".
+
+Enabled with the PYPY_IMPORTTIME=<file> environment variable, which also
+covers the built-in modules initialized before app_main runs, or with
+"-X importtime[=<file>]".  Each finished import writes one line:
+
+    import time: self [us] | cumulative | heap [kB] | imported package
+    import time:       211 |        905 |        64 |   encodings.utf_8
+
+The name is indented by the nesting depth, so the output reads as a tree
+with every module listed after the modules it imported.  'heap' is the
+growth of the GC heap (surviving objects only) during the import; it is 0
+when not translated.
+"""
+
+import os
+import time
+
+from rpython.rlib import rgc
+from rpython.rlib.objectmodel import we_are_translated
+
+
+HEADER = "import time: self [us] | cumulative | heap [kB] | imported package\n"
+
+
+class _Entry(object):
+    def __init__(self, starttime, startmem):
+        self.starttime = starttime
+        self.startmem = startmem
+        self.children_time = 0.0
+
+
+def _rjust(s, width):
+    # RPython's '%' does not support widths
+    return ' ' * (width - len(s)) + s
+
+def _heap_size():
+    if we_are_translated():
+        return rgc.get_stats(rgc.TOTAL_MEMORY)
+    return 0
+
+
+class ImportTimeTracer(object):
+    def __init__(self, space):
+        self.fd = -1
+        self.stack = []
+
+    def enable(self, fd):
+        self.fd = fd
+        self._write(HEADER)
+
+    def is_enabled(self):
+        return self.fd >= 0
+
+    def enter(self):
+        self.stack.append(_Entry(time.time(), _heap_size()))
+
+    def leave(self, name):
+        entry = self.stack.pop()
+        cumulative = time.time() - entry.starttime
+        selftime = cumulative - entry.children_time
+        if self.stack:
+            self.stack[-1].children_time += cumulative
+        heap = (_heap_size() - entry.startmem) // 1024
+        self._write("import time: %s | %s | %s | %s%s\n" % (
+            _rjust(str(int(selftime * 1e6)), 9),
+            _rjust(str(int(cumulative * 1e6)), 10),
+            _rjust(str(heap), 9),
+            "  " * len(self.stack), name))
+
+    def _write(self, line):
+        try:
+            os.write(self.fd, line)
+        except OSError:
+            self.fd = -1
+
+    def enable_from_env(self):
+        """Called from the entry point, before space.startup()"""
+        filename = os.environ.get('PYPY_IMPORTTIME', None)
+        if filename:
+            self.open_output(filename)
+
+    def open_output(self, filename):
+        if filename == '-':
+            self.enable(2)
+            return
+        try:
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0666)
+        except OSError:
+            os.write(2, "PYPY_IMPORTTIME: cannot open %s\n" % (filename,))
+            return
+        self.enable(fd)
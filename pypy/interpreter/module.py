@@ -4,6 +4,7 @@ Module objects.
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError
+from pypy.interpreter.importtime import ImportTimeTracer
 from rpython.rlib.objectmodel import we_are_translated, not_rpython
 
 
@@ -62,7 +63,15 @@ class Module(W_Root):
                 if self._frozen:
                     return
             self.startup_called = True
-            self.startup(space)
+            tracer = space.fromcache(ImportTimeTracer)
+            if tracer.is_enabled():
+                tracer.enter()
+                try:
+                    self.startup(space)
+                finally:
+                    tracer.leave(space.text_w(self.w_name) + " (startup)")
+            else:
+                self.startup(space)
 
     def startup(self, space):
         """This is called at runtime on import to allow the module to
@@ -116,6 +116,7 @@ class PyCode(eval.Code):
 
     def _initialize(self):
         from pypy.objspace.std.mapdict import init_mapdict_cache
+        from pypy.objspace.std.celldict import init_module_attr_cache
         from pypy.interpreter.nestedscope import CellFamily
         if self.co_cellvars:
             argcount = self.co_argcount
@@ -136,6 +137,7 @@ class PyCode(eval.Code):
         self._compute_flatcall()
 
         init_mapdict_cache(self)
+        init_module_attr_cache(self)
         self._globals_caches = [None] * len(self.co_names_w)
 
     def _init_ready(self):
@@ -3,6 +3,9 @@ General classes for bytecode compilers.
 Compiler instances are stored into 'space.getexecutioncontext().compiler'.
 """
 
+from collections import OrderedDict
+
+from rpython.rlib import objectmodel
 from pypy.interpreter import pycode
 from pypy.interpreter.pyparser import future, pyparse, error as parseerror
 from pypy.interpreter.astcompiler import (astbuilder, codegen, consts, misc,
@@ -10,6 +13,48 @@ from pypy.interpreter.astcompiler import (astbuilder, codegen, consts, misc,
 from pypy.interpreter.error import OperationError, oefmt
 
 
+class CompileCache(object):
+    """A bounded LRU cache of the code objects produced by compile(), exec
+    and eval() of strings, keyed by (source, filename, mode, flags).
+    Disabled (maxsize == 0) by default; see __pypy__.set_compile_cache_size().
+    """
+
+    def __init__(self, space):
+        self.maxsize = 0
+        self.hits = 0
+        self.misses = 0
+        self.codes = OrderedDict()
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self.codes) > maxsize:
+            self._evict_oldest()
+
+    def clear(self):
+        self.codes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        code = self.codes.get(key, None)
+        if code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            objectmodel.move_to_end(self.codes, key)
+        return code
+
+    def store(self, key, code):
+        if len(self.codes) >= self.maxsize:
+            self._evict_oldest()
+        self.codes[key] = code
+
+    def _evict_oldest(self):
+        for key in self.codes:
+            del self.codes[key]
+            break
+
+
 class AbstractCompiler(object):
     """Abstract base class for a bytecode compiler."""
 
@@ -29,6 +74,20 @@ class AbstractCompiler(object):
         the given code object."""
         return 0
 
+    def compile_cached(self, source, filename, mode, flags):
+        """Same as compile(), but returns the code object of a previous
+        identical compilation if the space's CompileCache is enabled.
+        """
+        cache = self.space.fromcache(CompileCache)
+        if cache.maxsize == 0 or not self.space._side_effects_ok():
+            return self.compile(source, filename, mode, flags)
+        key = (source, filename, mode, flags)
+        code = cache.lookup(key)
+        if code is None:
+            code = self.compile(source, filename, mode, flags)
+            cache.store(key, code)
+        return code
+
     def compile_command(self, source, filename, mode, flags):
         """Same as compile(), but tries to compile a possibly partial
         interactive input.  If more input is needed, it returns None.
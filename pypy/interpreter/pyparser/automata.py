@@ -67,23 +67,28 @@ class DFA:
 
     # ____________________________________________________________
 
-    def _next_state(self, item, crntState):
-        if ord(item) >= self.max_char:
+    def _next_state(self, ordch, crntState):
+        # 'ordch' is the already-clamped character code, see _char_code()
+        if ordch >= self.max_char:
             return self.defaults[crntState]
         else:
-            return self.states[crntState * self.max_char + ord(item)]
+            return self.states[crntState * self.max_char + ordch]
+
+    @staticmethod
+    def _char_code(item):
+        ordch = ord(item)
+        if ordch > 0x80:
+            ordch = 0x80 # NON_ASCII
+        return ordch
 
     def recognize(self, inVec, pos = 0):
         crntState = self.start
         lastAccept = False
         i = pos
         for i in range(pos, len(inVec)):
-            item = inVec[i]
-            if ord(item) > 0x80:
-                item = NON_ASCII
             accept = self.accepts[crntState]
-            crntState = self._next_state(item, crntState)
-            if crntState != ERROR_STATE:
+            nextState = self._next_state(self._char_code(inVec[i]), crntState)
+            if nextState != ERROR_STATE:
                 pass
             elif accept:
                 return i
@@ -93,7 +98,7 @@ class DFA:
                 return i - 1
             else:
                 return -1
-            crntState = ord(crntState)
+            crntState = ord(nextState)
             lastAccept = accept
         # if self.states[crntState][1]:
         if self.accepts[crntState]:
@@ -111,16 +116,13 @@ class NonGreedyDFA (DFA):
         crntState = self.start
         i = pos
         for i in range(pos, len(inVec)):
-            item = inVec[i]
-            if ord(item) > 0x80:
-                item = NON_ASCII
             accept = self.accepts[crntState]
             if accept:
                 return i
-            crntState = self._next_state(item, crntState)
-            if crntState == ERROR_STATE:
+            nextState = self._next_state(self._char_code(inVec[i]), crntState)
+            if nextState == ERROR_STATE:
                 return -1
-            crntState = ord(crntState)
+            crntState = ord(nextState)
             i += 1
         if self.accepts[crntState]:
             return i
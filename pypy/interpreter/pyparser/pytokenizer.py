@@ -3,7 +3,7 @@ from pypy.interpreter.pyparser.parser import Token
 from pypy.interpreter.pyparser.pygram import tokens
 from pypy.interpreter.pyparser.pytoken import python_opmap
 from pypy.interpreter.pyparser.error import TokenError, TokenIndentationError
-from pypy.interpreter.pyparser.pytokenize import tabsize, whiteSpaceDFA, \
+from pypy.interpreter.pyparser.pytokenize import tabsize, \
     triple_quoted, endDFAs, single_quoted, pseudoDFA
 from pypy.interpreter.astcompiler import consts
 
@@ -12,6 +12,8 @@ NUMCHARS = '0123456789'
 ALNUMCHARS = NAMECHARS + NUMCHARS
 EXTENDED_ALNUMCHARS = ALNUMCHARS + '-.'
 WHITESPACES = ' \t\n\r\v\f'
+# the characters matched by pytokenize.whiteSpaceDFA
+WHITESPACES_IN_LINE = ' \t\f'
 
 def match_encoding_declaration(comment):
     """returns the declared encoding or None
@@ -165,11 +167,12 @@ def generate_tokens(lines, flags):
 
         while pos < max:
             pseudomatch = pseudoDFA.recognize(line, pos)
-            start = whiteSpaceDFA.recognize(line, pos)
+            # skip the leading whitespace by hand: running whiteSpaceDFA
+            # for every single token shows up when tokenizing big modules
+            start = pos
+            while start < max and line[start] in WHITESPACES_IN_LINE:
+                start += 1
             if pseudomatch >= 0:                            # scan for tokens
-                # JDR: Modified
-                if start < 0:
-                    start = pos
                 end = pseudomatch
 
                 if start == end:
@@ -258,8 +261,6 @@ def generate_tokens(lines, flags):
                     token_list.append(tok)
                     last_comment = ''
             else:
-                if start < 0:
-                    start = pos
                 if start<max and line[start] in single_quoted:
                     raise TokenError("end of line (EOL) while scanning string literal",
                              line, lnum, start+1, token_list)
@@ -31,6 +31,15 @@ class TestTokenizer(object):
             Token(tokens.ENDMARKER, '', 2, 0, ''),
             ]
 
+    def test_whitespace_between_tokens(self):
+        line = "a \t\x0c+  1"
+        tks = tokenize(line)
+        assert tks[:3] == [
+            Token(tokens.NAME, 'a', 1, 0, line),
+            Token(tokens.PLUS, '+', 1, 4, line),
+            Token(tokens.NUMBER, '1', 1, 7, line),
+        ]
+
     def test_error_parenthesis(self):
         for paren in "([{":
             check_token_error(paren + "1 + 2",
@@ -62,6 +71,7 @@ class TestTokenizer(object):
 
     def test_eol_string(self):
         check_token_error("x = 'a", pos=5, line=1)
+        check_token_error("x =  \t'a", pos=7, line=1)
 
     def test_eof_triple_quoted(self):
         check_token_error("'''", pos=1, line=1)
@@ -0,0 +1,75 @@
+import os
+from pypy.interpreter.importtime import ImportTimeTracer, HEADER
+
+
+class TestImportTimeTracer:
+    def setup_method(self, meth):
+        self.tracer = self.space.fromcache(ImportTimeTracer)
+        assert not self.tracer.is_enabled()
+
+    def teardown_method(self, meth):
+        if self.tracer.is_enabled():
+            os.close(self.tracer.fd)
+            self.tracer.fd = -1
+        del self.tracer.stack[:]
+
+    def test_nesting(self, tmpdir):
+        output = tmpdir.join('out')
+        self.tracer.open_output(str(output))
+        self.tracer.enter()
+        self.tracer.enter()
+        self.tracer.leave('pkg.sub')
+        self.tracer.leave('pkg')
+        assert not self.tracer.stack
+        lines = output.read().splitlines()
+        assert lines[0] + '\n' == HEADER
+        assert lines[1].endswith('|   pkg.sub')
+        assert lines[2].endswith('| pkg')
+        fields = [int(x) for x in lines[2][len('import time:'):].split('|')[:3]]
+        selftime, cumulative, heap = fields
+        assert 0 <= selftime <= cumulative
+
+    def test_import(self, tmpdir):
+        pkg = tmpdir.join('tracedpkg').ensure(dir=1)
+        pkg.join('__init__.py').write('import tracedpkg.sub\n')
+        pkg.join('sub.py').write('x = 42\n')
+        output = tmpdir.join('out')
+        space = self.space
+        self.tracer.open_output(str(output))
+        space.appexec([space.newtext(str(tmpdir))], """(path):
+            import sys
+            sys.path.insert(0, path)
+            try:
+                import tracedpkg
+            finally:
+                sys.path.remove(path)
+                del sys.modules['tracedpkg']
+                del sys.modules['tracedpkg.sub']
+        """)
+        lines = output.read().splitlines()
+        assert lines[-2].endswith('|   tracedpkg.sub')
+        assert lines[-1].endswith('| tracedpkg')
+
+    def test_enable_from_env(self, tmpdir, monkeypatch):
+        monkeypatch.delenv('PYPY_IMPORTTIME', raising=False)
+        self.tracer.enable_from_env()
+        assert not self.tracer.is_enabled()
+        output = tmpdir.join('out')
+        monkeypatch.setenv('PYPY_IMPORTTIME', str(output))
+        self.tracer.enable_from_env()
+        assert self.tracer.is_enabled()
+        assert output.read() == HEADER
+
+    def test_leave_rtypes(self):
+        # the formatting of the lines must be RPython
+        from rpython.translator.translator import TranslationContext
+        def f(n):
+            tracer = ImportTimeTracer(None)
+            for i in range(n):
+                tracer.enter()
+            tracer.leave('pkg.sub')
+            tracer.leave('pkg')
+            return len(tracer.stack)
+        t = TranslationContext()
+        t.buildannotator().build_types(f, [int])
+        t.buildrtyper().specialize()
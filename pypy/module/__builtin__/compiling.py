@@ -61,7 +61,7 @@ in addition to any features explicitly specified.
         node = ec.compiler.compile_to_ast(source, filename, mode, flags)
         return node.to_object(space)
     else:
-        return ec.compiler.compile(source, filename, mode, flags)
+        return ec.compiler.compile_cached(source, filename, mode, flags)
 
 
 def eval(space, w_code, w_globals=None, w_locals=None):
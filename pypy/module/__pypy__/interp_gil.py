@@ -0,0 +1,56 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from rpython.rlib import rgil
+
+
+@unwrap_spec(interval=float)
+def setswitchinterval(space, interval):
+    """setswitchinterval(seconds)
+
+    Keep the GIL for at least this many seconds after it changed hands,
+    before giving it to another waiting thread.  The check is done every
+    sys.getcheckinterval() bytecodes.  0.0 (the default) switches at every
+    check if another thread is waiting."""
+    if interval < 0.0:
+        raise oefmt(space.w_ValueError, "switch interval must be positive")
+    rgil.set_switch_interval(interval)
+
+def getswitchinterval(space):
+    """getswitchinterval() -> seconds"""
+    return space.newfloat(rgil.get_stats().switch_interval)
+
+@unwrap_spec(fair=bool)
+def set_gil_fair(space, fair):
+    """set_gil_fair(flag)
+
+    In fair mode, a thread that wants the GIL while other threads are
+    already waiting for it queues behind them, instead of trying to grab
+    it first.  This gives I/O threads a bounded latency behind CPU-bound
+    threads, at some cost in throughput."""
+    rgil.set_fair(fair)
+
+def gil_stats(space):
+    """gil_stats() -> dict
+
+    'switches' and 'wait_time' count all the times a thread got the GIL
+    after waiting, and the total time spent waiting; 'yields' counts the
+    times a thread gave the GIL to a waiting thread at a periodic check.
+    The 'thread_*' entries are the same numbers for the calling thread
+    only, together with the time it held the GIL.  Times are in seconds."""
+    stats = rgil.get_stats()
+    w_stats = space.newdict()
+    space.setitem_str(w_stats, 'switch_interval',
+                      space.newfloat(stats.switch_interval))
+    space.setitem_str(w_stats, 'fair', space.newbool(stats.fair))
+    space.setitem_str(w_stats, 'switches', space.newint(stats.switches))
+    space.setitem_str(w_stats, 'yields', space.newint(stats.yields))
+    space.setitem_str(w_stats, 'wait_time', space.newfloat(stats.wait_time))
+    space.setitem_str(w_stats, 'thread_wait_time',
+                      space.newfloat(stats.thread_wait_time))
+    space.setitem_str(w_stats, 'thread_hold_time',
+                      space.newfloat(stats.thread_hold_time))
+    space.setitem_str(w_stats, 'thread_waits',
+                      space.newint(stats.thread_waits))
+    space.setitem_str(w_stats, 'thread_yields',
+                      space.newint(stats.thread_yields))
+    return w_stats
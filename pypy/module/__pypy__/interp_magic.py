@@ -191,6 +191,29 @@ def set_code_callback(space, w_callable):
     else:
         cache._code_hook = w_callable
 
+@unwrap_spec(size=int)
+def set_compile_cache_size(space, size):
+    """Set the number of code objects kept by the cache used by compile(),
+    exec and eval() on strings.  0, the default, disables the cache.
+    Identical compilations then return the same code object."""
+    from pypy.interpreter.pycompiler import CompileCache
+    if size < 0:
+        raise oefmt(space.w_ValueError, "cache size must be >= 0")
+    cache = space.fromcache(CompileCache)
+    cache.resize(size)
+    if size == 0:
+        cache.clear()
+
+def compile_cache_info(space):
+    """Return a tuple (hits, misses, currsize, maxsize) describing the
+    compile() cache."""
+    from pypy.interpreter.pycompiler import CompileCache
+    cache = space.fromcache(CompileCache)
+    return space.newtuple([space.newint(cache.hits),
+                           space.newint(cache.misses),
+                           space.newint(len(cache.codes)),
+                           space.newint(cache.maxsize)])
+
 @unwrap_spec(string='bytes', byteorder='text', signed=int)
 def decode_long(space, string, byteorder='little', signed=1):
     from rpython.rlib.rbigint import rbigint, InvalidEndiannessError
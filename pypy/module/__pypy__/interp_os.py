@@ -1,5 +1,8 @@
 import os
 
+from rpython.rlib import rposix
+
+from pypy.interpreter.error import oefmt, wrap_oserror
 from pypy.interpreter.gateway import unwrap_spec
 
 
@@ -7,3 +10,27 @@ from pypy.interpreter.gateway import unwrap_spec
 def real_getenv(space, name):
     """Get an OS environment value skipping Python cache"""
     return space.newtext_or_none(os.environ.get(name))
+
+@unwrap_spec(out_fd="c_int", in_fd="c_int", count="nonnegint")
+def sendfile(space, out_fd, in_fd, w_offset, count):
+    """sendfile(out_fd, in_fd, offset, count) -> byteswritten
+
+    Copy count bytes from file descriptor in_fd to file descriptor out_fd,
+    starting at offset, without going through user space.  Like
+    os.sendfile() in Python 3.  On Linux, offset can be None to read
+    from the current position of in_fd and advance it."""
+    if space.is_none(w_offset):
+        if not hasattr(rposix, 'sendfile_no_offset'):
+            raise oefmt(space.w_ValueError,
+                        "offset cannot be None on this platform")
+        try:
+            res = rposix.sendfile_no_offset(out_fd, in_fd, count)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+    else:
+        offset = space.r_longlong_w(w_offset)
+        try:
+            res = rposix.sendfile(out_fd, in_fd, offset, count)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+    return space.newint(res)
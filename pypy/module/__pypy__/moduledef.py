@@ -2,7 +2,7 @@ import sys
 
 from pypy.interpreter.mixedmodule import MixedModule
 from pypy.module.imp.importing import get_pyc_magic
-from rpython.rlib import rtime
+from rpython.rlib import rposix, rtime
 
 
 class BuildersModule(MixedModule):
@@ -33,6 +33,10 @@ class ThreadModule(MixedModule):
         '_signals_enter':  'interp_signal.signals_enter',
         '_signals_exit':   'interp_signal.signals_exit',
         '_raise_in_thread': 'interp_signal._raise_in_thread',
+        'setswitchinterval': 'interp_gil.setswitchinterval',
+        'getswitchinterval': 'interp_gil.getswitchinterval',
+        'set_gil_fair': 'interp_gil.set_gil_fair',
+        'gil_stats': 'interp_gil.gil_stats',
     }
 
 
@@ -58,6 +62,8 @@ class OsModule(MixedModule):
     interpleveldefs = {
         'real_getenv': 'interp_os.real_getenv'
     }
+    if hasattr(rposix, 'sendfile'):
+        interpleveldefs['sendfile'] = 'interp_os.sendfile'
 
 
 class PyPyDateTime(MixedModule):
@@ -112,6 +118,8 @@ class Module(MixedModule):
         'set_debug'                 : 'interp_magic.set_debug',
         'locals_to_fast'            : 'interp_magic.locals_to_fast',
         'set_code_callback'         : 'interp_magic.set_code_callback',
+        'set_compile_cache_size'    : 'interp_magic.set_compile_cache_size',
+        'compile_cache_info'        : 'interp_magic.compile_cache_info',
         'save_module_content_for_future_reload':
                           'interp_magic.save_module_content_for_future_reload',
         'decode_long'               : 'interp_magic.decode_long',
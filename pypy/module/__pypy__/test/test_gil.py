@@ -0,0 +1,34 @@
+class AppTestGil:
+    spaceconfig = dict(usemodules=['__pypy__', 'thread'])
+
+    def test_switch_interval(self):
+        from __pypy__ import thread
+        old = thread.getswitchinterval()
+        try:
+            thread.setswitchinterval(0.005)
+            assert thread.getswitchinterval() == 0.005
+            assert thread.gil_stats()['switch_interval'] == 0.005
+            raises(ValueError, thread.setswitchinterval, -1.0)
+            assert thread.getswitchinterval() == 0.005
+        finally:
+            thread.setswitchinterval(old)
+
+    def test_fair(self):
+        from __pypy__ import thread
+        assert thread.gil_stats()['fair'] is False
+        thread.set_gil_fair(True)
+        try:
+            assert thread.gil_stats()['fair'] is True
+        finally:
+            thread.set_gil_fair(False)
+
+    def test_stats(self):
+        from __pypy__ import thread
+        stats = thread.gil_stats()
+        assert sorted(stats) == ['fair', 'switch_interval', 'switches',
+                                 'thread_hold_time', 'thread_wait_time',
+                                 'thread_waits', 'thread_yields',
+                                 'wait_time', 'yields']
+        assert stats['switches'] >= stats['thread_waits'] >= 0
+        assert stats['wait_time'] >= stats['thread_wait_time'] >= 0.0
+        assert stats['thread_hold_time'] >= 0.0
@@ -38,6 +38,35 @@ def f():
             __pypy__.set_code_callback(None)
         assert d['f'].__code__ in l
 
+    def test_compile_cache(self):
+        import __pypy__
+        __pypy__.set_compile_cache_size(2)
+        try:
+            assert __pypy__.compile_cache_info() == (0, 0, 0, 2)
+            c1 = compile("x + 1", "<a>", "eval")
+            assert compile("x + 1", "<a>", "eval") is c1
+            c2 = compile("x + 1", "<b>", "eval")
+            assert c2 is not c1
+            assert compile("x + 1", "<a>", "eval") is c1
+            # c2 is now the least recently used entry and gets evicted
+            assert compile("x + 1", "<a>", "exec") is not c1
+            assert compile("x + 1", "<a>", "eval") is c1
+            assert compile("x + 1", "<b>", "eval") is not c2
+            assert __pypy__.compile_cache_info() == (3, 4, 2, 2)
+            assert eval("x + 1", {'x': 5}) == 6
+            assert eval("x + 1", {'x': 6}) == 7
+            d = {}
+            exec "def f(): return 42" in d
+            exec "def f(): return 42" in d
+            assert d['f']() == 42
+            raises(SyntaxError, compile, "x +", "<a>", "eval")
+            raises(ValueError, __pypy__.set_compile_cache_size, -1)
+        finally:
+            __pypy__.set_compile_cache_size(0)
+        assert __pypy__.compile_cache_info() == (0, 0, 0, 0)
+        assert compile("x + 1", "<a>", "eval") is not compile(
+                "x + 1", "<a>", "eval")
+
     def test_decode_long(self):
         from __pypy__ import decode_long
         assert decode_long('') == 0
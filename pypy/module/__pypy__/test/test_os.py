@@ -1,6 +1,14 @@
+from rpython.tool.udir import udir
+
+
 class AppTestOs:
     spaceconfig = dict(usemodules=['__pypy__'])
 
+    def setup_class(cls):
+        tmpfile = udir.join('test_os_sendfile')
+        tmpfile.write('0123456789')
+        cls.w_tmpfile = cls.space.wrap(str(tmpfile))
+
     def test_real_getenv(self):
         import __pypy__.os
         import os
@@ -14,3 +22,28 @@ class AppTestOs:
         assert os.getenv(key) is None
         os.unsetenv(key)
         assert __pypy__.os.real_getenv(key) is None
+
+    def test_sendfile(self):
+        import __pypy__.os
+        import os
+        if not hasattr(__pypy__.os, 'sendfile'):
+            skip("no sendfile")
+        r, w = os.pipe()
+        fd = os.open(self.tmpfile, os.O_RDONLY)
+        try:
+            assert __pypy__.os.sendfile(w, fd, 3, 4) == 4
+            assert os.read(r, 10) == b'3456'
+            assert os.lseek(fd, 0, os.SEEK_CUR) == 0
+            try:
+                n = __pypy__.os.sendfile(w, fd, None, 2)
+            except ValueError:
+                pass        # offset=None is only supported on Linux
+            else:
+                assert n == 2
+                assert os.read(r, 10) == b'01'
+                assert os.lseek(fd, 0, os.SEEK_CUR) == 2
+            raises(OSError, __pypy__.os.sendfile, r, fd, 0, 1)
+        finally:
+            os.close(fd)
+            os.close(r)
+            os.close(w)
@@ -1,5 +1,7 @@
 from __future__ import with_statement
 
+import os
+
 from rpython.rlib.signature import signature
 from rpython.rlib import types
 
@@ -13,11 +15,14 @@ from rpython.rlib.buffer import ByteBuffer, RawByteBuffer, SubBuffer
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rarithmetic import r_longlong, intmask
 from rpython.rlib import rposix
+from rpython.rlib.rreadahead import HAVE_READAHEAD, ReadAhead
+from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_renamer
 from pypy.module._io.interp_iobase import (
     W_IOBase, DEFAULT_BUFFER_SIZE, convert_size, trap_eintr,
     check_readable_w, check_writable_w, check_seekable_w)
 from pypy.module._io.interp_io import W_BlockingIOError
+from pypy.module._io.interp_fileio import W_FileIO
 from rpython.rlib import rthread
 
 STATE_ZERO, STATE_OK, STATE_DETACHED = range(3)
@@ -137,6 +142,20 @@ class BufferedMixin:
 
         self.lock = None
 
+        # BufferedReader only: if max_buffer_size is larger than
+        # initial_buffer_size, the buffer doubles on every sequential
+        # refill up to max_buffer_size, and shrinks back after a seek.
+        self.initial_buffer_size = 0
+        self.max_buffer_size = 0
+        self.next_fill_pos = -1     # abs_pos just after the last refill
+
+        # BufferedReader over a FileIO only: the next block is read ahead
+        # by a helper thread if readahead_fd is not -1.
+        self.readahead = None
+        self.readahead_fd = -1
+        self.bytes_read_ahead = 0   # bytes collected from the helper thread
+        self.bytes_readahead_used = 0   # ...and used to fill the buffer
+
         self.readable = False
         self.writable = False
 
@@ -152,15 +171,8 @@ class BufferedMixin:
             raise oefmt(space.w_ValueError,
                         "buffer size must be strictly positive")
 
-        if space.config.translation.split_gc_address_space:
-            # When using split GC address space, it is not possible to get the
-            # raw address of a GC buffer. Therefore we use a buffer backed by
-            # raw memory.
-            self.buffer = RawByteBuffer(self.buffer_size)
-        else:
-            # TODO: test whether using the raw buffer is faster
-            self.buffer = ByteBuffer(self.buffer_size)
-
+        self.buffer = self._allocate_buffer(space, self.buffer_size)
+        self.initial_buffer_size = self.buffer_size
         self.lock = TryLock(space)
 
         try:
@@ -168,6 +180,17 @@ class BufferedMixin:
         except OperationError:
             pass
 
+    def _allocate_buffer(self, space, size):
+        if (space.config.translation.split_gc_address_space or
+                self.readahead_fd >= 0):
+            # When using split GC address space, it is not possible to get the
+            # raw address of a GC buffer. Therefore we use a buffer backed by
+            # raw memory.  The read ahead data is also copied with memcpy().
+            return RawByteBuffer(size)
+        else:
+            # TODO: test whether using the raw buffer is faster
+            return ByteBuffer(size)
+
     def _check_init(self, space):
         if self.state == STATE_ZERO:
             raise oefmt(space.w_ValueError,
@@ -307,6 +330,7 @@ class BufferedMixin:
     def close_w(self, space):
         self._check_init(space)
         with self.lock:
+            self._stop_readahead()
             if self._closed(space):
                 return
         try:
@@ -374,6 +398,8 @@ class BufferedMixin:
     def detach_w(self, space):
         self._check_init(space)
         space.call_method(self, "flush")
+        with self.lock:
+            self._stop_readahead()
         w_raw = self.w_raw
         self.w_raw = None
         self.state = STATE_DETACHED
@@ -546,12 +572,105 @@ class BufferedMixin:
         start = self.read_end
         if start == -1:
             start = 0
+        if start == 0 and self.max_buffer_size > self.initial_buffer_size:
+            self._adapt_buffer_size(space)
         length = self.buffer_size - start
-        size = self._raw_read(space, self.buffer, start, length)
+        size = -1
+        if self.readahead is not None and self.readahead.is_pending():
+            size = self._read_from_readahead(space, start, length)
+        if size < 0:
+            size = self._raw_read(space, self.buffer, start, length)
         if size > 0:
             self.read_end = self.raw_pos = start + size
+            if self.readahead_fd >= 0:
+                self._start_readahead(space)
+        self.next_fill_pos = self.abs_pos
         return size
 
+    def _adapt_buffer_size(self, space):
+        # Must run with the lock held, and with an empty buffer!
+        if self.abs_pos >= 0 and self.abs_pos == self.next_fill_pos:
+            size = self._next_buffer_size()
+        else:
+            size = self.initial_buffer_size
+        if size != self.buffer_size:
+            self.buffer = self._allocate_buffer(space, size)
+            self.buffer_size = size
+
+    def _next_buffer_size(self):
+        # the buffer size of the next refill, if it is sequential
+        size = self.buffer_size
+        if size < self.max_buffer_size:
+            size = min(size * 2, self.max_buffer_size)
+        return size
+
+    def _raw_fileio_fd(self):
+        w_raw = self.w_raw
+        if isinstance(w_raw, W_FileIO):
+            return w_raw.fd
+        return -1
+
+    def _start_readahead(self, space):
+        # Start reading the next block in the helper thread.  The raw
+        # stream must still be the file it was when we started.
+        if not HAVE_READAHEAD:
+            return
+        if self.abs_pos < 0 or self._raw_fileio_fd() != self.readahead_fd:
+            return
+        if self.readahead is None:
+            self.readahead = ReadAhead()
+        try:
+            self.readahead.start(self.readahead_fd, self.abs_pos,
+                                 self._next_buffer_size())
+        except OSError:
+            self._stop_readahead()
+
+    def _read_from_readahead(self, space, start, length):
+        # Fill the buffer from the block read ahead, if it is the one we
+        # need.  Returns -1 if the caller must read from the raw stream.
+        readahead = self.readahead
+        offset = readahead.pending_offset
+        n = readahead.wait()    # releases the GIL if the read is not done
+        if n <= 0:
+            return -1     # errors and EOF are reported by the normal read
+        self.bytes_read_ahead += n
+        if (offset != self.abs_pos or n > length or
+                self._raw_fileio_fd() != self.readahead_fd):
+            return -1
+        # move the file position as if we had read() the data ourselves
+        try:
+            os.lseek(self.readahead_fd, self.abs_pos + n, 0)
+        except OSError:
+            return -1
+        buf = rffi.ptradd(self.buffer.get_raw_address(), start)
+        rffi.c_memcpy(rffi.cast(rffi.VOIDP, buf),
+                      rffi.cast(rffi.VOIDP, readahead.get_buffer()), n)
+        self.abs_pos += n
+        self.bytes_readahead_used += n
+        return n
+
+    def _stop_readahead(self):
+        # Must run with the lock held!
+        self.readahead_fd = -1
+        if self.readahead is not None:
+            self.readahead.free()
+            self.readahead = None
+
+    def readahead_stats_w(self, space):
+        """readahead_stats() -> dict
+
+        The current buffer size, and the number of bytes read ahead by the
+        helper thread and of those actually used.  PyPy extension."""
+        self._check_init(space)
+        w_stats = space.newdict()
+        space.setitem_str(w_stats, "buffer_size",
+                          space.newint(self.buffer_size))
+        space.setitem_str(w_stats, "bytes_read_ahead",
+                          space.newint(self.bytes_read_ahead))
+        space.setitem_str(w_stats, "bytes_consumed",
+                          space.newint(self.bytes_readahead_used))
+        return w_stats
+
     def _read_generic(self, space, n):
         """Generic read function: read from the stream until enough bytes are
            read, or until an EOF occurs or until read() would block."""
@@ -829,14 +948,22 @@ class BufferedMixin:
                 self._reader_reset_buf()
 
 class W_BufferedReader(BufferedMixin, W_BufferedIOBase):
-    @unwrap_spec(buffer_size=int)
-    def descr_init(self, space, w_raw, buffer_size=DEFAULT_BUFFER_SIZE):
+    @unwrap_spec(buffer_size=int, max_buffer_size=int, readahead=bool)
+    def descr_init(self, space, w_raw, buffer_size=DEFAULT_BUFFER_SIZE,
+                   max_buffer_size=0, readahead=False):
+        if self.lock is not None:
+            with self.lock:
+                self._stop_readahead()
         self.state = STATE_ZERO
         check_readable_w(space, w_raw)
 
         self.w_raw = w_raw
         self.buffer_size = buffer_size
+        self.max_buffer_size = max_buffer_size
         self.readable = True
+        if HAVE_READAHEAD and readahead:
+            # only for a real FileIO, whose data we can pread() ourselves
+            self.readahead_fd = self._raw_fileio_fd()
 
         self._init(space)
         self._reader_reset_buf()
@@ -852,6 +979,7 @@ W_BufferedReader.typedef = TypeDef(
     read1 = interp2app(W_BufferedReader.read1_w),
     raw = interp_attrproperty_w("w_raw", cls=W_BufferedReader),
     readline = interp2app(W_BufferedReader.readline_w),
+    readahead_stats = interp2app(W_BufferedReader.readahead_stats_w),
 
     # from the mixin class
     __repr__ = interp2app(W_BufferedReader.repr_w),
@@ -4,6 +4,7 @@ from pypy.interpreter.error import (
     OperationError, oefmt, wrap_oserror, wrap_oserror2)
 from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import r_longlong
+from rpython.rlib import rposix
 from rpython.rlib.rposix import c_read, get_saved_errno, open
 from rpython.rlib.rstring import StringBuilder
 from rpython.rtyper.lltypesystem import lltype, rffi
@@ -11,6 +12,8 @@ from os import O_RDONLY, O_WRONLY, O_RDWR, O_CREAT, O_TRUNC
 import sys, os, stat, errno
 from pypy.module._io.interp_iobase import W_RawIOBase, convert_size
 
+HAVE_PREAD = hasattr(rposix, 'c_pread')
+
 def interp_member_w(name, cls, doc=None):
     "NOT_RPYTHON: initialization-time only"
     def fget(space, obj):
@@ -404,6 +407,55 @@ class W_FileIO(W_RawIOBase):
                 e = OSError(err, "read failed")
                 raise wrap_oserror(space, e, w_exception_class=space.w_IOError)
 
+    @unwrap_spec(offset=r_longlong)
+    def readinto_at_w(self, space, w_buffer, offset):
+        """readinto_at(buffer, offset) -> number of bytes read
+
+        Read into the buffer from the given position in the file, with
+        pread().  The current file position is neither used nor changed,
+        so several threads can read different parts of the same file
+        concurrently: the GIL is released during the system call."""
+        self._check_closed(space)
+        self._check_readable(space)
+        if not HAVE_PREAD:
+            raise oefmt(space.w_NotImplementedError,
+                        "readinto_at() is not available on this platform")
+        if offset < 0:
+            raise oefmt(space.w_ValueError, "negative offset")
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        length = rwbuffer.getlength()
+
+        target_address = lltype.nullptr(rffi.CCHARP.TO)
+        if length > 64:
+            try:
+                target_address = rwbuffer.get_raw_address()
+            except ValueError:
+                pass
+
+        if not target_address:
+            try:
+                buf = rposix.pread(self.fd, length, offset)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    return space.w_None
+                raise wrap_oserror(space, e,
+                                   w_exception_class=space.w_IOError)
+            self.output_slice(space, rwbuffer, 0, buf)
+            return space.newint(len(buf))
+        else:
+            got = rposix.c_pread(self.fd, rffi.cast(rffi.VOIDP, target_address),
+                                 length, offset)
+            keepalive_until_here(rwbuffer)
+            got = rffi.cast(lltype.Signed, got)
+            if got >= 0:
+                return space.newint(got)
+            else:
+                err = get_saved_errno()
+                if err == errno.EAGAIN:
+                    return space.w_None
+                e = OSError(err, "pread failed")
+                raise wrap_oserror(space, e, w_exception_class=space.w_IOError)
+
     def readall_w(self, space):
         self._check_closed(space)
         self._check_readable(space)
@@ -465,6 +517,7 @@ W_FileIO.typedef = TypeDef(
     write = interp2app(W_FileIO.write_w),
     read = interp2app(W_FileIO.read_w),
     readinto = interp2app(W_FileIO.readinto_w),
+    readinto_at = interp2app(W_FileIO.readinto_at_w),
     readall = interp2app(W_FileIO.readall_w),
     truncate = interp2app(W_FileIO.truncate_w),
     close = interp2app(W_FileIO.close_w),
@@ -13,7 +13,7 @@ from rpython.rlib.rbigint import rbigint
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rutf8 import (check_utf8, next_codepoint_pos,
                                 codepoints_in_utf8, codepoints_in_utf8,
-                                Utf8StringBuilder)
+                                Utf8StringBuilder, CheckError)
 
 
 STATE_ZERO, STATE_OK, STATE_DETACHED = range(3)
@@ -25,6 +25,72 @@ SEEN_ALL  = SEEN_CR | SEEN_LF | SEEN_CRLF
 
 _WINDOWS = sys.platform == 'win32'
 
+def process_newlines(output, final, pendingcr, translate, seennl):
+    """The newline handling of IncrementalNewlineDecoder.decode(), on the
+    utf-8 'output' of the underlying decoder.  Returns the new values of
+    (output, pendingcr, seennl)."""
+    if pendingcr and (final or len(output) > 0):
+        output = '\r' + output
+        pendingcr = False
+
+    # retain last \r even when not translating data:
+    # then readline() is sure to get \r\n in one pass
+    if not final and len(output) > 0:
+        last = len(output) - 1
+        assert last >= 0
+        if output[last] == '\r':
+            output = output[:last]
+            pendingcr = True
+
+    if not output:
+        return output, pendingcr, seennl
+
+    # Record which newlines are read and do newline translation if
+    # desired, all in one pass.
+    if output.find('\r') < 0:
+        # If no \r, quick scan for a possible "\n" character.
+        # (there's nothing else to be done, even when in translation mode)
+        if output.find('\n') >= 0:
+            seennl |= SEEN_LF
+            # Finished: we have scanned for newlines, and none of them
+            # need translating.
+    elif not translate:
+        i = 0
+        while i < len(output):
+            if seennl == SEEN_ALL:
+                break
+            c = output[i]
+            i += 1
+            if c == '\n':
+                seennl |= SEEN_LF
+            elif c == '\r':
+                if i < len(output) and output[i] == '\n':
+                    seennl |= SEEN_CRLF
+                    i += 1
+                else:
+                    seennl |= SEEN_CR
+    else:
+        # Translate!
+        builder = StringBuilder(len(output))
+        i = 0
+        while i < len(output):
+            c = output[i]
+            i += 1
+            if c == '\n':
+                seennl |= SEEN_LF
+            elif c == '\r':
+                if i < len(output) and output[i] == '\n':
+                    seennl |= SEEN_CRLF
+                    i += 1
+                else:
+                    seennl |= SEEN_CR
+                builder.append('\n')
+                continue
+            builder.append(c)
+        output = builder.build()
+    return output, pendingcr, seennl
+
+
 class W_IncrementalNewlineDecoder(W_Root):
     seennl = 0
     pendingcr = False
@@ -81,74 +147,12 @@ class W_IncrementalNewlineDecoder(W_Root):
             raise oefmt(space.w_TypeError,
                         "decoder should return a string result")
 
-        output, output_len = space.utf8_len_w(w_output)
-        output_len = len(output)
-        if self.pendingcr and (final or output_len):
-            output = '\r' + output
-            self.pendingcr = False
-            output_len += 1
-
-        # retain last \r even when not translating data:
-        # then readline() is sure to get \r\n in one pass
-        if not final and output_len > 0:
-            last = len(output) - 1
-            assert last >= 0
-            if output[last] == '\r':
-                output = output[:last]
-                self.pendingcr = True
-                output_len -= 1
-
-        if output_len == 0:
-            return space.newutf8("", 0)
-
-        # Record which newlines are read and do newline translation if
-        # desired, all in one pass.
-        seennl = self.seennl
-
-        if output.find('\r') < 0:
-            # If no \r, quick scan for a possible "\n" character.
-            # (there's nothing else to be done, even when in translation mode)
-            if output.find('\n') >= 0:
-                seennl |= SEEN_LF
-                # Finished: we have scanned for newlines, and none of them
-                # need translating.
-        elif not self.translate:
-            i = 0
-            while i < len(output):
-                if seennl == SEEN_ALL:
-                    break
-                c = output[i]
-                i += 1
-                if c == '\n':
-                    seennl |= SEEN_LF
-                elif c == '\r':
-                    if i < len(output) and output[i] == '\n':
-                        seennl |= SEEN_CRLF
-                        i += 1
-                    else:
-                        seennl |= SEEN_CR
-        elif output.find('\r') >= 0:
-            # Translate!
-            builder = StringBuilder(len(output))
-            i = 0
-            while i < output_len:
-                c = output[i]
-                i += 1
-                if c == '\n':
-                    seennl |= SEEN_LF
-                elif c == '\r':
-                    if i < len(output) and output[i] == '\n':
-                        seennl |= SEEN_CRLF
-                        i += 1
-                    else:
-                        seennl |= SEEN_CR
-                    builder.append('\n')
-                    continue
-                builder.append(c)
-            output = builder.build()
-
-        self.seennl |= seennl
-        lgt = check_utf8(output, True)
+        output, lgt = space.utf8_len_w(w_output)
+        # only ascii characters are added or removed
+        oldsize = len(output)
+        output, self.pendingcr, self.seennl = process_newlines(
+            output, final, self.pendingcr, self.translate, self.seennl)
+        lgt += len(output) - oldsize
         return space.newutf8(output, lgt)
 
     def reset_w(self, space):
@@ -193,6 +197,98 @@ W_IncrementalNewlineDecoder.typedef = TypeDef(
     newlines = GetSetProperty(W_IncrementalNewlineDecoder.newlines_get_w),
 )
 
+class FastDecoder(object):
+    """Incremental decoder used by TextIOWrapper for the utf-8, ascii and
+    latin-1 codecs instead of the codec's app-level incrementaldecoder
+    (wrapped in an IncrementalNewlineDecoder in universal newlines mode).
+    The result is directly the utf-8 representation of the decoded text;
+    valid utf-8 (or ascii) input is returned without being copied.  The
+    getstate() values are the same as the ones of the decoders it
+    replaces, so the tell() cookies are too."""
+
+    def __init__(self, encoding, errors, universal, translate):
+        self.encoding = encoding
+        self.errors = errors
+        self.universal = universal
+        self.translate = translate
+        self.reset()
+
+    def reset(self):
+        self.pending = ''       # incomplete utf-8 sequence
+        self.pendingcr = False
+        self.seennl = 0
+
+    def getstate(self):
+        flag = 0
+        if self.universal and self.pendingcr:
+            flag = 1
+        return self.pending, flag
+
+    def setstate(self, pending, flag):
+        self.pending = pending
+        self.pendingcr = self.universal and bool(flag & 1)
+
+    def decode(self, space, input, final):
+        """Returns (utf8, length)"""
+        from pypy.interpreter import unicodehelper
+        from pypy.module._codecs.interp_codecs import CodecState
+        if self.pending:
+            input = self.pending + input
+            self.pending = ''
+        errorhandler = space.fromcache(CodecState).decode_error_handler
+        if self.encoding == 'utf-8':
+            try:
+                lgt = check_utf8(input, True)
+            except CheckError:
+                output, consumed, lgt = unicodehelper.str_decode_utf8(
+                    input, self.errors, final, errorhandler)
+                if consumed < len(input):
+                    assert consumed >= 0
+                    self.pending = input[consumed:]
+            else:
+                output = input
+        elif self.encoding == 'ascii':
+            output, _, lgt = unicodehelper.str_decode_ascii(
+                input, self.errors, final, errorhandler)
+        else:
+            output, _, lgt = unicodehelper.str_decode_latin_1(
+                input, self.errors, final, errorhandler)
+        if self.universal:
+            # only ascii characters are added or removed
+            oldsize = len(output)
+            output, self.pendingcr, self.seennl = process_newlines(
+                output, final, self.pendingcr, self.translate, self.seennl)
+            lgt += len(output) - oldsize
+        return output, lgt
+
+    def newlines_w(self, space):
+        newlines_w = []
+        if self.seennl & SEEN_CR:
+            newlines_w.append(space.newutf8("\r", 1))
+        if self.seennl & SEEN_LF:
+            newlines_w.append(space.newutf8("\n", 1))
+        if self.seennl & SEEN_CRLF:
+            newlines_w.append(space.newutf8("\r\n", 2))
+        if not newlines_w:
+            return space.w_None
+        if len(newlines_w) == 1:
+            return newlines_w[0]
+        return space.newtuple(newlines_w)
+
+FAST_ENCODINGS = ['utf-8', 'ascii', 'iso8859-1']
+
+def _fast_codec_name(space, w_codec):
+    """Returns the name of the codec if FastDecoder implements it"""
+    w_name = space.findattr(w_codec, space.newtext("name"))
+    if w_name is None or not space.isinstance_w(w_name, space.w_bytes):
+        return None
+    name = space.bytes_w(w_name)
+    for fast_name in FAST_ENCODINGS:
+        if name == fast_name:
+            return fast_name
+    return None
+
+
 class W_TextIOBase(W_IOBase):
     w_encoding = None
 
@@ -302,10 +398,10 @@ class DecodeBuffer(object):
         self.upos = 0
         self.ulen = ulen
 
-    def set(self, space, w_decoded):
-        check_decoded(space, w_decoded)
-        self.ulen = space.len_w(w_decoded)
-        self.text = space.utf8_w(w_decoded)
+    def set(self, text, ulen):
+        assert ulen >= 0
+        self.text = text
+        self.ulen = ulen
         self.pos = 0
         self.upos = 0
 
@@ -372,92 +468,79 @@ class DecodeBuffer(object):
         assert newpos >= 0
         return self.text[pos:newpos]
 
+    def skip_chars(self, count):
+        # must only be called with at most the number of chars left
+        if self.ulen == len(self.text):
+            self.pos += count
+            self.upos += count
+        else:
+            for i in range(count):
+                self._advance_codepoint()
+
+    # The markers searched by the find_*() methods are ascii, and the bytes
+    # of the utf-8 encoding of a larger char are never ascii, so the search
+    # is done directly on the utf-8 bytes; only the number of chars skipped
+    # over is computed afterwards.  A non-negative 'limit' is the maximum
+    # number of chars to consume, including the marker.
+
+    def _consume_until(self, stop, found, limit):
+        count = self._count_chars(self.pos, stop)
+        if 0 <= limit < count:
+            self.skip_chars(limit)
+            return False
+        self.pos = stop
+        self.upos += count
+        return found
+
     def find_newline_universal(self, limit):
         # Universal newline search. Find any of \r, \r\n, \n
         # The decoder ensures that \r\n are not split in two pieces
-        if limit < 0:
-            limit = sys.maxint
-        scanned = 0
-        while scanned < limit:
-            if self.exhausted():
-                return False
-            ch = self.text[self.pos]
-            self._advance_codepoint()
-            scanned += 1
+        text = self.text
+        end = len(text)
+        i = self.pos
+        while i < end:
+            ch = text[i]
             if ch == '\n':
-                return True
+                return self._consume_until(i + 1, True, limit)
             if ch == '\r':
-                if scanned >= limit:
-                    return False
-                if self.exhausted():
-                    return True
-                ch = self.text[self.pos]
-                if ch == '\n':
-                    self._advance_codepoint()
-                    return True
-                else:
-                    return True
-        return False
+                if i + 1 < end and text[i + 1] == '\n':
+                    return self._consume_until(i + 2, True, limit)
+                return self._consume_until(i + 1, True, limit)
+            i += 1
+        return self._consume_until(end, False, limit)
 
     def find_crlf(self, limit):
-        if limit < 0:
-            limit = sys.maxint
-        scanned = 0
-        while scanned < limit:
-            if self.exhausted():
-                return False
-            ch = self.text[self.pos]
-            self._advance_codepoint()
-            scanned += 1
-            if ch == '\r':
-                if scanned >= limit:
-                    return False
-                if self.exhausted():
-                    # This is the tricky case: we found a \r right at the end,
-                    # un-consume it
-                    self.pos -= 1
-                    self.upos -= 1
-                    return False
-                if self.text[self.pos] == '\n':
-                    self._advance_codepoint()
-                    return True
-        return False
+        text = self.text
+        start = self.pos
+        assert start >= 0
+        pos = text.find('\r\n', start)
+        if pos >= 0:
+            return self._consume_until(pos + 2, True, limit)
+        end = len(text)
+        if end > start and text[end - 1] == '\r':
+            # This is the tricky case: we found a \r right at the end,
+            # don't consume it unless 'limit' stops the search right there
+            if limit < 0 or self._count_chars(start, end) != limit:
+                return self._consume_until(end - 1, False, limit)
+        return self._consume_until(end, False, limit)
 
     def find_char(self, marker, limit):
         # only works for ascii markers!
         assert 0 <= ord(marker) < 128
-        # ascii fast path
+        start = self.pos
+        assert start >= 0
+        end = len(self.text)
+        if limit >= 0 and self.ulen == end:
+            end = min(end, start + limit)
+        pos = self.text.find(marker, start, end)
+        if pos >= 0:
+            return self._consume_until(pos + 1, True, limit)
+        return self._consume_until(end, False, limit)
+
+    def _count_chars(self, start, stop):
         if self.ulen == len(self.text):
-            end = len(self.text)
-            if limit >= 0:
-                end = min(end, self.pos + limit)
-            pos = self.pos
-            assert pos >= 0
-            assert end >= 0
-            pos = self.text.find(marker, pos, end)
-            if pos >= 0:
-                self.pos = self.upos = pos + 1
-                return True
-            else:
-                self.pos = self.upos = end
-                return False
-
-        if limit < 0:
-            limit = sys.maxint
-        # XXX it might be better to search for the marker quickly, then compute
-        # the new upos afterwards.
-        scanned = 0
-        while scanned < limit:
-            # don't use next_char here, since that computes a slice etc
-            if self.exhausted():
-                return False
-            # this is never true if self.text[pos] is part of a larger char
-            found = self.text[self.pos] == marker
-            self._advance_codepoint()
-            if found:
-                return True
-            scanned += 1
-        return False
+            return stop - start
+        return codepoints_in_utf8(self.text, start, stop)
 
     def _advance_codepoint(self):
         # must only be called after checking self.exhausted()!
@@ -478,6 +561,7 @@ class W_TextIOWrapper(W_TextIOBase):
         self.state = STATE_ZERO
         self.w_encoder = None
         self.w_decoder = None
+        self.decoder = None     # a FastDecoder, used instead of w_decoder
 
         self.decoded = DecodeBuffer()
         self.pending_bytes = None   # list of bytes objects waiting to be
@@ -529,12 +613,21 @@ class W_TextIOWrapper(W_TextIOBase):
             self.writenl = None
 
         # build the decoder object
+        self.w_decoder = None
+        self.decoder = None
         if space.is_true(space.call_method(w_buffer, "readable")):
             w_codec = interp_codecs.lookup_codec(space,
                                                  space.text_w(self.w_encoding))
-            self.w_decoder = space.call_method(w_codec,
+            codec_name = _fast_codec_name(space, w_codec)
+            if (codec_name is not None and
+                    space.isinstance_w(w_errors, space.w_bytes)):
+                self.decoder = FastDecoder(codec_name, space.bytes_w(w_errors),
+                                           self.readuniversal,
+                                           self.readtranslate)
+            else:
+                self.w_decoder = space.call_method(w_codec,
                                                "incrementaldecoder", w_errors)
-            if self.readuniversal:
+            if self.w_decoder is not None and self.readuniversal:
                 self.w_decoder = space.call_function(
                     space.gettypeobject(W_IncrementalNewlineDecoder.typedef),
                     self.w_decoder, space.newbool(self.readtranslate))
@@ -612,6 +705,8 @@ class W_TextIOWrapper(W_TextIOBase):
 
     def newlines_get_w(self, space):
         self._check_attached(space)
+        if self.decoder is not None:
+            return self.decoder.newlines_w(space)
         if self.w_decoder is None:
             return space.w_None
         return space.findattr(self.w_decoder, space.newtext("newlines"))
@@ -644,6 +739,46 @@ class W_TextIOWrapper(W_TextIOBase):
                 ret = space.call_method(self.w_buffer, "close")
             return ret
 
+    # _____________________________________________________________
+    # decoder
+
+    def _has_decoder(self):
+        return self.decoder is not None or self.w_decoder is not None
+
+    def _decode(self, space, w_input, final):
+        """Returns (utf8, length)"""
+        if self.decoder is not None:
+            return self.decoder.decode(space, space.bytes_w(w_input), final)
+        w_decoded = space.call_method(self.w_decoder, "decode",
+                                      w_input, space.newbool(final))
+        check_decoded(space, w_decoded)
+        return space.utf8_len_w(w_decoded)
+
+    def _decoder_getstate(self, space):
+        """Returns (dec_buffer, dec_flags)"""
+        if self.decoder is not None:
+            return self.decoder.getstate()
+        w_state = space.call_method(self.w_decoder, "getstate")
+        if (not space.isinstance_w(w_state, space.w_tuple)
+                or space.len_w(w_state) != 2):
+            raise oefmt(space.w_TypeError, "illegal decoder state")
+        w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
+        return space.bytes_w(w_dec_buffer), space.int_w(w_dec_flags)
+
+    def _decoder_setstate_raw(self, space, dec_buffer, dec_flags):
+        if self.decoder is not None:
+            self.decoder.setstate(dec_buffer, dec_flags)
+        else:
+            space.call_method(self.w_decoder, "setstate",
+                              space.newtuple2(space.newbytes(dec_buffer),
+                                              space.newint(dec_flags)))
+
+    def _decoder_reset(self, space):
+        if self.decoder is not None:
+            self.decoder.reset()
+        else:
+            space.call_method(self.w_decoder, "reset")
+
     # _____________________________________________________________
     # read methods
 
@@ -654,21 +789,15 @@ class W_TextIOWrapper(W_TextIOBase):
         The entire input chunk is sent to the decoder, though some of it may
         remain buffered in the decoder, yet to be converted."""
 
-        if not self.w_decoder:
+        if not self._has_decoder():
             raise oefmt(space.w_IOError, "not readable")
 
         if self.telling:
             # To prepare for tell(), we need to snapshot a point in the file
             # where the decoder's input buffer is empty.
-            w_state = space.call_method(self.w_decoder, "getstate")
-            if (not space.isinstance_w(w_state, space.w_tuple)
-                    or space.len_w(w_state) != 2):
-                raise oefmt(space.w_TypeError, "illegal decoder state")
             # Given this, we know there was a valid snapshot point
             # len(dec_buffer) bytes ago with decoder state (b'', dec_flags).
-            w_dec_buffer, w_dec_flags = space.unpackiterable(w_state, 2)
-            dec_buffer = space.bytes_w(w_dec_buffer)
-            dec_flags = space.int_w(w_dec_flags)
+            dec_buffer, dec_flags = self._decoder_getstate(space)
         else:
             dec_buffer = None
             dec_flags = 0
@@ -683,10 +812,9 @@ class W_TextIOWrapper(W_TextIOBase):
             raise oefmt(space.w_TypeError, msg, w_input)
 
         eof = space.len_w(w_input) == 0
-        w_decoded = space.call_method(self.w_decoder, "decode",
-                                      w_input, space.newbool(eof))
-        self.decoded.set(space, w_decoded)
-        if space.len_w(w_decoded) > 0:
+        text, lgt = self._decode(space, w_input, eof)
+        self.decoded.set(text, lgt)
+        if lgt > 0:
             eof = False
 
         if self.telling:
@@ -713,6 +841,16 @@ class W_TextIOWrapper(W_TextIOBase):
     def next_w(self, space):
         self._check_attached(space)
         self.telling = False
+        if space.is_w(space.type(self),
+                      space.gettypeobject(W_TextIOWrapper.typedef)):
+            # not a subclass: call _readline() without looking up readline
+            self._check_closed(space)
+            self._writeflush(space)
+            text, lgt = self._readline(space, -1)
+            if lgt == 0:
+                self.telling = self.seekable
+                raise OperationError(space.w_StopIteration, space.w_None)
+            return space.newutf8(text, lgt)
         try:
             return W_TextIOBase.next_w(self, space)
         except OperationError as e:
@@ -723,7 +861,7 @@ class W_TextIOWrapper(W_TextIOBase):
     def read_w(self, space, w_size=None):
         self._check_attached(space)
         self._check_closed(space)
-        if not self.w_decoder:
+        if not self._has_decoder():
             raise oefmt(space.w_IOError, "not readable")
 
         size = convert_size(space, w_size)
@@ -732,14 +870,13 @@ class W_TextIOWrapper(W_TextIOBase):
         if size < 0:
             # Read everything
             w_bytes = space.call_method(self.w_buffer, "read")
-            w_decoded = space.call_method(self.w_decoder, "decode", w_bytes, space.w_True)
-            check_decoded(space, w_decoded)
+            text, textlgt = self._decode(space, w_bytes, True)
             chars, lgt = self.decoded.get_chars(-1)
-            w_result = space.newutf8(chars, lgt)
-            w_final = space.add(w_result, w_decoded)
             self.decoded.reset()
             self.snapshot = None
-            return w_final
+            if lgt == 0:
+                return space.newutf8(text, textlgt)
+            return space.newutf8(chars + text, lgt + textlgt)
 
         remaining = size
         builder = Utf8StringBuilder(size)
@@ -755,15 +892,14 @@ class W_TextIOWrapper(W_TextIOBase):
         return space.newutf8(builder.build(), builder.getlength())
 
     def _scan_line_ending(self, limit):
-        if self.readuniversal:
+        if self.readtranslate:
+            # Newlines are already translated, only search for \n
+            return self.decoded.find_char('\n', limit)
+        elif self.readuniversal:
             return self.decoded.find_newline_universal(limit)
         else:
-            if self.readtranslate:
-                # Newlines are already translated, only search for \n
-                newline = '\n'
-            else:
-                # Non-universal mode.
-                newline = self.readnl
+            # Non-universal mode.
+            newline = self.readnl
             if newline == '\r\n':
                 return self.decoded.find_crlf(limit)
             else:
@@ -819,6 +955,12 @@ class W_TextIOWrapper(W_TextIOBase):
             found = self._scan_line_ending(remaining)
             end_scan = self.decoded.pos
             uend_scan = self.decoded.upos
+            if builder.getlength() == 0 and (
+                    found or (limit >= 0 and uend_scan - ustart >= limit)):
+                # the common case of a whole line in the decoded chunk:
+                # return a slice of it instead of copying it to 'builder'
+                assert end_scan >= 0
+                return self.decoded.text[start:end_scan], uend_scan - ustart
             if end_scan > start:
                 builder.append_utf8_slice(self.decoded.text, start, end_scan, uend_scan - ustart)
 
@@ -892,8 +1034,8 @@ class W_TextIOWrapper(W_TextIOBase):
         self.decoded.reset()
         self.snapshot = None
 
-        if self.w_decoder:
-            space.call_method(self.w_decoder, "reset")
+        if self._has_decoder():
+            self._decoder_reset(space)
 
         return space.newint(textlen)
 
@@ -938,11 +1080,9 @@ class W_TextIOWrapper(W_TextIOBase):
         # at start is not (b"", 0) but e.g. (b"", 2) (meaning, in the case of
         # utf-16, that we are expecting a BOM).
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
-            space.call_method(self.w_decoder, "reset")
+            self._decoder_reset(space)
         else:
-            space.call_method(self.w_decoder, "setstate",
-                              space.newtuple2(space.newbytes(""),
-                                              space.newint(cookie.dec_flags)))
+            self._decoder_setstate_raw(space, "", cookie.dec_flags)
 
     def _encoder_setstate(self, space, cookie):
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
@@ -976,8 +1116,8 @@ class W_TextIOWrapper(W_TextIOBase):
             space.call_method(self, "flush")
             self.decoded.reset()
             self.snapshot = None
-            if self.w_decoder:
-                space.call_method(self.w_decoder, "reset")
+            if self._has_decoder():
+                self._decoder_reset(space)
             return space.call_method(self.w_buffer, "seek",
                                      w_pos, space.newint(whence))
 
@@ -1003,7 +1143,7 @@ class W_TextIOWrapper(W_TextIOBase):
         self.snapshot = None
 
         # Restore the decoder to its state from the safe start point.
-        if self.w_decoder:
+        if self._has_decoder():
             self._decoder_setstate(space, cookie)
 
         if cookie.chars_to_skip:
@@ -1018,16 +1158,14 @@ class W_TextIOWrapper(W_TextIOBase):
             self.snapshot = PositionSnapshot(cookie.dec_flags,
                                              space.bytes_w(w_chunk))
 
-            w_decoded = space.call_method(self.w_decoder, "decode",
-                                          w_chunk, space.newbool(bool(cookie.need_eof)))
-            w_decoded = check_decoded(space, w_decoded)
+            text, lgt = self._decode(space, w_chunk, bool(cookie.need_eof))
 
             # Skip chars_to_skip of the decoded characters
-            if space.len_w(w_decoded) < cookie.chars_to_skip:
+            if lgt < cookie.chars_to_skip:
                 raise oefmt(space.w_IOError,
                             "can't restore logical file position")
-            self.decoded.set(space, w_decoded)
-            self.decoded.pos = w_decoded._index_to_byte(cookie.chars_to_skip)
+            self.decoded.set(text, lgt)
+            self.decoded.skip_chars(cookie.chars_to_skip)
         else:
             self.snapshot = PositionSnapshot(cookie.dec_flags, "")
 
@@ -1050,7 +1188,7 @@ class W_TextIOWrapper(W_TextIOBase):
 
         w_pos = space.call_method(self.w_buffer, "tell")
 
-        if self.w_decoder is None or self.snapshot is None:
+        if not self._has_decoder() or self.snapshot is None:
             assert not self.decoded.text
             return w_pos
 
@@ -1071,7 +1209,7 @@ class W_TextIOWrapper(W_TextIOBase):
 
         # Starting from the snapshot position, we will walk the decoder
         # forward until it gives us enough decoded characters.
-        w_saved_state = space.call_method(self.w_decoder, "getstate")
+        saved_buffer, saved_flags = self._decoder_getstate(space)
 
         try:
             # Note our initial start point
@@ -1085,23 +1223,19 @@ class W_TextIOWrapper(W_TextIOBase):
             chars_decoded = 0
             i = 0
             while i < len(input):
-                w_decoded = space.call_method(self.w_decoder, "decode",
-                                              space.newbytes(input[i]))
-                check_decoded(space, w_decoded)
-                chars_decoded += space.len_w(w_decoded)
+                _, lgt = self._decode(space, space.newbytes(input[i]), False)
+                chars_decoded += lgt
 
                 cookie.bytes_to_feed += 1
 
-                w_state = space.call_method(self.w_decoder, "getstate")
-                w_dec_buffer, w_flags = space.unpackiterable(w_state, 2)
-                dec_buffer_len = space.len_w(w_dec_buffer)
+                dec_buffer, dec_flags = self._decoder_getstate(space)
 
-                if dec_buffer_len == 0 and chars_decoded <= chars_to_skip:
+                if len(dec_buffer) == 0 and chars_decoded <= chars_to_skip:
                     # Decoder buffer is empty, so this is a safe start point.
                     cookie.start_pos += cookie.bytes_to_feed
                     chars_to_skip -= chars_decoded
                     assert chars_to_skip >= 0
-                    cookie.dec_flags = space.int_w(w_flags)
+                    cookie.dec_flags = dec_flags
                     cookie.bytes_to_feed = 0
                     chars_decoded = 0
                 if chars_decoded >= chars_to_skip:
@@ -1109,18 +1243,15 @@ class W_TextIOWrapper(W_TextIOBase):
                 i += 1
             else:
                 # We didn't get enough decoded data; signal EOF to get more.
-                w_decoded = space.call_method(self.w_decoder, "decode",
-                                              space.newbytes(""),
-                                              space.newint(1))  # final=1
-                check_decoded(space, w_decoded)
-                chars_decoded += space.len_w(w_decoded)
+                _, lgt = self._decode(space, space.newbytes(""), True)
+                chars_decoded += lgt
                 cookie.need_eof = 1
 
                 if chars_decoded < chars_to_skip:
                     raise oefmt(space.w_IOError,
                         "can't reconstruct logical file position")
         finally:
-            space.call_method(self.w_decoder, "setstate", w_saved_state)
+            self._decoder_setstate_raw(space, saved_buffer, saved_flags)
 
         # The returned cookie corresponds to the last safe start point.
         cookie.chars_to_skip = chars_to_skip
@@ -405,3 +405,69 @@ def test_newlines2():
     for ch in msg:
         decoded += decoder.decode(ch)
     assert set(decoder.newlines) == {"\r", "\n", "\r\n"}
+
+def test_fast_decoder_lines():
+    # utf-8, ascii and latin-1 are decoded without the codec's
+    # incrementaldecoder; check lines split across tiny chunks
+    text = u"h\xe9llo\r\nw€rld\r\U00010000\nend"
+    for enc in ["utf-8", "utf8", "UTF-8", "latin-1", "ascii"]:
+        try:
+            data = text.encode(enc)
+        except UnicodeEncodeError:
+            data = text.encode(enc, "replace")
+        expected = data.decode(enc)
+        for newline in [None, "", "\n", "\r", "\r\n"]:
+            for chunk_size in [1, 2, 3, 8192]:
+                t = _io.TextIOWrapper(_io.BytesIO(data), encoding=enc,
+                                      newline=newline)
+                t._CHUNK_SIZE = chunk_size
+                lines = list(t)
+                assert u"".join(lines) == (
+                    expected.replace(u"\r\n", u"\n").replace(u"\r", u"\n")
+                    if newline is None else expected)
+                t.seek(0)
+                assert t.readlines() == lines
+    t = _io.TextIOWrapper(_io.BytesIO(b"a\r\nb\rc\n"), encoding="utf-8")
+    t.read()
+    assert set(t.newlines) == {"\r", "\n", "\r\n"}
+
+def test_fast_decoder_errors():
+    data = b"abc\xff\xc3\n\xc3\xa9\n"
+    t = _io.TextIOWrapper(_io.BytesIO(data), encoding="utf-8")
+    raises(UnicodeDecodeError, t.read)
+    t = _io.TextIOWrapper(_io.BytesIO(data), encoding="utf-8",
+                          errors="replace")
+    assert t.readline() == u"abc��\n"
+    assert t.readline() == u"\xe9\n"
+    t = _io.TextIOWrapper(_io.BytesIO(data), encoding="ascii",
+                          errors="ignore")
+    assert t.read() == u"abc\n\n"
+    # an incomplete sequence at the end of the input
+    t = _io.TextIOWrapper(_io.BytesIO(b"abc\xc3"), encoding="utf-8")
+    raises(UnicodeDecodeError, t.read)
+
+def test_fast_decoder_tell():
+    data = u"\xe9t\xe9\r\nhiver\n€\n".encode("utf-8")
+    t = _io.TextIOWrapper(_io.BytesIO(data), encoding="utf-8")
+    t._CHUNK_SIZE = 3
+    assert t.readline() == u"\xe9t\xe9\n"
+    pos = t.tell()
+    assert t.readline() == u"hiver\n"
+    assert t.read(1) == u"€"
+    pos2 = t.tell()
+    assert t.read() == u"\n"
+    t.seek(pos)
+    assert t.read() == u"hiver\n€\n"
+    t.seek(pos2)
+    assert t.read() == u"\n"
+
+def test_fast_decoder_write_resets():
+    # a chunk ending in the middle of a character, then a write()
+    raw = _io.BytesIO(b"a\xc3\xa9bc")
+    t = _io.TextIOWrapper(_io.BufferedRandom(raw), encoding="utf-8")
+    t._CHUNK_SIZE = 2
+    assert t.read(1) == u"a"
+    t.write(u"Z")
+    assert t.read() == u"bc"
+    t.flush()
+    assert raw.getvalue() == b"a\xc3Zbc"
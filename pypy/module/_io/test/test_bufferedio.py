@@ -17,6 +17,10 @@ class AppTestBufferedReader:
         bigtmpfile = udir.join('bigtmpfile')
         bigtmpfile.write("a\nb\nc" * 20, mode='wb')
         cls.w_bigtmpfile = cls.space.wrap(str(bigtmpfile))
+        seqtmpfile = udir.join('seqtmpfile')
+        seqtmpfile.write(''.join(['%07d\n' % i for i in range(3000)]),
+                         mode='wb')
+        cls.w_seqtmpfile = cls.space.wrap(str(seqtmpfile))
 
     def test_simple_read(self):
         import _io
@@ -255,6 +259,68 @@ class AppTestBufferedReader:
         assert r == "abca"
         assert rawio.count == 4
 
+    def test_adaptive_buffer_size(self):
+        import _io
+        f = _io.BufferedReader(_io.FileIO(self.seqtmpfile), 256,
+                               max_buffer_size=2048)
+        assert f.readahead_stats()['buffer_size'] == 256
+        assert f.readline() == '0000000\n'
+        for i in range(1, 500):
+            assert f.readline() == '%07d\n' % i
+        # the buffer doubled on every sequential refill
+        assert f.readahead_stats()['buffer_size'] == 2048
+        assert len(f.peek(1)) <= 2048
+        f.seek(8 * 2500)
+        assert f.read(8) == '0002500\n'
+        assert f.readahead_stats()['buffer_size'] == 256
+        f.seek(0)
+        assert f.read() == open(self.seqtmpfile, 'rb').read()
+        assert f.readahead_stats()['bytes_read_ahead'] == 0
+        f.close()
+        # by default, the buffer size is fixed
+        f = _io.BufferedReader(_io.FileIO(self.seqtmpfile), 256)
+        for i in range(500):
+            f.readline()
+        assert f.readahead_stats()['buffer_size'] == 256
+        f.close()
+
+    def test_readahead(self):
+        import _io, os
+        expected = open(self.seqtmpfile, 'rb').read()
+        raw = _io.FileIO(self.seqtmpfile)
+        f = _io.BufferedReader(raw, 1024, max_buffer_size=8192,
+                               readahead=True)
+        assert f.read(10) == expected[:10]
+        chunks = [f.readline()]
+        while True:
+            data = f.read(1000)
+            if not data:
+                break
+            chunks.append(data)
+        assert expected[:10] + ''.join(chunks) == expected
+        stats = f.readahead_stats()
+        assert stats['buffer_size'] == 8192
+        if os.name == 'posix':
+            assert stats['bytes_consumed'] > 0
+            assert stats['bytes_read_ahead'] >= stats['bytes_consumed']
+            assert 10 + stats['bytes_consumed'] <= len(expected)
+        # the raw file is at the position of the data buffered so far
+        assert raw.tell() == len(expected)
+        f.seek(8 * 1000)
+        assert f.read(8) == '0001000\n'
+        assert raw.tell() == 8 * 1000 + 1024
+        f.seek(8 * 1000 + 1024)
+        assert f.read(16) == '0001128\n0001129\n'
+        assert f.read() == expected[8 * 1130:]
+        f.close()
+        assert raw.closed
+
+    def test_readahead_not_fileio(self):
+        import _io
+        f = _io.BufferedReader(_io.BytesIO("abc\n" * 1000), readahead=True)
+        assert f.read() == "abc\n" * 1000
+        assert f.readahead_stats()['bytes_read_ahead'] == 0
+
 class AppTestBufferedReaderWithThreads(AppTestBufferedReader):
     spaceconfig = dict(usemodules=['_io', 'thread', 'time'])
 
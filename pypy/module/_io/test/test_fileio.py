@@ -166,6 +166,28 @@ class AppTestFileIO:
         assert f.readinto(a) == 1000
         assert a == 'a' * 1000 + 'x' * 24
 
+    def test_readinto_at(self):
+        import _io, os
+        if os.name == 'nt':
+            skip("no pread() on Windows")
+        f = _io.FileIO(self.bigfile, 'r')
+        f.seek(10)
+        a = bytearray('x' * 5)
+        assert f.readinto_at(a, 2) == 5
+        assert a == 'aaaaa'
+        b = bytearray('x' * 1024)
+        assert f.readinto_at(b, 100) == 900
+        assert b == 'a' * 900 + 'x' * 124
+        assert f.readinto_at(a, 5000) == 0
+        assert f.tell() == 10
+        raises(ValueError, f.readinto_at, a, -1)
+        raises(TypeError, f.readinto_at, b"hello", 0)
+        f.close()
+        raises(ValueError, f.readinto_at, a, 0)
+        f = _io.FileIO(self.tmpfile, 'w')
+        raises(ValueError, f.readinto_at, a, 0)
+        f.close()
+
     def test_nonblocking_read(self):
         try:
             import os, fcntl
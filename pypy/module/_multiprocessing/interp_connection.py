@@ -1,10 +1,12 @@
 import sys
 from errno import EINTR
 
-from rpython.rlib import rpoll, rsocket
+from rpython.rlib import rpoll, rposix, rsocket
+from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import intmask, r_uint
 from rpython.rtyper.lltypesystem import lltype, rffi
 
+from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.gateway import (
@@ -15,6 +17,10 @@ READABLE, WRITABLE = range(1, 3)
 PY_SSIZE_T_MAX = sys.maxint
 PY_SSIZE_T_MIN = -sys.maxint - 1
 
+# bytearrays and arrays of at least this many bytes are not pickled, but
+# sent after the pickle as messages of their own (see app_pickle below)
+OOB_THRESHOLD = 64 * 1024
+
 class State(object):
     def __init__(self, space):
         pass
@@ -36,6 +42,79 @@ def w_handle(space, handle):
     return space.newint(rffi.cast(rffi.INTPTR_T, handle))
 
 
+app_pickle = gateway.applevel(r'''
+# A message produced by send() is normally a pickle.  If the object
+# contains large bytearrays or arrays, it starts with OOB_MAGIC instead
+# (a pickle never starts with a NUL byte) and is followed by one more
+# message with the raw contents of each of them.  After the magic come
+# two pickles: the list of (typecode, nbytes) of these buffers, with
+# typecode '' for a bytearray, and then the object itself, which refers
+# to the buffers by their index as persistent ids.
+
+OOB_MAGIC = '\x00oob'
+
+def dumps(pickle, obj, protocol, threshold):
+    try:
+        from array import array
+    except ImportError:
+        array = None
+    buffers = []
+    descrs = []
+    seen = {}
+    def persistent_id(x):
+        tp = type(x)
+        if tp is bytearray:
+            typecode = ''
+            nbytes = len(x)
+        elif tp is array:
+            typecode = x.typecode
+            nbytes = len(x) * x.itemsize
+        else:
+            return None
+        if nbytes < threshold:
+            return None
+        key = id(x)
+        if key not in seen:
+            seen[key] = len(buffers)
+            buffers.append(x)
+            descrs.append((typecode, nbytes))
+        return seen[key]
+    f = pickle.StringIO()
+    pickler = pickle.Pickler(f, protocol)
+    pickler.persistent_id = persistent_id
+    pickler.dump(obj)
+    data = f.getvalue()
+    if not buffers:
+        return data, buffers
+    return OOB_MAGIC + pickle.dumps(descrs, protocol) + data, buffers
+
+def loads(pickle, conn, data):
+    if not data.startswith(OOB_MAGIC):
+        return pickle.loads(data)
+    f = pickle.StringIO(data)
+    f.seek(len(OOB_MAGIC))
+    unpickler = pickle.Unpickler(f)
+    buffers = []
+    for typecode, nbytes in unpickler.load():
+        if typecode:
+            from array import array
+            item = array(typecode)
+            item.fromstring('\x00' * item.itemsize)
+            buf = item * (nbytes // item.itemsize)
+        else:
+            buf = bytearray(nbytes)
+        # received directly into the storage of 'buf'
+        if conn.recv_bytes_into(buf) != nbytes:
+            raise IOError("bad message length")
+        buffers.append(buf)
+    unpickler.persistent_load = buffers.__getitem__
+    return unpickler.load()
+''', filename=__file__)
+
+pickle_dumps = app_pickle.interphook('dumps')
+pickle_loads = app_pickle.interphook('loads')
+
+
 class W_BaseConnection(W_Root):
     BUFFER_SIZE = 1024
     buffer = lltype.nullptr(rffi.CCHARP.TO)
@@ -68,6 +147,32 @@ class W_BaseConnection(W_Root):
     def do_poll(self, space, timeout):
         raise NotImplementedError
 
+    def do_send_buffers(self, space, buf, buffers):
+        """Send the message 'buf', then one message with the contents of
+        each of the 'buffers'.  Overridden to avoid copying them."""
+        self.do_send_string(space, buf, 0, len(buf))
+        for buffer in buffers:
+            data = buffer.as_str()
+            self.do_send_string(space, data, 0, len(data))
+
+    def do_recv_into(self, space, rwbuffer, offset):
+        """Receive one message into 'rwbuffer' at 'offset'.  Returns
+        its length.  Overridden to avoid copying it."""
+        res, newbuf = self.do_recv_string(
+            space, self.BUFFER_SIZE, PY_SSIZE_T_MAX)
+        try:
+            if newbuf:
+                data = rffi.charpsize2str(newbuf, res)
+            else:
+                data = rffi.charpsize2str(self.buffer, res)
+        finally:
+            if newbuf:
+                rffi.free_charp(newbuf)
+        if res > rwbuffer.getlength() - offset:
+            raise BufferTooShort(space, space.newbytes(data))
+        rwbuffer.setslice(offset, data)
+        return res
+
     def close(self):
         self.do_close()
 
@@ -131,20 +236,14 @@ class W_BaseConnection(W_Root):
 
     @unwrap_spec(offset='index')
     def recv_bytes_into(self, space, w_buffer, offset=0):
+        self._check_readable(space)
         rwbuffer = space.writebuf_w(w_buffer)
-        length = rwbuffer.getlength()
-
-        res, newbuf = self.do_recv_string(
-            space, length - offset, PY_SSIZE_T_MAX)
-        try:
-            if newbuf:
-                raise BufferTooShort(space, space.newbytes(
-                    rffi.charpsize2str(newbuf, res)))
-            rwbuffer.setslice(offset, rffi.charpsize2str(self.buffer, res))
-        finally:
-            if newbuf:
-                rffi.free_charp(newbuf)
+        if offset < 0:
+            raise oefmt(space.w_ValueError, "negative offset")
+        if offset > rwbuffer.getlength():
+            raise oefmt(space.w_ValueError, "offset out of bounds")
 
+        res = self.do_recv_into(space, rwbuffer, offset)
         return space.newint(res)
 
     def send(self, space, w_obj):
@@ -153,11 +252,17 @@ class W_BaseConnection(W_Root):
         w_picklemodule = space.fromcache(State).w_picklemodule
         w_protocol = space.getattr(
             w_picklemodule, space.newtext("HIGHEST_PROTOCOL"))
-        w_pickled = space.call_method(
-            w_picklemodule, "dumps", w_obj, w_protocol)
+        w_pickled, w_buffers = space.fixedview(pickle_dumps(
+            space, w_picklemodule, w_obj, w_protocol,
+            space.newint(OOB_THRESHOLD)), 2)
 
         buf = space.bytes_w(w_pickled)
-        self.do_send_string(space, buf, 0, len(buf))
+        buffers_w = space.listview(w_buffers)
+        if not buffers_w:
+            self.do_send_string(space, buf, 0, len(buf))
+        else:
+            buffers = [space.readbuf_w(w_buffer) for w_buffer in buffers_w]
+            self.do_send_buffers(space, buf, buffers)
 
     def recv(self, space):
         self._check_readable(space)
@@ -173,12 +278,8 @@ class W_BaseConnection(W_Root):
             if newbuf:
                 rffi.free_charp(newbuf)
 
-        w_builtins = space.getbuiltinmodule('__builtin__')
         w_picklemodule = space.fromcache(State).w_picklemodule
-        w_unpickled = space.call_method(
-            w_picklemodule, "loads", w_received)
-
-        return w_unpickled
+        return pickle_loads(space, w_picklemodule, self, w_received)
 
     @unwrap_spec(w_timeout=WrappedDefault(0.0))
     def poll(self, space, w_timeout):
@@ -211,30 +312,36 @@ class W_FileConnection(W_BaseConnection):
     INVALID_HANDLE_VALUE = -1
     fd = INVALID_HANDLE_VALUE
 
+    # WRITE() and READ() send and receive directly from and to raw memory
     if sys.platform == 'win32':
-        def WRITE(self, data):
+        def WRITE(self, buf, size):
             from rpython.rlib._rsocket_rffi import send, geterrno
-            length = send(self.fd, data, len(data), 0)
+            length = send(self.fd, buf, size, 0)
             if length < 0:
                 raise WindowsError(geterrno(), "send")
-            return length
-        def READ(self, size):
+            return intmask(length)
+        def READ(self, buf, size):
             from rpython.rlib._rsocket_rffi import socketrecv, geterrno
-            with rffi.scoped_alloc_buffer(size) as buf:
-                length = socketrecv(self.fd, buf.raw, buf.size, 0)
-                if length < 0:
-                    raise WindowsError(geterrno(), "recv")
-                return buf.str(length)
+            length = socketrecv(self.fd, rffi.cast(rffi.VOIDP, buf), size, 0)
+            if length < 0:
+                raise WindowsError(geterrno(), "recv")
+            return intmask(length)
         def CLOSE(self):
             from rpython.rlib._rsocket_rffi import socketclose
             socketclose(self.fd)
     else:
-        def WRITE(self, data):
-            import os
-            return os.write(self.fd, data)
-        def READ(self, length):
-            import os
-            return os.read(self.fd, length)
+        def WRITE(self, buf, size):
+            length = rffi.cast(lltype.Signed, rposix.c_write(
+                self.fd, rffi.cast(rffi.VOIDP, buf), size))
+            if length < 0:
+                raise OSError(rposix.get_saved_errno(), "write")
+            return length
+        def READ(self, buf, size):
+            length = rffi.cast(lltype.Signed, rposix.c_read(
+                self.fd, rffi.cast(rffi.VOIDP, buf), size))
+            if length < 0:
+                raise OSError(rposix.get_saved_errno(), "read")
+            return length
         def CLOSE(self):
             import os
             try:
@@ -286,7 +393,104 @@ class W_FileConnection(W_BaseConnection):
         finally:
             lltype.free(message, flavor='raw')
 
-    def do_recv_string(self, space, buflength, maxlength):
+    if sys.platform != 'win32':
+        def do_send_buffers(self, space, buf, buffers):
+            # a single writev() for all the messages, taking the contents
+            # of the buffers directly from their storage if possible
+            addresses = []
+            for buffer in buffers:
+                try:
+                    addresses.append(buffer.get_raw_address())
+                except ValueError:
+                    W_BaseConnection.do_send_buffers(self, space, buf,
+                                                     buffers)
+                    return
+            n = 2 * (len(buffers) + 1)
+            iov = lltype.malloc(rposix.IOVEC_ARRAY, n, flavor='raw')
+            headers = lltype.malloc(rffi.CArray(rffi.UINT), n // 2,
+                                    flavor='raw')
+            charp, llobj, flag = rffi.get_nonmovingbuffer_ll(buf)
+            try:
+                for i in range(n // 2):
+                    if i == 0:
+                        address = charp
+                        size = len(buf)
+                    else:
+                        address = addresses[i - 1]
+                        size = buffers[i - 1].getlength()
+                    headers[i] = rffi.cast(rffi.UINT, rsocket.htonl(
+                        rffi.cast(lltype.Unsigned, size)))
+                    header = rffi.ptradd(headers, i)
+                    iov[2 * i].c_iov_base = rffi.cast(rffi.VOIDP, header)
+                    iov[2 * i].c_iov_len = rffi.cast(rffi.SIZE_T, 4)
+                    iov[2 * i + 1].c_iov_base = rffi.cast(rffi.VOIDP, address)
+                    iov[2 * i + 1].c_iov_len = rffi.cast(rffi.SIZE_T, size)
+                self._sendallv(space, iov, n)
+            finally:
+                rffi.free_nonmovingbuffer_ll(charp, llobj, flag)
+                lltype.free(headers, flavor='raw')
+                lltype.free(iov, flavor='raw')
+                keepalive_until_here(buffers)
+
+        def _sendallv(self, space, iov, n):
+            i = 0
+            while i < n:
+                count = rffi.cast(lltype.Signed, rposix.c_writev(
+                    self.fd, rffi.ptradd(iov, i),
+                    min(n - i, rposix.IOV_MAX)))
+                if count < 0:
+                    e = OSError(rposix.get_saved_errno(), "writev")
+                    if e.errno == EINTR:
+                        space.getexecutioncontext().checksignals()
+                        continue
+                    raise wrap_oserror(space, e)
+                # skip what was written, which may end in the middle of
+                # an entry
+                while i < n:
+                    size = rffi.cast(lltype.Signed, iov[i].c_iov_len)
+                    if count < size:
+                        base = rffi.cast(rffi.CCHARP, iov[i].c_iov_base)
+                        iov[i].c_iov_base = rffi.cast(
+                            rffi.VOIDP, rffi.ptradd(base, count))
+                        iov[i].c_iov_len = rffi.cast(rffi.SIZE_T,
+                                                     size - count)
+                        break
+                    count -= size
+                    i += 1
+
+    def do_recv_into(self, space, rwbuffer, offset):
+        length = self._recv_length(space, PY_SSIZE_T_MAX)
+        if length > rwbuffer.getlength() - offset:
+            newbuf = lltype.malloc(rffi.CCHARP.TO, length, flavor='raw')
+            try:
+                self._recvall(space, newbuf, length)
+                data = rffi.charpsize2str(newbuf, length)
+            finally:
+                lltype.free(newbuf, flavor='raw')
+            raise BufferTooShort(space, space.newbytes(data))
+
+        address = lltype.nullptr(rffi.CCHARP.TO)
+        if length > self.BUFFER_SIZE:
+            try:
+                address = rwbuffer.get_raw_address()
+            except ValueError:
+                pass
+        if address:
+            self._recvall(space, rffi.ptradd(address, offset), length)
+            keepalive_until_here(rwbuffer)
+        elif length <= self.BUFFER_SIZE:
+            self._recvall(space, self.buffer, length)
+            rwbuffer.setslice(offset, rffi.charpsize2str(self.buffer, length))
+        else:
+            newbuf = lltype.malloc(rffi.CCHARP.TO, length, flavor='raw')
+            try:
+                self._recvall(space, newbuf, length)
+                rwbuffer.setslice(offset, rffi.charpsize2str(newbuf, length))
+            finally:
+                lltype.free(newbuf, flavor='raw')
+        return length
+
+    def _recv_length(self, space, maxlength):
         with lltype.scoped_alloc(rffi.CArrayPtr(rffi.UINT).TO, 1) as length_ptr:
             self._recvall(space, rffi.cast(rffi.CCHARP, length_ptr), 4)
             length = intmask(rsocket.ntohl(
@@ -296,7 +500,10 @@ class W_FileConnection(W_BaseConnection):
             if self.flags == 0:
                 self.close()
             raise oefmt(space.w_IOError, "bad message length")
+        return length
 
+    def do_recv_string(self, space, buflength, maxlength):
+        length = self._recv_length(space, maxlength)
         if length <= buflength:
             self._recvall(space, self.buffer, length)
             return length, lltype.nullptr(rffi.CCHARP.TO)
@@ -307,10 +514,8 @@ class W_FileConnection(W_BaseConnection):
 
     def _sendall(self, space, message, size):
         while size > 0:
-            # XXX inefficient
-            data = rffi.charpsize2str(message, size)
             try:
-                count = self.WRITE(data)
+                count = self.WRITE(message, size)
             except OSError as e:
                 if e.errno == EINTR:
                     space.getexecutioncontext().checksignals()
@@ -324,22 +529,18 @@ class W_FileConnection(W_BaseConnection):
         remaining = length
         while remaining > 0:
             try:
-                data = self.READ(remaining)
+                count = self.READ(buf, remaining)
             except OSError as e:
                 if e.errno == EINTR:
                     space.getexecutioncontext().checksignals()
                     continue
                 raise wrap_oserror(space, e)
-            count = len(data)
             if count == 0:
                 if remaining == length:
                     raise OperationError(space.w_EOFError, space.w_None)
                 else:
                     raise oefmt(space.w_IOError,
                                 "got end of file during message")
-            # XXX inefficient
-            for i in range(count):
-                buf[i] = data[i]
             remaining -= count
             buf = rffi.ptradd(buf, count)
 
@@ -209,6 +209,61 @@ class AppTestSocketConnection(BaseConnectionTest):
         data2 = sock.recv(8)
         assert data2 == '\x00\x00\x00\x04defg'
 
+    def w_make_blocking_pair(self):
+        import socket
+        rhandle, whandle = self.make_pair()
+        for handle in (rhandle, whandle):
+            sock = socket.fromfd(handle.fileno(),
+                                 socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(True)
+            sock.close()
+        return rhandle, whandle
+
+    def test_recv_bytes_into_large(self):
+        rhandle, whandle = self.make_blocking_pair()
+        whandle.send_bytes("abc" * 5000)
+        whandle.send_bytes("xyz" * 1000)
+        buf = bytearray(20000)
+        assert rhandle.recv_bytes_into(buf, 5) == 15000
+        assert buf[:5] == bytearray(5)
+        assert buf[5:15005] == "abc" * 5000
+        assert buf[15005:] == bytearray(4995)
+        raises(ValueError, rhandle.recv_bytes_into, buf, -1)
+        raises(ValueError, rhandle.recv_bytes_into, buf, 20001)
+        assert rhandle.recv_bytes_into(buf) == 3000
+        assert buf[:3000] == "xyz" * 1000
+
+    def test_send_large_buffers(self):
+        import array, thread
+        rhandle, whandle = self.make_blocking_pair()
+        doubles = array.array('d', [i * 0.5 for i in range(20000)])
+        data = bytearray("abcdefgh" * 20000)
+        small = bytearray("small")
+        obj = {'doubles': doubles, 'data': [data, data], 'small': small,
+               'chars': array.array('c', 'x' * 70000)}
+        def send():
+            whandle.send(obj)
+            whandle.send(42)
+        thread.start_new_thread(send, ())
+        obj2 = rhandle.recv()
+        assert obj2 == obj
+        assert type(obj2['doubles']) is array.array
+        assert type(obj2['data'][0]) is bytearray
+        assert obj2['data'][0] is obj2['data'][1]
+        assert rhandle.recv() == 42
+
+    def test_large_buffers_wire_format(self):
+        # the buffers are sent as messages of their own, after the pickle
+        import thread
+        rhandle, whandle = self.make_blocking_pair()
+        data = bytearray("x" * 100000)
+        def send():
+            whandle.send([data, 5])
+        thread.start_new_thread(send, ())
+        header = rhandle.recv_bytes()
+        assert header.startswith('\x00oob')
+        assert rhandle.recv_bytes() == "x" * 100000
+
     def test_repr(self):
         import _multiprocessing, os
         fd = os.dup(1)     # closed by Connection.__del__
@@ -1,12 +1,14 @@
 from rpython.rlib import rsocket
-from rpython.rlib.rsocket import SocketError, INVALID_SOCKET
+from rpython.rlib.rsocket import SocketError
 from rpython.rlib.rarithmetic import intmask, r_longlong, r_uint32
 
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec, WrappedDefault
 from pypy.module._socket.interp_socket import (
-    converted_error, W_Socket, addr_as_object, ipaddr_from_object
+    converted_error, W_Socket, ipaddr_from_object
 )
+from pypy.module._socket.interp_resolver import (
+    getaddrinfo_cached, wrap_addrinfo)
 
 
 def gethostname(space):
@@ -270,14 +272,7 @@ def inet_ntop(space, family, packed):
                     "invalid length of packed IP address string")
     return space.newtext(ip)
 
-@unwrap_spec(family=int, socktype=int, proto=int, flags=int)
-def getaddrinfo(space, w_host, w_port,
-                family=rsocket.AF_UNSPEC, socktype=0, proto=0, flags=0):
-    """getaddrinfo(host, port [, family, socktype, proto, flags])
-        -> list of (family, socktype, proto, canonname, sockaddr)
-
-    Resolve host and port into addrinfo struct.
-    """
+def getaddrinfo_args(space, w_host, w_port):
     # host can be None, string or unicode
     if space.is_w(w_host, space.w_None):
         host = None
@@ -300,18 +295,23 @@ def getaddrinfo(space, w_host, w_port,
     else:
         raise oefmt(space.w_TypeError,
                     "getaddrinfo() argument 2 must be integer or string")
+    return host, port
+
+@unwrap_spec(family=int, socktype=int, proto=int, flags=int)
+def getaddrinfo(space, w_host, w_port,
+                family=rsocket.AF_UNSPEC, socktype=0, proto=0, flags=0):
+    """getaddrinfo(host, port [, family, socktype, proto, flags])
+        -> list of (family, socktype, proto, canonname, sockaddr)
+
+    Resolve host and port into addrinfo struct.
+    """
+    host, port = getaddrinfo_args(space, w_host, w_port)
     try:
-        lst = rsocket.getaddrinfo(host, port, family, socktype,
-                                  proto, flags)
+        lst = getaddrinfo_cached(space, host, port, family, socktype,
+                                 proto, flags)
     except SocketError as e:
         raise converted_error(space, e)
-    lst1 = [space.newtuple([space.newint(family),
-                            space.newint(socktype),
-                            space.newint(protocol),
-                            space.newtext(canonname),
-                            addr_as_object(addr, INVALID_SOCKET, space)]) # -1 as per cpython
-            for (family, socktype, protocol, canonname, addr) in lst]
-    return space.newlist(lst1)
+    return wrap_addrinfo(space, lst)
 
 def getdefaulttimeout(space):
     """getdefaulttimeout() -> timeout
@@ -0,0 +1,259 @@
+"""
+The resolver cache, an optional cache of the results of getaddrinfo() that
+keeps each of them for a fixed number of seconds, and _socket.resolver, a
+getaddrinfo() that runs in helper threads and whose results an event loop
+can wait for.  Both are PyPy extensions.
+"""
+
+import time
+from collections import OrderedDict
+
+from rpython.rlib import rsocket
+from rpython.rlib.rsocket import GAIError, INVALID_SOCKET
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt, wrap_oserror
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.module._socket.interp_socket import addr_as_object, converted_error
+
+
+class CacheEntry(object):
+    def __init__(self, expires, result):
+        self.expires = expires
+        self.result = result
+
+
+class ResolverCache(object):
+    """A bounded cache of the results of getaddrinfo(), each kept for 'ttl'
+    seconds.  Disabled (ttl == 0.0) by default; see setresolvercache().
+    Failed lookups are not cached.
+    """
+
+    def __init__(self, space):
+        self.ttl = 0.0
+        self.maxsize = 256
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def configure(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        if ttl == 0.0:
+            self.clear()
+        while len(self.entries) > maxsize:
+            self._evict_oldest()
+
+    def clear(self):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key, None)
+        if entry is not None and entry.expires <= time.time():
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.result
+
+    def store(self, key, result):
+        if self.ttl == 0.0:
+            return
+        if key in self.entries:
+            del self.entries[key]
+        elif len(self.entries) >= self.maxsize:
+            # the entries are in insertion order, so this is the one that
+            # expires first
+            self._evict_oldest()
+        self.entries[key] = CacheEntry(time.time() + self.ttl, result)
+
+    def _evict_oldest(self):
+        for key in self.entries:
+            del self.entries[key]
+            break
+
+
+def cache_key(host, port, family, socktype, proto, flags):
+    if host is None:
+        host = '-'
+    else:
+        host = '+' + host
+    if port is None:
+        port = '-'
+    else:
+        port = '+' + port
+    return '%d %d %d %d %s %s' % (family, socktype, proto, flags, host, port)
+
+def getaddrinfo_cached(space, host, port, family, socktype, proto, flags):
+    """rsocket.getaddrinfo(), going through the resolver cache if it is
+    enabled.  Raises SocketError."""
+    cache = space.fromcache(ResolverCache)
+    if cache.ttl == 0.0:
+        return rsocket.getaddrinfo(host, port, family, socktype, proto, flags)
+    key = cache_key(host, port, family, socktype, proto, flags)
+    lst = cache.lookup(key)
+    if lst is None:
+        lst = rsocket.getaddrinfo(host, port, family, socktype, proto, flags)
+        cache.store(key, lst)
+    return lst
+
+def wrap_addrinfo(space, lst):
+    lst1 = [space.newtuple([space.newint(family),
+                            space.newint(socktype),
+                            space.newint(protocol),
+                            space.newtext(canonname),
+                            addr_as_object(addr, INVALID_SOCKET, space)]) # -1 as per cpython
+            for (family, socktype, protocol, canonname, addr) in lst]
+    return space.newlist(lst1)
+
+
+@unwrap_spec(ttl=float, maxsize=int)
+def setresolvercache(space, ttl, maxsize=256):
+    """setresolvercache(ttl[, maxsize])
+
+    Keep the results of getaddrinfo(), and thus of socket.create_connection(),
+    for 'ttl' seconds, in a cache of at most 'maxsize' entries.  A ttl of 0,
+    the default, disables and empties the cache.  PyPy extension."""
+    if ttl < 0.0:
+        raise oefmt(space.w_ValueError, "ttl must be >= 0")
+    if maxsize <= 0:
+        raise oefmt(space.w_ValueError, "maxsize must be > 0")
+    space.fromcache(ResolverCache).configure(ttl, maxsize)
+
+def resolvercacheinfo(space):
+    """resolvercacheinfo() -> (hits, misses, currsize, maxsize, ttl)
+
+    Describe the getaddrinfo() cache.  PyPy extension."""
+    cache = space.fromcache(ResolverCache)
+    return space.newtuple([space.newint(cache.hits),
+                           space.newint(cache.misses),
+                           space.newint(len(cache.entries)),
+                           space.newint(cache.maxsize),
+                           space.newfloat(cache.ttl)])
+
+
+class W_Resolver(W_Root):
+    resolver = None
+
+    def __init__(self, space, resolver):
+        self.resolver = resolver
+        self.next_id = 0
+        self.keys = {}      # id of the running requests -> cache key
+        self.ready = []     # [(id, w_result)] of cache hits not polled yet
+        self.register_finalizer(space)
+
+    @unwrap_spec(workers=int)
+    def descr_new_resolver(space, w_subtype, workers=4):
+        from rpython.rlib.rresolver import AsyncResolver
+        if workers <= 0:
+            raise oefmt(space.w_ValueError, "workers must be > 0")
+        try:
+            resolver = AsyncResolver(workers)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+        self = space.allocate_instance(W_Resolver, w_subtype)
+        W_Resolver.__init__(self, space, resolver)
+        return self
+
+    def _finalize_(self):
+        self.close()
+
+    def close(self):
+        if self.resolver is not None:
+            self.resolver.free()
+            self.resolver = None
+            self.keys.clear()
+            self.ready = []
+
+    def check_closed(self, space):
+        if self.resolver is None:
+            raise oefmt(space.w_ValueError, "resolver is closed")
+
+    def descr_close(self, space):
+        self.close()
+
+    def descr_get_closed(self, space):
+        return space.newbool(self.resolver is None)
+
+    def descr_get_pending(self, space):
+        return space.newint(len(self.keys) + len(self.ready))
+
+    def descr_fileno(self, space):
+        self.check_closed(space)
+        return space.newint(self.resolver.fileno())
+
+    @unwrap_spec(family=int, socktype=int, proto=int, flags=int)
+    def descr_getaddrinfo(self, space, w_host, w_port,
+                          family=rsocket.AF_UNSPEC, socktype=0, proto=0,
+                          flags=0):
+        """getaddrinfo(host, port [, family, socktype, proto, flags])
+            -> request id
+
+        Start resolving host and port.  poll() returns the result with the
+        same id."""
+        from pypy.module._socket.interp_func import getaddrinfo_args
+        self.check_closed(space)
+        host, port = getaddrinfo_args(space, w_host, w_port)
+        id = self.next_id
+        self.next_id = id + 1
+        key = cache_key(host, port, family, socktype, proto, flags)
+        cache = space.fromcache(ResolverCache)
+        if cache.ttl != 0.0:
+            lst = cache.lookup(key)
+            if lst is not None:
+                self.ready.append((id, wrap_addrinfo(space, lst)))
+                self.resolver.wakeup()
+                return space.newint(id)
+        try:
+            self.resolver.submit(id, host, port, family, socktype, proto,
+                                 flags)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+        self.keys[id] = key
+        return space.newint(id)
+
+    def descr_poll(self, space):
+        """poll() -> list of (id, result)
+
+        Return the requests that completed since the last call, without
+        blocking.  The result is what socket.getaddrinfo() would return,
+        or the socket.gaierror instance that it would raise.  The list may
+        be empty even if fileno() was readable."""
+        self.check_closed(space)
+        results_w = []
+        for id, w_result in self.ready:
+            results_w.append(space.newtuple2(space.newint(id), w_result))
+        self.ready = []
+        cache = space.fromcache(ResolverCache)
+        for id, error, lst in self.resolver.collect():
+            key = self.keys[id]
+            del self.keys[id]
+            if error:
+                w_result = converted_error(space,
+                                           GAIError(error)).get_w_value(space)
+            else:
+                cache.store(key, lst)
+                w_result = wrap_addrinfo(space, lst)
+            results_w.append(space.newtuple2(space.newint(id), w_result))
+        return space.newlist(results_w)
+
+
+W_Resolver.typedef = TypeDef("_socket.resolver",
+    __doc__ = """resolver([workers])
+
+Run getaddrinfo() in up to 'workers' helper threads.  fileno() becomes
+readable when poll() has results.  PyPy extension.""",
+    __new__ = interp2app(W_Resolver.descr_new_resolver.im_func),
+    closed = GetSetProperty(W_Resolver.descr_get_closed),
+    pending = GetSetProperty(W_Resolver.descr_get_pending),
+    fileno = interp2app(W_Resolver.descr_fileno),
+    close = interp2app(W_Resolver.descr_close),
+    getaddrinfo = interp2app(W_Resolver.descr_getaddrinfo),
+    poll = interp2app(W_Resolver.descr_poll),
+)
+W_Resolver.typedef.acceptable_as_base_class = False
@@ -1,5 +1,6 @@
 import sys
 from rpython.rlib import rsocket, rweaklist
+from rpython.rlib.buffer import ByteBuffer, StringBuffer
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.rsocket import (
     RSocket, AF_INET, SOCK_STREAM, SocketError, SocketErrorWithErrno,
@@ -530,6 +531,143 @@ class W_Socket(W_Root):
         except SocketError as e:
             raise converted_error(space, e)
 
+    @unwrap_spec(flags=int)
+    def sendmsg_w(self, space, w_buffers, w_ancdata=None, flags=0,
+                  w_address=None):
+        """sendmsg(buffers[, ancdata[, flags[, address]]]) -> count
+
+        Send the data of the sequence of buffers as one message (gathered
+        I/O).  'ancdata' is a sequence of (level, type, data) tuples of
+        ancillary data.  The address is only given for unconnected
+        sockets.  Return the number of bytes sent.
+        """
+        messages = [space.charbuf_w(w_buf)
+                    for w_buf in space.unpackiterable(w_buffers)]
+        ancillary = []
+        if w_ancdata is not None and not space.is_w(w_ancdata, space.w_None):
+            for w_item in space.unpackiterable(w_ancdata):
+                w_level, w_type, w_data = space.fixedview(w_item, 3)
+                ancillary.append((space.int_w(w_level), space.int_w(w_type),
+                                  space.charbuf_w(w_data)))
+        try:
+            address = None
+            if w_address is not None and not space.is_w(w_address,
+                                                        space.w_None):
+                address = self.addr_from_object(space, w_address)
+            count = self.sock.sendmsg(messages, ancillary, flags, address)
+        except SocketError as e:
+            raise converted_error(space, e)
+        if count == -1000:
+            raise explicit_socket_error(space,
+                "sending multiple control messages not supported")
+        if count == -1001 or count == -1002:
+            raise oefmt(space.w_OverflowError, "ancillary data item too large")
+        return space.newint(count)
+
+    @unwrap_spec(bufsize='nonnegint', ancbufsize=int, flags=int)
+    def recvmsg_w(self, space, bufsize, ancbufsize=0, flags=0):
+        """recvmsg(bufsize[, ancbufsize[, flags]]) ->
+            (data, ancdata, msg_flags, address)
+
+        Receive up to bufsize bytes and up to ancbufsize bytes of ancillary
+        data.  'ancdata' is a list of (level, type, data) tuples.
+        """
+        try:
+            data, ancdata, msg_flags, addr = self.sock.recvmsg(
+                bufsize, ancbufsize, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newtuple([space.newbytes(data),
+                               self._wrap_ancdata(space, ancdata),
+                               space.newint(msg_flags),
+                               self._wrap_addr(space, addr)])
+
+    @unwrap_spec(ancbufsize=int, flags=int)
+    def recvmsg_into_w(self, space, w_buffers, ancbufsize=0, flags=0):
+        """recvmsg_into(buffers[, ancbufsize[, flags]]) ->
+            (nbytes, ancdata, msg_flags, address)
+
+        Like recvmsg(), but scatter the data received directly into the
+        sequence of writable buffers, filling each one in turn.
+        """
+        buffers = [space.writebuf_w(w_buf)
+                   for w_buf in space.unpackiterable(w_buffers)]
+        try:
+            nbytes, ancdata, msg_flags, addr = self.sock.recvmsg_into(
+                buffers, ancbufsize, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newtuple([space.newint(nbytes),
+                               self._wrap_ancdata(space, ancdata),
+                               space.newint(msg_flags),
+                               self._wrap_addr(space, addr)])
+
+    @unwrap_spec(flags=int)
+    def sendmmsg_w(self, space, w_buffers, flags=0, w_address=None):
+        """sendmmsg(buffers[, flags[, address]]) -> count
+
+        Send each of the buffers as a separate datagram, with a single
+        system call.  Return the number of datagrams sent, which may be
+        less than len(buffers).  Linux only.
+        """
+        buffers = [_raw_readbuf(space, w_buf)
+                   for w_buf in space.unpackiterable(w_buffers)]
+        try:
+            address = None
+            if w_address is not None and not space.is_w(w_address,
+                                                        space.w_None):
+                address = self.addr_from_object(space, w_address)
+            count = self.sock.sendmmsg(buffers, flags, address)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newint(count)
+
+    @unwrap_spec(flags=int)
+    def recvmmsg_into_w(self, space, w_buffers, flags=0):
+        """recvmmsg_into(buffers[, flags]) -> [(nbytes, msg_flags, address)]
+
+        Receive up to len(buffers) datagrams with a single system call,
+        each one directly into the corresponding writable buffer.  Return
+        one tuple per datagram received.  Linux only.
+        """
+        buffers = []
+        copied = []     # the buffers received into a copy, by index
+        for w_buf in space.unpackiterable(w_buffers):
+            buf = space.writebuf_w(w_buf)
+            try:
+                buf.get_raw_address()
+            except ValueError:
+                # no raw address to pass to the OS: receive into a copy
+                copied.append((len(buffers), buf))
+                buf = ByteBuffer(buf.getlength())
+            buffers.append(buf)
+        try:
+            result = self.sock.recvmmsg_into(buffers, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        for i, buf in copied:
+            if i < len(result):
+                nbytes = min(result[i][0], buf.getlength())
+                buf.setslice(0, buffers[i].getslice(0, 1, nbytes))
+        result_w = [None] * len(result)
+        for i in range(len(result)):
+            nbytes, msg_flags, addr = result[i]
+            result_w[i] = space.newtuple([space.newint(nbytes),
+                                          space.newint(msg_flags),
+                                          self._wrap_addr(space, addr)])
+        return space.newlist(result_w)
+
+    def _wrap_addr(self, space, addr):
+        if addr is None:
+            return space.w_None
+        return addr_as_object(addr, self.sock.fd, space)
+
+    def _wrap_ancdata(self, space, ancdata):
+        return space.newlist([
+            space.newtuple([space.newint(level), space.newint(type),
+                            space.newbytes(data)])
+            for level, type, data in ancdata])
+
     @unwrap_spec(cmd=int)
     def ioctl_w(self, space, cmd, w_option):
         from rpython.rtyper.lltypesystem import rffi, lltype
@@ -697,6 +835,15 @@ class SocketAPI:
 def get_error(space, name):
     return space.fromcache(SocketAPI).get_exception(name)
 
+def _raw_readbuf(space, w_obj):
+    # a read-only buffer whose raw address can be passed to the OS
+    buf = space.readbuf_w(w_obj)
+    try:
+        buf.get_raw_address()
+    except ValueError:
+        buf = StringBuffer(buf.as_str())
+    return buf
+
 def converted_error(space, e):
     message = e.get_msg()
     w_exception_class = get_error(space, e.applevelerrcls)
@@ -725,6 +872,10 @@ setsockopt settimeout shutdown _reuse _drop recv_into recvfrom_into
 for name in ('dup',):
     if not hasattr(RSocket, name):
         socketmethodnames.remove(name)
+if rsocket._c.HAVE_SENDMSG:
+    socketmethodnames += ['sendmsg', 'recvmsg', 'recvmsg_into']
+if rsocket._c.HAVE_MMSG:
+    socketmethodnames += ['sendmmsg', 'recvmmsg_into']
 if hasattr(rsocket._c, 'WSAIoctl'):
     socketmethodnames.append('ioctl')
 
@@ -765,6 +916,11 @@ recvfrom(buflen[, flags]) -- receive data and sender's address
 sendall(data[, flags]) -- send all data
 send(data[, flags]) -- send data, may not send all of it
 sendto(data[, flags], addr) -- send data to a given address
+sendmsg(buffers[, ancdata[, flags[, addr]]]) -- send gathered data [*]
+recvmsg(buflen[, ancbufsize[, flags]]) -- receive data and ancillary data [*]
+recvmsg_into(buffers[, ancbufsize[, flags]]) -- scatter data into buffers [*]
+sendmmsg(buffers[, flags[, addr]]) -- send one datagram per buffer [*]
+recvmmsg_into(buffers[, flags]) -- receive one datagram per buffer [*]
 setblocking(0 | 1) -- set or clear the blocking I/O flag
 setsockopt(level, optname, value) -- set socket options
 settimeout(None | float) -- set or clear the timeout
@@ -12,6 +12,9 @@ class Module(MixedModule):
         'herror'    :  'interp_socket.get_error(space, "herror")',
         'gaierror'  :  'interp_socket.get_error(space, "gaierror")',
         'timeout'   :  'interp_socket.get_error(space, "timeout")',
+
+        'setresolvercache' : 'interp_resolver.setresolvercache',
+        'resolvercacheinfo': 'interp_resolver.resolvercacheinfo',
     }
 
     def startup(self, space):
@@ -24,6 +27,9 @@ class Module(MixedModule):
 
     def buildloaders(cls):
         from rpython.rlib import rsocket
+        from rpython.rlib.rresolver import HAVE_ASYNC_RESOLVER
+        if HAVE_ASYNC_RESOLVER:
+            Module.interpleveldefs['resolver'] = 'interp_resolver.W_Resolver'
         for name in """
             gethostbyname gethostbyname_ex gethostbyaddr gethostname
             getservbyname getservbyport getprotobyname
@@ -294,6 +294,52 @@ def test_timeout(space, w_socket):
                   "(_socket): return _socket.getdefaulttimeout()")
     assert space.unwrap(w_t) is None
 
+def test_recvmmsg_into_no_raw_address(space, w_socket):
+    from rpython.rlib.buffer import Buffer
+    from pypy.interpreter.baseobjspace import W_Root
+    from pypy.interpreter.typedef import TypeDef
+    if not hasattr(rsocket.RSocket, 'recvmmsg_into'):
+        pytest.skip('no recvmmsg')
+
+    class NoRawBuffer(Buffer):
+        # a writable buffer which cannot give its raw address
+        def __init__(self, size):
+            self.data = ['\0'] * size
+            self.readonly = False
+        def getlength(self):
+            return len(self.data)
+        def getitem(self, index):
+            return self.data[index]
+        def setitem(self, index, char):
+            self.data[index] = char
+
+    class W_NoRawBuffer(W_Root):
+        def __init__(self, size):
+            self.buf = NoRawBuffer(size)
+        def writebuf_w(self, space):
+            return self.buf
+    W_NoRawBuffer.typedef = TypeDef('norawbuffer')
+
+    w_s1, w_s2 = space.fixedview(space.appexec([w_socket], """(_socket):
+        s1 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s1.bind(('127.0.0.1', 0))
+        s2 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s2.bind(('127.0.0.1', 0))
+        s1.sendto(b'hello', s2.getsockname())
+        s1.sendto(b'world!', s2.getsockname())
+        s2.settimeout(5.0)
+        return s1, s2"""), 2)
+    w_buf1 = W_NoRawBuffer(8)
+    w_buf2 = W_NoRawBuffer(3)
+    w_result = space.call_method(w_s2, 'recvmmsg_into',
+                                 space.newlist([w_buf1, w_buf2]))
+    result = space.unwrap(w_result)
+    assert [nbytes for nbytes, flags, addr in result] == [5, 3]
+    assert ''.join(w_buf1.buf.data) == 'hello\0\0\0'
+    assert ''.join(w_buf2.buf.data) == 'wor'
+    space.call_method(w_s1, 'close')
+    space.call_method(w_s2, 'close')
+
 
 # XXX also need tests for other connection and timeout errors
 
@@ -858,6 +904,59 @@ class AppTestSocketTCP:
         exc = raises(ValueError, cli.recvfrom_into, buf, 1024)
         assert str(exc.value) == "nbytes is greater than the length of the buffer"
 
+    def test_sendmsg_recvmsg_into(self):
+        import _socket, array
+        if not hasattr(_socket.socket, 'recvmsg_into'):
+            skip('no sendmsg/recvmsg')
+        cli = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+        cli.connect(self.serv.getsockname())
+        conn, addr = self.serv.accept()
+        header = bytearray(b'HDR:')
+        count = conn.sendmsg([header, b'body', buffer(b'!')])
+        assert count == 9
+        buf1 = bytearray(4)
+        buf2 = array.array('c', b' ' * 16)
+        nbytes, ancdata, msg_flags, addr = cli.recvmsg_into(
+            [buf1, buf2])
+        assert nbytes == 9
+        assert ancdata == []
+        assert buf1 == b'HDR:'
+        assert buf2.tostring()[:5] == b'body!'
+        conn.sendmsg([b'abc'])
+        data, ancdata, msg_flags, addr = cli.recvmsg(100)
+        assert data == b'abc'
+        cli.close()
+        conn.close()
+
+    def test_sendmmsg_recvmmsg_into(self):
+        import _socket, array
+        if not hasattr(_socket.socket, 'recvmmsg_into'):
+            skip('no sendmmsg/recvmmsg')
+        s1 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s1.bind(('127.0.0.1', 0))
+        s2 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s2.bind(('127.0.0.1', 0))
+        count = s1.sendmmsg([b'a', bytearray(b'bb'), memoryview(b'ccc')],
+                            0, s2.getsockname())
+        assert count == 3
+        bufs = [bytearray(2), array.array('c', b'  '), bytearray(2),
+                bytearray(2)]
+        result = s2.recvmmsg_into(bufs)
+        assert len(result) == 3
+        assert [nbytes for nbytes, flags, addr in result] == [1, 2, 2]
+        assert result[2][1] & _socket.MSG_TRUNC
+        assert result[0][2] == s1.getsockname()
+        assert bufs[0][:1] == b'a'
+        assert bufs[1].tostring() == b'bb'
+        assert bufs[2] == b'cc'
+        s2.connect(s1.getsockname())
+        assert s2.sendmmsg([b'x', b'y']) == 2
+        s1.settimeout(5.0)
+        result = s1.recvmmsg_into([bytearray(1), bytearray(1)])
+        assert 1 <= len(result) <= 2
+        s1.close()
+        s2.close()
+
     def test_family(self):
         import socket
         cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -877,6 +976,240 @@ class AppTestSocketTCP:
         assert not hasattr(_socket, "SOCK_NONBLOCK") # 3.7 only
 
 
+class AppTestSendfile:
+    spaceconfig = {'usemodules': ['_socket', 'select', 'mmap']}
+
+    def setup_class(cls):
+        data = ''.join([chr(i % 251) for i in range(30000)])
+        fn = udir.join('sendfile_data')
+        fn.write(data, mode='wb')
+        cls.w_filename = cls.space.wrap(str(fn))
+        cls.w_data = cls.space.newbytes(data)
+
+    def w_pair(self):
+        import socket
+        serv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        serv.bind(('127.0.0.1', 0))
+        serv.listen(1)
+        cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        cli.connect(serv.getsockname())
+        conn, addr = serv.accept()
+        serv.close()
+        return cli, conn
+
+    def w_transfer(self, f, offset=0, count=None, timeout=None):
+        # the data is small enough to fit in the socket buffers
+        cli, conn = self.pair()
+        cli.settimeout(timeout)
+        try:
+            sent = cli.sendfile(f, offset, count)
+        finally:
+            cli.close()
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        conn.close()
+        return sent, ''.join(chunks)
+
+    def test_sendfile(self):
+        import socket, __pypy__.os
+        assert socket._os_sendfile is getattr(__pypy__.os, 'sendfile', None)
+        with open(self.filename, 'rb') as f:
+            sent, received = self.transfer(f)
+            assert sent == len(self.data)
+            assert received == self.data
+            assert f.tell() == len(self.data)
+        with open(self.filename, 'rb') as f:
+            sent, received = self.transfer(f, 1000, 5000, timeout=10.0)
+            assert sent == 5000
+            assert received == self.data[1000:6000]
+            assert f.tell() == 6000
+
+    def test_sendfile_fallbacks(self):
+        import socket, StringIO
+        saved = socket._os_sendfile
+        socket._os_sendfile = None     # use mmap and send()
+        try:
+            with open(self.filename, 'rb') as f:
+                sent, received = self.transfer(f, 7, 10000)
+                assert sent == 10000
+                assert received == self.data[7:10007]
+                assert f.tell() == 10007
+        finally:
+            socket._os_sendfile = saved
+        # no fileno(): read and send
+        f = StringIO.StringIO(self.data)
+        sent, received = self.transfer(f, 5)
+        assert received == self.data[5:]
+        assert f.tell() == len(self.data)
+
+    def test_sendfile_errors(self):
+        import socket
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        with open(self.filename, 'rb') as f:
+            raises(ValueError, s.sendfile, f)
+            s.setblocking(False)
+            raises(ValueError, s.sendfile, f)
+            s.setblocking(True)
+            raises(ValueError, s.sendfile, f, 0, 0)
+            raises(TypeError, s.sendfile, f, 0, 1.5)
+        s.close()
+
+
+class AppTestResolver:
+    spaceconfig = {'usemodules': ['_socket', 'select', 'time']}
+
+    def setup_class(cls):
+        # a stub resolver: 'hosts' maps the names that it knows to
+        # numeric addresses, and 'calls' counts the lookups
+        cls.hosts = {}
+        cls.calls = []
+        def set_host(space, w_name, w_ip):
+            name = space.text_w(w_name)
+            if space.is_w(w_ip, space.w_None):
+                cls.hosts.pop(name, None)
+            else:
+                cls.hosts[name] = space.text_w(w_ip)
+        def stub_calls(space):
+            return space.newint(len(cls.calls))
+        cls.w_set_host = cls.space.wrap(interp2app(set_host))
+        cls.w_stub_calls = cls.space.wrap(interp2app(stub_calls))
+
+    def setup_method(self, meth):
+        real_getaddrinfo = rsocket.getaddrinfo
+        hosts = self.hosts
+        calls = self.calls
+        def stub_getaddrinfo(host, port, family=rsocket.AF_UNSPEC,
+                             socktype=0, proto=0, flags=0):
+            calls.append(host)
+            if host not in hosts:
+                raise rsocket.GAIError(rsocket.EAI_NONAME)
+            return real_getaddrinfo(hosts[host], port, family, socktype,
+                                    proto, flags | rsocket.AI_NUMERICHOST)
+        self.saved_getaddrinfo = real_getaddrinfo
+        rsocket.getaddrinfo = stub_getaddrinfo
+        hosts.clear()
+        del calls[:]
+
+    def teardown_method(self, meth):
+        rsocket.getaddrinfo = self.saved_getaddrinfo
+        self.space.appexec([], "(): import _socket; _socket.setresolvercache(0)")
+
+    def test_stub(self):
+        import _socket
+        self.set_host('stub.test', '127.0.0.5')
+        assert _socket.getaddrinfo('stub.test', 80, _socket.AF_INET,
+                                   _socket.SOCK_STREAM)[0][4] == \
+            ('127.0.0.5', 80)
+        raises(_socket.gaierror, _socket.getaddrinfo, 'other.test', 80)
+        # no cache by default
+        _socket.getaddrinfo('stub.test', 80)
+        assert self.stub_calls() == 3
+        assert _socket.resolvercacheinfo() == (0, 0, 0, 256, 0.0)
+
+    def test_cache(self):
+        import _socket
+        _socket.setresolvercache(60.0)
+        self.set_host('stub.test', '127.0.0.5')
+        res = _socket.getaddrinfo('stub.test', 80, _socket.AF_INET)
+        self.set_host('stub.test', '127.0.0.6')
+        assert _socket.getaddrinfo('stub.test', 80, _socket.AF_INET) == res
+        assert self.stub_calls() == 1
+        # the key includes all the arguments
+        res2 = _socket.getaddrinfo('stub.test', 81, _socket.AF_INET)
+        assert res2[0][4] == ('127.0.0.6', 81)
+        assert self.stub_calls() == 2
+        # failures are not cached
+        raises(_socket.gaierror, _socket.getaddrinfo, 'other.test', 80)
+        raises(_socket.gaierror, _socket.getaddrinfo, 'other.test', 80)
+        assert self.stub_calls() == 4
+        assert _socket.resolvercacheinfo() == (1, 4, 2, 256, 60.0)
+        # disabling the cache empties it
+        _socket.setresolvercache(0)
+        assert _socket.getaddrinfo('stub.test', 80,
+                                   _socket.AF_INET)[0][4] == ('127.0.0.6', 80)
+        assert _socket.resolvercacheinfo() == (0, 0, 0, 256, 0.0)
+        raises(ValueError, _socket.setresolvercache, -1.0)
+        raises(ValueError, _socket.setresolvercache, 1.0, 0)
+
+    def test_cache_ttl_and_size(self):
+        import _socket, time
+        _socket.setresolvercache(0.2, 2)
+        for i in range(3):
+            self.set_host('host%d.test' % i, '127.0.0.%d' % (i + 1))
+            _socket.getaddrinfo('host%d.test' % i, 80)
+        assert _socket.resolvercacheinfo()[2] == 2
+        _socket.getaddrinfo('host2.test', 80)
+        _socket.getaddrinfo('host0.test', 80)     # evicted
+        assert self.stub_calls() == 4
+        time.sleep(0.3)
+        self.set_host('host2.test', '127.0.0.9')
+        assert _socket.getaddrinfo('host2.test', 80,
+                                   _socket.AF_INET)[0][4] == ('127.0.0.9', 80)
+        assert self.stub_calls() == 5
+
+    def w_poll_all(self, resolver, count):
+        import select
+        results = {}
+        while len(results) < count:
+            r, w, x = select.select([resolver], [], [], 10.0)
+            assert r, "timed out"
+            for id, result in resolver.poll():
+                results[id] = result
+        return results
+
+    def test_resolver(self):
+        import _socket, select
+        resolver = _socket.resolver(2)
+        assert resolver.poll() == []
+        id1 = resolver.getaddrinfo('127.0.0.1', 80, _socket.AF_INET,
+                                   _socket.SOCK_STREAM, 0,
+                                   _socket.AI_NUMERICHOST)
+        id2 = resolver.getaddrinfo('not an address', None, _socket.AF_INET,
+                                   0, 0, _socket.AI_NUMERICHOST)
+        id3 = resolver.getaddrinfo('localhost', '80', _socket.AF_INET,
+                                   _socket.SOCK_STREAM)
+        assert len(set([id1, id2, id3])) == 3
+        assert resolver.pending == 3
+        results = self.poll_all(resolver, 3)
+        assert resolver.pending == 0
+        assert results[id1] == [(_socket.AF_INET, _socket.SOCK_STREAM,
+                                 _socket.IPPROTO_TCP, '', ('127.0.0.1', 80))]
+        assert isinstance(results[id2], _socket.gaierror)
+        assert results[id2].args[0] == _socket.EAI_NONAME
+        assert results[id3]
+        for family, socktype, proto, canonname, addr in results[id3]:
+            assert addr == ('127.0.0.1', 80)
+        raises(TypeError, resolver.getaddrinfo, 42, 80)
+        resolver.close()
+        assert resolver.closed
+        raises(ValueError, resolver.fileno)
+        raises(ValueError, resolver.getaddrinfo, 'localhost', 80)
+        resolver.close()
+
+    def test_resolver_cache(self):
+        import _socket
+        _socket.setresolvercache(60.0)
+        self.set_host('stub.test', '127.0.0.5')
+        res = _socket.getaddrinfo('stub.test', 80)
+        # the helper threads do not know 'stub.test', but it is cached
+        resolver = _socket.resolver()
+        id = resolver.getaddrinfo('stub.test', 80)
+        assert self.poll_all(resolver, 1) == {id: res}
+        # and the results of the helper threads are cached too
+        id = resolver.getaddrinfo('127.0.0.1', 80, 0, 0, 0,
+                                  _socket.AI_NUMERICHOST)
+        res = self.poll_all(resolver, 1)[id]
+        assert _socket.resolvercacheinfo()[2] == 2
+        assert _socket.getaddrinfo('127.0.0.1', 80, 0, 0, 0,
+                                   _socket.AI_NUMERICHOST) == res
+        assert self.stub_calls() == 1
+        resolver.close()
+
+
 class AppTestErrno:
     spaceconfig = {'usemodules': ['_socket']}
 
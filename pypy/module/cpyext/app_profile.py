@@ -0,0 +1,36 @@
+# NOT_RPYTHON
+
+import cpyext
+
+def profile_report(file=None, limit=30):
+    """Write the statistics of cpyext.profile(True) to the given file
+    (default: sys.stderr), with the 'limit' most expensive entries of each
+    kind first: the calls of C functions, then the conversions between PyPy
+    objects and PyObject*s per type.  To get a report when the program
+    exits, use:
+
+        cpyext.profile(True)
+        atexit.register(cpyext.profile_report)
+    """
+    if file is None:
+        import sys
+        file = sys.stderr
+    stats = cpyext.profile_stats()
+    for kind, title in [('call', 'C function'),
+                        ('make_ref', 'make_ref (PyPy -> C)'),
+                        ('from_ref', 'from_ref (C -> PyPy)'),
+                        ('dealloc', 'dealloc')]:
+        entries = [(seconds, count, name)
+                   for (kind1, name, count, seconds) in stats
+                   if kind1 == kind]
+        if not entries:
+            continue
+        entries.sort(reverse=True)
+        print >> file, '%-40s %10s %10s %10s' % (title, 'count',
+                                                 'total (s)', 'per (us)')
+        for seconds, count, name in entries[:limit]:
+            print >> file, '%-40s %10d %10.3f %10.2f' % (
+                name, count, seconds, seconds * 1e6 / count)
+        if len(entries) > limit:
+            print >> file, '... %d more' % (len(entries) - limit,)
+        print >> file
@@ -42,6 +42,14 @@ from pypy.objspace.std.bytesobject import W_BytesObject
 ## - There could be an (expensive!) check in from_ref() that the buffer still
 ##   corresponds to the pypy gc-managed string,
 ##
+## After cpyext.shared_bytes(True), which is off by default, large strings
+## (SHARED_BYTES_MIN_SIZE bytes or more) of the exact type str are not
+## copied: their PyBytesObject has ob_sstate == SSTATE_PYPY_SHARED, and
+## ob_sval holds a pointer to the characters of the RPython string, which
+## is made non-movable.  The string is kept alive by the pypy object,
+## which lives at least as long as the PyBytesObject.  C code must use
+## PyString_AS_STRING() & co. to get at the characters of such a string.
+##
 
 PyBytesObjectStruct = lltype.ForwardReference()
 PyBytesObject = lltype.Ptr(PyBytesObjectStruct)
@@ -49,11 +57,16 @@ PyBytesObjectFields = PyVarObjectFields + \
     (("ob_shash", rffi.LONG), ("ob_sstate", rffi.INT), ("ob_sval", rffi.CArray(lltype.Char)))
 cpython_struct("PyStringObject", PyBytesObjectFields, PyBytesObjectStruct)
 
+SSTATE_INTERNED_MORTAL = 1
+SSTATE_PYPY_SHARED = 3
+SHARED_BYTES_MIN_SIZE = 64 * 1024
+
 @bootstrap_function
 def init_bytesobject(space):
     "Type description of PyBytesObject"
     make_typedescr(space.w_bytes.layout.typedef,
                    basestruct=PyBytesObject.TO,
+                   itemcount=bytes_itemcount,
                    attach=bytes_attach,
                    dealloc=bytes_dealloc,
                    realize=bytes_realize)
@@ -73,14 +86,48 @@ def new_empty_str(space, length):
     py_str.c_ob_sstate = rffi.cast(rffi.INT, 0) # SSTATE_NOT_INTERNED
     return py_str
 
+class SharedBytes(object):
+    """Whether large strings are shared with their PyBytesObject, see
+    shared_bytes().  Disabled by default, because C code that reads ob_sval
+    directly would not see their characters."""
+
+    def __init__(self, space):
+        self.enabled = False
+
+def is_shared_bytes(space, w_obj, length):
+    return (space.fromcache(SharedBytes).enabled and
+            length >= SHARED_BYTES_MIN_SIZE and
+            space.is_w(space.type(w_obj), space.w_bytes))
+
+def bytes_itemcount(space, w_obj):
+    length = space.len_w(w_obj)
+    if is_shared_bytes(space, w_obj, length):
+        return rffi.sizeof(rffi.CCHARP)   # room for the pointer only
+    return length
+
+def bytes_data(py_str):
+    """The characters of a PyBytesObject."""
+    if rffi.cast(lltype.Signed, py_str.c_ob_sstate) == SSTATE_PYPY_SHARED:
+        return rffi.cast(rffi.CCHARPP, py_str.c_ob_sval)[0]
+    return rffi.cast(rffi.CCHARP, py_str.c_ob_sval)
+
 def bytes_attach(space, py_obj, w_obj, w_userdata=None):
     """
-    Copy RPython string object contents to a PyBytesObject. The
-    c_ob_sval must not be modified.
+    Copy RPython string object contents to a PyBytesObject, or for large
+    strings, make the PyBytesObject point to them. The c_ob_sval must not
+    be modified.
     """
     py_str = rffi.cast(PyBytesObject, py_obj)
     s = space.bytes_w(w_obj)
     len_s = len(s)
+    if is_shared_bytes(space, w_obj, len_s):
+        # bytes_itemcount() made room for a pointer in c_ob_sval
+        data = rffi.get_raw_address_of_string(s)
+        rffi.cast(rffi.CCHARPP, py_str.c_ob_sval)[0] = data
+        py_str.c_ob_size = len_s
+        py_str.c_ob_shash = space.hash_w(space.newbytes(s))
+        py_str.c_ob_sstate = rffi.cast(rffi.INT, SSTATE_PYPY_SHARED)
+        return
     if py_str.c_ob_size  < len_s:
         raise oefmt(space.w_ValueError,
             "bytes_attach called on object with ob_size %d but trying to store %d",
@@ -92,7 +139,7 @@ def bytes_attach(space, py_obj, w_obj, w_userdata=None):
     # not fully linked yet
     #py_str.c_ob_shash = space.hash_w(w_obj)
     py_str.c_ob_shash = space.hash_w(space.newbytes(s))
-    py_str.c_ob_sstate = rffi.cast(rffi.INT, 1) # SSTATE_INTERNED_MORTAL
+    py_str.c_ob_sstate = rffi.cast(rffi.INT, SSTATE_INTERNED_MORTAL)
 
 def bytes_realize(space, py_obj):
     """
@@ -107,7 +154,7 @@ def bytes_realize(space, py_obj):
     # if py_obj has a tp_hash, this will try to call it but the object is
     # not realized yet
     py_str.c_ob_shash = space.hash_w(space.newbytes(s))
-    py_str.c_ob_sstate = rffi.cast(rffi.INT, 1) # SSTATE_INTERNED_MORTAL
+    py_str.c_ob_sstate = rffi.cast(rffi.INT, SSTATE_INTERNED_MORTAL)
     track_reference(space, py_obj, w_obj)
     return w_obj
 
@@ -150,7 +197,7 @@ def _PyString_AsString(space, ref):
                         "expected string or Unicode object, %T found",
                         from_ref(space, ref))
     ref_str = rffi.cast(PyBytesObject, ref)
-    return ref_str.c_ob_sval
+    return bytes_data(ref_str)
 
 @cpython_api([rffi.VOIDP], rffi.CCHARP, error=0)
 def PyString_AS_STRING(space, void_ref):
@@ -174,12 +221,13 @@ def PyString_AsStringAndSize(space, ref, data, length):
                         "expected string or Unicode object, %T found",
                         from_ref(space, ref))
     ref_str = rffi.cast(PyBytesObject, ref)
-    data[0] = ref_str.c_ob_sval
+    sval = bytes_data(ref_str)
+    data[0] = sval
     if length:
         length[0] = ref_str.c_ob_size
     else:
         i = 0
-        while ref_str.c_ob_sval[i] != '\0':
+        while sval[i] != '\0':
             i += 1
         if i != ref_str.c_ob_size:
             raise oefmt(space.w_TypeError,
@@ -56,6 +56,10 @@ typedef struct {
 #define SSTATE_NOT_INTERNED 0
 #define SSTATE_INTERNED_MORTAL 1
 #define SSTATE_INTERNED_IMMORTAL 2
+/* PyPy, after cpyext.shared_bytes(True) only: a large string whose
+   ob_sval holds a pointer to the characters, which are not copied.  Use
+   PyString_AS_STRING() to read them. */
+#define SSTATE_PYPY_SHARED 3
 #define PyString_CHECK_INTERNED(op) (((PyStringObject *)(op))->ob_sstate)
 
 PyAPI_FUNC(PyObject *) PyString_FromFormatV(const char *format, va_list vargs);
@@ -1,4 +1,71 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
 from .methodobject import W_PyCFunctionObject
+from .listobject import LazyListItems
+from .bytesobject import SharedBytes
+from .profiler import BoundaryProfiler
 
 def is_cpyext_function(space, w_arg):
     return space.newbool(isinstance(w_arg, W_PyCFunctionObject))
+
+@unwrap_spec(cachesize=int)
+def lazy_list_items(space, cachesize):
+    """lazy_list_items(cachesize) -> previous cachesize
+
+    Let C code read the items of a list with PyList_GET_ITEM(),
+    PyList_GetItem() or PySequence_Fast_GET_ITEM() without converting the
+    whole list to PyObject*s first; a list of ints, floats or strs keeps its
+    compact storage until C code writes to it or calls
+    PySequence_Fast_ITEMS().  The borrowed references are kept alive by a
+    cache of 'cachesize' items, so C code must not hold more of them at
+    once.  0, the default, disables this."""
+    if cachesize < 0:
+        raise oefmt(space.w_ValueError, "cachesize must be >= 0")
+    lazy = space.fromcache(LazyListItems)
+    old = lazy.maxsize
+    lazy.configure(cachesize)
+    return space.newint(old)
+
+@unwrap_spec(enabled=bool)
+def shared_bytes(space, enabled):
+    """shared_bytes(enabled) -> previous state
+
+    Don't copy the characters of the strs of 64KB or more that are passed
+    to C code: their PyStringObject points to them instead.  C code must
+    then read them with PyString_AS_STRING() or PyString_AsString(), not
+    from ob_sval directly.  Disabled by default."""
+    shared = space.fromcache(SharedBytes)
+    old = shared.enabled
+    shared.enabled = enabled
+    return space.newbool(old)
+
+@unwrap_spec(enabled=bool)
+def profile(space, enabled):
+    """profile(enabled) -> previous state
+
+    Count and time the calls to C functions, and the conversions between
+    PyPy objects and PyObject*s per type; see profile_stats().  Enabling
+    the profiler clears the previous statistics."""
+    profiler = space.fromcache(BoundaryProfiler)
+    old = profiler.enabled
+    profiler.enable(enabled)
+    return space.newbool(old)
+
+def profile_stats(space):
+    """profile_stats() -> [(kind, name, count, seconds)]
+
+    The statistics collected by profile(True), in no particular order.
+    'kind' is 'call' for the calls of the C function or slot wrapper
+    'name'; for the conversions of the objects of type 'name', it is
+    'make_ref' (to a new PyObject*), 'from_ref' (from a PyObject* that had
+    no PyPy object yet) or 'dealloc'.  The times are inclusive."""
+    profiler = space.fromcache(BoundaryProfiler)
+    tables = profiler.get_tables()
+    stats_w = []
+    for i in range(len(tables)):
+        w_kind = space.newtext(BoundaryProfiler.KINDS[i])
+        for name, entry in tables[i].items():
+            stats_w.append(space.newtuple([w_kind, space.newtext(name),
+                                           space.newint(entry.count),
+                                           space.newfloat(entry.duration)]))
+    return space.newlist(stats_w)
@@ -1,11 +1,14 @@
 
+from collections import OrderedDict
+
 from rpython.rlib.objectmodel import always_inline
 from rpython.rtyper.lltypesystem import rffi, lltype
 from pypy.module.cpyext.api import (cpython_api, CANNOT_FAIL, Py_ssize_t,
                                     build_type_checkers_flags)
 from pypy.module.cpyext.pyerrors import PyErr_BadInternalCall
-from pypy.module.cpyext.pyobject import decref, incref, PyObject, make_ref
-from pypy.objspace.std.listobject import W_ListObject
+from pypy.module.cpyext.pyobject import (decref, incref, PyObject, make_ref,
+                                         as_pyobj)
+from pypy.objspace.std.listobject import W_ListObject, ObjectListStrategy
 from pypy.interpreter.error import oefmt
 
 
@@ -30,6 +33,72 @@ def get_list_storage(space, w_list):
     w_list.convert_to_cpy_strategy(space)
     return CPyListStrategy.unerase(w_list.lstorage)
 
+
+class LazyItem(object):
+    def __init__(self, w_item, py_item):
+        self.w_item = w_item
+        self.py_item = py_item
+
+
+class LazyListItems(object):
+    """The borrowed references that PyList_GET_ITEM() and PyList_GetItem()
+    returned for lists that were left in their own strategy, see
+    lazy_list_items().  The items of an IntegerListStrategy list, for
+    example, are created by each getitem(), so something must keep the
+    PyObject* alive.  Holds at most 'maxsize' of them and forgets the
+    oldest first; an entry is also dropped when the list item changed.
+    Disabled (maxsize == 0) by default.
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.maxsize = 0
+        self.entries = OrderedDict()
+
+    def configure(self, maxsize):
+        self.maxsize = maxsize
+        while len(self.entries) > maxsize:
+            self._evict_oldest()
+
+    def is_lazy(self, w_list):
+        from pypy.module.cpyext.sequence import CPyListStrategy
+        return (self.maxsize > 0 and
+                w_list.strategy is not self.space.fromcache(CPyListStrategy))
+
+    def getitem(self, w_list, index):
+        space = self.space
+        w_item = w_list.getitem(index)
+        if w_list.strategy is space.fromcache(ObjectListStrategy):
+            # the list holds on to w_item, which keeps its PyObject alive
+            return as_pyobj(space, w_item)
+        key = (w_list, index)
+        entry = self.entries.get(key, None)
+        if entry is not None:
+            if space.is_w(entry.w_item, w_item):
+                return entry.py_item
+            del self.entries[key]
+            decref(space, entry.py_item)
+        elif len(self.entries) >= self.maxsize:
+            self._evict_oldest()
+        py_item = make_ref(space, w_item)
+        self.entries[key] = LazyItem(w_item, py_item)
+        return py_item
+
+    def _evict_oldest(self):
+        for key, entry in self.entries.iteritems():
+            del self.entries[key]
+            decref(self.space, entry.py_item)
+            break
+
+def get_list_item(space, w_list, index):
+    """Borrowed reference to w_list[index], which must be in range.  Only
+    switches w_list to the CPyListStrategy if lazy_list_items() is off."""
+    lazy = space.fromcache(LazyListItems)
+    if lazy.is_lazy(w_list):
+        return lazy.getitem(w_list, index)
+    storage = get_list_storage(space, w_list)
+    return storage._elems[index]
+
 @cpython_api([rffi.VOIDP, Py_ssize_t, PyObject], lltype.Void, error=CANNOT_FAIL)
 def PyList_SET_ITEM(space, w_list, index, py_item):
     """Form of PyList_SetItem() without error checking. This is normally
@@ -67,9 +136,8 @@ def PyList_SetItem(space, w_list, index, py_item):
 @cpython_api([rffi.VOIDP, Py_ssize_t], PyObject, result_is_ll=True)
 def PyList_GET_ITEM(space, w_list, index):
     assert isinstance(w_list, W_ListObject)
-    storage = get_list_storage(space, w_list)
     assert 0 <= index < w_list.length()
-    return storage._elems[index]     # borrowed ref
+    return get_list_item(space, w_list, index)     # borrowed ref
 
 @cpython_api([PyObject, Py_ssize_t], PyObject, result_is_ll=True)
 def PyList_GetItem(space, w_list, index):
@@ -81,8 +149,7 @@ def PyList_GetItem(space, w_list, index):
         PyErr_BadInternalCall(space)
     if index < 0 or index >= w_list.length():
         raise oefmt(space.w_IndexError, "list index out of range")
-    storage = get_list_storage(space, w_list)
-    return storage._elems[index]     # borrowed ref
+    return get_list_item(space, w_list, index)     # borrowed ref
 
 
 @cpython_api([PyObject, PyObject], rffi.INT_real, error=-1)
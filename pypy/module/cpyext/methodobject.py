@@ -1,3 +1,5 @@
+import time
+
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib import jit
 
@@ -15,8 +17,9 @@ from pypy.module.cpyext.api import (
     build_type_checkers)
 from pypy.module.cpyext.pyobject import (
     decref, from_ref, make_ref, as_pyobj, make_typedescr)
-from pypy.module.cpyext.state import State
-from pypy.module.cpyext.tupleobject import tuple_from_args_w
+from pypy.module.cpyext.profiler import BoundaryProfiler
+from pypy.module.cpyext.tupleobject import (
+    tuple_from_args_w, args_tuple_from_args_w, args_tuple_release)
 
 PyMethodDef = cts.gettype('PyMethodDef')
 PyCFunction = cts.gettype('PyCFunction')
@@ -71,6 +74,23 @@ class W_PyCFunctionObject(W_Root):
         return self.call(space, self.w_self, __args__)
 
     def call(self, space, w_self, __args__):
+        profiler = space.fromcache(BoundaryProfiler)
+        if profiler.enabled:
+            start = time.time()
+            try:
+                return self.call_unprofiled(space, w_self, __args__)
+            finally:
+                profiler.record(profiler.calls, self.get_profile_name(space),
+                                start)
+        return self.call_unprofiled(space, w_self, __args__)
+
+    def get_profile_name(self, space):
+        if self.w_module is not None and space.isinstance_w(self.w_module,
+                                                            space.w_text):
+            return '%s.%s' % (space.text_w(self.w_module), self.name)
+        return self.name
+
+    def call_unprofiled(self, space, w_self, __args__):
         flags = self.flags & ~(METH_CLASS | METH_STATIC | METH_COEXIST)
         length = len(__args__.arguments_w)
         if not flags & METH_KEYWORDS and __args__.keywords:
@@ -104,22 +124,21 @@ class W_PyCFunctionObject(W_Root):
         return generic_cpy_call(space, func, w_self, w_o)
 
     def call_varargs(self, space, w_self, __args__):
-        state = space.fromcache(State)
         func = self.ml.c_ml_meth
-        py_args = tuple_from_args_w(space, __args__.arguments_w)
+        py_args = args_tuple_from_args_w(space, __args__.arguments_w)
         try:
             return generic_cpy_call(space, func, w_self, py_args)
         finally:
-            decref(space, py_args)
+            args_tuple_release(space, py_args)
 
     def call_keywords(self, space, w_self, __args__):
         func = rffi.cast(PyCFunctionKwArgs, self.ml.c_ml_meth)
-        py_args = tuple_from_args_w(space, __args__.arguments_w)
+        py_args = args_tuple_from_args_w(space, __args__.arguments_w)
         w_kwargs = w_kwargs_from_args(space, __args__)
         try:
             return generic_cpy_call(space, func, w_self, py_args, w_kwargs)
         finally:
-            decref(space, py_args)
+            args_tuple_release(space, py_args)
 
     def call_oldargs(self, space, w_self, __args__):
         func = self.ml.c_ml_meth
@@ -169,6 +188,11 @@ class W_PyCMethodObject(W_PyCFunctionObject):
         return self.space.newtext("<method '%s' of '%s' objects>" % (
             self.name, w_objclass.name))
 
+    def get_profile_name(self, space):
+        w_objclass = self.w_objclass
+        assert isinstance(w_objclass, W_TypeObject)
+        return '%s.%s' % (w_objclass.name, self.name)
+
     def descr_call(self, space, __args__):
         if len(__args__.arguments_w) == 0:
             w_objclass = self.w_objclass
@@ -227,6 +251,9 @@ class W_PyCClassMethodObject(W_PyCFunctionObject):
                             "built-in method '%s' of '%s' object" %
                             (self.name, self.w_objclass.getname(self.space)))
 
+    def get_profile_name(self, space):
+        return '%s.%s' % (self.w_objclass.getname(space), self.name)
+
 
 class W_PyCWrapperObject(W_Root):
     """
@@ -246,6 +273,14 @@ class W_PyCWrapperObject(W_Root):
         self.w_objclass = w_type
 
     def descr_call(self, space, w_self, __args__):
+        profiler = space.fromcache(BoundaryProfiler)
+        if profiler.enabled:
+            start = time.time()
+            try:
+                return self.call(space, w_self, __args__)
+            finally:
+                profiler.record(profiler.calls, '%s.%s' % (
+                    self.w_objclass.name, self.method_name), start)
         return self.call(space, w_self, __args__)
 
     def call(self, space, w_self, __args__):
@@ -6,10 +6,15 @@ class Module(MixedModule):
     interpleveldefs = {
         'load_module': 'api.load_extension_module',
         'is_cpyext_function': 'interp_cpyext.is_cpyext_function',
+        'lazy_list_items': 'interp_cpyext.lazy_list_items',
+        'shared_bytes': 'interp_cpyext.shared_bytes',
+        'profile': 'interp_cpyext.profile',
+        'profile_stats': 'interp_cpyext.profile_stats',
         'FunctionType': 'methodobject.W_PyCFunctionObject',
     }
 
     appleveldefs = {
+        'profile_report': 'app_profile.profile_report',
     }
 
     atexit_funcs = []
@@ -0,0 +1,55 @@
+"""
+An optional profiler of the boundary between PyPy and C extensions.  When
+enabled with cpyext.profile(True), it counts and times:
+
+  - the calls to each C function or slot wrapper, from PyPy;
+  - per type, the PyObject*s built for pypy objects (make_ref(),
+    as_pyobj(), including the type's attach function), the pypy objects
+    built from PyObject*s (from_ref() of objects that are not realized yet,
+    i.e. the type's realize function), and the PyObject*s deallocated
+    (decref() reaching zero).
+
+The times are inclusive: a call includes the conversions of its arguments
+and result, and the PyObject* of a tuple includes those of its items.
+See cpyext.profile_stats() and cpyext.profile_report().
+"""
+
+import time
+
+
+class ProfileEntry(object):
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+class BoundaryProfiler(object):
+    _immutable_fields_ = ['enabled?']
+
+    KINDS = ['call', 'make_ref', 'from_ref', 'dealloc']
+
+    def __init__(self, space):
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        self.calls = {}         # name of the C function -> ProfileEntry
+        self.make_refs = {}     # type name -> ProfileEntry
+        self.from_refs = {}
+        self.deallocs = {}
+
+    def enable(self, enabled):
+        if enabled and not self.enabled:
+            self.clear()
+        self.enabled = enabled
+
+    def record(self, table, name, start):
+        entry = table.get(name, None)
+        if entry is None:
+            entry = ProfileEntry()
+            table[name] = entry
+        entry.count += 1
+        entry.duration += time.time() - start
+
+    def get_tables(self):
+        return [self.calls, self.make_refs, self.from_refs, self.deallocs]
@@ -1,4 +1,5 @@
 import sys
+import time
 
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.baseobjspace import W_Root, SpaceCache
@@ -9,6 +10,7 @@ from pypy.module.cpyext.api import (
     CANNOT_FAIL, Py_TPFLAGS_HEAPTYPE, PyTypeObjectPtr, is_PyObject,
     PyVarObject, Py_ssize_t, init_function, cts)
 from pypy.module.cpyext.state import State
+from pypy.module.cpyext.profiler import BoundaryProfiler
 from pypy.objspace.std.typeobject import W_TypeObject
 from pypy.objspace.std.noneobject import W_NoneObject
 from pypy.objspace.std.boolobject import W_BoolObject
@@ -109,6 +111,9 @@ class BaseCpyTypedescr(object):
         pyobj.c_ob_type = pytype
         return pyobj
 
+    def get_itemcount(self, space, w_obj):
+        return space.len_w(w_obj)
+
     def attach(self, space, pyobj, w_obj, w_userdata=None):
         pass
 
@@ -137,6 +142,8 @@ def make_typedescr(typedef, **kw):
 
     basestruct: The basic structure to allocate
     alloc     : allocate and basic initialization of a raw PyObject
+    itemcount : Function returning the number of items to allocate for a
+                pypy object of a variable-sized type (default: its length)
     attach    : Function called to tie a raw structure to a pypy object
     realize   : Function called to create a pypy object from a raw struct
     dealloc   : a @slot_function(), similar to PyObject_dealloc
@@ -144,6 +151,7 @@ def make_typedescr(typedef, **kw):
 
     tp_basestruct = kw.pop('basestruct', PyObject.TO)
     tp_alloc      = kw.pop('alloc', None)
+    tp_itemcount  = kw.pop('itemcount', None)
     tp_attach     = kw.pop('attach', None)
     tp_realize    = kw.pop('realize', None)
     tp_dealloc    = kw.pop('dealloc', None)
@@ -159,6 +167,10 @@ def make_typedescr(typedef, **kw):
             def allocate(self, space, w_type, itemcount=0, immortal=False):
                 return tp_alloc(self, space, w_type, itemcount)
 
+        if tp_itemcount:
+            def get_itemcount(self, space, w_obj):
+                return tp_itemcount(space, w_obj)
+
         if hasattr(tp_dealloc, 'api_func'):
             def get_dealloc(self, space):
                 return tp_dealloc.api_func.get_llhelper(space)
@@ -214,11 +226,23 @@ def create_ref(space, w_obj, w_userdata=None, immortal=False):
     Allocates a PyObject, and fills its fields with info from the given
     interpreter object.
     """
+    profiler = space.fromcache(BoundaryProfiler)
+    if profiler.enabled:
+        start = time.time()
+        py_obj = _create_ref(space, w_obj, w_userdata, immortal)
+        w_type = space.type(w_obj)
+        assert isinstance(w_type, W_TypeObject)
+        profiler.record(profiler.make_refs, w_type.name, start)
+        return py_obj
+    return _create_ref(space, w_obj, w_userdata, immortal)
+
+def _create_ref(space, w_obj, w_userdata, immortal):
     w_type = space.type(w_obj)
     pytype = rffi.cast(PyTypeObjectPtr, as_pyobj(space, w_type))
     typedescr = get_typedescr(w_obj.typedef)
     if pytype.c_tp_itemsize != 0:
-        itemcount = space.len_w(w_obj) # PyBytesObject and subclasses
+        # PyBytesObject and subclasses
+        itemcount = typedescr.get_itemcount(space, w_obj)
     else:
         itemcount = 0
     py_obj = typedescr.allocate(space, w_type, itemcount=itemcount, immortal=immortal)
@@ -286,6 +310,12 @@ def from_ref(space, ref):
         raise InvalidPointerException(str(ref))
     w_type = from_ref(space, ref_type)
     assert isinstance(w_type, W_TypeObject)
+    profiler = space.fromcache(BoundaryProfiler)
+    if profiler.enabled:
+        start = time.time()
+        w_obj = get_typedescr(w_type.layout.typedef).realize(space, ref)
+        profiler.record(profiler.from_refs, w_type.name, start)
+        return w_obj
     return get_typedescr(w_type.layout.typedef).realize(space, ref)
 
 @jit.dont_look_inside
@@ -399,6 +429,15 @@ def decref(space, pyobj):
         pyobj.c_ob_refcnt -= 1
         if pyobj.c_ob_refcnt == 0:
             state = space.fromcache(State)
+            profiler = space.fromcache(BoundaryProfiler)
+            if profiler.enabled:
+                # read the name now, the type may be deallocated too
+                type_name = rffi.charp2str(
+                    cts.cast('char*', pyobj.c_ob_type.c_tp_name))
+                start = time.time()
+                generic_cpy_call(space, state.C._Py_Dealloc, pyobj)
+                profiler.record(profiler.deallocs, type_name, start)
+                return
             generic_cpy_call(space, state.C._Py_Dealloc, pyobj)
         #else:
         #    w_obj = rawrefcount.to_obj(W_Root, ref)
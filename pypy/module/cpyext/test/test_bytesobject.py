@@ -8,7 +8,8 @@ from pypy.module.cpyext.bytesobject import (
     new_empty_str, PyBytesObject, _PyString_Resize, PyString_Concat,
     PyString_ConcatAndDel, PyString_Format, PyString_InternFromString,
     PyString_AsEncodedObject, PyString_AsDecodedObject, _PyString_Eq,
-    _PyString_Join)
+    _PyString_Join, PyString_AsString, SharedBytes, SHARED_BYTES_MIN_SIZE,
+    SSTATE_PYPY_SHARED)
 from pypy.module.cpyext.api import PyObjectP, PyObject, Py_ssize_tP, generic_cpy_call
 from pypy.module.cpyext.pyobject import decref, from_ref, make_ref
 from pypy.module.cpyext.buffer import PyObject_AsCharBuffer
@@ -347,6 +348,57 @@ class AppTestBytesObject(AppTestCpythonExtensionBase):
         # doesn't really test, but if printf is enabled will prove sstate
         assert module.test_sstate()
 
+    def test_large_bytes_ob_sval(self):
+        # by default, even large strings are copied into ob_sval
+        module = self.import_extension('foo', [
+            ("tail", "METH_VARARGS",
+             '''
+                PyObject *s;
+                Py_ssize_t n;
+                if (!PyArg_ParseTuple(args, "Sn", &s, &n))
+                    return NULL;
+                return PyString_FromStringAndSize(
+                    ((PyStringObject *)s)->ob_sval + PyString_GET_SIZE(s) - n,
+                    n);
+             '''),
+            ])
+        s = 'a' * 200000 + 'bcdef'
+        assert module.tail(s, 6) == 'abcdef'
+
+    def test_shared_bytes(self):
+        module = self.import_extension('foo', [
+            ("sstate", "METH_O",
+             '''
+                return PyInt_FromLong(PyString_CHECK_INTERNED(args));
+             '''),
+            ("tail", "METH_VARARGS",
+             '''
+                PyObject *s;
+                char *data;
+                Py_ssize_t size, n;
+                if (!PyArg_ParseTuple(args, "Sn", &s, &n))
+                    return NULL;
+                if (PyString_AsStringAndSize(s, &data, &size) < 0)
+                    return NULL;
+                if (PyString_AS_STRING(s) != data ||
+                        PyString_GET_SIZE(s) != size) {
+                    PyErr_SetString(PyExc_AssertionError, "mismatch");
+                    return NULL;
+                }
+                return PyString_FromStringAndSize(data + size - n, n);
+             '''),
+            ])
+        import cpyext
+        old = cpyext.shared_bytes(True)
+        try:
+            s = 'a' * 200000 + 'bcdef'
+            assert module.tail(s, 6) == 'abcdef'
+            assert module.tail('hello', 3) == 'llo'
+            assert module.sstate(s) == 3
+            assert module.sstate('hello') != 3
+        finally:
+            assert cpyext.shared_bytes(old) is True
+
     def test_subclass(self):
         # taken from PyStringArrType_Type in numpy's scalartypes.c.src
         module = self.import_extension('bar', [
@@ -506,6 +558,36 @@ class TestBytes(BaseApiTest):
         lltype.free(ref, flavor='raw')
         decref(space, py_obj)
 
+    def test_large_bytes(self, space):
+        s = 'abcdefgh' * (SHARED_BYTES_MIN_SIZE // 8) + 'xyz'
+        ref = make_ref(space, space.newbytes(s))
+        py_str = rffi.cast(PyBytesObject, ref)
+        assert py_str.c_ob_sstate == 1
+        assert rffi.charpsize2str(py_str.c_ob_sval, len(s)) == s
+        decref(space, ref)
+
+    def test_shared_bytes(self, space):
+        shared = space.fromcache(SharedBytes)
+        shared.enabled = True
+        try:
+            s = 'abcdefgh' * (SHARED_BYTES_MIN_SIZE // 8) + 'xyz'
+            ref = make_ref(space, space.newbytes(s))
+            py_str = rffi.cast(PyBytesObject, ref)
+            assert py_str.c_ob_sstate == SSTATE_PYPY_SHARED
+            assert py_str.c_ob_size == len(s)
+            assert py_str.c_ob_shash == space.hash_w(space.newbytes(s))
+            assert rffi.charpsize2str(PyString_AsString(space, ref),
+                                      len(s)) == s
+            decref(space, ref)
+            # smaller strings are still copied
+            ref = make_ref(space, space.newbytes('abc'))
+            py_str = rffi.cast(PyBytesObject, ref)
+            assert py_str.c_ob_sstate == 1
+            assert PyString_AsString(space, ref) == py_str.c_ob_sval
+            decref(space, ref)
+        finally:
+            shared.enabled = False
+
     def test_Concat(self, space):
         ref = make_ref(space, space.wrap('abc'))
         ptr = lltype.malloc(PyObjectP.TO, 1, flavor='raw')
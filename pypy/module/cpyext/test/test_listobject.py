@@ -292,3 +292,31 @@ class AppTestListObject(AppTestCpythonExtensionBase):
                 return PyLong_FromSsize_t(0);
              """)])
         assert module.test_refcount_diff(["first"], ["second"]) == 0
+
+    def test_lazy_list_items(self):
+        module = self.import_extension('foo', [
+             ("sum_fast", "METH_O",
+             """
+                PyObject *seq = PySequence_Fast(args, "not a sequence");
+                Py_ssize_t i, n;
+                double total = 0.0;
+                if (seq == NULL)
+                    return NULL;
+                n = PySequence_Fast_GET_SIZE(seq);
+                for (i = 0; i < n; i++)
+                    total += PyFloat_AsDouble(PySequence_Fast_GET_ITEM(seq, i));
+                Py_DECREF(seq);
+                return PyFloat_FromDouble(total);
+             """)])
+        import cpyext, __pypy__
+        old = cpyext.lazy_list_items(16)
+        try:
+            l = range(1000)
+            assert module.sum_fast(l) == 499500.0
+            assert module.sum_fast([0.5] * 100) == 50.0
+            l = [i for i in range(1000)]
+            assert module.sum_fast(l) == 499500.0
+            assert __pypy__.strategy(l) == 'IntegerListStrategy'
+            raises(ValueError, cpyext.lazy_list_items, -1)
+        finally:
+            assert cpyext.lazy_list_items(old) == 16
@@ -73,6 +73,58 @@ class AppTestMethodObject(AppTestCpythonExtensionBase):
         #
         raises(TypeError, mod.getarg_VARARGS, k=1)
 
+    def test_call_METH_VARARGS_reuse(self):
+        # the argument tuples may be reused between calls, but only if the
+        # function did not keep a reference to them
+        mod = self.import_extension('MyModule', [
+            ('keep', 'METH_VARARGS',
+             '''
+             static PyObject *kept = NULL;
+             if (PyTuple_GET_SIZE(args) == 0) {
+                 Py_INCREF(kept);
+                 return kept;
+             }
+             Py_XDECREF(kept);
+             Py_INCREF(args);
+             kept = args;
+             Py_INCREF(Py_None);
+             return Py_None;
+             '''
+             ),
+            ('second', 'METH_VARARGS',
+             '''
+             PyObject *item = PyTuple_GET_ITEM(args, 1);
+             Py_INCREF(item);
+             return item;
+             '''
+             ),
+            ('reenter', 'METH_VARARGS',
+             '''
+             PyObject *res = PyObject_CallFunctionObjArgs(
+                 PyTuple_GET_ITEM(args, 0), PyTuple_GET_ITEM(args, 1), NULL);
+             if (res == NULL)
+                 return NULL;
+             return Py_BuildValue("OON", PyTuple_GET_ITEM(args, 0),
+                                  PyTuple_GET_ITEM(args, 1), res);
+             '''
+             ),
+            ])
+        for i in range(5):
+            assert mod.second(i, i * 2) == i * 2
+        assert mod.keep(1, 2) is None
+        for i in range(5):
+            assert mod.second(i, 'x%d' % i) == 'x%d' % i
+        assert mod.keep() == (1, 2)
+        def inner(x):
+            return mod.second(x, x * 2)
+        def outer(x):
+            return mod.reenter(inner, x + 100)
+        for i in range(3):
+            assert mod.reenter(outer, i) == (outer, i, (inner, i + 100,
+                                                        2 * (i + 100)))
+        raises(ZeroDivisionError, mod.reenter, lambda x: 1 / x, 0)
+        assert mod.second(None, 'ok') == 'ok'
+
     def test_call_METH_OLDARGS(self):
         mod = self.import_extension('MyModule', [
             ('getarg_OLD', 'METH_OLDARGS',
@@ -254,3 +306,46 @@ class AppTestMethodObject(AppTestCpythonExtensionBase):
         mod = self.import_module(name="specmethdocstring")
         c = mod.C()
         assert c.__iter__.__doc__ == "usable docstring"
+
+    def test_profile(self):
+        mod = self.import_extension('MyModule', [
+            ('getarg_O', 'METH_O',
+             '''
+             Py_INCREF(args);
+             return args;
+             '''
+             ),
+            ('make_tuple', 'METH_NOARGS',
+             '''
+             return Py_BuildValue("(ss)", "a", "b");
+             '''
+             ),
+            ])
+        import cpyext, StringIO
+        assert cpyext.profile(True) is False
+        try:
+            for i in range(5):
+                mod.getarg_O((i, 'x'))
+            t = mod.make_tuple()
+            assert t == ('a', 'b')
+        finally:
+            assert cpyext.profile(False) is True
+        stats = {}
+        for kind, name, count, seconds in cpyext.profile_stats():
+            assert seconds >= 0.0
+            stats[kind, name] = count
+        assert stats['call', 'MyModule.getarg_O'] == 5
+        assert stats['call', 'MyModule.make_tuple'] == 1
+        assert stats['make_ref', 'tuple'] == 5
+        assert stats['from_ref', 'tuple'] == 1
+        mod.getarg_O(42)
+        assert cpyext.profile_stats() != []     # kept while disabled
+        f = StringIO.StringIO()
+        cpyext.profile_report(f, limit=1)
+        report = f.getvalue()
+        assert report.startswith('C function')
+        assert '\nMyModule.' in report
+        assert '\n... 1 more\n' in report
+        cpyext.profile(True)
+        assert cpyext.profile_stats() == []
+        cpyext.profile(False)
@@ -7,6 +7,7 @@ from pypy.module.cpyext.sequence import (
     PySequence_GetItem, PySequence_SetItem, PySequence_DelItem)
 from pypy.module.cpyext.pyobject import get_w_obj_and_decref, from_ref
 from pypy.module.cpyext.state import State
+from pypy.module.cpyext.sequence import CPyListStrategy
 import pytest
 
 class TestSequence(BaseApiTest):
@@ -271,6 +272,59 @@ class TestCPyListStrategy(BaseApiTest):
         assert map(space.unwrap, space.unpackiterable(w_l1)) == [1, 2, 3, 4]
 
 
+class TestLazyListItems(BaseApiTest):
+    def setup_method(self, func):
+        from pypy.module.cpyext.listobject import LazyListItems
+        BaseApiTest.setup_method(self, func)
+        self.lazy = self.space.fromcache(LazyListItems)
+        self.lazy.configure(4)
+
+    def teardown_method(self, func):
+        self.lazy.configure(0)
+        BaseApiTest.teardown_method(self, func)
+
+    def test_keeps_strategy(self, space, api):
+        from pypy.objspace.std.listobject import IntegerListStrategy
+        w_l = space.newlist([space.wrap(i) for i in range(10)])
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        for i in range(10):
+            assert from_ref(space, api.PyList_GetItem(w_l, i)) is not None
+            p = api.PySequence_Fast_GET_ITEM(w_l, i)
+            assert space.int_w(from_ref(space, p)) == i
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        assert len(self.lazy.entries) == 4
+        api.PySequence_Fast_ITEMS(w_l)
+        assert w_l.strategy is space.fromcache(CPyListStrategy)
+        assert space.unwrap(w_l) == range(10)
+
+    def test_same_pointer(self, space, api):
+        w_l = space.wrap([1.5, 2.5, 3.5])
+        p1 = api.PyList_GetItem(w_l, 1)
+        p2 = api.PyList_GET_ITEM(w_l, 1)
+        assert p1 == p2
+        assert p1.c_ob_refcnt > 1
+        space.setitem(w_l, space.wrap(1), space.wrap(7.5))
+        p3 = api.PyList_GetItem(w_l, 1)
+        assert space.float_w(from_ref(space, p3)) == 7.5
+        assert len(self.lazy.entries) == 1
+
+    def test_object_list(self, space, api):
+        w_x = space.appexec([], """():
+            class X(object): pass
+            return X()""")
+        w_l = space.newlist([w_x, space.wrap(1)])
+        assert from_ref(space, api.PyList_GetItem(w_l, 0)) is w_x
+        assert w_l.strategy is not space.fromcache(CPyListStrategy)
+        assert len(self.lazy.entries) == 0
+
+    def test_disabled(self, space, api):
+        self.lazy.configure(0)
+        w_l = space.wrap([1, 2, 3])
+        api.PyList_GetItem(w_l, 0)
+        assert w_l.strategy is space.fromcache(CPyListStrategy)
+
+
+
 class AppTestSequenceObject(AppTestCpythonExtensionBase):
     def test_fast(self):
         module = self.import_extension('foo', [
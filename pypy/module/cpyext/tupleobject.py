@@ -1,5 +1,6 @@
 from pypy.interpreter.error import oefmt
 from rpython.rtyper.lltypesystem import rffi, lltype
+from rpython.rlib import jit
 from rpython.rlib.objectmodel import we_are_translated
 from rpython.rlib.debug import fatalerror_notb
 from pypy.module.cpyext.api import (
@@ -117,6 +118,8 @@ def tuple_realize(space, py_obj):
     track_reference(space, py_obj, w_obj)
     return w_obj
 
+@jit.look_inside_iff(lambda space, args_w:
+        jit.loop_unrolling_heuristic(args_w, len(args_w)))
 def tuple_from_args_w(space, args_w):
     state = space.fromcache(State)
     n = len(args_w)
@@ -128,6 +131,55 @@ def tuple_from_args_w(space, args_w):
         py_tuple.c_ob_item[i] = make_ref(space, w_obj)
     return rffi.cast(PyObject, py_tuple)
 
+
+MAX_CACHED_ARGS = 8
+
+class ArgsTuples(object):
+    """One spare PyTupleObject per size, for the arguments of calls to
+    METH_VARARGS functions.  If the called function did not keep a
+    reference to its argument tuple, it is emptied and reused by the next
+    call of the same size, instead of being freed by its deallocator and
+    reallocated by PyTuple_New().
+    """
+
+    def __init__(self, space):
+        self.tuples = [lltype.nullptr(PyTupleObject.TO)] * MAX_CACHED_ARGS
+
+@jit.look_inside_iff(lambda space, args_w:
+        jit.loop_unrolling_heuristic(args_w, len(args_w)))
+def args_tuple_from_args_w(space, args_w):
+    """Same as tuple_from_args_w(), for a tuple that is then released with
+    args_tuple_release() instead of decref().
+    """
+    n = len(args_w)
+    if 0 < n < MAX_CACHED_ARGS:
+        cache = space.fromcache(ArgsTuples)
+        py_tuple = cache.tuples[n]
+        if py_tuple:
+            # taken out while in use, in case the call reenters
+            cache.tuples[n] = lltype.nullptr(PyTupleObject.TO)
+            for i in range(n):
+                py_tuple.c_ob_item[i] = make_ref(space, args_w[i])
+            return rffi.cast(PyObject, py_tuple)
+    return tuple_from_args_w(space, args_w)
+
+@jit.unroll_safe
+def args_tuple_release(space, py_obj):
+    py_tuple = rffi.cast(PyTupleObject, py_obj)
+    n = py_tuple.c_ob_size
+    if (0 < n < MAX_CACHED_ARGS and py_tuple.c_ob_refcnt == 1 and
+            not py_tuple.c_ob_pypy_link):
+        # only referenced from here: nobody can see that it is reused
+        for i in range(n):
+            py_item = py_tuple.c_ob_item[i]
+            py_tuple.c_ob_item[i] = lltype.nullptr(PyObject.TO)
+            decref(space, py_item)
+        cache = space.fromcache(ArgsTuples)
+        if not cache.tuples[n]:
+            cache.tuples[n] = py_tuple
+            return
+    decref(space, py_obj)
+
 @cpython_api([PyObject, Py_ssize_t, PyObject], rffi.INT_real, error=-1)
 def PyTuple_SetItem(space, ref, index, py_obj):
     if not tuple_check_ref(space, ref):
@@ -44,12 +44,13 @@ class LowLevelGcHooks(GcHooks):
         action.pinned_objects = pinned_objects
         action.fire()
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, rrc_duration):
         action = self.w_hooks.gc_collect_step
         action.count += 1
         action.duration += duration
         action.duration_min = min(action.duration_min, duration)
         action.duration_max = max(action.duration_max, duration)
+        action.rrc_duration += rrc_duration
         action.oldstate = oldstate
         action.newstate = newstate
         action.fire()
@@ -185,6 +186,7 @@ class GcCollectStepHookAction(NoRecursiveAction):
         self.duration = 0.0
         self.duration_min = inf
         self.duration_max = 0.0
+        self.rrc_duration = 0.0
 
     def fix_annotation(self):
         # the annotation of the class and its attributes must be completed
@@ -195,6 +197,7 @@ class GcCollectStepHookAction(NoRecursiveAction):
             self.duration = NonConstant(-53.2)
             self.duration_min = NonConstant(-53.2)
             self.duration_max = NonConstant(-53.2)
+            self.rrc_duration = NonConstant(-53.2)
             self.oldstate = NonConstant(-42)
             self.newstate = NonConstant(-42)
             self.fire()
@@ -207,7 +210,8 @@ class GcCollectStepHookAction(NoRecursiveAction):
             self.duration_max,
             self.oldstate,
             self.newstate,
-            rgc.is_done__states(self.oldstate, self.newstate))
+            rgc.is_done__states(self.oldstate, self.newstate),
+            self.rrc_duration)
         self.reset()
         self.space.call_function(self.w_callable, w_stats)
 
@@ -289,7 +293,7 @@ class W_GcCollectStepStats(W_Root):
     GC_STATES = tuple(incminimark.GC_STATES + ['USERDEL'])
 
     def __init__(self, count, duration, duration_min, duration_max,
-                 oldstate, newstate, major_is_done):
+                 oldstate, newstate, major_is_done, rrc_duration=0.0):
         self.count = count
         self.duration = duration
         self.duration_min = duration_min
@@ -297,6 +301,7 @@ class W_GcCollectStepStats(W_Root):
         self.oldstate = oldstate
         self.newstate = newstate
         self.major_is_done = major_is_done
+        self.rrc_duration = rrc_duration
 
 
 class W_GcCollectStats(W_Root):
@@ -372,6 +377,7 @@ W_GcCollectStepStats.typedef = TypeDef(
         "duration",
         "duration_min",
         "duration_max",
+        "rrc_duration",
         "oldstate",
         "newstate"))
     )
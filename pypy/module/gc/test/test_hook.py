@@ -29,8 +29,8 @@ class AppTestGcHooks(object):
             gchooks.fire_gc_minor(5.0, 0, 0)
             gchooks.fire_gc_minor(7.0, 0, 0)
             gchooks.fire_gc_collect_step(5.0, 0, 0)
-            gchooks.fire_gc_collect_step(15.0, 0, 0)
-            gchooks.fire_gc_collect_step(22.0, 0, 0)
+            gchooks.fire_gc_collect_step(15.0, 0, 0, 1.5)
+            gchooks.fire_gc_collect_step(22.0, 0, 0, 2.0)
             gchooks.fire_gc_collect(1, 2, 3, 4, 5, 6, 7)
 
         cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
@@ -144,7 +144,8 @@ class AppTestGcHooks(object):
 
             def on_gc_collect_step(self, stats):
                 self.steps.append((stats.count, stats.duration,
-                                   stats.duration_min, stats.duration_max))
+                                   stats.duration_min, stats.duration_max,
+                                   stats.rrc_duration))
 
             on_gc_collect = None
 
@@ -152,7 +153,7 @@ class AppTestGcHooks(object):
         gc.hooks.set(myhooks)
         self.fire_many()
         assert myhooks.minors == [(2, 12, 5, 7)]
-        assert myhooks.steps == [(3, 42, 5, 22)]
+        assert myhooks.steps == [(3, 42, 5, 22, 3.5)]
 
     def test_clear_queue(self):
         import gc
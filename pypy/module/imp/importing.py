@@ -12,6 +12,7 @@ from pypy.interpreter.baseobjspace import W_Root, CannotHaveLock
 from pypy.interpreter.eval import Code
 from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.streamutil import wrap_streamerror
+from pypy.interpreter.importtime import ImportTimeTracer
 from rpython.rlib import streamio, jit
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
@@ -699,20 +700,19 @@ def load_part(space, w_path, prefix, partname, w_parent, tentative):
         if not space.is_w(w_mod, space.w_None):
             return w_mod
     elif not prefix or w_path is not None:
-        find_info = find_module(
-            space, modulename, w_modulename, partname, w_path)
-
-        try:
-            if find_info:
-                w_mod = load_module(space, w_modulename, find_info)
-                if w_parent is not None:
-                    space.setattr(w_parent, space.newtext(partname), w_mod)
-                return w_mod
-        finally:
-            if find_info:
-                stream = find_info.stream
-                if stream:
-                    _close_ignore(stream)
+        tracer = space.fromcache(ImportTimeTracer)
+        if tracer.is_enabled():
+            tracer.enter()
+            try:
+                w_mod = _find_and_load_part(space, w_path, modulename,
+                                            w_modulename, partname, w_parent)
+            finally:
+                tracer.leave(modulename)
+        else:
+            w_mod = _find_and_load_part(space, w_path, modulename,
+                                        w_modulename, partname, w_parent)
+        if w_mod is not None:
+            return w_mod
 
     if tentative:
         return None
@@ -720,6 +720,24 @@ def load_part(space, w_path, prefix, partname, w_parent, tentative):
         # ImportError
         raise oefmt(space.w_ImportError, "No module named %s", modulename)
 
+def _find_and_load_part(space, w_path, modulename, w_modulename, partname,
+                        w_parent):
+    find_info = find_module(
+        space, modulename, w_modulename, partname, w_path)
+
+    try:
+        if find_info:
+            w_mod = load_module(space, w_modulename, find_info)
+            if w_parent is not None:
+                space.setattr(w_parent, space.newtext(partname), w_mod)
+            return w_mod
+    finally:
+        if find_info:
+            stream = find_info.stream
+            if stream:
+                _close_ignore(stream)
+    return None
+
 @jit.dont_look_inside
 def reload(space, w_module):
     """Reload the module.
@@ -1101,7 +1119,24 @@ def open_exclusive(space, cpathname, mode):
     fd = os.open(cpathname, flags, mode)
     return streamio.fdopen_as_stream(fd, "wb")
 
-def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
+class PycWriteQueue(object):
+    """If 'deferred' is set, write_compiled_module() only marshals the code
+    object and queues the data; the files are written by flush(), which
+    is called at the latest when the 'imp' module is shut down."""
+
+    def __init__(self, space):
+        self.deferred = False
+        self.pending = []
+
+    def flush(self, space):
+        pending = self.pending
+        self.pending = []
+        for cpathname, strbuf, src_mode, src_mtime in pending:
+            _write_pyc_file(space, cpathname, strbuf, src_mode, src_mtime)
+        return len(pending)
+
+def write_compiled_module(space, co, cpathname, src_mode, src_mtime,
+                          defer=True):
     """
     Write a compiled module to a file, placing the time of last
     modification of its source into the header.
@@ -1118,6 +1153,13 @@ def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
             raise
         #print "Problem while marshalling %s, skipping" % cpathname
         return
+    queue = space.fromcache(PycWriteQueue)
+    if defer and queue.deferred:
+        queue.pending.append((cpathname, strbuf, src_mode, src_mtime))
+        return
+    _write_pyc_file(space, cpathname, strbuf, src_mode, src_mtime)
+
+def _write_pyc_file(space, cpathname, strbuf, src_mode, src_mtime):
     #
     # Careful here: we must not crash nor leave behind something that looks
     # too much like a valid pyc file but really isn't one.
@@ -1,11 +1,14 @@
+import os, stat
+
 from pypy.module.imp import importing
 from pypy.module._file.interp_file import W_File
 from rpython.rlib import streamio
 from rpython.rlib.streamio import StreamErrors
-from pypy.interpreter.error import oefmt
+from pypy.interpreter.error import oefmt, wrap_oserror
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.streamutil import wrap_streamerror
+from pypy.interpreter.importtime import ImportTimeTracer
 
 
 def get_suffixes(space):
@@ -186,3 +189,52 @@ def release_lock(space):
 def reinit_lock(space):
     if space.config.objspace.usemodules.thread:
         importing.getimportlock(space).reinit_lock()
+
+#__________________________________________________________________
+# pypy-only extensions for writing .pyc files and tracing imports
+
+@unwrap_spec(flag=int)
+def _defer_pyc_writes(space, flag):
+    """Queue the .pyc files written by imports instead of writing them
+    immediately.  The queue is written by _flush_pyc_writes() or when the
+    interpreter exits."""
+    queue = space.fromcache(importing.PycWriteQueue)
+    queue.deferred = bool(flag)
+    if not flag:
+        queue.flush(space)
+
+def clear_pyc_writes(space):
+    # after a fork(), leave the queued files to the parent process
+    space.fromcache(importing.PycWriteQueue).pending = []
+
+def _flush_pyc_writes(space):
+    """Write all the queued .pyc files and return how many there were."""
+    queue = space.fromcache(importing.PycWriteQueue)
+    return space.newint(queue.flush(space))
+
+@unwrap_spec(filename='fsencode')
+def _compile_pyc(space, filename):
+    """Compile the source file 'filename' and write the .pyc file next to
+    it, exactly like an import would.  Returns the size of the source."""
+    stream = get_file(space, space.w_None, filename, 'U')
+    try:
+        try:
+            st = os.fstat(stream.try_to_find_file_descriptor())
+        except OSError as e:
+            raise wrap_oserror(space, e, filename)
+        source = importing._wrap_readall(space, stream)
+    finally:
+        importing._close_ignore(stream)
+    code_w = importing.parse_source_module(space, filename, source)
+    importing.write_compiled_module(space, code_w, filename + 'c',
+                                    st[stat.ST_MODE], int(st[stat.ST_MTIME]),
+                                    defer=False)
+    return space.newint(len(source))
+
+@unwrap_spec(filename='fsencode')
+def _trace_import_time(space, filename):
+    """Write the time spent in every following import to 'filename', or to
+    stderr if it is '-'.  See pypy/interpreter/importtime.py."""
+    tracer = space.fromcache(ImportTimeTracer)
+    if not tracer.is_enabled():
+        tracer.open_output(filename)
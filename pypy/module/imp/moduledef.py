@@ -24,6 +24,10 @@ class Module(MixedModule):
         'load_dynamic':    'interp_imp.load_dynamic',
         '_run_compiled_module': 'interp_imp._run_compiled_module',   # pypy
         '_getimporter':    'importing._getimporter',                 # pypy
+        '_defer_pyc_writes': 'interp_imp._defer_pyc_writes',         # pypy
+        '_flush_pyc_writes': 'interp_imp._flush_pyc_writes',         # pypy
+        '_compile_pyc':    'interp_imp._compile_pyc',                # pypy
+        '_trace_import_time': 'interp_imp._trace_import_time',       # pypy
         #'run_module':      'interp_imp.run_module',
         'new_module':      'interp_imp.new_module',
         'init_builtin':    'interp_imp.init_builtin',
@@ -49,4 +53,9 @@ class Module(MixedModule):
         add_fork_hook('before', interp_imp.acquire_lock)
         add_fork_hook('parent', interp_imp.release_lock)
         add_fork_hook('child', interp_imp.reinit_lock)
+        add_fork_hook('child', interp_imp.clear_pyc_writes)
 
+
+    def shutdown(self, space):
+        from pypy.module.imp import importing
+        space.fromcache(importing.PycWriteQueue).flush(space)
@@ -103,7 +103,9 @@ def setup_directory_structure(space):
     setuppkg("test_bytecode",
              a = '',
              b = '',
-             c = '')
+             c = '',
+             d = '',
+             e = 'x = 5')
 
     # create compiled/x.py and a corresponding pyc file
     p = setuppkg("compiled", x = "x = 84")
@@ -1159,6 +1161,27 @@ class TestPycStuff:
         ret = space.int_w(w_ret)
         assert ret == 42
 
+    def test_write_compiled_module_deferred(self):
+        space = self.space
+        pycode = importing.parse_source_module(space, "?", "x = 42\n")
+        cpathname = str(udir.join('deferred.pyc'))
+        if os.path.exists(cpathname):
+            os.unlink(cpathname)
+        queue = space.fromcache(importing.PycWriteQueue)
+        queue.deferred = True
+        try:
+            importing.write_compiled_module(space, pycode, cpathname,
+                                            0666, 12345)
+            assert not os.path.exists(cpathname)
+            assert len(queue.pending) == 1
+            assert queue.flush(space) == 1
+            assert queue.pending == []
+        finally:
+            queue.deferred = False
+        ret = importing.check_compiled_module(space, cpathname, 12345)
+        assert ret is not None
+        ret.close()
+
     def test_pyc_magic_changes(self):
         py.test.skip("For now, PyPy generates only one kind of .pyc files")
         # test that the pyc files produced by a space are not reimportable
@@ -1520,6 +1543,39 @@ class AppTestWriteBytecode(object):
         assert not os.path.exists(c.__file__ + 'c')
 
 
+    def test_deferred_write_bytecode(self):
+        import os.path
+        import sys
+        import imp
+        sys.dont_write_bytecode = False
+        imp._defer_pyc_writes(True)
+        try:
+            from test_bytecode import d
+            assert not os.path.exists(d.__file__ + 'c')
+            assert imp._flush_pyc_writes() == 1
+            assert os.path.exists(d.__file__ + 'c')
+            assert imp._flush_pyc_writes() == 0
+        finally:
+            imp._defer_pyc_writes(False)
+
+    def test_compile_pyc(self):
+        import os.path
+        import imp
+        import test_bytecode
+        fn = os.path.join(os.path.dirname(test_bytecode.__file__), 'e.py')
+        with open(fn, 'U') as f:
+            assert imp._compile_pyc(fn) == len(f.read())
+        assert os.path.exists(fn + 'c')
+        mod = imp.load_compiled('test_bytecode_e', fn + 'c')
+        assert mod.x == 5
+        bad = os.path.join(os.path.dirname(fn), 'bad_syntax.py')
+        with open(bad, 'w') as f:
+            f.write('x = (\n')
+        raises(SyntaxError, imp._compile_pyc, bad)
+        assert not os.path.exists(bad + 'c')
+        raises(IOError, imp._compile_pyc, fn + '-does-not-exist')
+
+
 class AppTestWriteBytecodeSandbox(AppTestWriteBytecode):
     spaceconfig = {
         "translation.sandbox": True
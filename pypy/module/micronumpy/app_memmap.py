@@ -0,0 +1,146 @@
+from __future__ import absolute_import
+
+import _numpypy
+from _numpypy.multiarray import ndarray, dtype as dtypedescr
+
+valid_filemodes = ["r", "c", "r+", "w+"]
+writeable_filemodes = ["r+", "w+"]
+
+mode_equivalents = {
+    "readonly": "r",
+    "copyonwrite": "c",
+    "readwrite": "r+",
+    "write": "w+",
+    }
+
+
+class memmap(ndarray):
+    """memmap(filename, dtype=uint8, mode='r+', offset=0, shape=None, order='C')
+
+    An array stored in a file on disk.  The array is a view of the pages of
+    the file mapped in memory by the mmap module: nothing is copied, and the
+    pages are read from the file only when they are accessed.  Use
+    prefault() to read all of them at once without holding the GIL.
+    """
+
+    def __new__(subtype, filename, dtype='uint8', mode='r+', offset=0,
+                shape=None, order='C'):
+        import mmap
+        import os.path
+        try:
+            mode = mode_equivalents[mode]
+        except KeyError:
+            if mode not in valid_filemodes:
+                raise ValueError("mode must be one of %s" %
+                        (valid_filemodes + list(mode_equivalents.keys())))
+
+        if mode == 'w+' and shape is None:
+            raise ValueError("shape must be given")
+
+        if hasattr(filename, 'read'):
+            fid = filename
+            own_file = False
+        else:
+            fid = open(filename, (mode == 'c' and 'r' or mode) + 'b')
+            own_file = True
+        try:
+            fid.seek(0, 2)
+            flen = fid.tell()
+            descr = dtypedescr(dtype)
+            _dbytes = descr.itemsize
+
+            if shape is None:
+                bytes = flen - offset
+                if bytes % _dbytes:
+                    raise ValueError("Size of available data is not a "
+                                     "multiple of the data-type size.")
+                size = bytes // _dbytes
+                shape = (size,)
+            else:
+                if not isinstance(shape, tuple):
+                    shape = (shape,)
+                size = 1
+                for k in shape:
+                    size *= k
+
+            bytes = long(offset + size * _dbytes)
+
+            if mode == 'w+' or (mode in writeable_filemodes and flen < bytes):
+                fid.seek(bytes - 1, 0)
+                fid.write('\0')
+                fid.flush()
+
+            if mode == 'c':
+                acc = mmap.ACCESS_COPY
+            elif mode == 'r':
+                acc = mmap.ACCESS_READ
+            else:
+                acc = mmap.ACCESS_WRITE
+
+            # mmap() wants an offset which is a multiple of the granularity
+            start = offset - offset % mmap.ALLOCATIONGRANULARITY
+            mm = mmap.mmap(fid.fileno(), bytes - start, access=acc,
+                           offset=start)
+        finally:
+            if own_file:
+                fid.close()
+
+        strides = None
+        if order == 'F':
+            strides = []
+            stride = _dbytes
+            for k in shape:
+                strides.append(stride)
+                stride *= k
+        self = ndarray.__new__(subtype, shape, dtype=descr, buffer=mm,
+                               offset=offset - start, strides=strides)
+        self._mmap = mm
+        self.offset = offset
+        self.mode = mode
+
+        if isinstance(filename, basestring):
+            self.filename = os.path.abspath(filename)
+        elif (hasattr(filename, "name") and
+              isinstance(filename.name, basestring)):
+            self.filename = os.path.abspath(filename.name)
+        else:
+            self.filename = None
+        return self
+
+    def __array_finalize__(self, obj):
+        if hasattr(obj, '_mmap') and self.base is not None:
+            # a view of a memmap
+            self._mmap = obj._mmap
+            self.filename = obj.filename
+            self.offset = obj.offset
+            self.mode = obj.mode
+        else:
+            self._mmap = None
+            self.filename = None
+            self.offset = None
+            self.mode = None
+
+    def __array_wrap__(self, arr, context=None):
+        arr = ndarray.__array_wrap__(self, arr, context)
+        # the results of ufuncs are not in the file
+        if self is arr or type(self) is not memmap:
+            return arr
+        if arr.shape == ():
+            return arr[()]
+        return arr.view(ndarray)
+
+    def __getitem__(self, index):
+        res = ndarray.__getitem__(self, index)
+        if type(res) is memmap and res._mmap is None:
+            return res.view(type=ndarray)
+        return res
+
+    def flush(self):
+        """Write the changes of the array to the file on disk."""
+        if self.base is not None and hasattr(self.base, 'flush'):
+            self.base.flush()
+
+    def prefault(self):
+        """Read all the pages of the array from the file now, with the GIL
+        released.  PyPy extension."""
+        _numpypy.prefault(self)
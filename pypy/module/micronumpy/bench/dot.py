@@ -1,3 +1,14 @@
+""" Matrix multiply benchmark: times dot() of two n x n matrices for
+several sizes, dtypes and, on PyPy, numbers of threads (see
+_numpypy.set_dot_threads()).
+
+    pypy-c dot.py [-n sizes] [-t max_threads] [-d dtypes] [-r repeat]
+
+'sizes' and 'dtypes' are comma-separated, e.g. -n 100,500,1000 -d float64.
+Prints the best time of 'repeat' runs and the GFLOP/s (2*n**3 flops per
+product, 8*n**3 for complex numbers).
+"""
+
 import sys
 import time
 
@@ -6,27 +17,69 @@ try:
 except ImportError:
     import numpy
 
-def get_matrix(n):
+try:
+    from _numpypy import set_dot_threads
+except ImportError:
+    set_dot_threads = None
+
+def get_matrix(n, dtype):
     import random
-    x = numpy.zeros((n,n), dtype=numpy.float64)
+    x = numpy.zeros((n,n), dtype=dtype)
     for i in range(n):
-        for j in range(n):
-            x[i][j] = random.random()
+        x[i] = [random.random() for j in range(n)]
     return x
 
-def main(n, r):
-    x = get_matrix(n)
-    y = get_matrix(n)
-    a = time.time()
-    for _ in xrange(r):
+def bench(x, y, repeat):
+    best = None
+    for _ in xrange(repeat):
+        a = time.time()
         #z = numpy.dot(x, y)  # uses numpy possibly-blas-lib dot
         z = numpy.core.multiarray.dot(x, y)  # uses strictly numpy C dot
-    b = time.time()
-    print '%d runs, %.2f seconds' % (r, b-a)
+        elapsed = time.time() - a
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
 
-n = int(sys.argv[1])
-try:
-    r = int(sys.argv[2])
-except IndexError:
-    r = 1
-main(n, r)
+def main(argv):
+    sizes = [100, 250, 500, 1000]
+    dtypes = ['float32', 'float64', 'complex128']
+    max_threads = 8
+    repeat = 3
+    while argv:
+        if argv[0] == '-n':
+            sizes = [int(s) for s in argv[1].split(',')]
+        elif argv[0] == '-d':
+            dtypes = argv[1].split(',')
+        elif argv[0] == '-t':
+            max_threads = int(argv[1])
+        elif argv[0] == '-r':
+            repeat = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    if set_dot_threads is None:
+        thread_counts = [1]      # not PyPy: whatever the BLAS library does
+    else:
+        thread_counts = []
+        nthreads = 1
+        while nthreads <= max_threads:
+            thread_counts.append(nthreads)
+            nthreads *= 2
+    print '%-12s %6s %8s %12s %10s' % ('dtype', 'n', 'threads', 'seconds',
+                                      'GFLOP/s')
+    for dtype in dtypes:
+        flops_per_madd = 8 if dtype.startswith('complex') else 2
+        for n in sizes:
+            x = get_matrix(n, dtype)
+            y = get_matrix(n, dtype)
+            for nthreads in thread_counts:
+                if set_dot_threads is not None:
+                    set_dot_threads(nthreads)
+                elapsed = bench(x, y, repeat)
+                gflops = flops_per_madd * n ** 3 / max(elapsed, 1e-9) / 1e9
+                print '%-12s %6d %8d %12.4f %10.2f' % (dtype, n, nthreads,
+                                                       elapsed, gflops)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
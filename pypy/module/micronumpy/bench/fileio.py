@@ -0,0 +1,77 @@
+""" File I/O benchmark: times tofile(), fromfile() and the sum of a memmap
+of a float64 array of n items, against reading the file into a string and
+calling fromstring().
+
+    pypy-c fileio.py [-n sizes] [-r repeat] [-f filename]
+
+'sizes' is comma-separated, e.g. -n 1000000,100000000.  Prints the best time
+of 'repeat' runs and the number of megabytes moved per second.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+def bench(func, repeat):
+    best = None
+    for _ in xrange(repeat):
+        a = time.time()
+        func()
+        elapsed = time.time() - a
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(argv):
+    sizes = [1000000, 10000000, 100000000]
+    repeat = 3
+    filename = None
+    while argv:
+        if argv[0] == '-n':
+            sizes = [int(s) for s in argv[1].split(',')]
+        elif argv[0] == '-r':
+            repeat = int(argv[1])
+        elif argv[0] == '-f':
+            filename = argv[1]
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    if filename is None:
+        fd, filename = tempfile.mkstemp(suffix='.dat')
+        os.close(fd)
+
+    def read_fromstring():
+        with open(filename, 'rb') as f:
+            numpy.fromstring(f.read(), dtype='float64')
+
+    def sum_memmap():
+        m = numpy.memmap(filename, dtype='float64', mode='r')
+        if hasattr(m, 'prefault'):
+            m.prefault()
+        m.sum()
+
+    print '%-12s %12s %12s %12s' % ('operation', 'n', 'seconds', 'MB/s')
+    try:
+        for n in sizes:
+            a = numpy.arange(n, dtype='float64')
+            operations = [
+                ('tofile', lambda: a.tofile(filename)),
+                ('fromfile', lambda: numpy.fromfile(filename)),
+                ('fromstring', read_fromstring),
+                ('memmap.sum', sum_memmap)]
+            for name, func in operations:
+                elapsed = bench(func, repeat)
+                print '%-12s %12d %12.4f %12.1f' % (
+                    name, n, elapsed, a.nbytes / max(elapsed, 1e-9) / 1e6)
+    finally:
+        os.unlink(filename)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+""" Elementwise expression benchmark: times a*b + c*d - e computed one ufunc
+at a time, and with _numpypy.lazy() on PyPy, which computes it in a single
+loop without the temporary arrays.
+
+    pypy-c fused.py [-n sizes] [-r repeat]
+
+'sizes' is comma-separated, e.g. -n 1000,1000000.  Prints the best time of
+'repeat' runs, and the number of temporary arrays and of bytes of them made
+by each expression.
+"""
+
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+try:
+    from _numpypy import lazy
+except ImportError:
+    lazy = None
+
+def eager_expr(a, b, c, d, e):
+    return a * b + c * d - e
+
+def lazy_expr(a, b, c, d, e):
+    return (lazy(a) * b + c * d - e).force()
+
+# a*b, c*d and their sum are temporaries; the subtraction makes the result
+EAGER_TEMPORARIES = 3
+
+def bench(expr, arrays, repeat):
+    best = None
+    for _ in xrange(repeat):
+        t = time.time()
+        z = expr(*arrays)
+        z[0] = 1.0  # make sure that the result is computed
+        elapsed = time.time() - t
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(argv):
+    sizes = [1000, 100000, 10000000]
+    repeat = 5
+    while argv:
+        if argv[0] == '-n':
+            sizes = [int(s) for s in argv[1].split(',')]
+        elif argv[0] == '-r':
+            repeat = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    exprs = [('eager', eager_expr, EAGER_TEMPORARIES)]
+    if lazy is not None:
+        exprs.append(('lazy', lazy_expr, 0))
+    print '%-6s %10s %12s %12s %14s' % ('mode', 'n', 'seconds',
+                                        'temporaries', 'temp. bytes')
+    for n in sizes:
+        arrays = [numpy.arange(n, dtype=float) * (i + 1) for i in range(5)]
+        for name, expr, temporaries in exprs:
+            elapsed = bench(expr, arrays, repeat)
+            print '%-6s %10d %12.4f %12d %14d' % (name, n, elapsed,
+                                                  temporaries,
+                                                  temporaries * n * 8)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
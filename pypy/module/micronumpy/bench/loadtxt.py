@@ -0,0 +1,85 @@
+""" loadtxt benchmark: times _numpypy.loadtxt() on a file of n lines of
+'cols' comma-separated floats, against splitting the lines and converting
+the fields with float() at app-level, like the loadtxt() of numpy.
+
+    pypy-c loadtxt.py [-n lines] [-c cols] [-r repeat] [-f filename]
+
+Prints the best time of 'repeat' runs and the number of megabytes of text
+parsed per second.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+try:
+    from _numpypy import loadtxt
+except ImportError:
+    loadtxt = None
+
+def bench(func, repeat):
+    best = None
+    for _ in xrange(repeat):
+        a = time.time()
+        func()
+        elapsed = time.time() - a
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def applevel_loadtxt(filename):
+    rows = []
+    with open(filename) as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if line:
+                rows.append([float(x) for x in line.split(',')])
+    return numpy.array(rows)
+
+def main(argv):
+    nlines = 1000000
+    cols = 8
+    repeat = 3
+    filename = None
+    while argv:
+        if argv[0] == '-n':
+            nlines = int(argv[1])
+        elif argv[0] == '-c':
+            cols = int(argv[1])
+        elif argv[0] == '-r':
+            repeat = int(argv[1])
+        elif argv[0] == '-f':
+            filename = argv[1]
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    if filename is None:
+        fd, filename = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+    try:
+        with open(filename, 'w') as f:
+            for i in xrange(nlines):
+                f.write(','.join(['%.6f' % (i * 0.25 + j)
+                                  for j in range(cols)]) + '\n')
+        size = os.path.getsize(filename)
+        operations = [('app-level', lambda: applevel_loadtxt(filename))]
+        if loadtxt is not None:
+            operations.append(
+                ('loadtxt', lambda: loadtxt(filename, delimiter=',')))
+        print '%-12s %12s %12s %12s' % ('loader', 'lines', 'seconds', 'MB/s')
+        for name, func in operations:
+            elapsed = bench(func, repeat)
+            print '%-12s %12d %12.4f %12.1f' % (
+                name, nlines, elapsed, size / max(elapsed, 1e-9) / 1e6)
+    finally:
+        os.unlink(filename)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+""" Reduction benchmark: times sum(), prod(), max(), min() and mean() of a
+float array of n items, of all the items and along each axis of it seen as
+a matrix, for several numbers of threads on PyPy (see
+_numpypy.set_reduce_threads()).
+
+    pypy-c reduce.py [-n sizes] [-t max_threads] [-d dtypes] [-r repeat]
+
+'sizes' and 'dtypes' are comma-separated, e.g. -n 1000000 -d float64.
+Prints the best time of 'repeat' runs and the number of items reduced per
+second.
+"""
+
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+try:
+    from _numpypy import set_reduce_threads
+except ImportError:
+    set_reduce_threads = None
+
+def get_array(n, dtype):
+    # rows of 1000 items, to have the axis reductions
+    return (numpy.arange(n, dtype=dtype) % 7).reshape(-1, 1000)
+
+def bench(func, repeat):
+    best = None
+    for _ in xrange(repeat):
+        a = time.time()
+        func()
+        elapsed = time.time() - a
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(argv):
+    sizes = [100000, 1000000, 10000000]
+    dtypes = ['float32', 'float64']
+    max_threads = 8
+    repeat = 3
+    while argv:
+        if argv[0] == '-n':
+            sizes = [int(s) for s in argv[1].split(',')]
+        elif argv[0] == '-d':
+            dtypes = argv[1].split(',')
+        elif argv[0] == '-t':
+            max_threads = int(argv[1])
+        elif argv[0] == '-r':
+            repeat = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    if set_reduce_threads is None:
+        thread_counts = [1]
+    else:
+        thread_counts = []
+        nthreads = 1
+        while nthreads <= max_threads:
+            thread_counts.append(nthreads)
+            nthreads *= 2
+    print '%-8s %-10s %10s %8s %12s %12s' % ('dtype', 'reduction', 'n',
+                                             'threads', 'seconds', 'Mitems/s')
+    for dtype in dtypes:
+        for n in sizes:
+            a = get_array(n, dtype)
+            reductions = [
+                ('sum', a.sum), ('prod', a.prod), ('max', a.max),
+                ('min', a.min), ('mean', a.mean),
+                ('sum(0)', lambda: a.sum(axis=0)),
+                ('sum(1)', lambda: a.sum(axis=1))]
+            for name, func in reductions:
+                for nthreads in thread_counts:
+                    if set_reduce_threads is not None:
+                        set_reduce_threads(nthreads)
+                    elapsed = bench(func, repeat)
+                    print '%-8s %-10s %10d %8d %12.4f %12.1f' % (
+                        dtype, name, a.size, nthreads, elapsed,
+                        a.size / max(elapsed, 1e-9) / 1e6)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,12 +1,15 @@
-from pypy.interpreter.error import OperationError, oefmt
+import os
+
+from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.baseobjspace import BufferInterfaceNotFound
 from pypy.interpreter.gateway import unwrap_spec, WrappedDefault
 from rpython.rlib.buffer import SubBuffer
+from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.rstring import strip_spaces
 from rpython.rlib.rawstorage import RAW_STORAGE_PTR
 from rpython.rtyper.lltypesystem import lltype, rffi
 
-from pypy.module.micronumpy import descriptor, loop, support
+from pypy.module.micronumpy import descriptor, fileio, loop, support
 from pypy.module.micronumpy.base import (wrap_impl,
     W_NDimArray, convert_to_array, W_NumpyObject)
 from pypy.module.micronumpy.converters import shape_converter, order_converter
@@ -588,3 +591,64 @@ def frombuffer(space, w_buffer, w_dtype=None, count=-1, offset=0):
         writable = not buf.readonly
     return W_NDimArray.from_shape_and_storage(space, [n], storage, storage_bytes=s,
                                 dtype=dtype, w_base=w_buffer, writable=writable)
+
+
+def _fromfile(space, w_file, dtype, count, sep):
+    if sep != '':
+        s = space.bytes_w(space.call_method(w_file, 'read'))
+        return _fromstring_text(space, s, count, sep, len(s), dtype)
+    itemsize = dtype.elsize
+    fd = fileio.get_fileno(space, w_file)
+    if fd < 0:
+        # not a real file, e.g. a StringIO
+        if count < 0:
+            w_data = space.call_method(w_file, 'read')
+        else:
+            w_data = space.call_method(w_file, 'read',
+                                       space.newint(count * itemsize))
+        s = space.bytes_w(w_data)
+        count = len(s) / itemsize
+        return _fromstring_bin(space, s, count, count * itemsize, dtype)
+    space.call_method(w_file, 'flush')
+    pos = fileio.get_position(space, w_file)
+    if count < 0:
+        try:
+            size = os.fstat(fd).st_size
+        except OSError as e:
+            raise wrap_oserror(space, e)
+        count = max(intmask(size) - pos, 0) / itemsize
+    a = W_NDimArray.from_shape(space, [count], dtype=dtype)
+    with a.implementation as storage:
+        addr = support.get_storage_as_int(storage, a.get_start())
+        got = fileio.read_into(space, fd, pos, addr, count * itemsize)
+    fileio.set_position(space, w_file, pos + got)
+    if got < count * itemsize:
+        # the end of the file: only keep the items read
+        a = space.getitem(a, space.newslice(space.newint(0),
+                                            space.newint(got / itemsize),
+                                            space.w_None))
+    return a
+
+
+@unwrap_spec(count=int, sep='text')
+def fromfile(space, w_file, w_dtype=None, count=-1, sep=''):
+    """fromfile(file, dtype=float, count=-1, sep='')
+
+    Read 'count' items (all of them if negative) of type 'dtype' from a file
+    object or a file name.  The items are binary data, read directly into
+    the new array with the GIL released, or, if 'sep' is not empty, text
+    separated by 'sep'."""
+    dtype = space.interp_w(descriptor.W_Dtype,
+        space.call_function(space.gettypefor(descriptor.W_Dtype), w_dtype))
+    if dtype.elsize == 0:
+        raise oefmt(space.w_ValueError, "itemsize cannot be zero in type")
+    if dtype.is_object():
+        raise oefmt(space.w_ValueError, "Cannot read into object array")
+    if space.isinstance_w(w_file, space.w_basestring):
+        w_file = space.call_function(space.builtin.get('open'), w_file,
+                                     space.newtext('rb'))
+        try:
+            return _fromfile(space, w_file, dtype, count, sep)
+        finally:
+            space.call_method(w_file, 'close')
+    return _fromfile(space, w_file, dtype, count, sep)
@@ -0,0 +1,135 @@
+"""
+Moving the items of arrays directly between files and the storage of the
+arrays, for fromfile(), ndarray.tofile() and memmap.  The data is copied by
+read() and write() with the GIL released, with no intermediate string, so
+the page faults of the copies (of the fresh array storage, or of the pages
+of the file) happen without the GIL too.  prefault() does the same for the
+pages of a memmap.
+"""
+
+import errno
+
+from rpython.rlib import rposix, rmmap
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+from pypy.interpreter.error import OperationError, wrap_oserror
+from pypy.module.micronumpy import support
+from pypy.module.micronumpy.base import convert_to_array
+
+# the largest read() or write(), so that signals are checked now and then
+CHUNK_SIZE = 1 << 26
+
+eci = ExternalCompilationInfo(
+    post_include_bits=["""
+RPY_EXTERN void pypy_numpy_prefault(char *, long, long);
+"""],
+    separate_module_sources=["""
+/* Touch one byte of each page of p[0:n].  Called with the GIL released. */
+RPY_EXTERN void pypy_numpy_prefault(char *p, long n, long pagesize)
+{
+    volatile char sink;
+    long i;
+    for (i = 0; i < n; i += pagesize)
+        sink = p[i];
+    if (n > 0)
+        sink = p[n - 1];
+    (void)sink;
+}
+"""])
+
+c_prefault = rffi.llexternal('pypy_numpy_prefault',
+                             [rffi.CCHARP, rffi.LONG, rffi.LONG], lltype.Void,
+                             compilation_info=eci, releasegil=True)
+
+
+def get_fileno(space, w_file):
+    """The file descriptor of the file object w_file, or -1 if it has none,
+    like a StringIO."""
+    try:
+        w_fileno = space.call_method(w_file, 'fileno')
+    except OperationError as e:
+        if not (e.match(space, space.w_AttributeError) or
+                e.match(space, space.w_ValueError) or
+                e.match(space, space.w_IOError)):
+            raise
+        return -1
+    return space.c_int_w(w_fileno)
+
+def get_position(space, w_file):
+    return space.int_w(space.call_method(w_file, 'tell'))
+
+def set_position(space, w_file, pos):
+    space.call_method(w_file, 'seek', space.newint(pos))
+
+def _seek(space, fd, pos):
+    try:
+        rposix.lseek(fd, pos, 0)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+
+def read_into(space, fd, pos, addr, nbytes):
+    """Read up to 'nbytes' bytes at the position 'pos' of the file 'fd' to
+    the memory at the address 'addr'.  Returns the number of bytes read,
+    which is less than 'nbytes' only at the end of the file."""
+    _seek(space, fd, pos)
+    done = 0
+    while done < nbytes:
+        count = min(nbytes - done, CHUNK_SIZE)
+        got = rffi.cast(lltype.Signed, rposix.c_read(
+            fd, rffi.cast(rffi.VOIDP, addr + done),
+            rffi.cast(rposix.POSIX_SIZE_T, count)))
+        if got < 0:
+            err = rposix.get_saved_errno()
+            if err != errno.EINTR:
+                raise wrap_oserror(space, OSError(err, "read"))
+        elif got == 0:
+            break
+        else:
+            done += got
+        space.getexecutioncontext().checksignals()
+    return done
+
+def write_from(space, fd, pos, addr, nbytes):
+    """Write the 'nbytes' bytes at the address 'addr' at the position 'pos'
+    of the file 'fd'."""
+    _seek(space, fd, pos)
+    done = 0
+    while done < nbytes:
+        count = min(nbytes - done, CHUNK_SIZE)
+        got = rffi.cast(lltype.Signed, rposix.c_write(
+            fd, rffi.cast(rffi.VOIDP, addr + done),
+            rffi.cast(rposix.POSIX_SIZE_T, count)))
+        if got < 0:
+            err = rposix.get_saved_errno()
+            if err != errno.EINTR:
+                raise wrap_oserror(space, OSError(err, "write"))
+        else:
+            done += got
+        space.getexecutioncontext().checksignals()
+
+
+def prefault(space, w_arr):
+    """prefault(a)
+
+    Read one byte of each memory page of the array 'a' with the GIL
+    released, so that the page faults of a memmap, which read the file,
+    happen now and while other threads can run.  PyPy extension."""
+    arr = convert_to_array(space, w_arr)
+    if arr.get_size() == 0:
+        return
+    impl = arr.implementation
+    # the memory between the lowest and the highest item
+    lo = hi = impl.start
+    shape = impl.get_shape()
+    strides = impl.get_strides()
+    for i in range(len(shape)):
+        extent = (shape[i] - 1) * strides[i]
+        if extent < 0:
+            lo += extent
+        else:
+            hi += extent
+    with impl as storage:
+        addr = support.get_storage_as_int(storage, lo)
+        c_prefault(rffi.cast(rffi.CCHARP, addr),
+                   hi - lo + arr.get_dtype().elsize, rmmap.PAGESIZE)
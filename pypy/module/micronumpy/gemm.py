@@ -0,0 +1,382 @@
+"""
+A matrix multiply for dot() on float32, float64, complex64 and complex128
+arrays.  It is written in C, with the usual blocking of BLAS-like
+libraries: panels of both operands are copied to contiguous buffers that
+fit the caches, then a micro-kernel computes a small tile of the result in
+local variables.  The rows of the result are split between up to
+get_dot_threads() threads, and the GIL is released for the whole call.
+
+Any strides are accepted for the operands, as long as they are multiples
+of the item size; the result must be C-contiguous.
+"""
+
+import sys
+
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+from rpython.rlib.rarithmetic import intmask
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module.micronumpy import constants as NPY
+from pypy.module.micronumpy import support
+
+# the 'kind' argument of pypy_numpy_gemm()
+GEMM_KINDS = {NPY.FLOAT: 0, NPY.DOUBLE: 1, NPY.CFLOAT: 2, NPY.CDOUBLE: 3}
+
+# products of fewer multiply-adds than this don't use pypy_numpy_gemm()
+GEMM_MIN_WORK = 16 * 16 * 16
+
+if sys.platform == 'win32':
+    libraries = []
+else:
+    libraries = ['pthread']
+
+eci = ExternalCompilationInfo(
+    libraries=libraries,
+    post_include_bits=["""
+RPY_EXTERN int pypy_numpy_gemm(int, long, long, long, char *, long, long,
+                               char *, long, long, char *, long);
+"""],
+    separate_module_sources=["""
+#include <stdlib.h>
+#include <string.h>
+#ifndef _WIN32
+#  include <pthread.h>
+#  define GEMM_THREADS
+#endif
+
+/* KC x NC panels of B and MC x KC panels of A are packed; the
+   micro-kernel computes MR x NR tiles of C. */
+#define KC 256
+#define MC 128
+#define NC 1024
+#define MR 4
+#define NR 4
+/* below this many multiply-adds per thread, use fewer threads */
+#define MIN_WORK_PER_THREAD (64 * 64 * 64)
+
+struct gemm_args {
+    int kind;
+    long m, n, k;
+    char *a, *b, *c;
+    long a_rs, a_cs, b_rs, b_cs, ldc;   /* in items */
+    long m0, m1;                        /* rows of C to compute */
+    int error;
+};
+
+#define MIN(a, b) ((a) < (b) ? (a) : (b))
+
+/* Each DEFINE_GEMM() defines gemm_rows_SUFFIX(), which computes the rows
+   m0 to m1 of C = A * B.  T is the scalar type; complex numbers are pairs
+   of them (W == 2). */
+
+#define DEFINE_PACKING(SUFFIX, T, W)                                        \\
+static void pack_a_##SUFFIX(T *dst, const T *a, long rs, long cs,           \\
+                            long mc, long kc)                               \\
+{                                                                           \\
+    long i, ii, p, w;                                                       \\
+    for (i = 0; i < mc; i += MR) {                                          \\
+        for (p = 0; p < kc; p++) {                                          \\
+            for (ii = 0; ii < MR; ii++) {                                   \\
+                for (w = 0; w < W; w++)                                     \\
+                    *dst++ = (i + ii < mc) ?                                \\
+                        a[((i + ii) * rs + p * cs) * W + w] : (T)0;         \\
+            }                                                               \\
+        }                                                                   \\
+    }                                                                       \\
+}                                                                           \\
+static void pack_b_##SUFFIX(T *dst, const T *b, long rs, long cs,           \\
+                            long kc, long nc)                               \\
+{                                                                           \\
+    long j, jj, p, w;                                                       \\
+    for (j = 0; j < nc; j += NR) {                                          \\
+        for (p = 0; p < kc; p++) {                                          \\
+            for (jj = 0; jj < NR; jj++) {                                   \\
+                for (w = 0; w < W; w++)                                     \\
+                    *dst++ = (j + jj < nc) ?                                \\
+                        b[(p * rs + (j + jj) * cs) * W + w] : (T)0;         \\
+            }                                                               \\
+        }                                                                   \\
+    }                                                                       \\
+}
+
+#define DEFINE_MICRO_REAL(SUFFIX, T)                                        \\
+static void micro_##SUFFIX(long kc, const T *ap, const T *bp, T *c,         \\
+                           long ldc, long mr, long nr, int first)           \\
+{                                                                           \\
+    T acc[MR][NR];                                                          \\
+    long p, i, j;                                                           \\
+    memset(acc, 0, sizeof(acc));                                            \\
+    for (p = 0; p < kc; p++) {                                              \\
+        for (i = 0; i < MR; i++)                                            \\
+            for (j = 0; j < NR; j++)                                        \\
+                acc[i][j] += ap[i] * bp[j];                                 \\
+        ap += MR;                                                           \\
+        bp += NR;                                                           \\
+    }                                                                       \\
+    for (i = 0; i < mr; i++)                                                \\
+        for (j = 0; j < nr; j++) {                                          \\
+            if (first)                                                      \\
+                c[i * ldc + j] = acc[i][j];                                 \\
+            else                                                            \\
+                c[i * ldc + j] += acc[i][j];                                \\
+        }                                                                   \\
+}
+
+#define DEFINE_MICRO_COMPLEX(SUFFIX, T)                                     \\
+static void micro_##SUFFIX(long kc, const T *ap, const T *bp, T *c,         \\
+                           long ldc, long mr, long nr, int first)           \\
+{                                                                           \\
+    T re[MR][NR], im[MR][NR];                                               \\
+    long p, i, j;                                                           \\
+    memset(re, 0, sizeof(re));                                              \\
+    memset(im, 0, sizeof(im));                                              \\
+    for (p = 0; p < kc; p++) {                                              \\
+        for (i = 0; i < MR; i++)                                            \\
+            for (j = 0; j < NR; j++) {                                      \\
+                re[i][j] += ap[2*i] * bp[2*j] - ap[2*i+1] * bp[2*j+1];      \\
+                im[i][j] += ap[2*i] * bp[2*j+1] + ap[2*i+1] * bp[2*j];      \\
+            }                                                               \\
+        ap += 2 * MR;                                                       \\
+        bp += 2 * NR;                                                       \\
+    }                                                                       \\
+    for (i = 0; i < mr; i++)                                                \\
+        for (j = 0; j < nr; j++) {                                          \\
+            T *cij = c + 2 * (i * ldc + j);                                 \\
+            if (first) {                                                    \\
+                cij[0] = re[i][j];                                          \\
+                cij[1] = im[i][j];                                          \\
+            }                                                               \\
+            else {                                                          \\
+                cij[0] += re[i][j];                                         \\
+                cij[1] += im[i][j];                                         \\
+            }                                                               \\
+        }                                                                   \\
+}
+
+#define DEFINE_GEMM(SUFFIX, T, W)                                           \\
+static int gemm_rows_##SUFFIX(struct gemm_args *g)                          \\
+{                                                                           \\
+    const T *a = (const T *)g->a, *b = (const T *)g->b;                     \\
+    T *c = (T *)g->c;                                                       \\
+    long jc, pc, ic, jr, ir;                                                \\
+    long kcmax = MIN(KC, g->k);                                             \\
+    T *ap = malloc(sizeof(T) * W * (MIN(MC, g->m1 - g->m0) + MR) * kcmax);  \\
+    T *bp = malloc(sizeof(T) * W * kcmax * (MIN(NC, g->n) + NR));           \\
+    if (ap == NULL || bp == NULL) {                                         \\
+        free(ap);                                                           \\
+        free(bp);                                                           \\
+        return -1;                                                          \\
+    }                                                                       \\
+    for (jc = 0; jc < g->n; jc += NC) {                                     \\
+        long nc = MIN(NC, g->n - jc);                                       \\
+        for (pc = 0; pc < g->k; pc += KC) {                                 \\
+            long kc = MIN(KC, g->k - pc);                                   \\
+            pack_b_##SUFFIX(bp, b + (pc * g->b_rs + jc * g->b_cs) * W,      \\
+                            g->b_rs, g->b_cs, kc, nc);                      \\
+            for (ic = g->m0; ic < g->m1; ic += MC) {                        \\
+                long mc = MIN(MC, g->m1 - ic);                              \\
+                pack_a_##SUFFIX(ap, a + (ic * g->a_rs + pc * g->a_cs) * W,  \\
+                                g->a_rs, g->a_cs, mc, kc);                  \\
+                for (jr = 0; jr < nc; jr += NR) {                           \\
+                    for (ir = 0; ir < mc; ir += MR) {                       \\
+                        micro_##SUFFIX(kc, ap + ir * kc * W,                \\
+                                       bp + jr * kc * W,                    \\
+                                       c + ((ic + ir) * g->ldc + jc + jr) * W, \\
+                                       g->ldc, MIN(MR, mc - ir),            \\
+                                       MIN(NR, nc - jr), pc == 0);          \\
+                    }                                                       \\
+                }                                                           \\
+            }                                                               \\
+        }                                                                   \\
+    }                                                                       \\
+    free(ap);                                                               \\
+    free(bp);                                                               \\
+    return 0;                                                               \\
+}
+
+DEFINE_PACKING(s, float, 1)
+DEFINE_MICRO_REAL(s, float)
+DEFINE_GEMM(s, float, 1)
+DEFINE_PACKING(d, double, 1)
+DEFINE_MICRO_REAL(d, double)
+DEFINE_GEMM(d, double, 1)
+DEFINE_PACKING(c, float, 2)
+DEFINE_MICRO_COMPLEX(c, float)
+DEFINE_GEMM(c, float, 2)
+DEFINE_PACKING(z, double, 2)
+DEFINE_MICRO_COMPLEX(z, double)
+DEFINE_GEMM(z, double, 2)
+
+static void *gemm_thread(void *arg)
+{
+    struct gemm_args *g = (struct gemm_args *)arg;
+    switch (g->kind) {
+    case 0: g->error = gemm_rows_s(g); break;
+    case 1: g->error = gemm_rows_d(g); break;
+    case 2: g->error = gemm_rows_c(g); break;
+    case 3: g->error = gemm_rows_z(g); break;
+    default: g->error = -1;
+    }
+    return NULL;
+}
+
+/* C = A * B, where A is m x k, B is k x n and C is m x n, C-contiguous.
+   Called with the GIL released.  Returns 0, or -1 if out of memory. */
+RPY_EXTERN int pypy_numpy_gemm(int kind, long m, long n, long k,
+                               char *a, long a_rs, long a_cs,
+                               char *b, long b_rs, long b_cs,
+                               char *c, long nthreads)
+{
+    struct gemm_args args[64];
+    long i, rows, max_threads;
+    int error = 0;
+
+    max_threads = (m + MR - 1) / MR;
+    if ((double)m * n * k / MIN_WORK_PER_THREAD < max_threads)
+        max_threads = (long)((double)m * n * k / MIN_WORK_PER_THREAD);
+    if (nthreads > max_threads)
+        nthreads = max_threads;
+    if (nthreads > 64)
+        nthreads = 64;
+    if (nthreads < 1)
+        nthreads = 1;
+#ifndef GEMM_THREADS
+    nthreads = 1;
+#endif
+    /* split the rows in chunks that are multiples of MR */
+    rows = (m + nthreads - 1) / nthreads;
+    rows = (rows + MR - 1) / MR * MR;
+    for (i = 0; i < nthreads; i++) {
+        struct gemm_args *g = &args[i];
+        g->kind = kind;
+        g->m = m; g->n = n; g->k = k;
+        g->a = a; g->a_rs = a_rs; g->a_cs = a_cs;
+        g->b = b; g->b_rs = b_rs; g->b_cs = b_cs;
+        g->c = c; g->ldc = n;
+        g->m0 = MIN(i * rows, m);
+        g->m1 = MIN((i + 1) * rows, m);
+        g->error = 0;
+    }
+#ifdef GEMM_THREADS
+    {
+        pthread_t threads[64];
+        int started[64];
+        for (i = 1; i < nthreads; i++)
+            started[i] = pthread_create(&threads[i], NULL, gemm_thread,
+                                        &args[i]) == 0;
+        gemm_thread(&args[0]);
+        for (i = 1; i < nthreads; i++) {
+            if (started[i])
+                pthread_join(threads[i], NULL);
+            else
+                gemm_thread(&args[i]);  /* no thread: do it here */
+        }
+    }
+#else
+    gemm_thread(&args[0]);
+#endif
+    for (i = 0; i < nthreads; i++)
+        if (args[i].error)
+            error = -1;
+    return error;
+}
+"""])
+
+c_gemm = rffi.llexternal('pypy_numpy_gemm',
+                         [rffi.INT, rffi.LONG, rffi.LONG, rffi.LONG,
+                          rffi.CCHARP, rffi.LONG, rffi.LONG,
+                          rffi.CCHARP, rffi.LONG, rffi.LONG,
+                          rffi.CCHARP, rffi.LONG], rffi.INT,
+                         compilation_info=eci, releasegil=True)
+
+
+class DotThreads(object):
+    def __init__(self, space):
+        self.nthreads = 1
+
+def get_dot_threads(space):
+    return space.fromcache(DotThreads).nthreads
+
+@unwrap_spec(nthreads=int)
+def set_dot_threads(space, nthreads):
+    """set_dot_threads(nthreads) -> previous value
+
+    Let dot() of float and complex matrices use up to 'nthreads' threads.
+    The default is 1.  PyPy extension."""
+    if nthreads < 1:
+        raise oefmt(space.w_ValueError, "nthreads must be >= 1")
+    cache = space.fromcache(DotThreads)
+    old = cache.nthreads
+    cache.nthreads = nthreads
+    return space.newint(old)
+
+
+def _matrix_strides(arr, elsize, as_column):
+    """The strides, in items, of the rows and columns of 'arr' seen as a
+    matrix, or None if they are not multiples of the item size.  A 1-d
+    array is a single row, or a single column if 'as_column'."""
+    strides = arr.implementation.get_strides()
+    for stride in strides:
+        if stride % elsize != 0:
+            return None
+    if len(strides) == 1:
+        if as_column:
+            return [strides[0] // elsize, 0]
+        return [0, strides[0] // elsize]
+    return [strides[0] // elsize, strides[1] // elsize]
+
+def dot(space, left, right, result, dtype):
+    """Compute result = dot(left, right) with pypy_numpy_gemm(), if it
+    supports these arrays, and return True; otherwise return False.
+    Small products are left to the loop in loop.multidim_dot(), which the
+    JIT compiles well."""
+    if dtype.num not in GEMM_KINDS or not dtype.is_native():
+        return False
+    for arr in [left, right]:
+        arr_dtype = arr.get_dtype()
+        if arr_dtype.num != dtype.num or not arr_dtype.is_native():
+            return False
+    if left.ndims() > 2 or right.ndims() > 2:
+        return False
+    elsize = dtype.elsize
+    if (result.get_size() < 1 or
+            not result.implementation.flags & NPY.ARRAY_C_CONTIGUOUS):
+        return False
+    a_strides = _matrix_strides(left, elsize, as_column=False)
+    b_strides = _matrix_strides(right, elsize, as_column=True)
+    if a_strides is None or b_strides is None:
+        return False
+    left_shape = left.get_shape()
+    right_shape = right.get_shape()
+    k = left_shape[-1]
+    if k < 1:
+        return False
+    if len(left_shape) == 2:
+        m = left_shape[0]
+    else:
+        m = 1
+    if len(right_shape) == 2:
+        n = right_shape[1]
+    else:
+        n = 1
+    if float(m) * n * k < GEMM_MIN_WORK:
+        return False
+    with left.implementation as a_storage:
+        with right.implementation as b_storage:
+            with result.implementation as c_storage:
+                a = support.get_storage_as_int(a_storage, left.get_start())
+                b = support.get_storage_as_int(b_storage, right.get_start())
+                c = support.get_storage_as_int(c_storage, result.get_start())
+                res = c_gemm(rffi.cast(rffi.INT, GEMM_KINDS[dtype.num]),
+                             m, n, k,
+                             rffi.cast(rffi.CCHARP, a), a_strides[0],
+                             a_strides[1],
+                             rffi.cast(rffi.CCHARP, b), b_strides[0],
+                             b_strides[1],
+                             rffi.cast(rffi.CCHARP, c),
+                             get_dot_threads(space))
+    if intmask(res) < 0:
+        raise MemoryError
+    return True
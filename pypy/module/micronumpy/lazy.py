@@ -0,0 +1,587 @@
+""" Lazy evaluation of elementwise ufunc expressions, a PyPy extension.
+
+_numpypy.lazy(a) returns a lazyarray.  Applying a one- or two-argument
+ufunc, or an arithmetic operator, to a lazyarray does not compute anything:
+it returns a new lazyarray that records the ufunc and its operands.  The
+whole expression is computed when the result is needed, e.g. when it is
+indexed, reduced, printed, converted with numpy.asarray() or exported as a
+buffer, in a single loop (loop.fused_eval()) that writes only the final
+result.  So (lazy(a) * b + c * d - e) makes no temporary arrays and reads
+each operand once, instead of making four temporaries.
+
+The operands are read when the expression is computed, not when it is
+recorded: they must not be modified in between.
+
+Expressions are trees of Expr nodes.  The nodes only describe the
+computation; the operands are kept in lists next to the tree, so that the
+same tree is used, as a green variable of the JIT, for all the expressions
+with the same structure and dtypes (see ExprCache).
+"""
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from rpython.tool.sourcetools import func_with_new_name
+from pypy.module.micronumpy import loop, constants as NPY
+from pypy.module.micronumpy.base import W_NDimArray, convert_to_array
+from pypy.module.micronumpy.boxes import W_GenericBox
+from pypy.module.micronumpy.strides import _shape_agreement
+
+
+class Expr(object):
+    _immutable_fields_ = ['key', 'dtype']
+
+    def eval(self, space, arrays, scalars, i):
+        """The value of item 'i' of the result, a box of self.dtype."""
+        raise NotImplementedError
+
+    def shifted(self, cache, arrays_offset, scalars_offset):
+        raise NotImplementedError
+
+
+class ArrayLeaf(Expr):
+    """Item i of arrays[index], which is C-contiguous."""
+    _immutable_fields_ = ['index']
+
+    def __init__(self, key, index, dtype):
+        self.key = key
+        self.index = index
+        self.dtype = dtype
+
+    def eval(self, space, arrays, scalars, i):
+        impl = arrays[self.index]
+        return self.dtype.read(impl, impl.start + i * self.dtype.elsize, 0)
+
+    def shifted(self, cache, arrays_offset, scalars_offset):
+        return cache.array_leaf(self.index + arrays_offset, self.dtype)
+
+
+class ScalarLeaf(Expr):
+    """scalars[index], for all i."""
+    _immutable_fields_ = ['index']
+
+    def __init__(self, key, index, dtype):
+        self.key = key
+        self.index = index
+        self.dtype = dtype
+
+    def eval(self, space, arrays, scalars, i):
+        return scalars[self.index]
+
+    def shifted(self, cache, arrays_offset, scalars_offset):
+        return cache.scalar_leaf(self.index + scalars_offset, self.dtype)
+
+
+class Call1(Expr):
+    _immutable_fields_ = ['name', 'func', 'calc_dtype', 'arg']
+
+    def __init__(self, key, name, func, calc_dtype, dtype, arg):
+        self.key = key
+        self.name = name
+        self.func = func
+        self.calc_dtype = calc_dtype
+        self.dtype = dtype
+        self.arg = arg
+
+    def eval(self, space, arrays, scalars, i):
+        calc_dtype = self.calc_dtype
+        w_arg = self.arg.eval(space, arrays, scalars, i)
+        w_res = self.func(calc_dtype, w_arg.convert_to(space, calc_dtype))
+        return w_res.convert_to(space, self.dtype)
+
+    def shifted(self, cache, arrays_offset, scalars_offset):
+        return cache.call1(self.name, self.func, self.calc_dtype, self.dtype,
+                           self.arg.shifted(cache, arrays_offset,
+                                            scalars_offset))
+
+
+class Call2(Expr):
+    _immutable_fields_ = ['name', 'func', 'calc_dtype', 'left', 'right']
+
+    def __init__(self, key, name, func, calc_dtype, dtype, left, right):
+        self.key = key
+        self.name = name
+        self.func = func
+        self.calc_dtype = calc_dtype
+        self.dtype = dtype
+        self.left = left
+        self.right = right
+
+    def eval(self, space, arrays, scalars, i):
+        calc_dtype = self.calc_dtype
+        w_left = self.left.eval(space, arrays, scalars, i)
+        w_right = self.right.eval(space, arrays, scalars, i)
+        w_res = self.func(calc_dtype,
+                          w_left.convert_to(space, calc_dtype),
+                          w_right.convert_to(space, calc_dtype))
+        return w_res.convert_to(space, self.dtype)
+
+    def shifted(self, cache, arrays_offset, scalars_offset):
+        return cache.call2(self.name, self.func, self.calc_dtype, self.dtype,
+                           self.left.shifted(cache, arrays_offset,
+                                             scalars_offset),
+                           self.right.shifted(cache, arrays_offset,
+                                              scalars_offset))
+
+
+def dtype_key(dtype):
+    return '%d%s%d' % (dtype.num, dtype.byteorder, dtype.elsize)
+
+class ExprCache(object):
+    """All the Expr trees built so far, by structure."""
+
+    def __init__(self, space):
+        self.exprs = {}
+
+    def array_leaf(self, index, dtype):
+        key = 'a%d:%s' % (index, dtype_key(dtype))
+        expr = self.exprs.get(key, None)
+        if expr is None:
+            expr = ArrayLeaf(key, index, dtype)
+            self.exprs[key] = expr
+        return expr
+
+    def scalar_leaf(self, index, dtype):
+        key = 's%d:%s' % (index, dtype_key(dtype))
+        expr = self.exprs.get(key, None)
+        if expr is None:
+            expr = ScalarLeaf(key, index, dtype)
+            self.exprs[key] = expr
+        return expr
+
+    def call1(self, name, func, calc_dtype, dtype, arg):
+        key = '%s:%s:%s(%s)' % (name, dtype_key(calc_dtype),
+                                dtype_key(dtype), arg.key)
+        expr = self.exprs.get(key, None)
+        if expr is None:
+            expr = Call1(key, name, func, calc_dtype, dtype, arg)
+            self.exprs[key] = expr
+        return expr
+
+    def call2(self, name, func, calc_dtype, dtype, left, right):
+        key = '%s:%s:%s(%s,%s)' % (name, dtype_key(calc_dtype),
+                                   dtype_key(dtype), left.key, right.key)
+        expr = self.exprs.get(key, None)
+        if expr is None:
+            expr = Call2(key, name, func, calc_dtype, dtype, left, right)
+            self.exprs[key] = expr
+        return expr
+
+
+class W_LazyArray(W_Root):
+    """An array whose items are computed when they are needed.  Either
+    'expr' is not None, and the items are expr.eval() of 'arrays' and
+    'scalars', or the array was computed and is 'w_forced'."""
+
+    def __init__(self, shape, expr, arrays, scalars):
+        self.shape = shape
+        self.dtype = expr.dtype
+        self.expr = expr
+        self.arrays = arrays      # W_NDimArrays
+        self.scalars = scalars    # W_GenericBoxes
+        self.w_forced = None
+
+    def force(self, space):
+        """Compute the array, if it was not computed yet."""
+        if self.w_forced is not None:
+            return self.w_forced
+        expr = self.expr
+        assert expr is not None
+        if isinstance(expr, ArrayLeaf):
+            # lazy(a) itself
+            w_res = self.arrays[0]
+        else:
+            impls = [_contiguous_impl(space, w_arr, self.shape)
+                     for w_arr in self.arrays]
+            w_res = W_NDimArray.from_shape(space, self.shape, self.dtype,
+                                           zero=False)
+            loop.fused_eval(space, expr, impls, self.scalars, w_res)
+        self.w_forced = w_res
+        self.expr = None
+        self.arrays = []
+        self.scalars = []
+        return w_res
+
+    def as_operand(self, space):
+        """Return (expr, arrays, scalars) to use this array in a bigger
+        expression."""
+        if self.w_forced is not None:
+            cache = space.fromcache(ExprCache)
+            return cache.array_leaf(0, self.dtype), [self.w_forced], []
+        return self.expr, self.arrays, self.scalars
+
+    def descr_force(self, space):
+        return self.force(space)
+
+    def descr___array__(self, space, w_dtype=None):
+        w_arr = self.force(space)
+        if space.is_none(w_dtype):
+            return w_arr
+        return space.call_method(w_arr, 'astype', w_dtype)
+
+    def descr_get_shape(self, space):
+        return space.newtuple([space.newint(i) for i in self.shape])
+
+    def descr_get_dtype(self, space):
+        return self.dtype
+
+    def descr_get_ndim(self, space):
+        return space.newint(len(self.shape))
+
+    def descr_get_size(self, space):
+        size = 1
+        for i in self.shape:
+            size *= i
+        return space.newint(size)
+
+    def descr_get_forced(self, space):
+        return space.newbool(self.w_forced is not None)
+
+    def descr_len(self, space):
+        return space.len(self.force(space))
+
+    def descr_iter(self, space):
+        return space.iter(self.force(space))
+
+    def descr_getitem(self, space, w_idx):
+        return space.getitem(self.force(space), w_idx)
+
+    def descr_setitem(self, space, w_idx, w_value):
+        space.setitem(self.force(space), w_idx, w_value)
+
+    def descr_repr(self, space):
+        return space.repr(self.force(space))
+
+    def descr_str(self, space):
+        return space.str(self.force(space))
+
+    def descr_getattr(self, space, w_name):
+        # everything else is done by the computed array
+        return space.getattr(self.force(space), w_name)
+
+    def buffer_w(self, space, flags):
+        return self.force(space).buffer_w(space, flags)
+
+    def readbuf_w(self, space):
+        return self.force(space).readbuf_w(space)
+
+    def writebuf_w(self, space):
+        return self.force(space).writebuf_w(space)
+
+    def charbuf_w(self, space):
+        return self.force(space).charbuf_w(space)
+
+    def _forced_impl(opname):
+        def impl(self, space):
+            return getattr(space, opname)(self.force(space))
+        return func_with_new_name(impl, "lazy_forced_%s_impl" % opname)
+
+    descr_nonzero = _forced_impl("nonzero")
+    descr_int = _forced_impl("int")
+    descr_long = _forced_impl("long")
+    descr_float = _forced_impl("float")
+    descr_hex = _forced_impl("hex")
+    descr_oct = _forced_impl("oct")
+    descr_index = _forced_impl("index")
+    descr_hash = _forced_impl("hash")
+
+    def descr_contains(self, space, w_item):
+        return space.contains(self.force(space), w_item)
+
+    def _unaryop_impl(ufunc_name):
+        def impl(self, space):
+            from pypy.module.micronumpy import ufuncs
+            return getattr(ufuncs.get(space), ufunc_name).call(
+                space, [self, None], None, 'safe', None)
+        return func_with_new_name(impl, "lazy_unaryop_%s_impl" % ufunc_name)
+
+    descr_pos = _unaryop_impl("positive")
+    descr_neg = _unaryop_impl("negative")
+    descr_abs = _unaryop_impl("absolute")
+    descr_invert = _unaryop_impl("invert")
+
+    def _binop_impl(ufunc_name):
+        def impl(self, space, w_other):
+            from pypy.module.micronumpy import ufuncs
+            return getattr(ufuncs.get(space), ufunc_name).call(
+                space, [self, w_other, None], None, 'safe', None)
+        return func_with_new_name(impl, "lazy_binop_%s_impl" % ufunc_name)
+
+    descr_add = _binop_impl("add")
+    descr_sub = _binop_impl("subtract")
+    descr_mul = _binop_impl("multiply")
+    descr_div = _binop_impl("divide")
+    descr_truediv = _binop_impl("true_divide")
+    descr_floordiv = _binop_impl("floor_divide")
+    descr_mod = _binop_impl("mod")
+    descr_pow = _binop_impl("power")
+    descr_lshift = _binop_impl("left_shift")
+    descr_rshift = _binop_impl("right_shift")
+    descr_and = _binop_impl("bitwise_and")
+    descr_or = _binop_impl("bitwise_or")
+    descr_xor = _binop_impl("bitwise_xor")
+    descr_eq = _binop_impl("equal")
+    descr_ne = _binop_impl("not_equal")
+    descr_lt = _binop_impl("less")
+    descr_le = _binop_impl("less_equal")
+    descr_gt = _binop_impl("greater")
+    descr_ge = _binop_impl("greater_equal")
+
+    def descr_divmod(self, space, w_other):
+        w_quotient = self.descr_div(space, w_other)
+        w_remainder = self.descr_mod(space, w_other)
+        return space.newtuple([w_quotient, w_remainder])
+
+    def _binop_inplace_impl(opname):
+        # done by the computed array, which is modified: it is not lazy
+        def impl(self, space, w_other):
+            space.call_method(self.force(space), opname, w_other)
+            return self
+        return func_with_new_name(impl, "lazy_binop_inplace_%s_impl" %
+                                  opname.strip('_'))
+
+    descr_iadd = _binop_inplace_impl("__iadd__")
+    descr_isub = _binop_inplace_impl("__isub__")
+    descr_imul = _binop_inplace_impl("__imul__")
+    descr_idiv = _binop_inplace_impl("__idiv__")
+    descr_itruediv = _binop_inplace_impl("__itruediv__")
+    descr_ifloordiv = _binop_inplace_impl("__ifloordiv__")
+    descr_imod = _binop_inplace_impl("__imod__")
+    descr_ipow = _binop_inplace_impl("__ipow__")
+    descr_ilshift = _binop_inplace_impl("__ilshift__")
+    descr_irshift = _binop_inplace_impl("__irshift__")
+    descr_iand = _binop_inplace_impl("__iand__")
+    descr_ior = _binop_inplace_impl("__ior__")
+    descr_ixor = _binop_inplace_impl("__ixor__")
+
+    def _binop_right_impl(ufunc_name):
+        def impl(self, space, w_other):
+            from pypy.module.micronumpy import ufuncs
+            return getattr(ufuncs.get(space), ufunc_name).call(
+                space, [w_other, self, None], None, 'safe', None)
+        return func_with_new_name(impl, "lazy_binop_right_%s_impl" %
+                                  ufunc_name)
+
+    descr_radd = _binop_right_impl("add")
+    descr_rsub = _binop_right_impl("subtract")
+    descr_rmul = _binop_right_impl("multiply")
+    descr_rdiv = _binop_right_impl("divide")
+    descr_rtruediv = _binop_right_impl("true_divide")
+    descr_rfloordiv = _binop_right_impl("floor_divide")
+    descr_rmod = _binop_right_impl("mod")
+    descr_rpow = _binop_right_impl("power")
+    descr_rlshift = _binop_right_impl("left_shift")
+    descr_rrshift = _binop_right_impl("right_shift")
+    descr_rand = _binop_right_impl("bitwise_and")
+    descr_ror = _binop_right_impl("bitwise_or")
+    descr_rxor = _binop_right_impl("bitwise_xor")
+
+    def descr_rdivmod(self, space, w_other):
+        w_quotient = self.descr_rdiv(space, w_other)
+        w_remainder = self.descr_rmod(space, w_other)
+        return space.newtuple([w_quotient, w_remainder])
+
+
+def _contiguous_impl(space, w_arr, shape):
+    """The implementation of w_arr if it is C-contiguous and has the given
+    shape, or else of a C-contiguous copy broadcast to that shape."""
+    impl = w_arr.implementation
+    if impl.get_shape() == shape and impl.flags & NPY.ARRAY_C_CONTIGUOUS:
+        return impl
+    w_copy = W_NDimArray.from_shape(space, shape, w_arr.get_dtype(),
+                                    zero=False)
+    w_copy.implementation.setslice(space, w_arr)
+    return w_copy.implementation
+
+
+def lazy(space, w_obj):
+    """lazy(a) -> lazyarray
+
+    Record the ufuncs applied to the returned object, and to their results,
+    and compute them in a single loop when the result is needed.  The
+    operands must not be modified until then.  PyPy extension."""
+    if isinstance(w_obj, W_LazyArray):
+        return w_obj
+    w_arr = convert_to_array(space, w_obj)
+    if w_arr.is_scalar():
+        raise oefmt(space.w_ValueError, "lazy() needs an array, not a scalar")
+    expr = space.fromcache(ExprCache).array_leaf(0, w_arr.get_dtype())
+    return W_LazyArray(w_arr.get_shape(), expr, [w_arr], [])
+
+
+def has_lazy_args(args_w, nin):
+    for i in range(nin):
+        if isinstance(args_w[i], W_LazyArray):
+            return True
+    return False
+
+def force_args(space, args_w):
+    result_w = args_w[:]
+    for i in range(len(result_w)):
+        w_arg = result_w[i]
+        if isinstance(w_arg, W_LazyArray):
+            result_w[i] = w_arg.force(space)
+    return result_w
+
+def _operand(space, w_arg):
+    """(shape, expr, arrays, scalars, w_typearg) to use w_arg in a lazy
+    expression, where w_typearg is an array for the dtype resolution of
+    the ufunc, or None if w_arg cannot be used."""
+    cache = space.fromcache(ExprCache)
+    if isinstance(w_arg, W_LazyArray):
+        expr, arrays, scalars = w_arg.as_operand(space)
+        # only the dtype of arrays matter, not their contents
+        w_typearg = W_NDimArray.from_shape(space, [0], w_arg.dtype)
+        return w_arg.shape, expr, arrays, scalars, w_typearg
+    if not isinstance(w_arg, W_NDimArray):
+        from pypy.module.micronumpy.ctors import numpify
+        w_arg = numpify(space, w_arg)
+        if isinstance(w_arg, W_GenericBox):
+            w_arg = W_NDimArray.from_scalar(space, w_arg)
+    assert isinstance(w_arg, W_NDimArray)
+    dtype = w_arg.get_dtype()
+    if (not dtype.is_number() or
+            not space.is_w(space.type(w_arg),
+                           space.gettypefor(W_NDimArray))):
+        return None, None, None, None, None
+    if w_arg.get_size() == 1:
+        return (w_arg.get_shape(), cache.scalar_leaf(0, dtype), [],
+                [w_arg.get_scalar_value()], w_arg)
+    return (w_arg.get_shape(), cache.array_leaf(0, dtype), [w_arg], [],
+            w_arg)
+
+def _broadcast_shapes(space, shape1, shape2):
+    shape = _shape_agreement(shape1, shape2)
+    if len(shape) < max(len(shape1), len(shape2)):
+        raise oefmt(space.w_ValueError,
+                    "operands could not be broadcast together with shapes "
+                    "(%s) (%s)", ",".join([str(x) for x in shape1]),
+                    ",".join([str(x) for x in shape2]))
+    return shape
+
+def record_ufunc(space, ufunc, args_w, casting):
+    """Return a W_LazyArray for the ufunc applied to args_w, of which one
+    of the inputs is a W_LazyArray; or None if the ufunc must be computed
+    now."""
+    from pypy.module.micronumpy.ufuncs import W_Ufunc1, W_Ufunc2
+    nin = ufunc.nin
+    if len(args_w) > nin and args_w[nin] is not None:
+        return None     # out=...
+    cache = space.fromcache(ExprCache)
+    if isinstance(ufunc, W_Ufunc1):
+        shape, arg, arrays, scalars, w_typearg = _operand(space, args_w[0])
+        if arg is None:
+            return None
+        calc_dtype, dt_out, func = ufunc.find_specialization(
+            space, arg.dtype, None, casting)
+        assert calc_dtype is not None and dt_out is not None
+        if not dt_out.is_number():
+            return None
+        expr = cache.call1(ufunc.name, func, calc_dtype, dt_out, arg)
+    elif isinstance(ufunc, W_Ufunc2):
+        lshape, left, larrays, lscalars, w_ltype = _operand(space, args_w[0])
+        rshape, right, rarrays, rscalars, w_rtype = _operand(space,
+                                                             args_w[1])
+        if left is None or right is None:
+            return None
+        shape = _broadcast_shapes(space, lshape, rshape)
+        calc_dtype, dt_out, func = ufunc.find_specialization(
+            space, left.dtype, right.dtype, None, casting, w_ltype, w_rtype)
+        assert calc_dtype is not None and dt_out is not None
+        if not dt_out.is_number():
+            return None
+        right = right.shifted(cache, len(larrays), len(lscalars))
+        expr = cache.call2(ufunc.name, func, calc_dtype, dt_out, left,
+                           right)
+        arrays = larrays + rarrays
+        scalars = lscalars + rscalars
+    else:
+        return None
+    if len(shape) == 0:
+        return None     # the result is a scalar
+    return W_LazyArray(shape, expr, arrays, scalars)
+
+
+W_LazyArray.typedef = TypeDef("_numpypy.lazyarray",
+    __doc__ = """An array whose items are computed when they are needed.
+See _numpypy.lazy().""",
+    shape = GetSetProperty(W_LazyArray.descr_get_shape),
+    dtype = GetSetProperty(W_LazyArray.descr_get_dtype),
+    ndim = GetSetProperty(W_LazyArray.descr_get_ndim),
+    size = GetSetProperty(W_LazyArray.descr_get_size),
+    forced = GetSetProperty(W_LazyArray.descr_get_forced),
+    force = interp2app(W_LazyArray.descr_force),
+    __array__ = interp2app(W_LazyArray.descr___array__),
+
+    __len__ = interp2app(W_LazyArray.descr_len),
+    __iter__ = interp2app(W_LazyArray.descr_iter),
+    __getitem__ = interp2app(W_LazyArray.descr_getitem),
+    __setitem__ = interp2app(W_LazyArray.descr_setitem),
+    __repr__ = interp2app(W_LazyArray.descr_repr),
+    __str__ = interp2app(W_LazyArray.descr_str),
+    __getattr__ = interp2app(W_LazyArray.descr_getattr),
+    __contains__ = interp2app(W_LazyArray.descr_contains),
+    __hash__ = interp2app(W_LazyArray.descr_hash),
+    __nonzero__ = interp2app(W_LazyArray.descr_nonzero),
+    __int__ = interp2app(W_LazyArray.descr_int),
+    __long__ = interp2app(W_LazyArray.descr_long),
+    __float__ = interp2app(W_LazyArray.descr_float),
+    __hex__ = interp2app(W_LazyArray.descr_hex),
+    __oct__ = interp2app(W_LazyArray.descr_oct),
+    __index__ = interp2app(W_LazyArray.descr_index),
+
+    __pos__ = interp2app(W_LazyArray.descr_pos),
+    __neg__ = interp2app(W_LazyArray.descr_neg),
+    __abs__ = interp2app(W_LazyArray.descr_abs),
+    __invert__ = interp2app(W_LazyArray.descr_invert),
+    __add__ = interp2app(W_LazyArray.descr_add),
+    __sub__ = interp2app(W_LazyArray.descr_sub),
+    __mul__ = interp2app(W_LazyArray.descr_mul),
+    __div__ = interp2app(W_LazyArray.descr_div),
+    __truediv__ = interp2app(W_LazyArray.descr_truediv),
+    __floordiv__ = interp2app(W_LazyArray.descr_floordiv),
+    __mod__ = interp2app(W_LazyArray.descr_mod),
+    __divmod__ = interp2app(W_LazyArray.descr_divmod),
+    __pow__ = interp2app(W_LazyArray.descr_pow),
+    __lshift__ = interp2app(W_LazyArray.descr_lshift),
+    __rshift__ = interp2app(W_LazyArray.descr_rshift),
+    __and__ = interp2app(W_LazyArray.descr_and),
+    __or__ = interp2app(W_LazyArray.descr_or),
+    __xor__ = interp2app(W_LazyArray.descr_xor),
+    __eq__ = interp2app(W_LazyArray.descr_eq),
+    __ne__ = interp2app(W_LazyArray.descr_ne),
+    __lt__ = interp2app(W_LazyArray.descr_lt),
+    __le__ = interp2app(W_LazyArray.descr_le),
+    __gt__ = interp2app(W_LazyArray.descr_gt),
+    __ge__ = interp2app(W_LazyArray.descr_ge),
+    __radd__ = interp2app(W_LazyArray.descr_radd),
+    __rsub__ = interp2app(W_LazyArray.descr_rsub),
+    __rmul__ = interp2app(W_LazyArray.descr_rmul),
+    __rdiv__ = interp2app(W_LazyArray.descr_rdiv),
+    __rtruediv__ = interp2app(W_LazyArray.descr_rtruediv),
+    __rfloordiv__ = interp2app(W_LazyArray.descr_rfloordiv),
+    __rmod__ = interp2app(W_LazyArray.descr_rmod),
+    __rdivmod__ = interp2app(W_LazyArray.descr_rdivmod),
+    __rpow__ = interp2app(W_LazyArray.descr_rpow),
+    __rlshift__ = interp2app(W_LazyArray.descr_rlshift),
+    __rrshift__ = interp2app(W_LazyArray.descr_rrshift),
+    __rand__ = interp2app(W_LazyArray.descr_rand),
+    __ror__ = interp2app(W_LazyArray.descr_ror),
+    __rxor__ = interp2app(W_LazyArray.descr_rxor),
+
+    __iadd__ = interp2app(W_LazyArray.descr_iadd),
+    __isub__ = interp2app(W_LazyArray.descr_isub),
+    __imul__ = interp2app(W_LazyArray.descr_imul),
+    __idiv__ = interp2app(W_LazyArray.descr_idiv),
+    __itruediv__ = interp2app(W_LazyArray.descr_itruediv),
+    __ifloordiv__ = interp2app(W_LazyArray.descr_ifloordiv),
+    __imod__ = interp2app(W_LazyArray.descr_imod),
+    __ipow__ = interp2app(W_LazyArray.descr_ipow),
+    __ilshift__ = interp2app(W_LazyArray.descr_ilshift),
+    __irshift__ = interp2app(W_LazyArray.descr_irshift),
+    __iand__ = interp2app(W_LazyArray.descr_iand),
+    __ior__ = interp2app(W_LazyArray.descr_ior),
+    __ixor__ = interp2app(W_LazyArray.descr_ixor),
+)
+W_LazyArray.typedef.acceptable_as_base_class = False
@@ -159,6 +159,26 @@ def call1(space, shape, func, calc_dtype, w_obj, w_ret):
         elem = None
     return w_ret
 
+fused_driver = jit.JitDriver(
+    name='numpy_fused', greens=['expr', 'res_dtype'],
+    reds='auto', vectorize=True)
+
+def fused_eval(space, expr, arrays, scalars, w_ret):
+    """ Computes the lazy expression 'expr' (see lazy.py) into w_ret, which
+    is C-contiguous, as are the implementations in 'arrays'.
+    """
+    ret = w_ret.implementation
+    res_dtype = ret.dtype
+    elsize = res_dtype.elsize
+    size = w_ret.get_size()
+    i = 0
+    while i < size:
+        fused_driver.jit_merge_point(expr=expr, res_dtype=res_dtype)
+        res_dtype.store(ret, ret.start + i * elsize, 0,
+                        expr.eval(space, arrays, scalars, i))
+        i += 1
+    return w_ret
+
 call_many_to_one_driver = jit.JitDriver(
     name='numpy_call_many_to_one',
     greens=['shapelen', 'nin', 'func', 'in_dtypes', 'res_dtype'],
@@ -324,19 +344,75 @@ def split_iter(arr, axis_flags):
     return inner_iter, outer_iter
 
 
+# reductions of more items than this are done pairwise, see reduce_pairwise()
+PAIRWISE_BLOCKSIZE = 128
+
+reduce_pairwise_driver = jit.JitDriver(
+    name='numpy_reduce_pairwise',
+    greens = ['shapelen', 'func', 'calc_dtype'], reds = 'auto',
+    vectorize = True)
+
+def reduce_pairwise(space, func, arr_iter, arr_state, count, calc_dtype,
+                    shapelen):
+    """ Reduces the 'count' (>= 1) items from arr_state on, like numpy's
+    pairwise summation: the blocks of PAIRWISE_BLOCKSIZE items are reduced
+    in a loop that the JIT can vectorize, and the results of the blocks are
+    then combined two by two, so that the rounding error of a float sum
+    grows like O(log(count)) instead of O(count).  The blocks are combined
+    as soon as possible, with a stack of partial results, so the items are
+    still visited in order.  Returns the result and the state after the
+    last item.
+    """
+    partials = []
+    levels = []
+    while count > 0:
+        n = min(count, PAIRWISE_BLOCKSIZE)
+        count -= n
+        w_val = arr_iter.getitem(arr_state).convert_to(space, calc_dtype)
+        arr_state = arr_iter.next(arr_state)
+        n -= 1
+        while n > 0:
+            reduce_pairwise_driver.jit_merge_point(
+                shapelen=shapelen, func=func, calc_dtype=calc_dtype)
+            w_item = arr_iter.getitem(arr_state).convert_to(space, calc_dtype)
+            w_val = func(calc_dtype, w_val, w_item)
+            arr_state = arr_iter.next(arr_state)
+            n -= 1
+        # combine with the previous partial results of the same size
+        level = 0
+        while len(levels) > 0 and levels[-1] == level:
+            levels.pop()
+            w_val = func(calc_dtype, partials.pop(), w_val)
+            level += 1
+        partials.append(w_val)
+        levels.append(level)
+    w_val = partials.pop()
+    while len(partials) > 0:
+        w_val = func(calc_dtype, partials.pop(), w_val)
+    return w_val, arr_state
+
 reduce_flat_driver = jit.JitDriver(
     name='numpy_reduce_flat',
     greens = ['shapelen', 'func', 'done_func', 'calc_dtype'], reds = 'auto',
     vectorize = True)
 
-def reduce_flat(space, func, w_arr, calc_dtype, done_func, identity):
+def reduce_flat(space, func, w_arr, calc_dtype, done_func, identity,
+                pairwise=False):
     obj_iter, obj_state = w_arr.create_iter()
+    shapelen = len(w_arr.get_shape())
+    size = w_arr.get_size()
+    if pairwise and size > PAIRWISE_BLOCKSIZE:
+        cur_value, _ = reduce_pairwise(space, func, obj_iter, obj_state, size,
+                                       calc_dtype, shapelen)
+        if identity is not None:
+            cur_value = func(calc_dtype, identity.convert_to(space, calc_dtype),
+                             cur_value)
+        return cur_value
     if identity is None:
         cur_value = obj_iter.getitem(obj_state).convert_to(space, calc_dtype)
         obj_state = obj_iter.next(obj_state)
     else:
         cur_value = identity.convert_to(space, calc_dtype)
-    shapelen = len(w_arr.get_shape())
     while not obj_iter.done(obj_state):
         reduce_flat_driver.jit_merge_point(
             shapelen=shapelen, func=func,
@@ -353,13 +429,15 @@ reduce_driver = jit.JitDriver(
     greens=['shapelen', 'func', 'dtype'], reds='auto',
     vectorize=True)
 
-def reduce(space, func, w_arr, axis_flags, dtype, out, identity):
+def reduce(space, func, w_arr, axis_flags, dtype, out, identity,
+           pairwise=False):
     out_iter, out_state = out.create_iter()
     out_iter.track_index = False
     shape = w_arr.get_shape()
     shapelen = len(shape)
     inner_iter, outer_iter = split_iter(w_arr.implementation, axis_flags)
     assert outer_iter.size == out_iter.size
+    pairwise = pairwise and inner_iter.size > PAIRWISE_BLOCKSIZE
 
     if identity is not None:
         identity = identity.convert_to(space, dtype)
@@ -367,17 +445,23 @@ def reduce(space, func, w_arr, axis_flags, dtype, out, identity):
     while not outer_iter.done(outer_state):
         inner_state = inner_iter.reset()
         inner_state.offset = outer_state.offset
-        if identity is not None:
-            w_val = identity
+        if pairwise:
+            w_val, _ = reduce_pairwise(space, func, inner_iter, inner_state,
+                                       inner_iter.size, dtype, shapelen)
+            if identity is not None:
+                w_val = func(dtype, identity, w_val)
         else:
-            w_val = inner_iter.getitem(inner_state).convert_to(space, dtype)
-            inner_state = inner_iter.next(inner_state)
-        while not inner_iter.done(inner_state):
-            reduce_driver.jit_merge_point(
-                shapelen=shapelen, func=func, dtype=dtype)
-            w_item = inner_iter.getitem(inner_state).convert_to(space, dtype)
-            w_val = func(dtype, w_item, w_val)
-            inner_state = inner_iter.next(inner_state)
+            if identity is not None:
+                w_val = identity
+            else:
+                w_val = inner_iter.getitem(inner_state).convert_to(space, dtype)
+                inner_state = inner_iter.next(inner_state)
+            while not inner_iter.done(inner_state):
+                reduce_driver.jit_merge_point(
+                    shapelen=shapelen, func=func, dtype=dtype)
+                w_item = inner_iter.getitem(inner_state).convert_to(space, dtype)
+                w_val = func(dtype, w_item, w_val)
+                inner_state = inner_iter.next(inner_state)
         out_iter.setitem(out_state, w_val)
         out_state = out_iter.next(out_state)
         outer_state = outer_iter.next(outer_state)
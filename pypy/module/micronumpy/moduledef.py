@@ -4,7 +4,8 @@ from pypy.interpreter.mixedmodule import MixedModule
 class MultiArrayModule(MixedModule):
     appleveldefs = {
         'arange': 'app_numpy.arange',
-        'add_docstring': 'app_numpy.add_docstring'}
+        'add_docstring': 'app_numpy.add_docstring',
+        'memmap': 'app_memmap.memmap'}
     interpleveldefs = {
         'ndarray': 'ndarray.W_NDimArray',
         'dtype': 'descriptor.W_Dtype',
@@ -19,6 +20,7 @@ class MultiArrayModule(MixedModule):
         'empty_like': 'ctors.empty_like',
         'fromstring': 'ctors.fromstring',
         'frombuffer': 'ctors.frombuffer',
+        'fromfile': 'ctors.fromfile',
 
         'concatenate': 'arrayops.concatenate',
         'count_nonzero': 'arrayops.count_nonzero',
@@ -136,7 +138,13 @@ class UMathModule(MixedModule):
 class Module(MixedModule):
     applevel_name = '_numpypy'
     appleveldefs = {}
-    interpleveldefs = {}
+    interpleveldefs = {
+        'set_dot_threads': 'gemm.set_dot_threads',
+        'lazy': 'lazy.lazy',
+        'set_reduce_threads': 'reduction.set_reduce_threads',
+        'prefault': 'fileio.prefault',
+        'loadtxt': 'textio.loadtxt',
+    }
     submodules = {
         'multiarray': MultiArrayModule,
         'umath': UMathModule,
@@ -11,7 +11,7 @@ from rpython.rlib.rarithmetic import ovfcheck
 from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_with_new_name
 from pypy.module.micronumpy import descriptor, ufuncs, boxes, arrayops, loop, \
-    support, constants as NPY
+    support, gemm, fileio, constants as NPY
 from pypy.module.micronumpy.appbridge import get_appbridge_cache
 from pypy.module.micronumpy.arrayops import repeat, choose, put
 from pypy.module.micronumpy.base import W_NDimArray, convert_to_array, \
@@ -971,9 +971,48 @@ class __extend__(W_NDimArray):
         raise oefmt(space.w_NotImplementedError,
                     "strides not implemented yet")
 
-    def descr_tofile(self, space, w_fid, w_sep="", w_format="%s"):
-        raise oefmt(space.w_NotImplementedError,
-                    "tofile not implemented yet")
+    @unwrap_spec(sep='text', format='text')
+    def descr_tofile(self, space, w_fid, sep="", format="%s"):
+        if space.isinstance_w(w_fid, space.w_basestring):
+            w_fid = space.call_function(space.builtin.get('open'), w_fid,
+                                        space.newtext('wb'))
+            try:
+                self._tofile(space, w_fid, sep, format)
+            finally:
+                space.call_method(w_fid, 'close')
+        else:
+            self._tofile(space, w_fid, sep, format)
+
+    def _tofile(self, space, w_fid, sep, format):
+        # the items are always written in C order
+        arr = self
+        if not is_c_contiguous(arr.implementation):
+            arr = W_NDimArray(arr.implementation.copy(space, NPY.CORDER))
+        if sep != '':
+            w_format = space.newtext(format)
+            pieces = []
+            for w_item in space.listview(space.call_method(
+                    space.call_method(arr, 'ravel'), 'tolist')):
+                w_piece = space.mod(w_format, w_item)
+                pieces.append(space.text_w(space.str(w_piece)))
+            space.call_method(w_fid, 'write', space.newtext(sep.join(pieces)))
+            return
+        if arr.get_dtype().is_object():
+            raise oefmt(space.w_IOError,
+                        "cannot write object arrays to a file in binary mode")
+        fd = fileio.get_fileno(space, w_fid)
+        if fd < 0:
+            # not a real file, e.g. a StringIO
+            space.call_method(w_fid, 'write',
+                              space.newbytes(loop.tostring(space, arr)))
+            return
+        nbytes = arr.get_size() * arr.get_dtype().elsize
+        space.call_method(w_fid, 'flush')
+        pos = fileio.get_position(space, w_fid)
+        with arr.implementation as storage:
+            addr = support.get_storage_as_int(storage, arr.get_start())
+            fileio.write_from(space, fd, pos, addr, nbytes)
+        fileio.set_position(space, w_fid, pos + nbytes)
 
     def descr_view(self, space, w_dtype=None, w_type=None):
         if not w_type and w_dtype:
@@ -1204,6 +1243,8 @@ class __extend__(W_NDimArray):
         else:
             w_res = W_NDimArray.from_shape(space, out_shape, dtype, w_instance=self)
         # This is the place to add fpypy and blas
+        if gemm.dot(space, self, other, w_res, dtype):
+            return w_res
         return loop.multidim_dot(space, self, other, w_res, dtype,
                                  other_critical_dim)
 
@@ -1623,6 +1664,7 @@ W_NDimArray.typedef = TypeDef("numpy.ndarray", None, None, 'read-write',
     fill = interp2app(W_NDimArray.descr_fill),
     tobytes = interp2app(W_NDimArray.descr_tostring),
     tostring = interp2app(W_NDimArray.descr_tostring),
+    tofile = interp2app(W_NDimArray.descr_tofile),
 
     mean = interp2app(W_NDimArray.descr_mean),
     sum = interp2app(W_NDimArray.descr_sum),
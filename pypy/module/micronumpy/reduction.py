@@ -0,0 +1,373 @@
+"""
+A multithreaded reduction for add.reduce(), multiply.reduce(),
+maximum.reduce() and minimum.reduce() of float32 and float64 arrays, i.e.
+sum(), prod(), max(), min() and mean().  It is written in C and does
+pairwise reductions with several accumulators, like numpy's pairwise
+summation, which C compilers turn into SIMD code.  The work is split between
+up to get_reduce_threads() threads, and the GIL is released for the whole
+call.  With the default of one thread it is not used: the reductions are
+done by loop.reduce() and loop.reduce_flat().
+
+The items that are reduced together, and the results, must each be
+reachable with a single stride, e.g. any axis of a 2-d array, or all the
+items of a contiguous array; the result must be C-contiguous.  Because the
+items are combined in a different order, the results of float sums may
+differ in the last bits from those of the single-threaded loops.
+"""
+
+import sys
+
+from rpython.rtyper.lltypesystem import rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+from rpython.rlib.rarithmetic import intmask
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module.micronumpy import constants as NPY
+from pypy.module.micronumpy import support
+from pypy.module.micronumpy.base import W_NDimArray
+
+# the 'kind' and 'op' arguments of pypy_numpy_reduce()
+REDUCE_KINDS = {NPY.FLOAT: 0, NPY.DOUBLE: 1}
+REDUCE_OPS = {'add': 0, 'multiply': 1, 'maximum': 2, 'minimum': 3}
+
+# reductions of fewer items than this don't use pypy_numpy_reduce()
+REDUCE_MIN_SIZE = 1 << 16
+
+if sys.platform == 'win32':
+    libraries = []
+else:
+    libraries = ['pthread']
+
+eci = ExternalCompilationInfo(
+    libraries=libraries,
+    post_include_bits=["""
+RPY_EXTERN int pypy_numpy_reduce(int, int, long, long, char *, long, long,
+                                 char *, long);
+"""],
+    separate_module_sources=["""
+#include <stdlib.h>
+#ifndef _WIN32
+#  include <pthread.h>
+#  define REDUCE_THREADS
+#endif
+
+/* pairwise reductions of up to PW_BLOCKSIZE items use 8 accumulators */
+#define PW_BLOCKSIZE 128
+/* below this many items per thread, use fewer threads */
+#define MIN_ITEMS_PER_THREAD 32768
+#define MAX_THREADS 64
+
+#define OP_ADD(a, b) ((a) + (b))
+#define OP_MUL(a, b) ((a) * (b))
+/* like the max and min of types.Float: NaNs propagate */
+#define OP_MAX(a, b) (((a) >= (b) || (a) != (a)) ? (a) : (b))
+#define OP_MIN(a, b) (((a) <= (b) || (a) != (a)) ? (a) : (b))
+
+struct reduce_args {
+    int kind, op;
+    const char *a;
+    long n_outer, n_inner;
+    long outer_stride, inner_stride;    /* in items */
+    char *out;
+    long o0, o1;                        /* the results to compute */
+    long i0, i1;                        /* the items of each to reduce */
+};
+
+#define MIN(a, b) ((a) < (b) ? (a) : (b))
+
+/* Each DEFINE_PAIRWISE() defines pairwise_SUFFIX(), which reduces the
+   n >= 1 items a[0], a[stride], ... like numpy's pairwise_sum(). */
+
+#define DEFINE_PAIRWISE(SUFFIX, T, OP)                                      \\
+static T pairwise_##SUFFIX(const T *a, long n, long stride)                 \\
+{                                                                           \\
+    if (n < 8) {                                                            \\
+        long i;                                                             \\
+        T res = a[0];                                                       \\
+        for (i = 1; i < n; i++)                                             \\
+            res = OP(res, a[i * stride]);                                   \\
+        return res;                                                         \\
+    }                                                                       \\
+    else if (n <= PW_BLOCKSIZE) {                                           \\
+        long i;                                                             \\
+        T r[8], res;                                                        \\
+        for (i = 0; i < 8; i++)                                             \\
+            r[i] = a[i * stride];                                           \\
+        for (i = 8; i < n - (n % 8); i += 8) {                              \\
+            r[0] = OP(r[0], a[(i + 0) * stride]);                           \\
+            r[1] = OP(r[1], a[(i + 1) * stride]);                           \\
+            r[2] = OP(r[2], a[(i + 2) * stride]);                           \\
+            r[3] = OP(r[3], a[(i + 3) * stride]);                           \\
+            r[4] = OP(r[4], a[(i + 4) * stride]);                           \\
+            r[5] = OP(r[5], a[(i + 5) * stride]);                           \\
+            r[6] = OP(r[6], a[(i + 6) * stride]);                           \\
+            r[7] = OP(r[7], a[(i + 7) * stride]);                           \\
+        }                                                                   \\
+        res = OP(OP(OP(r[0], r[1]), OP(r[2], r[3])),                        \\
+                 OP(OP(r[4], r[5]), OP(r[6], r[7])));                       \\
+        for (; i < n; i++)                                                  \\
+            res = OP(res, a[i * stride]);                                   \\
+        return res;                                                         \\
+    }                                                                       \\
+    else {                                                                  \\
+        long n2 = n / 2;                                                    \\
+        n2 -= n2 % 8;                                                       \\
+        return OP(pairwise_##SUFFIX(a, n2, stride),                         \\
+                  pairwise_##SUFFIX(a + n2 * stride, n - n2, stride));      \\
+    }                                                                       \\
+}
+
+#define DEFINE_REDUCE(SUFFIX, T)                                            \\
+DEFINE_PAIRWISE(add_##SUFFIX, T, OP_ADD)                                    \\
+DEFINE_PAIRWISE(mul_##SUFFIX, T, OP_MUL)                                    \\
+DEFINE_PAIRWISE(max_##SUFFIX, T, OP_MAX)                                    \\
+DEFINE_PAIRWISE(min_##SUFFIX, T, OP_MIN)                                    \\
+static void reduce_##SUFFIX(struct reduce_args *r)                          \\
+{                                                                           \\
+    long o;                                                                 \\
+    T *out = (T *)r->out;                                                   \\
+    for (o = r->o0; o < r->o1; o++) {                                       \\
+        const T *a = (const T *)r->a + o * r->outer_stride +                \\
+                     r->i0 * r->inner_stride;                               \\
+        long n = r->i1 - r->i0;                                             \\
+        T res;                                                              \\
+        switch (r->op) {                                                    \\
+        case 0: res = pairwise_add_##SUFFIX(a, n, r->inner_stride); break;  \\
+        case 1: res = pairwise_mul_##SUFFIX(a, n, r->inner_stride); break;  \\
+        case 2: res = pairwise_max_##SUFFIX(a, n, r->inner_stride); break;  \\
+        default: res = pairwise_min_##SUFFIX(a, n, r->inner_stride); break; \\
+        }                                                                   \\
+        out[o] = res;                                                       \\
+    }                                                                       \\
+}                                                                           \\
+static T combine_##SUFFIX(int op, T a, T b)                                 \\
+{                                                                           \\
+    switch (op) {                                                           \\
+    case 0: return OP_ADD(a, b);                                            \\
+    case 1: return OP_MUL(a, b);                                            \\
+    case 2: return OP_MAX(a, b);                                            \\
+    default: return OP_MIN(a, b);                                           \\
+    }                                                                       \\
+}
+
+DEFINE_REDUCE(s, float)
+DEFINE_REDUCE(d, double)
+
+static void *reduce_thread(void *arg)
+{
+    struct reduce_args *r = (struct reduce_args *)arg;
+    if (r->kind == 0)
+        reduce_s(r);
+    else
+        reduce_d(r);
+    return NULL;
+}
+
+/* out[o] = reduction of a[o * outer_stride + i * inner_stride] for i in
+   range(n_inner), for o in range(n_outer); n_inner >= 1.  If there are
+   fewer results than threads, each reduction is also split between
+   several threads, whose partial results are then combined.  Called with
+   the GIL released.  Returns 0, or -1 if out of memory. */
+RPY_EXTERN int pypy_numpy_reduce(int kind, int op, long n_outer,
+                                 long n_inner, char *a, long outer_stride,
+                                 long inner_stride, char *out, long nthreads)
+{
+    struct reduce_args args[MAX_THREADS];
+    char *partials = NULL;
+    long i, max_threads, chunks, per_thread, elsize;
+
+    max_threads = (long)((double)n_outer * n_inner / MIN_ITEMS_PER_THREAD);
+    if (nthreads > max_threads)
+        nthreads = max_threads;
+    if (nthreads > MAX_THREADS)
+        nthreads = MAX_THREADS;
+    if (nthreads < 1)
+        nthreads = 1;
+#ifndef REDUCE_THREADS
+    nthreads = 1;
+#endif
+    elsize = (kind == 0) ? sizeof(float) : sizeof(double);
+    if (n_outer >= nthreads) {
+        /* split the results */
+        chunks = 1;
+        per_thread = (n_outer + nthreads - 1) / nthreads;
+        for (i = 0; i < nthreads; i++) {
+            args[i].o0 = MIN(i * per_thread, n_outer);
+            args[i].o1 = MIN((i + 1) * per_thread, n_outer);
+            args[i].i0 = 0;
+            args[i].i1 = n_inner;
+            args[i].out = out;
+        }
+    }
+    else {
+        /* split each reduction in 'chunks' parts, the thread i computes
+           the part i % chunks of the result i / chunks */
+        chunks = nthreads / n_outer;
+        nthreads = chunks * n_outer;
+        partials = malloc(elsize * nthreads);
+        if (partials == NULL)
+            return -1;
+        per_thread = (n_inner + chunks - 1) / chunks;
+        per_thread = (per_thread + PW_BLOCKSIZE - 1) / PW_BLOCKSIZE *
+                     PW_BLOCKSIZE;
+        for (i = 0; i < nthreads; i++) {
+            long c = i % chunks;
+            args[i].o0 = i / chunks;
+            args[i].o1 = i / chunks + 1;
+            args[i].i0 = MIN(c * per_thread, n_inner);
+            args[i].i1 = MIN((c + 1) * per_thread, n_inner);
+            /* reduce_*() writes out[o]: shift it to partials[i] */
+            args[i].out = partials + (i - args[i].o0) * elsize;
+        }
+    }
+    for (i = 0; i < nthreads; i++) {
+        args[i].kind = kind;
+        args[i].op = op;
+        args[i].a = a;
+        args[i].n_outer = n_outer;
+        args[i].n_inner = n_inner;
+        args[i].outer_stride = outer_stride;
+        args[i].inner_stride = inner_stride;
+        if (args[i].i0 == args[i].i1)
+            args[i].o1 = args[i].o0;    /* nothing to do */
+    }
+#ifdef REDUCE_THREADS
+    {
+        pthread_t threads[MAX_THREADS];
+        int started[MAX_THREADS];
+        for (i = 1; i < nthreads; i++)
+            started[i] = pthread_create(&threads[i], NULL, reduce_thread,
+                                        &args[i]) == 0;
+        reduce_thread(&args[0]);
+        for (i = 1; i < nthreads; i++) {
+            if (started[i])
+                pthread_join(threads[i], NULL);
+            else
+                reduce_thread(&args[i]);  /* no thread: do it here */
+        }
+    }
+#else
+    reduce_thread(&args[0]);
+#endif
+    if (partials != NULL) {
+        long o, c;
+        for (o = 0; o < n_outer; o++) {
+            for (c = 0; c < chunks; c++) {
+                struct reduce_args *r = &args[o * chunks + c];
+                if (r->o0 == r->o1)
+                    break;      /* this part and the next ones are empty */
+                if (kind == 0) {
+                    float x = ((float *)partials)[o * chunks + c];
+                    ((float *)out)[o] = c == 0 ? x :
+                        combine_s(op, ((float *)out)[o], x);
+                }
+                else {
+                    double x = ((double *)partials)[o * chunks + c];
+                    ((double *)out)[o] = c == 0 ? x :
+                        combine_d(op, ((double *)out)[o], x);
+                }
+            }
+        }
+        free(partials);
+    }
+    return 0;
+}
+"""])
+
+c_reduce = rffi.llexternal('pypy_numpy_reduce',
+                           [rffi.INT, rffi.INT, rffi.LONG, rffi.LONG,
+                            rffi.CCHARP, rffi.LONG, rffi.LONG,
+                            rffi.CCHARP, rffi.LONG], rffi.INT,
+                           compilation_info=eci, releasegil=True)
+
+
+class ReduceThreads(object):
+    def __init__(self, space):
+        self.nthreads = 1
+
+def get_reduce_threads(space):
+    return space.fromcache(ReduceThreads).nthreads
+
+@unwrap_spec(nthreads=int)
+def set_reduce_threads(space, nthreads):
+    """set_reduce_threads(nthreads) -> previous value
+
+    Let sum(), prod(), max(), min() and mean() of large float arrays use up
+    to 'nthreads' threads.  The default is 1.  PyPy extension."""
+    if nthreads < 1:
+        raise oefmt(space.w_ValueError, "nthreads must be >= 1")
+    cache = space.fromcache(ReduceThreads)
+    old = cache.nthreads
+    cache.nthreads = nthreads
+    return space.newint(old)
+
+
+def _collapse(shape, strides, axis_flags, reduced, elsize):
+    """The number of items and the stride, in items, of the dimensions of
+    an array that are reduced (or kept, if not 'reduced'), seen as a single
+    dimension; or (-1, 0) if they cannot be."""
+    count = 1
+    stride = 0
+    for i in range(len(shape) - 1, -1, -1):
+        if axis_flags[i] != reduced or shape[i] == 1:
+            continue
+        if strides[i] % elsize != 0:
+            return -1, 0
+        if count == 1:
+            stride = strides[i] // elsize
+        elif strides[i] != stride * count * elsize:
+            return -1, 0
+        count *= shape[i]
+    return count, stride
+
+def reduce(space, ufunc_name, w_arr, axis_flags, dtype, out):
+    """Compute out = reduction of w_arr along the axes of 'axis_flags' with
+    pypy_numpy_reduce(), if parallel reductions are enabled and it supports
+    these arrays, and return True; otherwise return False."""
+    nthreads = get_reduce_threads(space)
+    if nthreads <= 1:
+        return False
+    if ufunc_name not in REDUCE_OPS:
+        return False
+    if dtype.num not in REDUCE_KINDS or not dtype.is_native():
+        return False
+    for arr in [w_arr, out]:
+        arr_dtype = arr.get_dtype()
+        if arr_dtype.num != dtype.num or not arr_dtype.is_native():
+            return False
+    if (w_arr.get_size() < REDUCE_MIN_SIZE or
+            not out.implementation.flags & NPY.ARRAY_C_CONTIGUOUS):
+        return False
+    elsize = dtype.elsize
+    shape = w_arr.get_shape()
+    strides = w_arr.implementation.get_strides()
+    n_inner, inner_stride = _collapse(shape, strides, axis_flags, True,
+                                      elsize)
+    n_outer, outer_stride = _collapse(shape, strides, axis_flags, False,
+                                      elsize)
+    if n_inner < 1 or n_outer < 1 or n_outer != out.get_size():
+        return False
+    with w_arr.implementation as a_storage:
+        with out.implementation as out_storage:
+            a = support.get_storage_as_int(a_storage, w_arr.get_start())
+            o = support.get_storage_as_int(out_storage, out.get_start())
+            res = c_reduce(rffi.cast(rffi.INT, REDUCE_KINDS[dtype.num]),
+                           rffi.cast(rffi.INT, REDUCE_OPS[ufunc_name]),
+                           n_outer, n_inner,
+                           rffi.cast(rffi.CCHARP, a), outer_stride,
+                           inner_stride, rffi.cast(rffi.CCHARP, o), nthreads)
+    if intmask(res) < 0:
+        raise MemoryError
+    return True
+
+def reduce_flat(space, ufunc_name, w_arr, dtype):
+    """Like reduce() for all the axes: return the result as a box, or None
+    if it must be computed by loop.reduce_flat()."""
+    if get_reduce_threads(space) <= 1:
+        return None
+    w_res = W_NDimArray.from_shape(space, [], dtype)
+    axis_flags = [True] * len(w_arr.get_shape())
+    if not reduce(space, ufunc_name, w_arr, axis_flags, dtype, w_res):
+        return None
+    return w_res.get_scalar_value()
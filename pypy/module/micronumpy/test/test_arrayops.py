@@ -139,6 +139,54 @@ class AppTestNumSupport(BaseNumpyAppTest):
         assert exc.value[0] == ('output array is not acceptable (must have the '
                                 'right type, nr dimensions, and be a C-Array)')
 
+    def test_dot_gemm(self):
+        import numpy as np
+        import _numpypy
+        def check(a, b):
+            c = np.dot(a, b)
+            a2 = a.reshape(1, a.shape[0]) if a.ndim == 1 else a
+            b2 = b.reshape(b.shape[0], 1) if b.ndim == 1 else b
+            c2 = c.reshape(a2.shape[0], b2.shape[1])
+            m, n = c2.shape
+            for i in set([0, min(1, m - 1), m // 2, m - 1]):
+                for j in set([0, n // 2, n - 2, n - 1]):
+                    expected = (a2[i, :] * b2[:, j]).sum()
+                    assert abs(c2[i, j] - expected) <= 1e-3 * abs(expected)
+            return c
+        for dtype in ['float32', 'float64', 'complex64', 'complex128']:
+            a = np.arange(20 * 300, dtype=dtype).reshape(20, 300) / 100
+            b = np.arange(300 * 17, dtype=dtype).reshape(300, 17) / 100
+            if dtype.startswith('complex'):
+                a = a + 1j * a[:, ::-1]
+                b = b - 2j
+            c = check(a, b)
+            assert c.dtype == dtype and c.shape == (20, 17)
+            check(b.T, a.T)
+            check(a[::2, 1::3], b[::3, :5])
+            check(a, b[:, 4])
+            check(a[3], b)
+        a = np.ones((16, 32))
+        out = np.zeros((16, 16))
+        assert np.dot(a, a.T, out=out) is out
+        assert (out == 32).all()
+        assert np.dot(a, np.ones((32, 0))).shape == (16, 0)
+        assert (np.dot(np.ones((20, 0)), np.ones((0, 30))) == 0).all()
+
+    def test_dot_threads(self):
+        import numpy as np
+        import _numpypy
+        raises(ValueError, _numpypy.set_dot_threads, 0)
+        old = _numpypy.set_dot_threads(3)
+        try:
+            a = np.arange(150 * 100.).reshape(150, 100) % 7
+            b = np.ones((100, 120))
+            c = np.dot(a, b)
+            rowsums = a.sum(axis=1)
+            for i in range(150):
+                assert (c[i] == rowsums[i]).all()
+        finally:
+            assert _numpypy.set_dot_threads(old) == 3
+
     def test_choose_basic(self):
         from numpy import array
         a, b, c = array([1, 2, 3]), array([4, 5, 6]), array([7, 8, 9])
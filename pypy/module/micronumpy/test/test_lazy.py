@@ -0,0 +1,131 @@
+from pypy.module.micronumpy.test.test_base import BaseNumpyAppTest
+
+
+class AppTestLazy(BaseNumpyAppTest):
+    def test_lazy_expression(self):
+        import numpy as np
+        from _numpypy import lazy
+        a = np.arange(12.).reshape(3, 4)
+        b = np.arange(12.).reshape(3, 4) % 5
+        c = np.arange(4) + 1
+        x = lazy(a) * b + c * 2.5 - 1
+        assert type(x).__name__ == 'lazyarray'
+        assert not x.forced
+        assert x.shape == (3, 4)
+        assert x.dtype == np.float64
+        assert x.ndim == 2 and x.size == 12
+        assert not x.forced
+        expected = a * b + c * 2.5 - 1
+        assert (x[...] == expected).all()
+        assert x.forced
+        assert (np.array(x) == expected).all()
+        assert type(x.force()) is np.ndarray
+
+    def test_lazy_ufuncs(self):
+        import numpy as np
+        from _numpypy import lazy
+        a = np.array([1, -2, 3, -4], dtype=np.int32)
+        b = np.array([0.5, 1.5, 2.5, 3.5], dtype=np.float32)
+        for x, expected in [
+                (np.sqrt(abs(lazy(a))) + b, np.sqrt(abs(a)) + b),
+                (-lazy(a) * 2, -a * 2),
+                (3 - lazy(a), 3 - a),
+                (a / lazy(b), a / b),
+                (np.maximum(lazy(a), b), np.maximum(a, b)),
+                (lazy(a) < b, a < b),
+                (b ** lazy(a)[...], b ** a),
+                (lazy(a) + a[::-1], a + a[::-1]),
+                (lazy(a).reshape(2, 2) + [1, 2], a.reshape(2, 2) + [1, 2])]:
+            assert x.dtype == expected.dtype
+            assert x.shape == expected.shape
+            assert (x[...] == expected).all()
+
+    def test_lazy_forced_by(self):
+        import numpy as np
+        from _numpypy import lazy
+        a = np.arange(5)
+        assert lazy(a + 1).sum() == 15
+        assert (lazy(a) + 1).sum() == 15
+        assert np.add.reduce(lazy(a) + 1) == 15
+        assert repr(lazy(a) * 2) == 'array([0, 2, 4, 6, 8])'
+        assert str(lazy(a) * 2) == '[0 2 4 6 8]'
+        assert len(lazy(a) * 2) == 5
+        assert list(lazy(a) * 2) == [0, 2, 4, 6, 8]
+        assert str(buffer(lazy(a) * 2)) == str(buffer(a * 2))
+        x = lazy(a) * 2
+        x[0] = 7
+        assert x[0] == 7
+        out = np.zeros(5)
+        assert np.add(lazy(a), 1, out=out) is out
+        assert (out == a + 1).all()
+
+    def test_lazy_errors(self):
+        import numpy as np
+        from _numpypy import lazy
+        raises(ValueError, lazy, 5)
+        raises(ValueError, "lazy(np.ones(3)) + np.ones(4)")
+        x = lazy(np.array(['a', 'b']))
+        raises(TypeError, "x + x")
+
+    def test_lazy_operators(self):
+        import numpy as np
+        from _numpypy import lazy
+        import operator
+        a = np.array([7, -3, 12, 5], dtype=np.int32)
+        b = np.array([2, 5, 3, 1], dtype=np.int32)
+        for op in [operator.floordiv, operator.mod, operator.and_,
+                   operator.or_, operator.xor, operator.lshift,
+                   operator.rshift]:
+            for x, expected in [(op(lazy(a), b), op(a, b)),
+                                (op(a, lazy(b)), op(a, b)),
+                                (op(lazy(a), 2), op(a, 2)),
+                                (op(9, lazy(b)), op(9, b))]:
+                assert type(x).__name__ == 'lazyarray'
+                assert x.dtype == expected.dtype
+                assert (x[...] == expected).all()
+        x = ~lazy(a)
+        assert type(x).__name__ == 'lazyarray'
+        assert (x[...] == ~a).all()
+        for q, r in [divmod(lazy(a), b), divmod(a, lazy(b))]:
+            assert (q[...] == divmod(a, b)[0]).all()
+            assert (r[...] == divmod(a, b)[1]).all()
+
+    def test_lazy_inplace(self):
+        import numpy as np
+        from _numpypy import lazy
+        import operator
+        a = np.array([7, -3, 12, 5])
+        for op in [operator.iadd, operator.isub, operator.imul,
+                   operator.ifloordiv, operator.imod, operator.ipow,
+                   operator.ilshift, operator.irshift, operator.iand,
+                   operator.ior, operator.ixor]:
+            x = lazy(a) * 1
+            y = a * 1
+            res = op(x, 2)
+            assert res is x
+            assert (x[...] == op(y, 2)).all()
+        x = lazy(a) * 1.
+        x /= 2
+        assert (x[...] == a / 2.).all()
+        x += lazy(a)
+        assert (x[...] == a / 2. + a).all()
+
+    def test_lazy_forced_conversions(self):
+        import numpy as np
+        from _numpypy import lazy
+        for a in [np.array([0]), np.array([3]), np.array([2.5])]:
+            x = lazy(a) + 0
+            assert bool(x) == bool(a)
+            assert int(x) == int(a)
+            assert long(x) == long(a)
+            assert float(x) == float(a)
+        raises(ValueError, bool, lazy(np.array([1, 2])) + 0)
+        x = lazy(np.array([3])) * 2
+        assert [1, 2, 3, 4, 5, 6, 7][x] == 7
+        assert hex(x) == hex(np.array([6]))
+        assert oct(x) == oct(np.array([6]))
+        x = lazy(np.arange(4)) * 2
+        assert 6 in x
+        assert 5 not in x
+        x = lazy(np.arange(3)) + 1
+        assert hash(x) == hash(x.force())
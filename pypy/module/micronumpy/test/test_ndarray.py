@@ -2729,6 +2729,87 @@ class AppTestNumArrayFromBuffer(BaseNumpyAppTest):
         buf.close()
         f.close()
 
+    def test_tofile_fromfile(self):
+        import numpy as np
+        from StringIO import StringIO
+        a = np.arange(12, dtype='int32').reshape(3, 4)
+        a.tofile(self.tmpname)
+        b = np.fromfile(self.tmpname, dtype='int32')
+        assert b.shape == (12,)
+        assert (b == np.arange(12)).all()
+        b = np.fromfile(self.tmpname, dtype='int32', count=5)
+        assert list(b) == [0, 1, 2, 3, 4]
+        # the items of non-contiguous arrays are written in C order
+        a.T.tofile(self.tmpname)
+        assert list(np.fromfile(self.tmpname, dtype='int32')[:4]) == [
+            0, 4, 8, 1]
+        # reading and writing at the position of file objects
+        f = open(self.tmpname, 'wb')
+        f.write('xy')
+        np.array([1.5, 2.5]).tofile(f)
+        np.array([3.5]).tofile(f)
+        assert f.tell() == 2 + 3 * 8
+        f.close()
+        f = open(self.tmpname, 'rb')
+        assert f.read(2) == 'xy'
+        assert list(np.fromfile(f, count=2)) == [1.5, 2.5]
+        assert f.tell() == 2 + 2 * 8
+        # at the end of the file, only the items read
+        assert list(np.fromfile(f, count=10)) == [3.5]
+        assert np.fromfile(f).shape == (0,)
+        f.close()
+        # files without a file descriptor
+        s = StringIO()
+        np.array([7, 8], dtype='int16').tofile(s)
+        s.seek(0)
+        assert list(np.fromfile(s, dtype='int16')) == [7, 8]
+        raises(ValueError, np.fromfile, self.tmpname, dtype=object)
+
+    def test_tofile_fromfile_text(self):
+        import numpy as np
+        np.array([[1, 2], [3, 4]]).tofile(self.tmpname, sep=',')
+        assert open(self.tmpname).read() == '1,2,3,4'
+        b = np.fromfile(self.tmpname, dtype=int, sep=',')
+        assert list(b) == [1, 2, 3, 4]
+        np.array([0.5, 1.25]).tofile(self.tmpname, sep=' ', format='%.1f')
+        assert open(self.tmpname).read() == '0.5 1.2'
+
+    def test_memmap(self):
+        import numpy as np
+        a = np.memmap(self.tmpname, dtype='float32', mode='w+', shape=(3, 4))
+        assert isinstance(a, np.memmap)
+        assert a.shape == (3, 4)
+        assert a.mode == 'w+'
+        assert a.offset == 0
+        assert (a == 0).all()
+        a[:] = np.arange(12).reshape(3, 4)
+        # views share the mapping
+        b = a[1]
+        assert isinstance(b, np.memmap)
+        assert b._mmap is a._mmap
+        b[0] = 42
+        a.flush()
+        assert list(np.fromfile(self.tmpname, dtype='float32')[:6]) == [
+            0, 1, 2, 3, 42, 5]
+        # the results of ufuncs are plain arrays
+        c = a + 1
+        assert type(c) is np.ndarray
+        a.prefault()
+        del a, b
+        r = np.memmap(self.tmpname, dtype='float32', mode='r')
+        assert r.shape == (12,)
+        assert r[4] == 42
+        raises(ValueError, "r[0] = 1")
+        c = np.memmap(self.tmpname, dtype='float32', mode='c', shape=(2, 2),
+                      offset=8, order='F')
+        assert c.offset == 8
+        assert c[1, 0] == 3
+        assert c[0, 1] == 42
+        c[0, 0] = -1
+        assert np.memmap(self.tmpname, dtype='float32')[2] == 2
+        raises(ValueError, np.memmap, self.tmpname, mode='w')
+        raises(ValueError, np.memmap, self.tmpname, mode='w+')
+
 
 class AppTestMultiDim(BaseNumpyAppTest):
     def test_init(self):
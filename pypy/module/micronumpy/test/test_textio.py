@@ -0,0 +1,109 @@
+from pypy.module.micronumpy.test.test_base import BaseNumpyAppTest
+
+
+class AppTestLoadtxt(BaseNumpyAppTest):
+    def setup_class(cls):
+        from rpython.tool.udir import udir
+        BaseNumpyAppTest.setup_class.im_func(cls)
+        cls.w_tmpname = cls.space.wrap(str(udir.join('loadtxt-')))
+
+    def test_whitespace_and_comments(self):
+        import numpy as np
+        from _numpypy import loadtxt
+        with open(self.tmpname, 'w') as f:
+            f.write('# x y z\n1 2.5 -3\n\n  4\t5e1 6  # six\r\n7 8 nan')
+        a = loadtxt(self.tmpname)
+        assert a.dtype == np.float64
+        assert a.shape == (3, 3)
+        assert list(a[0]) == [1, 2.5, -3]
+        assert list(a[1]) == [4, 50, 6]
+        assert np.isnan(a[2, 2])
+        from StringIO import StringIO
+        a = loadtxt(StringIO('%% 1 2\n3 4 % 5\n'), comments='%')
+        assert a.tolist() == [3, 4]
+
+    def test_delimiter(self):
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        a = loadtxt(StringIO('1, 2\n3 ,4\n'), delimiter=',')
+        assert a.tolist() == [[1, 2], [3, 4]]
+
+    def test_usecols_skiprows(self):
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        s = 'a b c\n1 2 3\n4 5 6\n7 8 9\n'
+        a = loadtxt(StringIO(s), usecols=(2, 0), skiprows=1)
+        assert a.tolist() == [[3, 1], [6, 4], [9, 7]]
+        a = loadtxt(StringIO(s), usecols=[-1, 1, 1], skiprows=2)
+        assert a.tolist() == [[6, 5, 5], [9, 8, 8]]
+        a = loadtxt(StringIO(s), usecols=1, skiprows=1)
+        assert a.tolist() == [2, 5, 8]
+
+    def test_ndmin_unpack(self):
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        assert loadtxt(StringIO('1 2 3')).shape == (3,)
+        assert loadtxt(StringIO('1\n2\n3')).shape == (3,)
+        assert loadtxt(StringIO('5')).shape == ()
+        assert loadtxt(StringIO('5'), ndmin=1).shape == (1,)
+        assert loadtxt(StringIO('1 2 3'), ndmin=2).shape == (1, 3)
+        assert loadtxt(StringIO(''), ndmin=1).shape == (0,)
+        assert loadtxt(StringIO(''), ndmin=2).shape == (0, 1)
+        raises(ValueError, loadtxt, StringIO('1'), ndmin=3)
+        x, y = loadtxt(StringIO('1 2\n3 4\n5 6'), unpack=True)
+        assert list(x) == [1, 3, 5]
+        assert list(y) == [2, 4, 6]
+
+    def test_int_dtypes(self):
+        import numpy as np
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        a = loadtxt(StringIO('1 -2\n3 4'), dtype='int16')
+        assert a.dtype == np.int16
+        assert a.tolist() == [[1, -2], [3, 4]]
+        # like numpy, the integers may be written as floats
+        a = loadtxt(StringIO('1\n2.0\n3.7\n'), dtype=int)
+        assert list(a) == [1, 2, 3]
+        a = loadtxt(StringIO('0 2 0'), dtype=bool)
+        assert list(a) == [False, True, False]
+
+    def test_growth(self):
+        import numpy as np
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        # more items than the initial size of the array
+        s = ''.join(['%d;%d\n' % (i, -i) for i in range(5000)])
+        a = loadtxt(StringIO(s), delimiter=';', dtype='int32')
+        assert a.shape == (5000, 2)
+        assert (a[:, 0] == np.arange(5000)).all()
+        assert (a[:, 1] == -np.arange(5000)).all()
+
+    def test_long_lines(self):
+        from _numpypy import loadtxt
+        class Chunks(object):
+            # returns the data in pieces much smaller than a line
+            def __init__(self, data):
+                self.data = data
+            def read(self, size):
+                piece, self.data = self.data[:7], self.data[7:]
+                return piece
+        line = ' '.join([str(i) for i in range(100)])
+        a = loadtxt(Chunks(line + '\n' + line + '\n' + line))
+        assert a.shape == (3, 100)
+        assert list(a[2]) == range(100)
+
+    def test_errors(self):
+        from _numpypy import loadtxt
+        from StringIO import StringIO
+        exc = raises(ValueError, loadtxt, StringIO('1 2\n\n3\n'))
+        assert str(exc.value) == 'Wrong number of columns at line 3'
+        exc = raises(ValueError, loadtxt, StringIO('1 2\n3\n'), usecols=[1])
+        assert str(exc.value) == 'Wrong number of columns at line 2'
+        exc = raises(ValueError, loadtxt, StringIO('1 x\n'))
+        assert str(exc.value) == 'could not convert string to float: x'
+        exc = raises(ValueError, loadtxt, StringIO('1,,2\n'), delimiter=',')
+        assert str(exc.value) == 'could not convert string to float: '
+        raises(OverflowError, loadtxt, StringIO('1e30\n'), dtype=int)
+        raises(NotImplementedError, loadtxt, StringIO('1\n'), dtype='S3')
+        raises(NotImplementedError, loadtxt, StringIO('1\n'),
+               converters={0: float})
@@ -1171,6 +1171,49 @@ class AppTestUfuncs(BaseNumpyAppTest):
         assert (add.reduce(a, 1) == [6.0, 22.0, 38.0]).all()
         raises(ValueError, add.reduce, a, 2)
 
+    def test_reduce_pairwise(self):
+        import numpy as np
+        # summed one by one, the rounding errors would add up to ~2e-8
+        a = np.ones(100000) * 0.1
+        assert abs(a.sum() - 10000) < 1e-10
+        b = a.reshape(50000, 2)
+        assert (abs(b.sum(axis=0) - 5000) < 1e-10).all()
+        c = np.arange(1000.) % 7 - 3
+        c[500] = np.nan
+        assert np.isnan(c.max()) and np.isnan(c.min())
+        c[500] = 42
+        assert c.max() == 42 and c.min() == -3
+        assert abs((np.ones(300) * 1.01).prod() / 1.01 ** 300 - 1) < 1e-14
+        assert np.arange(1000).sum() == 499500
+        assert (np.arange(1000) + 1j).sum() == 499500 + 1000j
+
+    def test_reduce_threads(self):
+        import numpy as np
+        import _numpypy
+        raises(ValueError, _numpypy.set_reduce_threads, 0)
+        a = np.arange(70000.) % 7
+        a2 = a.reshape(10, 7000)
+        f = a.astype(np.float32)
+        expected = [a.sum(), a.max(), a.min(), (a + 1).prod(),
+                    a2.sum(axis=0), a2.sum(axis=1), a2.max(axis=1),
+                    a2.T.sum(axis=0), a2.sum(axis=1, keepdims=True),
+                    f.sum(), a2[:, ::2].min(axis=1)]
+        old = _numpypy.set_reduce_threads(4)
+        try:
+            results = [a.sum(), a.max(), a.min(), (a + 1).prod(),
+                       a2.sum(axis=0), a2.sum(axis=1), a2.max(axis=1),
+                       a2.T.sum(axis=0), a2.sum(axis=1, keepdims=True),
+                       f.sum(), a2[:, ::2].min(axis=1)]
+            for x, y in zip(results, expected):
+                assert type(x) is type(y)
+                assert np.array(x).shape == np.array(y).shape
+                assert (x == y).all()
+            a[12345] = np.nan
+            assert np.isnan(a.max()) and np.isnan(a.min())
+            assert np.isnan(a2.max(axis=1)[1])
+        finally:
+            assert _numpypy.set_reduce_threads(old) == 4
+
     def test_reduce_keepdims(self):
         from numpy import add, arange
         a = arange(12).reshape(3, 4)
@@ -400,6 +400,17 @@ class TestNumpyJit(LLJitMixin):
         assert result == sum(range(30)) + sum(range(60))
         self.check_vectorized(1, 0)
 
+    def define_sum_pairwise():
+        return """
+        a = |1000|
+        sum(a)
+        """
+
+    def test_sum_pairwise(self):
+        result = self.run("sum_pairwise")
+        assert result == sum(range(1000))
+        self.check_vectorized(1, 0)
+
     def define_sum_float_to_int16():
         return """
         a = |30|
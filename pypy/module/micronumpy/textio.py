@@ -0,0 +1,285 @@
+"""
+loadtxt() at interp-level.  The file is read in chunks, the items of each
+line are parsed with the parsers of rarithmetic and rfloat (which is based
+on rdtoa) and stored straight into the storage of an array, which grows
+geometrically, without building the lists of strings and of floats of the
+app-level loadtxt() of numpy.
+"""
+
+from rpython.rlib.rarithmetic import string_to_int, ovfcheck_float_to_int
+from rpython.rlib.rfloat import string_to_float
+from rpython.rlib.rstring import ParseStringError, ParseStringOverflowError
+from rpython.rtyper.lltypesystem import rffi
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module.micronumpy import descriptor, support
+from pypy.module.micronumpy.base import W_NDimArray
+
+# the size of the pieces of the file read at once
+CHUNK_SIZE = 1 << 20
+# the number of items of the array at first, doubled when it is full
+INITIAL_SIZE = 1024
+
+
+def _is_space(c):
+    return (c == ' ' or c == '\t' or c == '\n' or c == '\r' or c == '\f' or
+            c == '\v')
+
+
+class TextReader(object):
+    """Parses the lines of a text file into an array of 'dtype'."""
+
+    def __init__(self, space, dtype, comments, delimiter, skiprows, usecols):
+        self.space = space
+        self.dtype = dtype
+        self.comments = comments
+        self.delimiter = delimiter
+        self.skiprows = skiprows
+        self.usecols = usecols
+        self.ncols = -1
+        self.nrows = 0
+        self.lineno = 0
+        # the number of items stored in self.arr
+        self.count = 0
+        self.arr = W_NDimArray.from_shape(space, [INITIAL_SIZE], dtype,
+                                          zero=False)
+        # the bounds of the fields of the current line
+        self.starts = []
+        self.ends = []
+
+    def read(self, w_file):
+        space = self.space
+        # the start of the current line, in pieces: a line may be longer
+        # than several chunks
+        pending = []
+        while True:
+            s = space.bytes_w(space.call_method(w_file, 'read',
+                                                space.newint(CHUNK_SIZE)))
+            if not s:
+                break
+            first = s.find('\n')
+            if first < 0:
+                pending.append(s)
+                continue
+            # the line split between this chunk and the previous ones
+            assert first >= 0
+            pending.append(s[:first])
+            line = ''.join(pending)
+            self.parse_line(line, 0, len(line))
+            pos = first + 1
+            while True:
+                end = s.find('\n', pos)
+                if end < 0:
+                    break
+                self.parse_line(s, pos, end)
+                pos = end + 1
+            assert pos >= 0
+            pending = [s[pos:]]
+            space.getexecutioncontext().checksignals()
+        line = ''.join(pending)
+        if line:
+            self.parse_line(line, 0, len(line))
+
+    def parse_line(self, s, start, end):
+        assert start >= 0
+        self.lineno += 1
+        if self.lineno <= self.skiprows:
+            return
+        if self.comments:
+            i = s.find(self.comments, start, end)
+            if i >= 0:
+                end = i
+        while start < end and _is_space(s[start]):
+            start += 1
+        while end > start and _is_space(s[end - 1]):
+            end -= 1
+        if start == end:
+            return
+        assert end >= 0
+        nfields = self.split(s, start, end)
+        if self.usecols is None:
+            if self.ncols < 0:
+                self.ncols = nfields
+            elif nfields != self.ncols:
+                raise oefmt(self.space.w_ValueError,
+                            "Wrong number of columns at line %d", self.lineno)
+            self.reserve(nfields)
+            for j in range(nfields):
+                self.store(s, self.starts[j], self.ends[j], self.count + j)
+        else:
+            usecols = self.usecols
+            self.ncols = len(usecols)
+            self.reserve(len(usecols))
+            for j in range(len(usecols)):
+                col = usecols[j]
+                if col < 0:
+                    col += nfields
+                if not 0 <= col < nfields:
+                    raise oefmt(self.space.w_ValueError,
+                                "Wrong number of columns at line %d",
+                                self.lineno)
+                self.store(s, self.starts[col], self.ends[col],
+                           self.count + j)
+        self.count += self.ncols
+        self.nrows += 1
+
+    def split(self, s, start, end):
+        """Find the fields of s[start:end] and put their bounds into
+        self.starts and self.ends.  Returns the number of fields."""
+        delimiter = self.delimiter
+        n = 0
+        pos = start
+        while True:
+            if not delimiter:
+                fieldend = pos
+                while fieldend < end and not _is_space(s[fieldend]):
+                    fieldend += 1
+                nextpos = fieldend
+                while nextpos < end and _is_space(s[nextpos]):
+                    nextpos += 1
+                last = nextpos >= end
+            else:
+                fieldend = s.find(delimiter, pos, end)
+                last = fieldend < 0
+                if last:
+                    fieldend = end
+                nextpos = fieldend + len(delimiter)
+            if n == len(self.starts):
+                self.starts.append(pos)
+                self.ends.append(fieldend)
+            else:
+                self.starts[n] = pos
+                self.ends[n] = fieldend
+            n += 1
+            if last:
+                return n
+            pos = nextpos
+
+    def store(self, s, start, end, index):
+        while start < end and _is_space(s[start]):
+            start += 1
+        while end > start and _is_space(s[end - 1]):
+            end -= 1
+        assert start >= 0
+        assert end >= start
+        field = s[start:end]
+        dtype = self.dtype
+        if dtype.is_float():
+            box = dtype.box(self.parse_float(field))
+        else:
+            box = dtype.box(self.parse_int(field))
+        impl = self.arr.implementation
+        dtype.store(impl, impl.start + index * dtype.elsize, 0, box)
+
+    def parse_float(self, field):
+        try:
+            return string_to_float(field)
+        except ParseStringError:
+            raise oefmt(self.space.w_ValueError,
+                        "could not convert string to float: %s", field)
+
+    def parse_int(self, field):
+        try:
+            return string_to_int(field)
+        except ParseStringOverflowError:
+            raise oefmt(self.space.w_OverflowError,
+                        "Python int too large to convert to C long")
+        except ParseStringError:
+            pass
+        # like numpy, the integers may be written as floats
+        try:
+            return ovfcheck_float_to_int(self.parse_float(field))
+        except OverflowError:
+            raise oefmt(self.space.w_OverflowError,
+                        "cannot convert float %s to integer", field)
+
+    def reserve(self, n):
+        """Make room in self.arr for 'n' more items."""
+        size = self.arr.get_size()
+        if self.count + n <= size:
+            return
+        while size < self.count + n:
+            size *= 2
+        self.arr = self.copy_items([size])
+
+    def copy_items(self, shape):
+        """A new array of 'shape' starting with the items read so far."""
+        arr = W_NDimArray.from_shape(self.space, shape, self.dtype,
+                                     zero=False)
+        with self.arr.implementation as src_storage:
+            with arr.implementation as dst_storage:
+                src = support.get_storage_as_int(src_storage,
+                                                 self.arr.get_start())
+                dst = support.get_storage_as_int(dst_storage, arr.get_start())
+                rffi.c_memcpy(rffi.cast(rffi.VOIDP, dst),
+                              rffi.cast(rffi.VOIDP, src),
+                              rffi.cast(rffi.SIZE_T,
+                                        self.count * self.dtype.elsize))
+        return arr
+
+    def get_result(self, ndmin):
+        if self.ncols < 0:
+            # no data
+            if ndmin == 2:
+                return self.copy_items([0, 1])
+            return self.copy_items([0])
+        shape = [self.nrows, self.ncols]
+        if ndmin < 2:
+            shape = [dim for dim in shape if dim != 1]
+            if ndmin == 1 and not shape:
+                shape = [1]
+        return self.copy_items(shape)
+
+
+@unwrap_spec(skiprows=int, unpack=bool, ndmin=int)
+def loadtxt(space, w_fname, w_dtype=None, w_comments=None, w_delimiter=None,
+            w_converters=None, skiprows=0, w_usecols=None, unpack=False,
+            ndmin=0):
+    """loadtxt(fname, dtype=float, comments='#', delimiter=None,
+            converters=None, skiprows=0, usecols=None, unpack=False, ndmin=0)
+
+    Load the numbers of a text file, like numpy.loadtxt(), for integer,
+    boolean and float dtypes and without converters.  PyPy extension."""
+    dtype = space.interp_w(descriptor.W_Dtype,
+        space.call_function(space.gettypefor(descriptor.W_Dtype), w_dtype))
+    if not (dtype.is_int() or dtype.is_float()) or dtype.is_record():
+        raise oefmt(space.w_NotImplementedError,
+                    "loadtxt() of %s items is not supported",
+                    dtype.get_name())
+    if not space.is_none(w_converters):
+        raise oefmt(space.w_NotImplementedError,
+                    "loadtxt() with converters is not supported")
+    if ndmin not in (0, 1, 2):
+        raise oefmt(space.w_ValueError, "Illegal value of ndmin keyword: %d",
+                    ndmin)
+    if w_comments is None:
+        comments = '#'
+    elif space.is_none(w_comments):
+        comments = ''
+    else:
+        comments = space.text_w(w_comments)
+    delimiter = ''
+    if not space.is_none(w_delimiter):
+        delimiter = space.text_w(w_delimiter)
+    usecols = None
+    if not space.is_none(w_usecols):
+        if space.isinstance_w(w_usecols, space.w_int):
+            usecols = [space.int_w(w_usecols)]
+        else:
+            usecols = [space.int_w(w_col) for w_col in
+                       space.listview(w_usecols)]
+    reader = TextReader(space, dtype, comments, delimiter, skiprows, usecols)
+    if space.isinstance_w(w_fname, space.w_basestring):
+        w_file = space.call_function(space.builtin.get('open'), w_fname,
+                                     space.newtext('rb'))
+        try:
+            reader.read(w_file)
+        finally:
+            space.call_method(w_file, 'close')
+    else:
+        reader.read(w_fname)
+    arr = reader.get_result(ndmin)
+    if unpack:
+        return arr.descr_get_transpose(space)
+    return arr
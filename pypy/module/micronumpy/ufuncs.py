@@ -11,7 +11,7 @@ from rpython.rlib.rawstorage import (
 from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib.objectmodel import keepalive_until_here, specialize
 
-from pypy.module.micronumpy import loop, constants as NPY
+from pypy.module.micronumpy import loop, lazy, reduction, constants as NPY
 from pypy.module.micronumpy.descriptor import (
     get_dtype_cache, decode_w_dtype, num2dtype)
 from pypy.module.micronumpy.base import convert_to_array, W_NDimArray
@@ -295,8 +295,15 @@ class W_Ufunc(W_Root):
                                 "output parameter for reduction operation %s has "
                                 "too many dimensions", self.name)
                 dtype = out.get_dtype()
-            res = loop.reduce_flat(
-                space, self.func, obj, dtype, self.done_func, self.identity)
+            pairwise = self.reorderable and (dtype.is_float() or
+                                             dtype.is_complex())
+            res = None
+            if pairwise:
+                res = reduction.reduce_flat(space, self.name, obj, dtype)
+            if res is None:
+                res = loop.reduce_flat(
+                    space, self.func, obj, dtype, self.done_func,
+                    self.identity, pairwise)
             if out:
                 out.set_scalar_value(res)
                 return out
@@ -360,8 +367,12 @@ class W_Ufunc(W_Root):
                 if self.identity is not None:
                     out.fill(space, self.identity.convert_to(space, dtype))
                 return out
-            loop.reduce(
-                space, self.func, obj, axis_flags, dtype, out, self.identity)
+            pairwise = self.reorderable and (dtype.is_float() or
+                                             dtype.is_complex())
+            if not (pairwise and reduction.reduce(space, self.name, obj,
+                                                  axis_flags, dtype, out)):
+                loop.reduce(space, self.func, obj, axis_flags, dtype, out,
+                            self.identity, pairwise)
             out = space.call_method(obj, '__array_wrap__', out, space.w_None)
             return out
 
@@ -451,6 +462,11 @@ class W_Ufunc1(W_Ufunc):
         self.bool_result = bool_result
 
     def call(self, space, args_w, sig, casting, extobj):
+        if lazy.has_lazy_args(args_w, self.nin):
+            w_res = lazy.record_ufunc(space, self, args_w, casting)
+            if w_res is not None:
+                return w_res
+            args_w = lazy.force_args(space, args_w)
         w_obj = args_w[0]
         out = None
         if len(args_w) > 1:
@@ -517,7 +533,7 @@ class W_Ufunc1(W_Ufunc):
 
 class W_Ufunc2(W_Ufunc):
     _immutable_fields_ = ["func", "bool_result", "done_func", "dtypes[*]",
-                          "simple_binary"]
+                          "simple_binary", "reorderable"]
     nin = 2
     nout = 1
     nargs = 3
@@ -535,6 +551,8 @@ class W_Ufunc2(W_Ufunc):
             self.done_func = done_if_true
         else:
             self.done_func = None
+        # the items of reductions can be combined in any order
+        self.reorderable = name in ('add', 'multiply', 'maximum', 'minimum')
         self.bool_result = bool_result or (self.done_func is not None)
         self.simple_binary = (
             allow_complex and allow_bool and not self.bool_result and not int_only
@@ -552,6 +570,11 @@ class W_Ufunc2(W_Ufunc):
 
     @jit.unroll_safe
     def call(self, space, args_w, sig, casting, extobj):
+        if lazy.has_lazy_args(args_w, self.nin):
+            w_res = lazy.record_ufunc(space, self, args_w, casting)
+            if w_res is not None:
+                return w_res
+            args_w = lazy.force_args(space, args_w)
         if len(args_w) > 2:
             [w_lhs, w_rhs, out] = args_w
             out = out_converter(space, out)
@@ -170,6 +170,77 @@ actually written, which may be smaller than len(data)."""
     else:
         return space.newint(res)
 
+@unwrap_spec(fd=c_int, buffersize=int, offset=r_longlong)
+def pread(space, fd, buffersize, offset):
+    """Read from a file descriptor at the given offset, without changing
+the file position."""
+    try:
+        s = rposix.pread(fd, buffersize, offset)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    else:
+        return space.newbytes(s)
+
+@unwrap_spec(fd=c_int, offset=r_longlong)
+def pwrite(space, fd, w_data, offset):
+    """Write a string to a file descriptor at the given offset, without
+changing the file position.  Return the number of bytes written."""
+    data = space.getarg_w('s*', w_data)
+    try:
+        res = rposix.pwrite(fd, data.as_str(), offset)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    else:
+        return space.newint(res)
+
+@unwrap_spec(fd=c_int)
+def readv(space, fd, w_buffers):
+    """readv(fd, buffers) -> bytesread
+
+Read from a file descriptor into a sequence of writable buffers, filling
+each one before going on to the next.  Return the total number of bytes
+read."""
+    rwbuffers = [space.getarg_w('w*', w_buf)
+                 for w_buf in space.unpackiterable(w_buffers)]
+    counts = [rwbuffer.getlength() for rwbuffer in rwbuffers]
+    try:
+        chunks = rposix.readv(fd, counts)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    total = 0
+    for i in range(len(chunks)):
+        chunk = chunks[i]
+        if chunk:
+            rwbuffers[i].setslice(0, chunk)
+            total += len(chunk)
+    return space.newint(total)
+
+@unwrap_spec(fd=c_int)
+def writev(space, fd, w_buffers):
+    """writev(fd, buffers) -> byteswritten
+
+Write the contents of a sequence of buffers to a file descriptor with a
+single system call.  Return the total number of bytes written."""
+    data = [space.getarg_w('s*', w_buf).as_str()
+            for w_buf in space.unpackiterable(w_buffers)]
+    try:
+        res = rposix.writev(fd, data)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    else:
+        return space.newint(res)
+
+@unwrap_spec(fd=c_int, offset=r_longlong, length=r_longlong, advice=c_int)
+def posix_fadvise(space, fd, offset, length, advice):
+    """posix_fadvise(fd, offset, len, advice)
+
+Announce an intention to access data in a specific pattern, so that the
+kernel can optimize its caching and readahead."""
+    try:
+        rposix.posix_fadvise(fd, offset, length, advice)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+
 @unwrap_spec(fd=c_int)
 def close(space, fd):
     """Close a file descriptor (for low level IO)."""
@@ -92,6 +92,16 @@ corresponding Unix manual entries for more information on calls."""
         interpleveldefs['fsync'] = 'interp_posix.fsync'
     if hasattr(os, 'fdatasync'):
         interpleveldefs['fdatasync'] = 'interp_posix.fdatasync'
+    for name in ['pread', 'pwrite', 'readv', 'writev', 'posix_fadvise']:
+        if hasattr(rposix, name):
+            interpleveldefs[name] = 'interp_posix.%s' % (name,)
+    if hasattr(rposix, 'posix_fadvise'):
+        for name in ['POSIX_FADV_NORMAL', 'POSIX_FADV_SEQUENTIAL',
+                     'POSIX_FADV_RANDOM', 'POSIX_FADV_NOREUSE',
+                     'POSIX_FADV_WILLNEED', 'POSIX_FADV_DONTNEED']:
+            value = getattr(rposix, name)
+            if value is not None:
+                interpleveldefs[name] = 'space.wrap(%d)' % (value,)
     if hasattr(os, 'fchdir'):
         interpleveldefs['fchdir'] = 'interp_posix.fchdir'
     if hasattr(os, 'putenv'):
@@ -850,6 +850,57 @@ class AppTestPosix:
         assert data == b'hello, world!\n'
         os.close(fd)
 
+    if hasattr(rposix, 'pread'):
+        def test_pread_pwrite(self):
+            os = self.posix
+            fd = os.open(self.path2 + 'test_pread', os.O_RDWR | os.O_CREAT,
+                         0666)
+            try:
+                os.write(fd, b'hello world')
+                assert os.pwrite(fd, b'W', 6) == 1
+                assert os.pwrite(fd, buffer(b'HE'), 0) == 2
+                assert os.lseek(fd, 0, 1) == 11
+                assert os.pread(fd, 5, 6) == b'World'
+                assert os.pread(fd, 100, 0) == b'HEllo World'
+                assert os.pread(fd, 5, 20) == b''
+                assert os.lseek(fd, 0, 1) == 11
+                raises(OSError, os.pread, fd, 5, -1)
+            finally:
+                os.close(fd)
+            raises(OSError, os.pread, fd, 5, 0)
+
+    if hasattr(rposix, 'readv'):
+        def test_readv_writev(self):
+            os = self.posix
+            fd = os.open(self.path2 + 'test_readv', os.O_RDWR | os.O_CREAT,
+                         0666)
+            try:
+                assert os.writev(fd, [b'hello', buffer(b' '),
+                                      bytearray(b'world')]) == 11
+                assert os.writev(fd, []) == 0
+                os.lseek(fd, 0, 0)
+                a = bytearray(b'xxxxxx')
+                b = bytearray(b'xxxxxxxx')
+                assert os.readv(fd, [a, b]) == 11
+                assert a == b'hello '
+                assert b == b'worldxxx'
+                assert os.readv(fd, [a]) == 0
+                raises(TypeError, os.readv, fd, [b'immutable'])
+            finally:
+                os.close(fd)
+            raises(OSError, os.writev, fd, [b'x'])
+
+    if hasattr(rposix, 'posix_fadvise'):
+        def test_posix_fadvise(self):
+            os = self.posix
+            fd = os.open(self.path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 4, os.POSIX_FADV_WILLNEED)
+                raises(OSError, os.posix_fadvise, fd, 0, 0, 1234567)
+            finally:
+                os.close(fd)
+
     def test_write_unicode(self):
         os = self.posix
         fd = os.open(self.path2 + 'test_write_unicode',
@@ -11,6 +11,7 @@ from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rtyper.tool import rffi_platform
 from rpython.rlib._rsocket_rffi import socketclose, FD_SETSIZE
 from rpython.rlib.rposix import get_saved_errno
+from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import intmask
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
 
@@ -21,28 +22,24 @@ eci = ExternalCompilationInfo(
         "RPY_EXTERN\n"
         "int pypy_epoll_ctl(int, int, int, uint32_t);"
         "RPY_EXTERN\n"
-        "int pypy_epoll_wait(int, uint32_t*, int*, int, int);"
+        "int pypy_epoll_wait(int, void*, uint32_t*, int*, int, int);"
         ],
     separate_module_sources = ['''
         int pypy_epoll_ctl(int epfd, int op, int fd, uint32_t events){
             struct epoll_event evt = {events, (epoll_data_t)fd};
             return epoll_ctl(epfd, op, fd, &evt);
         };
-        int pypy_epoll_wait(int epfd, uint32_t *fds, int *evnts, int maxevents, int timeout){
-            struct epoll_event *events = malloc(sizeof(struct epoll_event) * maxevents);
-            if (events == NULL) {
-                return -1;
-            }
+        /* 'scratch' has room for 'maxevents' struct epoll_event */
+        int pypy_epoll_wait(int epfd, void *scratch, uint32_t *fds, int *evnts, int maxevents, int timeout){
+            struct epoll_event *events = (struct epoll_event *)scratch;
             int ret = epoll_wait(epfd, events, maxevents, timeout);
             if (ret < 0) {
-                free(events);
                 return ret;
             }
             for (int i=0; i<ret; i++) {
                 fds[i] = events[i].data.fd;
                 evnts[i] = events[i].events;
             }
-            free(events);
             return ret;
         };
         '''],
@@ -96,16 +93,79 @@ pypy_epoll_ctl = rffi.llexternal(
     compilation_info=eci,
     save_err=rffi.RFFI_SAVE_ERRNO
 )
+FDS = rffi.CArrayPtr(rffi.UINT)
+EVENTS = rffi.CArrayPtr(rffi.INT)
+EPOLL_EVENT_SIZE = rffi.sizeof(cconfig["epoll_event"])
+
 pypy_epoll_wait = rffi.llexternal(
     "pypy_epoll_wait",
-    [rffi.INT, rffi.CArrayPtr(rffi.UINT), rffi.CArrayPtr(rffi.INT),
-     rffi.INT, rffi.INT],
+    [rffi.INT, rffi.VOIDP, FDS, EVENTS, rffi.INT, rffi.INT],
     rffi.INT,
     compilation_info=eci,
     save_err=rffi.RFFI_SAVE_ERRNO
 )
 
+
+class EventBuffers(object):
+    """The raw arrays filled by epoll_wait().  They are allocated once per
+    epoll object and reused by every poll, instead of being malloced and
+    freed around each call."""
+
+    in_use = False
+
+    def __init__(self, size):
+        self.size = size
+        self.scratch = lltype.malloc(rffi.CCHARP.TO, size * EPOLL_EVENT_SIZE,
+                                     flavor='raw', track_allocation=False)
+        self.fds = lltype.malloc(FDS.TO, size, flavor='raw',
+                                 track_allocation=False)
+        self.events = lltype.malloc(EVENTS.TO, size, flavor='raw',
+                                    track_allocation=False)
+
+    def free(self):
+        if self.size > 0:
+            lltype.free(self.events, flavor='raw', track_allocation=False)
+            lltype.free(self.fds, flavor='raw', track_allocation=False)
+            lltype.free(self.scratch, flavor='raw', track_allocation=False)
+            self.size = 0
+
+    def wait(self, space, epfd, maxevents, timeout, fds, events):
+        assert maxevents <= self.size
+        nfds = pypy_epoll_wait(epfd, rffi.cast(rffi.VOIDP, self.scratch),
+                               fds, events, maxevents, timeout)
+        if nfds < 0:
+            raise exception_from_saved_errno(space, space.w_IOError)
+        return nfds
+
+
+def timeout_ms(timeout):
+    if timeout < 0:
+        return -1
+    return int(timeout * 1000.0)
+
+def check_maxevents(space, maxevents):
+    if maxevents == -1:
+        return FD_SETSIZE - 1
+    elif maxevents < 1:
+        raise oefmt(space.w_ValueError,
+                    "maxevents must be greater than 0, not %d", maxevents)
+    return maxevents
+
+def int_array_w(space, w_buffer, name):
+    # a writable buffer used as a C array of ints, e.g. array.array('i')
+    buf = space.writebuf_w(w_buffer)
+    try:
+        ptr = buf.get_raw_address()
+    except ValueError:
+        raise oefmt(space.w_TypeError,
+                    "%s: buffer without a raw address (use array.array or "
+                    "bytearray)", name)
+    return buf, ptr, buf.getlength() // rffi.sizeof(rffi.INT)
+
+
 class W_Epoll(W_Root):
+    buffers = None
+
     def __init__(self, space, epfd):
         self.space = space
         self.epfd = epfd
@@ -113,15 +173,7 @@ class W_Epoll(W_Root):
 
     @unwrap_spec(sizehint=int)
     def descr__new__(space, w_subtype, sizehint=-1):
-        if sizehint == -1:
-            sizehint = FD_SETSIZE - 1
-        elif sizehint < 0:
-            raise oefmt(space.w_ValueError,
-                        "sizehint must be greater than zero, got %d", sizehint)
-        epfd = epoll_create(sizehint)
-        if epfd < 0:
-            raise exception_from_saved_errno(space, space.w_IOError)
-
+        epfd = create_epoll(space, sizehint)
         return W_Epoll(space, epfd)
 
     @unwrap_spec(fd=int)
@@ -142,8 +194,31 @@ class W_Epoll(W_Root):
         if not self.get_closed():
             socketclose(self.epfd)
             self.epfd = -1
+            if self.buffers is not None and not self.buffers.in_use:
+                self.buffers.free()
+            self.buffers = None
             self.may_unregister_rpython_finalizer(self.space)
 
+    def acquire_buffers(self, size):
+        """Return the EventBuffers of this epoll, with at least 'size'
+        entries.  If they are already in use, by a poll() in another thread,
+        return new ones; release_buffers() frees them."""
+        buffers = self.buffers
+        if buffers is not None and buffers.in_use:
+            return EventBuffers(size)
+        if buffers is None or buffers.size < size:
+            if buffers is not None:
+                buffers.free()
+            buffers = self.buffers = EventBuffers(size)
+        buffers.in_use = True
+        return buffers
+
+    def release_buffers(self, buffers):
+        if buffers is self.buffers:
+            buffers.in_use = False
+        else:
+            buffers.free()
+
     def epoll_ctl(self, space, ctl, w_fd, eventmask, ignore_ebadf=False):
         fd = space.c_filedescriptor_w(w_fd)
         result = pypy_epoll_ctl(self.epfd, ctl, fd, rffi.cast(rffi.UINT, eventmask))
@@ -179,29 +254,59 @@ class W_Epoll(W_Root):
     @unwrap_spec(timeout=float, maxevents=int)
     def descr_poll(self, space, timeout=-1.0, maxevents=-1):
         self.check_closed(space)
-        if timeout < 0:
-            timeout = -1.0
-        else:
-            timeout *= 1000.0
-
-        if maxevents == -1:
-            maxevents = FD_SETSIZE - 1
-        elif maxevents < 1:
-            raise oefmt(space.w_ValueError,
-                        "maxevents must be greater than 0, not %d", maxevents)
-
-        with lltype.scoped_alloc(rffi.CArray(rffi.UINT), maxevents) as fids:
-            with lltype.scoped_alloc(rffi.CArray(rffi.INT), maxevents) as events:
-                nfds = pypy_epoll_wait(self.epfd, fids, events, maxevents, int(timeout))
-                if nfds < 0:
-                    raise exception_from_saved_errno(space, space.w_IOError)
-
-                elist_w = [None] * nfds
-                for i in xrange(nfds):
-                    elist_w[i] = space.newtuple2(
-                        space.newint(fids[i]), space.newint(events[i])
-                    )
-                return space.newlist(elist_w)
+        maxevents = check_maxevents(space, maxevents)
+        buffers = self.acquire_buffers(maxevents)
+        try:
+            nfds = buffers.wait(space, self.epfd, maxevents,
+                                timeout_ms(timeout), buffers.fds,
+                                buffers.events)
+            elist_w = [None] * nfds
+            for i in xrange(nfds):
+                elist_w[i] = space.newtuple2(
+                    space.newint(buffers.fds[i]),
+                    space.newint(buffers.events[i])
+                )
+        finally:
+            self.release_buffers(buffers)
+        return space.newlist(elist_w)
+
+    @unwrap_spec(timeout=float)
+    def descr_poll_into(self, space, w_fds, w_events, timeout=-1.0):
+        """poll_into(fds, events[, timeout]) -> number of events
+
+        Like poll(), but instead of building a list of tuples, store the
+        file descriptors and event masks of the ready files directly into
+        the preallocated buffers 'fds' and 'events', typically two
+        array.array('i').  The maximum number of events returned is the
+        number of ints that fit in the smaller buffer.  PyPy extension."""
+        self.check_closed(space)
+        fdsbuf, fdsptr, nfds_max = int_array_w(space, w_fds, "fds")
+        evbuf, evptr, nev_max = int_array_w(space, w_events, "events")
+        maxevents = min(nfds_max, nev_max)
+        if maxevents < 1:
+            raise oefmt(space.w_ValueError, "the buffers are too small")
+        buffers = self.acquire_buffers(maxevents)
+        try:
+            nfds = buffers.wait(space, self.epfd, maxevents,
+                                timeout_ms(timeout),
+                                rffi.cast(FDS, fdsptr),
+                                rffi.cast(EVENTS, evptr))
+        finally:
+            self.release_buffers(buffers)
+        keepalive_until_here(fdsbuf, evbuf)
+        return space.newint(nfds)
+
+
+def create_epoll(space, sizehint):
+    if sizehint == -1:
+        sizehint = FD_SETSIZE - 1
+    elif sizehint < 0:
+        raise oefmt(space.w_ValueError,
+                    "sizehint must be greater than zero, got %d", sizehint)
+    epfd = epoll_create(sizehint)
+    if epfd < 0:
+        raise exception_from_saved_errno(space, space.w_IOError)
+    return epfd
 
 
 W_Epoll.typedef = TypeDef("select.epoll",
@@ -215,5 +320,6 @@ W_Epoll.typedef = TypeDef("select.epoll",
     unregister = interp2app(W_Epoll.descr_unregister),
     modify = interp2app(W_Epoll.descr_modify),
     poll = interp2app(W_Epoll.descr_poll),
+    poll_into = interp2app(W_Epoll.descr_poll_into),
 )
 W_Epoll.typedef.acceptable_as_base_class = False
@@ -0,0 +1,135 @@
+"""
+select.epoll_reactor: an epoll object that also keeps a callback per
+registered file descriptor, and dispatches the ready events to them at
+interp-level.  An app-level event loop only has to call run_once() in a
+loop; no list or tuple is built per wakeup.
+
+The events returned by one epoll_wait() form the ready queue.  If a
+callback raises, the events not dispatched yet stay queued and the next
+run_once() dispatches them before waiting again, so that no edge-triggered
+event is lost.
+"""
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.module.select.interp_epoll import (
+    W_Epoll, EventBuffers, create_epoll, check_maxevents, timeout_ms,
+    EPOLL_CTL_ADD, EPOLL_CTL_MOD, EPOLL_CTL_DEL)
+from rpython.rlib.rarithmetic import intmask
+
+
+class W_EpollReactor(W_Epoll):
+    def __init__(self, space, epfd, maxevents):
+        W_Epoll.__init__(self, space, epfd)
+        self.callbacks = {}     # fd -> w_callback
+        self.ready = EventBuffers(maxevents)
+        self.ready_pos = 0
+        self.ready_count = 0
+        self.waiting = False
+
+    @unwrap_spec(sizehint=int, maxevents=int)
+    def descr_new_reactor(space, w_subtype, sizehint=-1, maxevents=-1):
+        maxevents = check_maxevents(space, maxevents)
+        epfd = create_epoll(space, sizehint)
+        return W_EpollReactor(space, epfd, maxevents)
+
+    def close(self):
+        if not self.get_closed():
+            W_Epoll.close(self)
+            self.callbacks.clear()
+            self.ready_pos = self.ready_count = 0
+            if not self.waiting:
+                self.ready.free()
+
+    @unwrap_spec(eventmask=int)
+    def descr_register_callback(self, space, w_fd, eventmask, w_callback):
+        self.check_closed(space)
+        fd = space.c_filedescriptor_w(w_fd)
+        self.epoll_ctl(space, EPOLL_CTL_ADD, w_fd, eventmask)
+        self.callbacks[fd] = w_callback
+
+    @unwrap_spec(eventmask=int)
+    def descr_modify_callback(self, space, w_fd, eventmask, w_callback=None):
+        self.check_closed(space)
+        fd = space.c_filedescriptor_w(w_fd)
+        self.epoll_ctl(space, EPOLL_CTL_MOD, w_fd, eventmask)
+        if w_callback is not None:
+            self.callbacks[fd] = w_callback
+
+    def descr_unregister_callback(self, space, w_fd):
+        self.check_closed(space)
+        fd = space.c_filedescriptor_w(w_fd)
+        self.epoll_ctl(space, EPOLL_CTL_DEL, w_fd, 0, ignore_ebadf=True)
+        try:
+            del self.callbacks[fd]
+        except KeyError:
+            pass
+
+    def descr_len(self, space):
+        return space.newint(len(self.callbacks))
+
+    def descr_get_pending(self, space):
+        return space.newint(self.ready_count - self.ready_pos)
+
+    @unwrap_spec(timeout=float)
+    def descr_run_once(self, space, timeout=-1.0):
+        """run_once([timeout]) -> number of callbacks called
+
+        Wait until at least one registered file is ready, or until the
+        timeout expires, then call callback(fd, events) for each ready file.
+        If events are still queued from a previous call, they are
+        dispatched without waiting."""
+        self.check_closed(space)
+        if self.ready_pos >= self.ready_count:
+            if self.waiting:
+                raise oefmt(space.w_RuntimeError,
+                            "epoll_reactor already polled by another thread")
+            ready = self.ready
+            self.waiting = True
+            try:
+                nfds = ready.wait(space, self.epfd, ready.size,
+                                  timeout_ms(timeout), ready.fds,
+                                  ready.events)
+            finally:
+                self.waiting = False
+                if self.get_closed():
+                    ready.free()    # closed by another thread meanwhile
+            self.check_closed(space)
+            self.ready_pos = 0
+            self.ready_count = nfds
+        count = 0
+        # a callback may itself call run_once() or unregister fds: always
+        # re-read the queue position, and look up the callback only now
+        while self.ready_pos < self.ready_count:
+            i = self.ready_pos
+            self.ready_pos = i + 1
+            fd = intmask(self.ready.fds[i])
+            w_callback = self.callbacks.get(fd, None)
+            if w_callback is None:
+                continue
+            events = intmask(self.ready.events[i])
+            space.call_function(w_callback, space.newint(fd),
+                                space.newint(events))
+            count += 1
+        return space.newint(count)
+
+
+W_EpollReactor.typedef = TypeDef("select.epoll_reactor",
+    __doc__ = """epoll_reactor([sizehint[, maxevents]])
+
+An epoll object that calls a callback(fd, events) for each ready file
+descriptor from run_once().  PyPy extension.""",
+    __new__ = interp2app(W_EpollReactor.descr_new_reactor.im_func),
+    __len__ = interp2app(W_EpollReactor.descr_len),
+
+    closed = GetSetProperty(W_EpollReactor.descr_get_closed),
+    pending = GetSetProperty(W_EpollReactor.descr_get_pending),
+    fileno = interp2app(W_EpollReactor.descr_fileno),
+    close = interp2app(W_EpollReactor.descr_close),
+    register = interp2app(W_EpollReactor.descr_register_callback),
+    unregister = interp2app(W_EpollReactor.descr_unregister_callback),
+    modify = interp2app(W_EpollReactor.descr_modify_callback),
+    run_once = interp2app(W_EpollReactor.descr_run_once),
+)
+W_EpollReactor.typedef.acceptable_as_base_class = False
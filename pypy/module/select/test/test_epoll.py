@@ -7,7 +7,7 @@ import platform
 
 class AppTestEpoll(object):
     spaceconfig = {
-        "usemodules": ["select", "_socket", "posix", "time"],
+        "usemodules": ["select", "_socket", "posix", "time", "array"],
     }
 
     def setup_class(cls):
@@ -209,3 +209,85 @@ class AppTestEpoll(object):
         ep = select.epoll()
         ep.close()
         ep.close()
+
+    def test_poll_into(self):
+        import select
+        import array
+
+        client, server = self.socket_pair()
+
+        ep = select.epoll(16)
+        ep.register(server.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        ep.register(client.fileno(), select.EPOLLIN | select.EPOLLOUT)
+        fds = array.array('i', [0] * 8)
+        events = array.array('i', [0] * 8)
+        n = ep.poll_into(fds, events, 1)
+        assert n == 2
+        assert sorted(zip(fds[:n], events[:n])) == sorted(ep.poll(1, 4))
+        # the number of events is limited by the size of the buffers
+        fds = array.array('i', [0])
+        assert ep.poll_into(fds, events, 1) == 1
+        n = ep.poll_into(bytearray(8), bytearray(8), 1)
+        assert n == 2
+        raises(ValueError, ep.poll_into, bytearray(2), events)
+        raises(TypeError, ep.poll_into, b'12345678', events)
+        ep.close()
+        raises(ValueError, ep.poll_into, fds, events)
+
+    def test_reactor(self):
+        import select
+
+        client, server = self.socket_pair()
+
+        r = select.epoll_reactor()
+        seen = []
+        def on_client(fd, events):
+            seen.append(('client', fd, events))
+        def on_server(fd, events):
+            seen.append(('server', fd, events))
+        r.register(client, select.EPOLLIN | select.EPOLLET, on_client)
+        r.register(server.fileno(), select.EPOLLIN | select.EPOLLET,
+                   on_server)
+        assert len(r) == 2
+        assert r.run_once(0) == 0
+        assert seen == []
+
+        client.send("Hello!")
+        assert r.run_once(1) == 1
+        assert seen == [('server', server.fileno(), select.EPOLLIN)]
+        del seen[:]
+        # edge-triggered: no new event until more data arrives
+        assert r.run_once(0) == 0
+
+        r.modify(server, select.EPOLLIN | select.EPOLLOUT, on_client)
+        assert r.run_once(1) == 1
+        assert seen == [('client', server.fileno(),
+                         select.EPOLLIN | select.EPOLLOUT)]
+        r.unregister(server)
+        assert len(r) == 1
+        r.close()
+        assert r.closed
+        raises(ValueError, r.run_once)
+        r.close()
+
+    def test_reactor_exception_keeps_queue(self):
+        import select
+
+        client, server = self.socket_pair()
+
+        r = select.epoll_reactor()
+        seen = []
+        def callback(fd, events):
+            seen.append(fd)
+            if len(seen) == 1:
+                raise ZeroDivisionError
+        r.register(client, select.EPOLLOUT | select.EPOLLET, callback)
+        r.register(server, select.EPOLLOUT | select.EPOLLET, callback)
+        raises(ZeroDivisionError, r.run_once, 1)
+        assert r.pending == 1
+        # the remaining event is dispatched without polling again
+        assert r.run_once(0) == 1
+        assert sorted(seen) == sorted([client.fileno(), server.fileno()])
+        assert r.pending == 0
+        assert r.run_once(0) == 0
+        r.close()
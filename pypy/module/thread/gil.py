@@ -44,7 +44,9 @@ class GILThreadLocals(OSThreadLocals):
 
 class GILReleaseAction(PeriodicAsyncAction):
     """An action called every sys.checkinterval bytecodes.  It releases
-    the GIL to give some other thread a chance to run.
+    the GIL to give some other thread a chance to run, unless the
+    switch interval (__pypy__.thread.setswitchinterval()) says that the
+    GIL changed hands too recently.
     """
 
     def perform(self, executioncontext, frame):
@@ -0,0 +1,60 @@
+""" Benchmark of the interpreter's inline caches for global, builtin and
+attribute loads.  Meant to be run with the JIT disabled, to measure the
+interpreter alone:
+
+    pypy-c --jit off bench_attrs.py [loops]
+"""
+
+import os
+import sys
+import time
+
+class A(object):
+    def __init__(self):
+        self.x = 1
+
+    def meth(self):
+        return 1
+
+CONST = 1
+
+def bench_global(n):
+    for i in xrange(n):
+        CONST; CONST; CONST; CONST; CONST
+
+def bench_builtin(n):
+    for i in xrange(n):
+        len; len; len; len; len
+
+def bench_instance_attr(n):
+    a = A()
+    for i in xrange(n):
+        a.x; a.x; a.x; a.x; a.x
+
+def bench_method_call(n):
+    a = A()
+    for i in xrange(n):
+        a.meth(); a.meth(); a.meth(); a.meth(); a.meth()
+
+def bench_module_attr(n):
+    for i in xrange(n):
+        os.path; os.path; os.path; os.path; os.path
+
+def bench_module_function_call(n):
+    p = os.path
+    for i in xrange(n):
+        p.isabs('/'); p.isabs('/'); p.isabs('/'); p.isabs('/'); p.isabs('/')
+
+def main(n):
+    for name, func in sorted(globals().items()):
+        if name.startswith('bench_'):
+            t0 = time.time()
+            func(n)
+            t1 = time.time()
+            print "%-28s %.3f seconds" % (name[len('bench_'):], t1 - t0)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(1000000)
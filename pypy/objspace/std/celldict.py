@@ -205,7 +205,7 @@ class ModuleDictStrategy(DictStrategy):
             cache = self.caches.get(key, None)
         if cache is None:
             cell = self.getdictvalue_no_unwrapping(w_dict, key)
-            cache = GlobalCache(cell)
+            cache = GlobalCache(cell, self)
             if (not space.config.objspace.honor__builtins__ and
                     cell is None and
                     w_dict is not space.builtin.w_dict):
@@ -233,7 +233,7 @@ create_iterator_classes(ModuleDictStrategy)
 # global caching
 
 class GlobalCache(object):
-    def __init__(self, cell):
+    def __init__(self, cell, strategy):
         # works like this: self.cell is always the result of
         # getdictvalue_no_unwrapping on the equivalent key.
         # this means it is None if the key doesn't exist, a w_value if there is
@@ -245,6 +245,9 @@ class GlobalCache(object):
         self.valid = True
         self.ref = weakref.ref(self)
         self.builtincache = None
+        # the ModuleDictStrategy that owns this cache; since every module
+        # dict has its own strategy, this identifies the dict too
+        self.strategy = strategy
 
     @objectmodel.always_inline
     def getvalue(self, space):
@@ -325,3 +328,42 @@ def STORE_GLOBAL_cached(self, nameindex, next_instr):
             assert cache.valid and cache.ref is not None
             pycode._globals_caches[nameindex] = cache.ref
 
+
+
+# ____________________________________________________________
+# module attribute caching
+
+def init_module_attr_cache(pycode):
+    pycode._module_attr_caches = [None] * len(pycode.co_names_w)
+
+@objectmodel.always_inline
+def LOAD_ATTR_module_cached(pycode, w_module, nameindex):
+    """ Fast path for 'module.name' on app-level modules, used by LOAD_ATTR
+    and LOOKUP_METHOD when not jitted. Returns None if the cache cannot
+    answer, in which case the caller has to do a normal getattr. """
+    w_dict = w_module.w_dict
+    if not isinstance(w_dict, W_ModuleDictObject):
+        return None
+    cache_wref = pycode._module_attr_caches[nameindex]
+    if cache_wref is not None:
+        cache = cache_wref()
+        if cache and cache.strategy is w_dict.mstrategy:
+            return cache.getvalue(pycode.space)
+    return _fill_module_attr_cache(pycode, w_module, w_dict, nameindex)
+
+@objectmodel.dont_inline
+def _fill_module_attr_cache(pycode, w_module, w_dict, nameindex):
+    space = pycode.space
+    if not space._side_effects_ok():
+        return None
+    name = space.text_w(pycode.co_names_w[nameindex])
+    # the 'module' type cannot be changed from app-level, so if it does not
+    # define 'name' now, the module's dict is the only place to look
+    if space.type(w_module).lookup(name) is not None:
+        return None
+    cache = w_dict.get_global_cache(name)
+    if cache is None:
+        return None
+    assert cache.valid and cache.ref is not None
+    pycode._module_attr_caches[nameindex] = cache.ref
+    return cache.getvalue(space)
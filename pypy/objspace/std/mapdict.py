@@ -5,6 +5,7 @@ from rpython.rlib.rarithmetic import intmask, r_uint, LONG_BIT
 from rpython.rlib.longlong2float import longlong2float, float2longlong
 
 from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.module import Module
 from pypy.interpreter.typedef import _share_methods
 from pypy.objspace.std.dictmultiobject import (
     W_DictMultiObject, DictStrategy, ObjectDictStrategy, BaseKeyIterator,
@@ -12,6 +13,7 @@ from pypy.objspace.std.dictmultiobject import (
     W_DictObject, BytesDictStrategy, UnicodeDictStrategy
 )
 from pypy.objspace.std.typeobject import MutableCell
+from pypy.objspace.std.celldict import LOAD_ATTR_module_cached
 
 
 
@@ -1305,6 +1307,12 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
                     # map.find_map_attr will always return None if attrkind==DICT.
                     _fill_cache(pycode, nameindex, map, version_tag, attr)
                     return attr._direct_read(w_obj)
+    elif type(w_obj) is Module:
+        # 'module.name': modules don't have maps, but their dicts have
+        # per-key caches (see celldict.py)
+        w_value = LOAD_ATTR_module_cached(pycode, w_obj, nameindex)
+        if w_value is not None:
+            return w_value
     if space.config.objspace.std.withmethodcachecounter:
         INVALID_CACHE_ENTRY.failure_counter += 1
     return space.getattr(w_obj, w_name)
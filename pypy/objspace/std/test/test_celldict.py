@@ -356,3 +356,84 @@ class TestCellCache(object):
         frame.w_top_of_stack = 9
         STORE_GLOBAL_cached(frame, 0, None)
         assert d.getitem(w_key) == 9
+
+
+class TestModuleAttrCache(object):
+
+    def test_cache_is_filled(self):
+        space = self.space
+        w_mod = space.appexec([], """():
+            m = type(__builtins__)("m")
+            m.x = 42
+            m.f = lambda: 43
+            return m
+        """)
+        w_func = space.appexec([], """():
+            def f(m):
+                return m.x + m.f()
+            return f
+        """)
+        w_code = space.getattr(w_func, space.newtext('func_code'))
+        for i in range(3):
+            w_res = space.call_function(w_func, w_mod)
+            assert space.int_w(w_res) == 85
+        names = [space.text_w(w_name) for w_name in w_code.co_names_w]
+        for name in ['x', 'f']:
+            cache = w_code._module_attr_caches[names.index(name)]()
+            assert cache is not None
+            assert cache.strategy is w_mod.w_dict.mstrategy
+
+
+class AppTestModuleAttrCache(object):
+
+    def test_module_attr_changes(self):
+        m = type(__builtins__)("m")
+        m.x = 1
+        m.f = lambda: 'f'
+        def load(m):
+            return m.x
+        def call(m):
+            return m.f()
+        for i in range(3):
+            assert load(m) == 1
+            assert call(m) == 'f'
+        m.x = 2
+        m.f = lambda: 'g'
+        assert load(m) == 2
+        assert call(m) == 'g'
+        del m.x, m.f
+        raises(AttributeError, load, m)
+        raises(AttributeError, call, m)
+        m.x = 3
+        assert load(m) == 3
+
+    def test_other_module(self):
+        m1 = type(__builtins__)("m1")
+        m2 = type(__builtins__)("m2")
+        m1.x = 1
+        m2.x = 2
+        def load(m):
+            return m.x
+        for i in range(3):
+            assert load(m1) == 1
+            assert load(m2) == 2
+
+    def test_type_attribute_not_shadowed(self):
+        m = type(__builtins__)("m")
+        m.__dict__['__class__'] = 5
+        def load(m):
+            return m.__class__
+        for i in range(3):
+            assert load(m) is type(m)
+
+    def test_devolved_dict(self):
+        m = type(__builtins__)("m")
+        m.x = 1
+        def load(m):
+            return m.x
+        for i in range(3):
+            assert load(m) == 1
+        m.__dict__[5] = 6
+        assert load(m) == 1
+        m.x = 2
+        assert load(m) == 2
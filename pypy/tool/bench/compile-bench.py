@@ -0,0 +1,66 @@
+""" Compile-throughput benchmark: tokenize, parse and compile every module
+of lib-python/2.7 (or the directories given on the command line) and report
+how many lines and bytes per second the compiler manages.
+
+Run it with the pypy-c under test, e.g. with the JIT off to look at the
+cold-start path:
+
+    pypy-c --jit off pypy/tool/bench/compile-bench.py [-n repeat] [dir...]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+
+def collect_sources(dirs):
+    sources = []
+    for dirname in dirs:
+        for dirpath, dirnames, filenames in os.walk(dirname):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                if not fn.endswith('.py'):
+                    continue
+                path = os.path.join(dirpath, fn)
+                with open(path, 'rb') as f:
+                    source = f.read()
+                try:
+                    compile(source, path, 'exec')
+                except (SyntaxError, TypeError, ValueError):
+                    continue    # lib2to3 test data, bad encodings, etc.
+                sources.append((path, source))
+    return sources
+
+
+def bench(sources, repeat):
+    nbytes = sum([len(source) for _, source in sources])
+    nlines = sum([source.count('\n') for _, source in sources])
+    best = None
+    for i in range(repeat):
+        t0 = time.time()
+        for path, source in sources:
+            compile(source, path, 'exec')
+        t1 = time.time()
+        if best is None or t1 - t0 < best:
+            best = t1 - t0
+    print "%d files, %d lines, %.1f MB" % (len(sources), nlines,
+                                           nbytes / (1024. * 1024.))
+    print "best of %d: %.3f seconds" % (repeat, best)
+    print "%.0f lines/s, %.2f MB/s" % (nlines / best,
+                                       nbytes / (1024. * 1024.) / best)
+
+
+def main(argv):
+    repeat = 3
+    if len(argv) >= 2 and argv[0] == '-n':
+        repeat = int(argv[1])
+        argv = argv[2:]
+    dirs = argv or [os.path.join(ROOT, 'lib-python', '2.7')]
+    sources = collect_sources(dirs)
+    bench(sources, repeat)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
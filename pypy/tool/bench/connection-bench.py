@@ -0,0 +1,66 @@
+""" Throughput benchmark for multiprocessing Connections: a parent process
+sends large array.array and bytearray payloads to a forked child over a
+multiprocessing.Pipe(), as Connection.send() does for a process pool, and
+compares that with sending the same bytes with send_bytes().
+
+    pypy-c pypy/tool/bench/connection-bench.py [-m megabytes] [-n count]
+"""
+
+import os
+import sys
+import time
+import array
+import multiprocessing
+
+
+def run(name, conn, count, nbytes, send):
+    t0 = time.time()
+    for i in xrange(count):
+        send()
+    conn.recv()       # the child acknowledges after receiving everything
+    elapsed = max(time.time() - t0, 1e-6)
+    print "%-20s %8.1f MB/s  %8.1f msgs/s" % (
+        name, count * nbytes / elapsed / (1024. * 1024.), count / elapsed)
+
+
+def child(conn, kinds, count):
+    for kind in kinds:
+        for i in xrange(count):
+            if kind == 'bytes':
+                conn.recv_bytes()
+            else:
+                conn.recv()
+        conn.send(None)
+    os._exit(0)
+
+
+def main(argv):
+    megabytes, count = 4, 100
+    while argv:
+        if argv[0] == '-m':
+            megabytes = int(argv[1])
+        elif argv[0] == '-n':
+            count = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    nbytes = megabytes * 1024 * 1024
+    doubles = array.array('d', [0.5]) * (nbytes // 8)
+    data = bytearray(nbytes)
+    raw = str(data)
+    kinds = ['array', 'bytearray', 'bytes']
+    parent_conn, child_conn = multiprocessing.Pipe()
+    pid = os.fork()
+    if pid == 0:
+        child(child_conn, kinds, count)
+    run('send(array)', parent_conn, count, nbytes,
+        lambda: parent_conn.send(doubles))
+    run('send(bytearray)', parent_conn, count, nbytes,
+        lambda: parent_conn.send(data))
+    run('send_bytes(str)', parent_conn, count, nbytes,
+        lambda: parent_conn.send_bytes(raw))
+    os.waitpid(pid, 0)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
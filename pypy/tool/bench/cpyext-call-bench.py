@@ -0,0 +1,144 @@
+""" Call overhead of C extension functions: builds a small extension module
+with distutils, then times calls to its METH_NOARGS, METH_O, METH_VARARGS
+and METH_VARARGS | METH_KEYWORDS functions from a Python loop, with int,
+str and tuple arguments.
+
+    pypy-c pypy/tool/bench/cpyext-call-bench.py [-n calls]
+
+Prints nanoseconds per call.  Also runs on CPython, for comparison.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+SOURCE = r'''
+#include <Python.h>
+
+static PyObject *noargs(PyObject *self, PyObject *unused)
+{
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+static PyObject *one(PyObject *self, PyObject *arg)
+{
+    Py_INCREF(arg);
+    return arg;
+}
+
+static PyObject *varargs(PyObject *self, PyObject *args)
+{
+    PyObject *first = PyTuple_GET_SIZE(args) ? PyTuple_GET_ITEM(args, 0)
+                                             : Py_None;
+    Py_INCREF(first);
+    return first;
+}
+
+static PyObject *keywords(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    return varargs(self, args);
+}
+
+static PyMethodDef methods[] = {
+    {"noargs", noargs, METH_NOARGS, NULL},
+    {"one", one, METH_O, NULL},
+    {"varargs", varargs, METH_VARARGS, NULL},
+    {"keywords", (PyCFunction)keywords, METH_VARARGS | METH_KEYWORDS, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+PyMODINIT_FUNC initcallbench(void)
+{
+    Py_InitModule("callbench", methods);
+}
+'''
+
+
+def build(tmpdir):
+    from distutils.core import Distribution, Extension
+    from distutils.command.build_ext import build_ext
+    src = os.path.join(tmpdir, 'callbench.c')
+    with open(src, 'w') as f:
+        f.write(SOURCE)
+    dist = Distribution({'ext_modules': [Extension('callbench', [src])]})
+    cmd = build_ext(dist)
+    cmd.build_lib = tmpdir
+    cmd.build_temp = tmpdir
+    cmd.ensure_finalized()
+    cmd.run()
+    sys.path.insert(0, tmpdir)
+    import callbench
+    return callbench
+
+
+def bench(name, func, n):
+    best = None
+    for repeat in range(3):
+        t0 = time.time()
+        func(n)
+        elapsed = time.time() - t0
+        if best is None or elapsed < best:
+            best = elapsed
+    print "%-32s %8.1f ns/call" % (name, best * 1e9 / n)
+
+
+def main(argv):
+    n = 2000000
+    while argv:
+        if argv[0] == '-n':
+            n = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    tmpdir = tempfile.mkdtemp(prefix='cpyext-call-bench-')
+    try:
+        m = build(tmpdir)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    def call_noargs(n):
+        f = m.noargs
+        for i in xrange(n):
+            f()
+    def call_o_int(n):
+        f = m.one
+        for i in xrange(n):
+            f(i)
+    def call_o_str(n):
+        f = m.one
+        s = 'abc'
+        for i in xrange(n):
+            f(s)
+    def call_varargs_1(n):
+        f = m.varargs
+        for i in xrange(n):
+            f(i)
+    def call_varargs_3(n):
+        f = m.varargs
+        s, t = 'abc', (1, 2)
+        for i in xrange(n):
+            f(i, s, t)
+    def call_keywords(n):
+        f = m.keywords
+        for i in xrange(n):
+            f(i, i)
+    def call_python(n):
+        def f(x):
+            return x
+        for i in xrange(n):
+            f(i)
+
+    bench('python function (reference)', call_python, n)
+    bench('METH_NOARGS', call_noargs, n)
+    bench('METH_O, int', call_o_int, n)
+    bench('METH_O, str', call_o_str, n)
+    bench('METH_VARARGS, 1 int', call_varargs_1, n)
+    bench('METH_VARARGS, int + str + tuple', call_varargs_3, n)
+    bench('METH_KEYWORDS, 2 ints', call_keywords, n)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+""" Contention benchmark for thread locks: N threads each acquire and
+release a shared lock in a loop, with a little work inside and outside of
+the critical section.  Measures thread.allocate_lock(), thread.RLock and a
+Queue.Queue passed around between the threads, for 1 to 32 threads.
+
+    pypy-c pypy/tool/bench/lock-bench.py [-n iterations] [-t max_threads]
+
+Prints the total number of acquire/release pairs per second.
+"""
+
+import sys
+import time
+import thread
+import threading
+import Queue
+
+
+def work(n):
+    x = 0
+    for i in range(n):
+        x += i
+    return x
+
+
+def bench_lock(lock, nthreads, iterations):
+    start = threading.Event()
+    def run():
+        start.wait()
+        for i in xrange(iterations):
+            with lock:
+                work(5)
+            work(20)
+    threads = [threading.Thread(target=run) for i in range(nthreads)]
+    for t in threads:
+        t.start()
+    t0 = time.time()
+    start.set()
+    for t in threads:
+        t.join()
+    return time.time() - t0
+
+
+def bench_queue(nthreads, iterations):
+    q = Queue.Queue()
+    start = threading.Event()
+    def run():
+        start.wait()
+        for i in xrange(iterations):
+            q.put(i)
+            q.get()
+            work(20)
+    threads = [threading.Thread(target=run) for i in range(nthreads)]
+    for t in threads:
+        t.start()
+    t0 = time.time()
+    start.set()
+    for t in threads:
+        t.join()
+    return time.time() - t0
+
+
+def main(argv):
+    iterations, max_threads = 20000, 32
+    while argv:
+        if argv[0] == '-n':
+            iterations = int(argv[1])
+        elif argv[0] == '-t':
+            max_threads = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    kinds = [('Lock', lambda n: bench_lock(thread.allocate_lock(), n,
+                                           iterations)),
+             ('RLock', lambda n: bench_lock(threading.RLock(), n,
+                                            iterations)),
+             ('Queue', lambda n: bench_queue(n, iterations))]
+    print "%-8s %s" % ('threads', '  '.join(["%14s" % (name,)
+                                              for name, fn in kinds]))
+    nthreads = 1
+    while nthreads <= max_threads:
+        results = []
+        for name, fn in kinds:
+            elapsed = fn(nthreads)
+            results.append(nthreads * iterations / max(elapsed, 1e-6))
+        print "%-8d %s" % (nthreads, '  '.join(["%10.0f op/s" % (r,)
+                                                 for r in results]))
+        nthreads *= 2
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,115 @@
+""" Benchmark of serving a file over a loopback TCP connection: CPU seconds
+used per GB sent by socket.sendfile() (kernel sendfile), by its mmap +
+send() fallback, and by the usual read() + sendall() loop.  The receiving
+end runs in a forked child, so only the sender's CPU time is counted.
+
+    pypy-c pypy/tool/bench/sendfile-bench.py [-m megabytes] [-n repeat]
+"""
+
+import os
+import sys
+import time
+import socket
+import resource
+import tempfile
+
+
+def make_file(megabytes):
+    fd, path = tempfile.mkstemp(prefix='sendfile-bench-')
+    block = os.urandom(1024 * 1024)
+    for i in range(megabytes):
+        os.write(fd, block)
+    os.close(fd)
+    return path
+
+
+def start_receiver():
+    serv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    serv.bind(('127.0.0.1', 0))
+    serv.listen(1)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            conn, addr = serv.accept()
+            buf = bytearray(1024 * 1024)
+            while conn.recv_into(buf):
+                pass
+        finally:
+            os._exit(0)
+    cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    cli.connect(serv.getsockname())
+    serv.close()
+    return cli, pid
+
+
+def serve_sendfile(sock, f):
+    return sock.sendfile(f)
+
+def serve_mmap(sock, f):
+    saved = socket._os_sendfile
+    socket._os_sendfile = None
+    try:
+        return sock.sendfile(f)
+    finally:
+        socket._os_sendfile = saved
+
+def serve_read(sock, f):
+    total = 0
+    while True:
+        data = f.read(65536)
+        if not data:
+            return total
+        sock.sendall(data)
+        total += len(data)
+
+
+def cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def bench(name, serve, path, repeat):
+    best = None
+    for i in range(repeat):
+        sock, pid = start_receiver()
+        with open(path, 'rb') as f:
+            c0 = cpu_time()
+            t0 = time.time()
+            sent = serve(sock, f)
+            t1 = time.time()
+            c1 = cpu_time()
+        sock.close()
+        os.waitpid(pid, 0)
+        if best is None or c1 - c0 < best[0]:
+            best = (c1 - c0, t1 - t0)
+    gb = sent / (1024. ** 3)
+    cpu, wall = best
+    print "%-16s %6.2f CPU s/GB  %7.1f MB/s" % (
+        name, cpu / gb, sent / (1024. * 1024.) / max(wall, 1e-6))
+
+
+def main(argv):
+    megabytes, repeat = 256, 3
+    while argv:
+        if argv[0] == '-m':
+            megabytes = int(argv[1])
+        elif argv[0] == '-n':
+            repeat = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    path = make_file(megabytes)
+    try:
+        if getattr(socket, '_os_sendfile', None) is not None:
+            bench('sendfile', serve_sendfile, path, repeat)
+        else:
+            print "%-16s skipped: no __pypy__.os.sendfile" % ('sendfile',)
+        if hasattr(socket.socket, 'sendfile'):
+            bench('mmap + send', serve_mmap, path, repeat)
+        bench('read + sendall', serve_read, path, repeat)
+    finally:
+        os.unlink(path)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
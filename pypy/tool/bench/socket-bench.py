@@ -0,0 +1,167 @@
+""" Loopback throughput benchmark for the batched socket calls: UDP
+datagrams sent and received one per syscall (sendto/recvfrom_into) versus
+in batches (sendmmsg/recvmmsg_into), and framed messages written as two
+send() calls versus one gathered sendmsg().
+
+    pypy-c pypy/tool/bench/socket-bench.py [-n count] [-s size] [-b batch]
+
+The batched variants are skipped if the socket module does not have them.
+"""
+
+import sys
+import time
+import struct
+import socket
+import threading
+
+
+def udp_pair():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    receiver.bind(('127.0.0.1', 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(receiver.getsockname())
+    return sender, receiver
+
+
+def run(name, count, size, send, recv):
+    done = []
+    def receive():
+        done.append(recv())
+    t = threading.Thread(target=receive)
+    t0 = time.time()
+    t.start()
+    send()
+    t.join()
+    elapsed = max(time.time() - t0, 1e-6)
+    received = done[0]
+    print "%-24s %8d msgs  %8.0f msgs/s  %7.1f MB/s" % (
+        name, received, received / elapsed,
+        received * size / elapsed / (1024. * 1024.))
+
+
+def bench_udp_single(count, size, batch):
+    sender, receiver = udp_pair()
+    receiver.settimeout(1.0)
+    payload = b'x' * size
+    buf = bytearray(size)
+    def send():
+        for i in xrange(count):
+            sender.send(payload)
+    def recv():
+        n = 0
+        try:
+            while n < count:
+                receiver.recv_into(buf)
+                n += 1
+        except socket.timeout:
+            pass      # UDP on loopback may still drop a few datagrams
+        return n
+    run('udp send/recv_into', count, size, send, recv)
+    sender.close()
+    receiver.close()
+
+
+def bench_udp_batched(count, size, batch):
+    sender, receiver = udp_pair()
+    if not hasattr(receiver, 'recvmmsg_into'):
+        print "%-24s skipped: no sendmmsg/recvmmsg_into" % ('udp batched',)
+        return
+    receiver.settimeout(1.0)
+    payloads = [b'x' * size] * batch
+    bufs = [bytearray(size) for i in range(batch)]
+    def send():
+        sent = 0
+        while sent < count:
+            sent += sender.sendmmsg(payloads[:min(batch, count - sent)])
+    def recv():
+        n = 0
+        try:
+            while n < count:
+                n += len(receiver.recvmmsg_into(bufs))
+        except socket.timeout:
+            pass
+        return n
+    run('udp sendmmsg/recvmmsg', count, size, send, recv)
+    sender.close()
+    receiver.close()
+
+
+def tcp_pair():
+    serv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    serv.bind(('127.0.0.1', 0))
+    serv.listen(1)
+    cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    cli.connect(serv.getsockname())
+    conn, addr = serv.accept()
+    serv.close()
+    for s in (cli, conn):
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return cli, conn
+
+
+def framed_receiver(conn, count, size):
+    def recv():
+        total = count * (4 + size)
+        buf = bytearray(1024 * 1024)
+        got = 0
+        while got < total:
+            n = conn.recv_into(buf)
+            if not n:
+                break
+            got += n
+        return got // (4 + size)
+    return recv
+
+
+def bench_framed_two_sends(count, size, batch):
+    cli, conn = tcp_pair()
+    body = b'x' * size
+    header = struct.pack('!I', size)
+    def send():
+        for i in xrange(count):
+            cli.sendall(header)
+            cli.sendall(body)
+    run('tcp header+body send', count, size, send,
+        framed_receiver(conn, count, size))
+    cli.close()
+    conn.close()
+
+
+def bench_framed_sendmsg(count, size, batch):
+    cli, conn = tcp_pair()
+    if not hasattr(cli, 'sendmsg'):
+        print "%-24s skipped: no sendmsg" % ('tcp sendmsg',)
+        return
+    body = b'x' * size
+    header = struct.pack('!I', size)
+    def send():
+        for i in xrange(count):
+            n = cli.sendmsg([header, body])
+            if n < len(header) + len(body):
+                cli.sendall((header + body)[n:])
+    run('tcp sendmsg', count, size, send,
+        framed_receiver(conn, count, size))
+    cli.close()
+    conn.close()
+
+
+def main(argv):
+    count, size, batch = 200000, 64, 32
+    while argv:
+        if argv[0] == '-n':
+            count = int(argv[1])
+        elif argv[0] == '-s':
+            size = int(argv[1])
+        elif argv[0] == '-b':
+            batch = int(argv[1])
+        else:
+            print __doc__
+            return
+        argv = argv[2:]
+    for bench in [bench_udp_single, bench_udp_batched,
+                  bench_framed_two_sends, bench_framed_sendmsg]:
+        bench(count, size, batch)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
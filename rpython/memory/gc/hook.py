@@ -26,14 +26,15 @@ class GcHooks(object):
         Called after a minor collection
         """
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, rrc_duration):
         """
         Called after each individual step of a major collection, in case the GC is
         incremental.
 
         ``oldstate`` and ``newstate`` are integers which indicate the GC
         state; for incminimark, see incminimark.STATE_* and
-        incminimark.GC_STATES.
+        incminimark.GC_STATES.  ``rrc_duration`` is the part of
+        ``duration`` spent on the objects linked with rawrefcount (cpyext).
         """
 
 
@@ -54,9 +55,10 @@ class GcHooks(object):
             self.on_gc_minor(duration, total_memory_used, pinned_objects)
 
     @rgc.no_collect
-    def fire_gc_collect_step(self, duration, oldstate, newstate):
+    def fire_gc_collect_step(self, duration, oldstate, newstate,
+                             rrc_duration=0.0):
         if self.is_gc_collect_step_enabled():
-            self.on_gc_collect_step(duration, oldstate, newstate)
+            self.on_gc_collect_step(duration, oldstate, newstate, rrc_duration)
 
     @rgc.no_collect
     def fire_gc_collect(self, num_major_collects,
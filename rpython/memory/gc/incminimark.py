@@ -2318,6 +2318,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
     # is done before every major collection step
     def major_collection_step(self, reserving_size=0):
         start = time.time()
+        self.rrc_step_duration = 0.0
         debug_start("gc-collect-step")
         oldstate = self.gc_state
         debug_print("starting gc state: ", GC_STATES[self.gc_state])
@@ -2385,6 +2386,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if estimate_from_nursery > estimate:
                 estimate = estimate_from_nursery
             estimate = intmask(estimate)
+            if self.rrc_enabled:
+                self.rrc_major_collection_trace_step(self._rrc_step_limit())
             remaining = self.visit_all_objects_step(estimate)
             #
             if remaining >= estimate // 2:
@@ -2403,7 +2406,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
             # finalizers/weak references are rare and short which means that
             # they do not need a separate state and do not need to be
             # made incremental.
-            # For now, the same applies to rawrefcount'ed objects.
+            # Rawrefcount'ed objects are traced by the marking steps above
+            # and freed by the first sweeping steps; only a final check of
+            # their refcounts is done here.
             if (not self.objects_to_trace.non_empty() and
                 not self.more_objects_to_trace.non_empty()):
                 #
@@ -2455,7 +2460,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
                     self.updated_old_objects_pointing_to_pinned = True
                 #
                 if self.rrc_enabled:
-                    self.rrc_major_collection_free()
+                    self.rrc_major_collection_free_start()
                 #
                 self.stat_ac_arenas_count = self.ac.arenas_count
                 self.stat_rawmalloced_total_size = self.rawmalloced_total_size
@@ -2463,7 +2468,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
             #END MARKING
         elif self.gc_state == STATE_SWEEPING:
             #
-            if self.raw_malloc_might_sweep.non_empty():
+            if self.rrc_enabled and self.rrc_major_free_pending():
+                # The rawrefcount'ed objects must be freed before any
+                # sweeping, which resets the GCFLAG_VISITED they need.
+                self.rrc_major_collection_free_step(self._rrc_step_limit())
+                done = False
+            elif self.raw_malloc_might_sweep.non_empty():
                 # Walk all rawmalloced objects and free the ones that don't
                 # have the GCFLAG_VISITED flag.  Visit at most 'limit' objects.
                 # This limit is conservatively high enough to guarantee that
@@ -2566,11 +2576,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
         duration = time.time() - start
         self.total_gc_time += duration
         debug_print("time taken: ", duration)
+        debug_print("of which rawrefcount: ", self.rrc_step_duration)
         debug_stop("gc-collect-step")
         self.hooks.fire_gc_collect_step(
             duration=duration,
             oldstate=oldstate,
-            newstate=self.gc_state)
+            newstate=self.gc_state,
+            rrc_duration=self.rrc_step_duration)
 
     def _sweep_old_objects_pointing_to_pinned(self, obj, new_list):
         if self.header(obj).tid & GCFLAG_VISITED:
@@ -3082,6 +3094,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
     # RawRefCount
 
     rrc_enabled = False
+    rrc_step_duration = 0.0
+    TEST_RRC_STEP_LIMIT = 0    # for tests
 
     _ADDRARRAY = lltype.Array(llmemory.Address, hints={'nolength': True})
     PYOBJ_HDR = lltype.Struct('GCHdr_PyObject',
@@ -3102,6 +3116,14 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.rrc_o_list_old   = self.AddressStack()
             self.rrc_p_dict       = self.AddressDict()  # non-nursery keys only
             self.rrc_p_dict_nurs  = self.AddressDict()  # nursery keys only
+            # the state of the incremental major collection: the old
+            # P list is moved to 'rrc_p_list_traced' while marking, and
+            # everything old is moved to the '_major' lists and dict when
+            # marking ends, until the first sweeping steps free it
+            self.rrc_p_list_traced = self.AddressStack()
+            self.rrc_p_list_major  = self.AddressStack()
+            self.rrc_o_list_major  = self.AddressStack()
+            self.rrc_p_dict_major  = self.null_address_dict()
             self.rrc_dealloc_trigger_callback = dealloc_trigger_callback
             self.rrc_dealloc_pending = self.AddressStack()
             self.rrc_enabled = True
@@ -3112,6 +3134,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
         assert self.rrc_p_list_old  .length() == 0
         assert self.rrc_o_list_young.length() == 0
         assert self.rrc_o_list_old  .length() == 0
+        assert self.rrc_p_list_traced.length() == 0
+        assert not self.rrc_major_free_pending()
         def check_value_is_null(key, value, ignore):
             assert value == llmemory.NULL
         self.rrc_p_dict.foreach(check_value_is_null, None)
@@ -3156,6 +3180,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
             dct = self.rrc_p_dict_nurs
         else:
             dct = self.rrc_p_dict
+            if self.rrc_p_dict_major:
+                # a major collection is still moving the surviving links
+                # from 'rrc_p_dict_major' to 'rrc_p_dict'
+                pyobject = dct.get(obj)
+                if pyobject:
+                    return pyobject
+                dct = self.rrc_p_dict_major
         return dct.get(obj)
 
     def rawrefcount_to_obj(self, pyobject):
@@ -3274,42 +3305,106 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self._pyobj(pyobject).ob_refcnt = rc
     _rrc_free._always_inline_ = True
 
-    def rrc_major_collection_trace(self):
-        self.rrc_p_list_old.foreach(self._rrc_major_trace, None)
+    def _rrc_step_limit(self):
+        # The number of rawrefcount'ed objects that one major collection
+        # step looks at, in each of the marking and the freeing phases.
+        if self.TEST_RRC_STEP_LIMIT:
+            return self.TEST_RRC_STEP_LIMIT
+        return 3 * self.nursery_size // self.small_request_threshold
 
-    def _rrc_major_trace(self, pyobject, ignore):
+    def _rrc_has_raw_refs(self, pyobject):
         from rpython.rlib.rawrefcount import REFCNT_FROM_PYPY
         from rpython.rlib.rawrefcount import REFCNT_FROM_PYPY_LIGHT
-        #
         rc = self._pyobj(pyobject).ob_refcnt
-        if rc == REFCNT_FROM_PYPY or rc == REFCNT_FROM_PYPY_LIGHT:
-            pass     # the corresponding object may die
-        else:
+        return rc != REFCNT_FROM_PYPY and rc != REFCNT_FROM_PYPY_LIGHT
+    _rrc_has_raw_refs._always_inline_ = True
+
+    def rrc_major_collection_trace_step(self, limit):
+        # Called from the marking steps.  Moves up to 'limit' objects from
+        # 'rrc_p_list_old' to 'rrc_p_list_traced', and adds the ones with
+        # references from C to 'objects_to_trace', so that they and what
+        # they reference are traced incrementally.
+        start = time.time()
+        lst = self.rrc_p_list_old
+        while limit > 0 and lst.non_empty():
+            pyobject = lst.pop()
+            self.rrc_p_list_traced.append(pyobject)
+            if self._rrc_has_raw_refs(pyobject):
+                intobj = self._pyobj(pyobject).ob_pypy_link
+                self.objects_to_trace.append(llmemory.cast_int_to_adr(intobj))
+            limit -= 1
+        self.rrc_step_duration += time.time() - start
+
+    def rrc_major_collection_trace(self):
+        # Called when marking is done.  The refcounts may have changed
+        # since rrc_major_collection_trace_step() saw them, so check them
+        # all again; this is usually quick because the objects were
+        # already visited.
+        start = time.time()
+        self.rrc_p_list_traced.foreach(self._rrc_major_trace, None)
+        self.rrc_p_list_old.foreach(self._rrc_major_trace, None)
+        self.rrc_step_duration += time.time() - start
+
+    def _rrc_major_trace(self, pyobject, ignore):
+        if self._rrc_has_raw_refs(pyobject):
             # force the corresponding object to be alive
             intobj = self._pyobj(pyobject).ob_pypy_link
             obj = llmemory.cast_int_to_adr(intobj)
-            self.objects_to_trace.append(obj)
-            self.visit_all_objects()
+            if not (self.header(obj).tid & GCFLAG_VISITED):
+                self.objects_to_trace.append(obj)
+                self.visit_all_objects()
+        # else: the corresponding object may die
+
+    def rrc_major_free_pending(self):
+        return bool(self.rrc_p_dict_major)
 
-    def rrc_major_collection_free(self):
+    def rrc_major_collection_free_start(self):
+        # Called when marking is done.  Moves all the old links to the
+        # '_major' lists and dict, which rrc_major_collection_free_step()
+        # empties; new links are added to fresh 'rrc_X_list_old' and
+        # 'rrc_p_dict' meanwhile.
         ll_assert(self.rrc_p_dict_nurs.length() == 0, "p_dict_nurs not empty 2")
+        ll_assert(not self.rrc_major_free_pending(),
+                  "rawrefcount major free already pending")
+        ll_assert(not self.rrc_p_list_major.non_empty(),
+                  "rrc_p_list_major not empty")
+        ll_assert(not self.rrc_o_list_major.non_empty(),
+                  "rrc_o_list_major not empty")
         length_estimate = self.rrc_p_dict.length()
-        self.rrc_p_dict.delete()
-        self.rrc_p_dict = new_p_dict = self.AddressDict(length_estimate)
-        new_p_list = self.AddressStack()
-        while self.rrc_p_list_old.non_empty():
-            self._rrc_major_free(self.rrc_p_list_old.pop(), new_p_list,
-                                                            new_p_dict)
-        self.rrc_p_list_old.delete()
-        self.rrc_p_list_old = new_p_list
-        #
-        new_o_list = self.AddressStack()
-        no_o_dict = self.null_address_dict()
-        while self.rrc_o_list_old.non_empty():
-            self._rrc_major_free(self.rrc_o_list_old.pop(), new_o_list,
-                                                            no_o_dict)
-        self.rrc_o_list_old.delete()
-        self.rrc_o_list_old = new_o_list
+        self.rrc_p_dict_major = self.rrc_p_dict
+        self.rrc_p_dict = self.AddressDict(length_estimate)
+        # the '_major' lists are empty: swap them with the current lists
+        swap = self.rrc_p_list_major
+        self.rrc_p_list_major = self.rrc_p_list_old
+        self.rrc_p_list_old = swap
+        swap = self.rrc_o_list_major
+        self.rrc_o_list_major = self.rrc_o_list_old
+        self.rrc_o_list_old = swap
+
+    def rrc_major_collection_free_step(self, limit):
+        # Frees the pyobjects of up to 'limit' dead objects from the
+        # '_major' lists, and moves the others back to 'rrc_X_list_old'.
+        # Must run before the sweeping steps reset GCFLAG_VISITED.
+        start = time.time()
+        limit = self._rrc_major_free_list(self.rrc_p_list_traced, limit,
+                                          self.rrc_p_list_old, self.rrc_p_dict)
+        limit = self._rrc_major_free_list(self.rrc_p_list_major, limit,
+                                          self.rrc_p_list_old, self.rrc_p_dict)
+        limit = self._rrc_major_free_list(self.rrc_o_list_major, limit,
+                                          self.rrc_o_list_old,
+                                          self.null_address_dict())
+        if limit > 0:
+            # all done
+            self.rrc_p_dict_major.delete()
+            self.rrc_p_dict_major = self.null_address_dict()
+        self.rrc_step_duration += time.time() - start
+
+    def _rrc_major_free_list(self, lst, limit, surviving_list,
+                             surviving_dict):
+        while limit > 0 and lst.non_empty():
+            self._rrc_major_free(lst.pop(), surviving_list, surviving_dict)
+            limit -= 1
+        return limit
 
     def _rrc_major_free(self, pyobject, surviving_list, surviving_dict):
         # The pyobject survives if the corresponding obj survives.
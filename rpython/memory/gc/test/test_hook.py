@@ -26,6 +26,7 @@ class MyGcHooks(GcHooks):
         self.steps = []
         self.collects = []
         self.durations = []
+        self.rrc_durations = []
 
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         self.durations.append(duration)
@@ -33,8 +34,9 @@ class MyGcHooks(GcHooks):
             'total_memory_used': total_memory_used,
             'pinned_objects': pinned_objects})
 
-    def on_gc_collect_step(self, duration, oldstate, newstate):
+    def on_gc_collect_step(self, duration, oldstate, newstate, rrc_duration):
         self.durations.append(duration)
+        self.rrc_durations.append(rrc_duration)
         self.steps.append({
             'oldstate': oldstate,
             'newstate': newstate})
@@ -108,6 +110,7 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         assert len(self.gc.hooks.durations) == 4 # 4 steps
         for d in self.gc.hooks.durations:
             assert d > 0.0
+        assert self.gc.hooks.rrc_durations == [0.0] * 4   # no rawrefcount
         self.gc.hooks.reset()
         #
         self.stackroots.append(self.malloc(S))
@@ -293,3 +293,74 @@ class TestRawRefCount(BaseDirectGCTest):
     def test_rawrefcount_next_dead_robust_against_non_init(self):
         # does not crash despite not calling init
         assert not self.gc.rawrefcount_next_dead()
+
+    def _old_pairs(self, n):
+        pairs = []
+        for i in range(n):
+            p1, p1ref, r1, r1addr, check_alive = (
+                self._rawrefcount_pair(i, is_light=True, create_old=True))
+            pairs.append((p1ref, r1, r1addr, check_alive))
+        return pairs
+
+    def test_major_collection_incremental(self):
+        from rpython.memory.gc import incminimark
+        self.gc.TEST_RRC_STEP_LIMIT = 3
+        pairs = self._old_pairs(10)
+        for p1ref, r1, r1addr, check_alive in pairs[::2]:
+            r1.ob_refcnt += 1      # the even ones are kept alive from C
+        self.gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        while self.gc.gc_state == incminimark.STATE_MARKING:
+            self.gc.debug_gc_step()
+        # marking is done, but the rawrefcount lists are not processed yet
+        assert self.gc.rrc_major_free_pending()
+        for p1ref, r1, r1addr, check_alive in pairs:
+            assert r1.ob_pypy_link != 0
+        for p1ref, r1, r1addr, check_alive in pairs[::2]:
+            assert self.gc.rawrefcount_from_obj(p1ref) == r1addr
+        steps = 0
+        while self.gc.rrc_major_free_pending():
+            assert self.gc.gc_state == incminimark.STATE_SWEEPING
+            self.gc.debug_gc_step()
+            steps += 1
+        assert steps >= 3
+        self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        for p1ref, r1, r1addr, check_alive in pairs[::2]:
+            check_alive(+1)
+            r1.ob_refcnt -= 1
+        for p1ref, r1, r1addr, check_alive in pairs[1::2]:
+            py.test.raises(RuntimeError, "r1.ob_refcnt")    # dead
+        self._collect(major=True)
+        self.gc.check_no_more_rawrefcount_state()
+
+    def test_incref_during_marking(self):
+        from rpython.memory.gc import incminimark
+        self.gc.TEST_RRC_STEP_LIMIT = 1
+        p1, p1ref, r1, r1addr, check_alive = (
+            self._rawrefcount_pair(42, is_light=True, create_old=True))
+        # p1 is only reachable from p0, which the marking visits last
+        p0 = self.malloc(S)
+        self.stackroots.append(p0)
+        self.write(p0, 'next', p1)
+        for i in range(5):
+            self.stackroots.append(self.malloc(S))
+        self._collect(major=False)
+        p0 = self.stackroots[0]
+        self.gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        self.gc.TEST_VISIT_SINGLE_STEP = True
+        try:
+            self.gc.debug_gc_step()
+            # the marking steps saw r1 without references from C.  Now C
+            # takes a reference and the other reference goes away
+            assert self.gc.rrc_p_list_traced.length() == 1
+            assert self.gc.gc_state == incminimark.STATE_MARKING
+            r1.ob_refcnt += 1
+            self.write(p0, 'next', lltype.nullptr(S))
+            self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        finally:
+            self.gc.TEST_VISIT_SINGLE_STEP = False
+        check_alive(+1)
+        r1.ob_refcnt -= 1
+        del self.stackroots[:]
+        self._collect(major=True)
+        py.test.raises(RuntimeError, "r1.ob_refcnt")    # dead
+        self.gc.check_no_more_rawrefcount_state()
@@ -982,6 +982,111 @@ if HAVE_SENDMSG:
                          "int free_ptr_to_charp(char** ptrtofree);\n"
                          ]
 
+# sendmmsg / recvmmsg: several datagrams, one per buffer, in a single syscall
+HAVE_MMSG = sys.platform.startswith('linux')
+if HAVE_MMSG:
+    separate_module_sources += ['''
+        #include <sys/socket.h>
+        #include <stdlib.h>
+        #include <errno.h>
+
+        RPY_EXTERN
+        int sendmmsg_implementation(int socket_fd,
+                                    struct sockaddr* address,
+                                    socklen_t addrlen,
+                                    char** messages,
+                                    long* message_lengths,
+                                    int no_of_messages,
+                                    int flags)
+        {
+            struct mmsghdr *msgs;
+            struct iovec *iovs;
+            int i, result, saved_errno;
+
+            msgs = (struct mmsghdr*) calloc(no_of_messages, sizeof(struct mmsghdr));
+            iovs = (struct iovec*) calloc(no_of_messages, sizeof(struct iovec));
+            if (msgs == NULL || iovs == NULL) {
+                free(msgs);
+                free(iovs);
+                errno = ENOMEM;
+                return -1;
+            }
+            for (i = 0; i < no_of_messages; i++) {
+                iovs[i].iov_base = messages[i];
+                iovs[i].iov_len = message_lengths[i];
+                msgs[i].msg_hdr.msg_name = address;
+                msgs[i].msg_hdr.msg_namelen = addrlen;
+                msgs[i].msg_hdr.msg_iov = &iovs[i];
+                msgs[i].msg_hdr.msg_iovlen = 1;
+            }
+            result = sendmmsg(socket_fd, msgs, no_of_messages, flags);
+            saved_errno = errno;
+            free(msgs);
+            free(iovs);
+            errno = saved_errno;
+            return result;
+        }
+
+        /*
+            Receive up to no_of_messages datagrams, the i-th one into
+            messages[i].  The sender addresses are written into 'addresses',
+            which holds no_of_messages slots of address_size bytes each.
+            On return, received[i], addrlens[i] and retflags[i] are the
+            size, address length and flags of the i-th datagram.
+        */
+        RPY_EXTERN
+        int recvmmsg_implementation(int socket_fd,
+                                    char** messages,
+                                    long* message_lengths,
+                                    int no_of_messages,
+                                    int flags,
+                                    char* addresses,
+                                    int address_size,
+                                    socklen_t* addrlens,
+                                    long* received,
+                                    long* retflags)
+        {
+            struct mmsghdr *msgs;
+            struct iovec *iovs;
+            int i, result, saved_errno;
+
+            msgs = (struct mmsghdr*) calloc(no_of_messages, sizeof(struct mmsghdr));
+            iovs = (struct iovec*) calloc(no_of_messages, sizeof(struct iovec));
+            if (msgs == NULL || iovs == NULL) {
+                free(msgs);
+                free(iovs);
+                errno = ENOMEM;
+                return -1;
+            }
+            for (i = 0; i < no_of_messages; i++) {
+                iovs[i].iov_base = messages[i];
+                iovs[i].iov_len = message_lengths[i];
+                msgs[i].msg_hdr.msg_name = addresses + i * address_size;
+                msgs[i].msg_hdr.msg_namelen = address_size;
+                msgs[i].msg_hdr.msg_iov = &iovs[i];
+                msgs[i].msg_hdr.msg_iovlen = 1;
+            }
+            // don't block waiting for more datagrams once one has arrived
+            result = recvmmsg(socket_fd, msgs, no_of_messages,
+                              flags | MSG_WAITFORONE, NULL);
+            saved_errno = errno;
+            for (i = 0; i < result; i++) {
+                received[i] = msgs[i].msg_len;
+                addrlens[i] = msgs[i].msg_hdr.msg_namelen;
+                retflags[i] = msgs[i].msg_hdr.msg_flags;
+            }
+            free(msgs);
+            free(iovs);
+            errno = saved_errno;
+            return result;
+        }
+    ''']
+    post_include_bits += ["RPY_EXTERN "
+                          "int sendmmsg_implementation(int socket_fd, struct sockaddr* address, socklen_t addrlen, char** messages, long* message_lengths, int no_of_messages, int flags);\n"
+                          "RPY_EXTERN "
+                          "int recvmmsg_implementation(int socket_fd, char** messages, long* message_lengths, int no_of_messages, int flags, char* addresses, int address_size, socklen_t* addrlens, long* received, long* retflags);\n"
+                          ]
+
 if _WIN32:
     CConfig.WSAEVENT = platform.SimpleType('WSAEVENT', rffi.VOIDP)
     CConfig.WSANETWORKEVENTS = platform.Struct(
@@ -1353,6 +1458,18 @@ sendmsg = jit.dont_look_inside(rffi.llexternal("sendmsg_implementation",
                                 rffi.SIGNEDP, rffi.SIGNEDP, rffi.CCHARPP, rffi.SIGNEDP, rffi.INT, rffi.INT],
                                rffi.INT, save_err=SAVE_ERR,
                                compilation_info=compilation_info))
+if HAVE_MMSG:
+    socklen_t_array = lltype.Ptr(rffi.CArray(socklen_t))
+    sendmmsg = jit.dont_look_inside(rffi.llexternal(
+        "sendmmsg_implementation",
+        [rffi.INT, sockaddr_ptr, socklen_t, rffi.CCHARPP, rffi.SIGNEDP,
+         rffi.INT, rffi.INT], rffi.INT,
+        save_err=SAVE_ERR, compilation_info=compilation_info))
+    recvmmsg = jit.dont_look_inside(rffi.llexternal(
+        "recvmmsg_implementation",
+        [rffi.INT, rffi.CCHARPP, rffi.SIGNEDP, rffi.INT, rffi.INT,
+         rffi.CCHARP, rffi.INT, socklen_t_array, rffi.SIGNEDP, rffi.SIGNEDP],
+        rffi.INT, save_err=SAVE_ERR, compilation_info=compilation_info))
 CMSG_SPACE = jit.dont_look_inside(rffi.llexternal("CMSG_SPACE_wrapper",[size_t], size_t, save_err=SAVE_ERR,compilation_info=compilation_info))
 CMSG_LEN = jit.dont_look_inside(rffi.llexternal("CMSG_LEN_wrapper",[size_t], size_t, save_err=SAVE_ERR,compilation_info=compilation_info))
 
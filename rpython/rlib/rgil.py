@@ -42,6 +42,19 @@ _gil_get_holder = llexternal('RPyGilGetHolder', [], lltype.Signed,
                              _nowrapper=True, sandboxsafe=True,
                              compilation_info=eci)
 
+_gil_set_switch_interval = llexternal('RPyGilSetSwitchInterval',
+                                      [rffi.DOUBLE], lltype.Void,
+                                      _nowrapper=True, sandboxsafe=True,
+                                      compilation_info=eci)
+
+_gil_set_fair = llexternal('RPyGilSetFair', [rffi.INT], lltype.Void,
+                           _nowrapper=True, sandboxsafe=True,
+                           compilation_info=eci)
+
+_gil_get_stats = llexternal('RPyGilGetStats', [rffi.DOUBLEP], lltype.Void,
+                            _nowrapper=True, sandboxsafe=True,
+                            compilation_info=eci)
+
 # ____________________________________________________________
 
 
@@ -227,3 +240,38 @@ def am_I_holding_the_GIL():
     from rpython.rlib import rthread
     my_tid = rthread.get_or_make_ident()
     return gil_get_holder() == my_tid
+
+# ____________________________________________________________
+# tuning and statistics
+
+def set_switch_interval(interval):
+    """Make yield_thread() keep the GIL until it was held for 'interval'
+    seconds since it last went to a waiting thread.  0.0 means that
+    yield_thread() always switches if another thread is waiting."""
+    _gil_set_switch_interval(interval)
+
+def set_fair(fair):
+    """In fair mode, a thread that needs the GIL while other threads are
+    already waiting for it queues behind them, instead of first trying to
+    grab it for a while."""
+    _gil_set_fair(rffi.cast(rffi.INT, fair))
+
+class GilStats(object):
+    """Process-wide counters, and the counters of the current thread.
+    Times are in seconds."""
+
+    def __init__(self, result):
+        self.switch_interval = result[0]
+        self.fair = result[1] != 0.0
+        self.switches = int(result[2])      # GIL acquired after waiting
+        self.yields = int(result[3])        # GIL given to a waiting thread
+        self.wait_time = result[4]
+        self.thread_wait_time = result[5]
+        self.thread_hold_time = result[6]
+        self.thread_waits = int(result[7])
+        self.thread_yields = int(result[8])
+
+def get_stats():
+    with lltype.scoped_alloc(rffi.DOUBLEP.TO, 9, zero=True) as result:
+        _gil_get_stats(result)
+        return GilStats(result)
@@ -209,7 +209,8 @@ else:
                 'sys/resource.h',
                 'sched.h',
                 'grp.h', 'dirent.h', 'sys/stat.h', 'fcntl.h',
-                'signal.h', 'sys/utsname.h', _ptyh]
+                'signal.h', 'sys/utsname.h', 'sys/uio.h', 'limits.h',
+                _ptyh]
     if sys.platform.startswith('linux') or sys.platform.startswith('gnu'):
         includes.append('sys/sysmacros.h')
     if sys.platform.startswith('freebsd') or sys.platform.startswith('openbsd'):
@@ -547,6 +548,79 @@ if not _WIN32:
         with rffi.scoped_nonmovingbuffer(data) as buf:
             return handle_posix_error('pwrite', c_pwrite(fd, buf, count, offset))
 
+    class CConfig:
+        _compilation_info_ = eci
+        IOVEC = rffi_platform.Struct('struct iovec',
+                                     [('iov_base', rffi.VOIDP),
+                                      ('iov_len', rffi.SIZE_T)])
+        IOV_MAX = rffi_platform.DefinedConstantInteger('IOV_MAX')
+
+    iovec_config = rffi_platform.configure(CConfig)
+    IOVEC = iovec_config['IOVEC']
+    IOVEC_ARRAY = rffi.CArray(IOVEC)
+    IOV_MAX = iovec_config['IOV_MAX'] or 1024
+
+    c_readv = external('readv',
+                       [rffi.INT, lltype.Ptr(IOVEC_ARRAY), rffi.INT],
+                       rffi.SSIZE_T, save_err=rffi.RFFI_SAVE_ERRNO)
+    c_writev = external('writev',
+                        [rffi.INT, lltype.Ptr(IOVEC_ARRAY), rffi.INT],
+                        rffi.SSIZE_T, save_err=rffi.RFFI_SAVE_ERRNO)
+
+    def readv(fd, counts):
+        """Read into len(counts) consecutive buffers with a single readv()
+        call.  Returns the list of strings read into each of them; at the
+        end of the file the last ones are shorter or empty."""
+        n = len(counts)
+        if n > IOV_MAX:
+            raise OSError(errno.EINVAL, None)
+        total = 0
+        for count in counts:
+            if count < 0:
+                raise OSError(errno.EINVAL, None)
+            total += count
+        iov = lltype.malloc(IOVEC_ARRAY, n, flavor='raw')
+        try:
+            with rffi.scoped_alloc_buffer(total) as buf:
+                pos = 0
+                for i in range(n):
+                    iov[i].c_iov_base = rffi.cast(rffi.VOIDP,
+                                                  rffi.ptradd(buf.raw, pos))
+                    iov[i].c_iov_len = rffi.cast(rffi.SIZE_T, counts[i])
+                    pos += counts[i]
+                got = handle_posix_error('readv', c_readv(fd, iov, n))
+                data = buf.str(got)
+        finally:
+            lltype.free(iov, flavor='raw')
+        result = []
+        pos = 0
+        for count in counts:
+            end = min(pos + count, got)
+            result.append(data[pos:end])
+            pos = end
+        return result
+
+    def writev(fd, data):
+        """Write the strings in the list 'data' with a single writev() call.
+        Returns the number of bytes written, like write()."""
+        n = len(data)
+        if n > IOV_MAX:
+            raise OSError(errno.EINVAL, None)
+        iov = lltype.malloc(IOVEC_ARRAY, n, flavor='raw')
+        bufs = []
+        try:
+            for i in range(n):
+                s = data[i]
+                buf, llobj, flag = rffi.get_nonmovingbuffer_ll(s)
+                bufs.append((buf, llobj, flag))
+                iov[i].c_iov_base = rffi.cast(rffi.VOIDP, buf)
+                iov[i].c_iov_len = rffi.cast(rffi.SIZE_T, len(s))
+            return handle_posix_error('writev', c_writev(fd, iov, n))
+        finally:
+            for buf, llobj, flag in bufs:
+                rffi.free_nonmovingbuffer_ll(buf, llobj, flag)
+            lltype.free(iov, flavor='raw')
+
     if HAVE_FALLOCATE:
         c_posix_fallocate = external('posix_fallocate',
                                      [rffi.INT, OFF_T, OFF_T], rffi.INT,
@@ -0,0 +1,266 @@
+"""
+Asynchronous readahead of a file: a helper thread, written in C, that
+runs one pread() at a time into its own raw buffer.  The caller starts a
+read with start() and later collects the result with wait(), which
+releases the GIL if it has to block.  This lets the next block of a file
+be read while the program is busy with the current one.
+
+Only available on POSIX platforms (HAVE_READAHEAD).
+"""
+
+import sys
+
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+from rpython.rlib.rarithmetic import intmask, r_longlong
+from rpython.rlib.rposix import get_saved_errno
+
+
+HAVE_READAHEAD = sys.platform != 'win32'
+
+# states of a pending read, as returned by wait()
+NO_READ = -2        # nothing was started
+READ_ERROR = -1     # the pread() failed, see get_saved_errno()
+
+if HAVE_READAHEAD:
+    eci = ExternalCompilationInfo(
+        includes=['pthread.h'],
+        libraries=['pthread'],
+        post_include_bits=["""
+RPY_EXTERN void *pypy_readahead_new(void);
+RPY_EXTERN int pypy_readahead_start(void *, int, long long, long);
+RPY_EXTERN long pypy_readahead_wait(void *);
+RPY_EXTERN char *pypy_readahead_buffer(void *);
+RPY_EXTERN void pypy_readahead_free(void *);
+"""],
+        separate_module_sources=["""
+#include <pthread.h>
+#include <stdlib.h>
+#include <unistd.h>
+#include <errno.h>
+
+enum { RA_IDLE, RA_REQUESTED, RA_DONE, RA_QUIT };
+
+struct pypy_readahead_s {
+    pthread_mutex_t mutex;
+    pthread_cond_t cond;
+    pthread_t thread;
+    int thread_started;
+    pid_t pid;                  /* the process that started the thread */
+    int state;
+    int fd;
+    long long offset;
+    char *buf;
+    long size, capacity;
+    long result;
+    int error;
+};
+
+static void *pypy_readahead_thread(void *arg)
+{
+    struct pypy_readahead_s *ra = (struct pypy_readahead_s *)arg;
+    pthread_mutex_lock(&ra->mutex);
+    while (1) {
+        int fd;
+        char *buf;
+        long size;
+        long long offset;
+        ssize_t n;
+        int error;
+
+        while (ra->state != RA_REQUESTED && ra->state != RA_QUIT)
+            pthread_cond_wait(&ra->cond, &ra->mutex);
+        if (ra->state == RA_QUIT)
+            break;
+        fd = ra->fd;
+        buf = ra->buf;
+        size = ra->size;
+        offset = ra->offset;
+        pthread_mutex_unlock(&ra->mutex);
+
+        do {
+            n = pread(fd, buf, size, offset);
+        } while (n < 0 && errno == EINTR);
+        error = n < 0 ? errno : 0;
+
+        pthread_mutex_lock(&ra->mutex);
+        ra->result = n;
+        ra->error = error;
+        ra->state = RA_DONE;
+        pthread_cond_broadcast(&ra->cond);
+    }
+    pthread_mutex_unlock(&ra->mutex);
+    return NULL;
+}
+
+/* The helper thread does not exist any more in a forked child. */
+static void pypy_readahead_check_fork(struct pypy_readahead_s *ra)
+{
+    if (ra->thread_started && ra->pid != getpid()) {
+        pthread_mutex_init(&ra->mutex, NULL);
+        pthread_cond_init(&ra->cond, NULL);
+        ra->thread_started = 0;
+        ra->state = RA_IDLE;
+    }
+}
+
+RPY_EXTERN void *pypy_readahead_new(void)
+{
+    struct pypy_readahead_s *ra = calloc(1, sizeof(struct pypy_readahead_s));
+    if (ra == NULL)
+        return NULL;
+    pthread_mutex_init(&ra->mutex, NULL);
+    pthread_cond_init(&ra->cond, NULL);
+    ra->state = RA_IDLE;
+    return ra;
+}
+
+/* Must not be called while a read is pending.  Returns 0, or -1 with
+   errno set if the buffer or the thread cannot be created. */
+RPY_EXTERN int pypy_readahead_start(void *p, int fd, long long offset,
+                                    long size)
+{
+    struct pypy_readahead_s *ra = (struct pypy_readahead_s *)p;
+    pypy_readahead_check_fork(ra);
+    if (size > ra->capacity) {
+        char *newbuf = realloc(ra->buf, size);
+        if (newbuf == NULL) {
+            errno = ENOMEM;
+            return -1;
+        }
+        ra->buf = newbuf;
+        ra->capacity = size;
+    }
+    if (!ra->thread_started) {
+        int err = pthread_create(&ra->thread, NULL,
+                                 pypy_readahead_thread, ra);
+        if (err != 0) {
+            errno = err;
+            return -1;
+        }
+        ra->thread_started = 1;
+        ra->pid = getpid();
+    }
+    pthread_mutex_lock(&ra->mutex);
+    ra->fd = fd;
+    ra->offset = offset;
+    ra->size = size;
+    ra->state = RA_REQUESTED;
+    pthread_cond_broadcast(&ra->cond);
+    pthread_mutex_unlock(&ra->mutex);
+    return 0;
+}
+
+/* Waits for the pending read.  Returns the number of bytes read, -1 with
+   errno set if it failed, or -2 if no read was started. */
+RPY_EXTERN long pypy_readahead_wait(void *p)
+{
+    struct pypy_readahead_s *ra = (struct pypy_readahead_s *)p;
+    long result;
+    pypy_readahead_check_fork(ra);
+    pthread_mutex_lock(&ra->mutex);
+    while (ra->state == RA_REQUESTED)
+        pthread_cond_wait(&ra->cond, &ra->mutex);
+    if (ra->state == RA_DONE) {
+        result = ra->result;
+        if (result < 0)
+            errno = ra->error;
+        ra->state = RA_IDLE;
+    }
+    else
+        result = -2;
+    pthread_mutex_unlock(&ra->mutex);
+    return result;
+}
+
+RPY_EXTERN char *pypy_readahead_buffer(void *p)
+{
+    return ((struct pypy_readahead_s *)p)->buf;
+}
+
+RPY_EXTERN void pypy_readahead_free(void *p)
+{
+    struct pypy_readahead_s *ra = (struct pypy_readahead_s *)p;
+    pypy_readahead_check_fork(ra);
+    if (ra->thread_started) {
+        pthread_mutex_lock(&ra->mutex);
+        while (ra->state == RA_REQUESTED)
+            pthread_cond_wait(&ra->cond, &ra->mutex);
+        ra->state = RA_QUIT;
+        pthread_cond_broadcast(&ra->cond);
+        pthread_mutex_unlock(&ra->mutex);
+        pthread_join(ra->thread, NULL);
+    }
+    pthread_cond_destroy(&ra->cond);
+    pthread_mutex_destroy(&ra->mutex);
+    free(ra->buf);
+    free(ra);
+}
+"""])
+
+    c_readahead_new = rffi.llexternal('pypy_readahead_new', [], rffi.VOIDP,
+                                      compilation_info=eci, releasegil=False)
+    c_readahead_start = rffi.llexternal('pypy_readahead_start',
+                                        [rffi.VOIDP, rffi.INT, rffi.LONGLONG,
+                                         rffi.LONG], rffi.INT,
+                                        compilation_info=eci,
+                                        releasegil=False,
+                                        save_err=rffi.RFFI_SAVE_ERRNO)
+    c_readahead_wait = rffi.llexternal('pypy_readahead_wait', [rffi.VOIDP],
+                                       rffi.LONG, compilation_info=eci,
+                                       releasegil=True,
+                                       save_err=rffi.RFFI_SAVE_ERRNO)
+    c_readahead_buffer = rffi.llexternal('pypy_readahead_buffer',
+                                         [rffi.VOIDP], rffi.CCHARP,
+                                         compilation_info=eci,
+                                         releasegil=False)
+    c_readahead_free = rffi.llexternal('pypy_readahead_free', [rffi.VOIDP],
+                                       lltype.Void, compilation_info=eci,
+                                       releasegil=True)
+
+
+class ReadAhead(object):
+    """A helper thread that reads ahead one block of a file descriptor.
+    The thread is only started by the first start(); free() must be called
+    to stop it."""
+
+    def __init__(self):
+        self.ll_readahead = c_readahead_new()
+        if not self.ll_readahead:
+            raise MemoryError
+        self.fd = -1
+        self.pending_offset = r_longlong(-1)     # -1 if no read is pending
+        self.size = 0
+
+    def is_pending(self):
+        return self.pending_offset >= 0
+
+    def start(self, fd, offset, size):
+        """Start reading 'size' bytes at 'offset' in the background.
+        Waits for the previous read first, if it was not collected yet."""
+        if self.is_pending():
+            self.wait()
+        res = c_readahead_start(self.ll_readahead, rffi.cast(rffi.INT, fd),
+                                rffi.cast(rffi.LONGLONG, offset),
+                                rffi.cast(rffi.LONG, size))
+        if intmask(res) < 0:
+            raise OSError(get_saved_errno(), "readahead failed")
+        self.fd = fd
+        self.pending_offset = r_longlong(offset)
+        self.size = size
+
+    def wait(self):
+        """Wait for the pending read.  Returns the number of bytes read, or
+        NO_READ, or READ_ERROR.  The data is then in get_buffer() until the
+        next start()."""
+        self.pending_offset = r_longlong(-1)
+        return intmask(c_readahead_wait(self.ll_readahead))
+
+    def get_buffer(self):
+        return c_readahead_buffer(self.ll_readahead)
+
+    def free(self):
+        if self.ll_readahead:
+            c_readahead_free(self.ll_readahead)
+            self.ll_readahead = lltype.nullptr(rffi.VOIDP.TO)
+            self.pending_offset = r_longlong(-1)
@@ -0,0 +1,478 @@
+"""
+Asynchronous getaddrinfo(): a pool of helper threads, written in C, that
+resolve the submitted requests in the background.  The results are
+collected with collect().  A pipe becomes readable whenever results are
+ready, so that an event loop can wait for its fileno() together with its
+other file descriptors.
+
+Only available on POSIX platforms (HAVE_ASYNC_RESOLVER).  The helper
+threads do not survive a fork(): the requests that they were resolving at
+that point never complete in the child.
+"""
+
+import sys
+
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+from rpython.rlib import rsocket
+from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.rposix import get_saved_errno
+
+
+HAVE_ASYNC_RESOLVER = sys.platform != 'win32'
+
+if HAVE_ASYNC_RESOLVER:
+    eci = ExternalCompilationInfo(
+        includes=['pthread.h'],
+        libraries=['pthread'],
+        post_include_bits=["""
+RPY_EXTERN void *pypy_resolver_new(int);
+RPY_EXTERN int pypy_resolver_fileno(void *);
+RPY_EXTERN int pypy_resolver_submit(void *, long, char *, char *,
+                                    int, int, int, int);
+RPY_EXTERN void pypy_resolver_wakeup(void *);
+RPY_EXTERN void pypy_resolver_drain(void *);
+RPY_EXTERN void *pypy_resolver_pop_done(void *);
+RPY_EXTERN long pypy_resolver_request_id(void *);
+RPY_EXTERN int pypy_resolver_request_error(void *);
+RPY_EXTERN void *pypy_resolver_request_take_result(void *);
+RPY_EXTERN void pypy_resolver_request_free(void *);
+RPY_EXTERN void pypy_resolver_free(void *);
+"""],
+        separate_module_sources=["""
+#include <pthread.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <errno.h>
+#include <sys/types.h>
+#include <sys/socket.h>
+#include <netdb.h>
+
+struct pypy_gai_request_s {
+    struct pypy_gai_request_s *next;
+    long id;
+    char *host, *port;          /* malloced copies, or NULL */
+    struct addrinfo hints;
+    struct addrinfo *result;
+    int error;
+};
+
+struct pypy_resolver_s {
+    pthread_mutex_t mutex;
+    pthread_cond_t cond;
+    pid_t pid;                  /* the process that started the threads */
+    int max_threads, threads, idle_threads;
+    int refs;                   /* the owner, plus one per running thread */
+    int quit;
+    int wakeup_fds[2];
+    struct pypy_gai_request_s *queue, *queue_tail;
+    struct pypy_gai_request_s *done, *done_tail;
+};
+
+static void pypy_gai_request_free(struct pypy_gai_request_s *req)
+{
+    if (req->result != NULL)
+        freeaddrinfo(req->result);
+    free(req->host);
+    free(req->port);
+    free(req);
+}
+
+static void pypy_gai_request_list_free(struct pypy_gai_request_s *req)
+{
+    while (req != NULL) {
+        struct pypy_gai_request_s *next = req->next;
+        pypy_gai_request_free(req);
+        req = next;
+    }
+}
+
+static void pypy_resolver_destroy(struct pypy_resolver_s *r)
+{
+    pypy_gai_request_list_free(r->queue);
+    pypy_gai_request_list_free(r->done);
+    close(r->wakeup_fds[0]);
+    close(r->wakeup_fds[1]);
+    pthread_cond_destroy(&r->cond);
+    pthread_mutex_destroy(&r->mutex);
+    free(r);
+}
+
+/* Called with the mutex held.  If the pipe is full, it is readable
+   anyway. */
+static void pypy_resolver_write_wakeup(struct pypy_resolver_s *r)
+{
+    char c = 0;
+    ssize_t n;
+    do {
+        n = write(r->wakeup_fds[1], &c, 1);
+    } while (n < 0 && errno == EINTR);
+}
+
+static void *pypy_resolver_thread(void *arg)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)arg;
+    int last;
+    pthread_mutex_lock(&r->mutex);
+    while (1) {
+        struct pypy_gai_request_s *req;
+
+        while (r->queue == NULL && !r->quit) {
+            r->idle_threads++;
+            pthread_cond_wait(&r->cond, &r->mutex);
+            r->idle_threads--;
+        }
+        if (r->quit)
+            break;
+        req = r->queue;
+        r->queue = req->next;
+        if (r->queue == NULL)
+            r->queue_tail = NULL;
+        pthread_mutex_unlock(&r->mutex);
+
+        req->error = getaddrinfo(req->host, req->port, &req->hints,
+                                 &req->result);
+        req->next = NULL;
+
+        pthread_mutex_lock(&r->mutex);
+        if (r->done_tail != NULL)
+            r->done_tail->next = req;
+        else
+            r->done = req;
+        r->done_tail = req;
+        pypy_resolver_write_wakeup(r);
+    }
+    r->threads--;
+    last = --r->refs == 0;
+    pthread_mutex_unlock(&r->mutex);
+    if (last)
+        pypy_resolver_destroy(r);
+    return NULL;
+}
+
+/* The helper threads do not exist any more in a forked child. */
+static void pypy_resolver_check_fork(struct pypy_resolver_s *r)
+{
+    if (r->threads > 0 && r->pid != getpid()) {
+        pthread_mutex_init(&r->mutex, NULL);
+        pthread_cond_init(&r->cond, NULL);
+        r->refs -= r->threads;
+        r->threads = 0;
+        r->idle_threads = 0;
+    }
+}
+
+static int pypy_resolver_set_flags(int fd)
+{
+    int flags = fcntl(fd, F_GETFL);
+    if (flags < 0 || fcntl(fd, F_SETFL, flags | O_NONBLOCK) < 0)
+        return -1;
+    flags = fcntl(fd, F_GETFD);
+    if (flags < 0 || fcntl(fd, F_SETFD, flags | FD_CLOEXEC) < 0)
+        return -1;
+    return 0;
+}
+
+/* Returns NULL with errno set if the pipe cannot be created. */
+RPY_EXTERN void *pypy_resolver_new(int max_threads)
+{
+    struct pypy_resolver_s *r = calloc(1, sizeof(struct pypy_resolver_s));
+    if (r == NULL) {
+        errno = ENOMEM;
+        return NULL;
+    }
+    if (pipe(r->wakeup_fds) < 0) {
+        free(r);
+        return NULL;
+    }
+    if (pypy_resolver_set_flags(r->wakeup_fds[0]) < 0 ||
+        pypy_resolver_set_flags(r->wakeup_fds[1]) < 0) {
+        int saved_errno = errno;
+        close(r->wakeup_fds[0]);
+        close(r->wakeup_fds[1]);
+        free(r);
+        errno = saved_errno;
+        return NULL;
+    }
+    pthread_mutex_init(&r->mutex, NULL);
+    pthread_cond_init(&r->cond, NULL);
+    r->max_threads = max_threads > 0 ? max_threads : 1;
+    r->refs = 1;
+    return r;
+}
+
+RPY_EXTERN int pypy_resolver_fileno(void *p)
+{
+    return ((struct pypy_resolver_s *)p)->wakeup_fds[0];
+}
+
+static char *pypy_resolver_strdup(char *s, int *failed)
+{
+    char *result;
+    if (s == NULL)
+        return NULL;
+    result = strdup(s);
+    if (result == NULL)
+        *failed = 1;
+    return result;
+}
+
+/* Queues a request, and starts one more thread if none is idle.  Returns
+   0, or -1 with errno set. */
+RPY_EXTERN int pypy_resolver_submit(void *p, long id, char *host, char *port,
+                                    int family, int socktype, int proto,
+                                    int flags)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)p;
+    struct pypy_gai_request_s *req;
+    int failed = 0;
+
+    req = calloc(1, sizeof(struct pypy_gai_request_s));
+    if (req == NULL) {
+        errno = ENOMEM;
+        return -1;
+    }
+    req->id = id;
+    req->host = pypy_resolver_strdup(host, &failed);
+    req->port = pypy_resolver_strdup(port, &failed);
+    if (failed) {
+        pypy_gai_request_free(req);
+        errno = ENOMEM;
+        return -1;
+    }
+    req->hints.ai_family = family;
+    req->hints.ai_socktype = socktype;
+    req->hints.ai_protocol = proto;
+    req->hints.ai_flags = flags;
+
+    pthread_mutex_lock(&r->mutex);
+    pypy_resolver_check_fork(r);
+    if (r->idle_threads == 0 && r->threads < r->max_threads) {
+        pthread_t thread;
+        pthread_attr_t attr;
+        int err;
+        pthread_attr_init(&attr);
+        pthread_attr_setdetachstate(&attr, PTHREAD_CREATE_DETACHED);
+        err = pthread_create(&thread, &attr, pypy_resolver_thread, r);
+        pthread_attr_destroy(&attr);
+        if (err == 0) {
+            r->threads++;
+            r->refs++;
+            r->pid = getpid();
+        }
+        else if (r->threads == 0) {
+            pthread_mutex_unlock(&r->mutex);
+            pypy_gai_request_free(req);
+            errno = err;
+            return -1;
+        }
+    }
+    if (r->queue_tail != NULL)
+        r->queue_tail->next = req;
+    else
+        r->queue = req;
+    r->queue_tail = req;
+    pthread_cond_signal(&r->cond);
+    pthread_mutex_unlock(&r->mutex);
+    return 0;
+}
+
+/* Makes the pipe readable, for results that are ready without a
+   request to the helper threads. */
+RPY_EXTERN void pypy_resolver_wakeup(void *p)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)p;
+    pthread_mutex_lock(&r->mutex);
+    pypy_resolver_write_wakeup(r);
+    pthread_mutex_unlock(&r->mutex);
+}
+
+/* Empties the pipe.  Must be called before the pypy_resolver_pop_done()
+   calls, so that no wakeup is lost. */
+RPY_EXTERN void pypy_resolver_drain(void *p)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)p;
+    char buf[64];
+    ssize_t n;
+    do {
+        n = read(r->wakeup_fds[0], buf, sizeof(buf));
+    } while (n > 0 || (n < 0 && errno == EINTR));
+}
+
+RPY_EXTERN void *pypy_resolver_pop_done(void *p)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)p;
+    struct pypy_gai_request_s *req;
+    pthread_mutex_lock(&r->mutex);
+    req = r->done;
+    if (req != NULL) {
+        r->done = req->next;
+        if (r->done == NULL)
+            r->done_tail = NULL;
+    }
+    pthread_mutex_unlock(&r->mutex);
+    return req;
+}
+
+RPY_EXTERN long pypy_resolver_request_id(void *p)
+{
+    return ((struct pypy_gai_request_s *)p)->id;
+}
+
+RPY_EXTERN int pypy_resolver_request_error(void *p)
+{
+    return ((struct pypy_gai_request_s *)p)->error;
+}
+
+/* The caller must then free the result with freeaddrinfo(). */
+RPY_EXTERN void *pypy_resolver_request_take_result(void *p)
+{
+    struct pypy_gai_request_s *req = (struct pypy_gai_request_s *)p;
+    struct addrinfo *result = req->result;
+    req->result = NULL;
+    return result;
+}
+
+RPY_EXTERN void pypy_resolver_request_free(void *p)
+{
+    pypy_gai_request_free((struct pypy_gai_request_s *)p);
+}
+
+/* The threads still running a getaddrinfo() finish it, and the last one
+   frees everything. */
+RPY_EXTERN void pypy_resolver_free(void *p)
+{
+    struct pypy_resolver_s *r = (struct pypy_resolver_s *)p;
+    int last;
+    pthread_mutex_lock(&r->mutex);
+    pypy_resolver_check_fork(r);
+    r->quit = 1;
+    pthread_cond_broadcast(&r->cond);
+    last = --r->refs == 0;
+    pthread_mutex_unlock(&r->mutex);
+    if (last)
+        pypy_resolver_destroy(r);
+}
+"""])
+
+    c_resolver_new = rffi.llexternal('pypy_resolver_new', [rffi.INT],
+                                     rffi.VOIDP, compilation_info=eci,
+                                     releasegil=False,
+                                     save_err=rffi.RFFI_SAVE_ERRNO)
+    c_resolver_fileno = rffi.llexternal('pypy_resolver_fileno', [rffi.VOIDP],
+                                        rffi.INT, compilation_info=eci,
+                                        releasegil=False)
+    c_resolver_submit = rffi.llexternal('pypy_resolver_submit',
+                                        [rffi.VOIDP, rffi.LONG, rffi.CCHARP,
+                                         rffi.CCHARP, rffi.INT, rffi.INT,
+                                         rffi.INT, rffi.INT], rffi.INT,
+                                        compilation_info=eci,
+                                        releasegil=False,
+                                        save_err=rffi.RFFI_SAVE_ERRNO)
+    c_resolver_wakeup = rffi.llexternal('pypy_resolver_wakeup', [rffi.VOIDP],
+                                        lltype.Void, compilation_info=eci,
+                                        releasegil=False)
+    c_resolver_drain = rffi.llexternal('pypy_resolver_drain', [rffi.VOIDP],
+                                       lltype.Void, compilation_info=eci,
+                                       releasegil=False)
+    c_resolver_pop_done = rffi.llexternal('pypy_resolver_pop_done',
+                                          [rffi.VOIDP], rffi.VOIDP,
+                                          compilation_info=eci,
+                                          releasegil=False)
+    c_request_id = rffi.llexternal('pypy_resolver_request_id', [rffi.VOIDP],
+                                   rffi.LONG, compilation_info=eci,
+                                   releasegil=False)
+    c_request_error = rffi.llexternal('pypy_resolver_request_error',
+                                      [rffi.VOIDP], rffi.INT,
+                                      compilation_info=eci,
+                                      releasegil=False)
+    c_request_take_result = rffi.llexternal(
+        'pypy_resolver_request_take_result', [rffi.VOIDP], rffi.VOIDP,
+        compilation_info=eci, releasegil=False)
+    c_request_free = rffi.llexternal('pypy_resolver_request_free',
+                                     [rffi.VOIDP], lltype.Void,
+                                     compilation_info=eci, releasegil=False)
+    c_resolver_free = rffi.llexternal('pypy_resolver_free', [rffi.VOIDP],
+                                      lltype.Void, compilation_info=eci,
+                                      releasegil=False)
+
+
+def _str2charp_or_null(s):
+    if s is None:
+        return lltype.nullptr(rffi.CCHARP.TO)
+    return rffi.str2charp(s)
+
+def _free_charp_or_null(p):
+    if p:
+        rffi.free_charp(p)
+
+
+class AsyncResolver(object):
+    """Runs getaddrinfo() in up to 'max_threads' helper threads, which are
+    only started when needed.  free() must be called to stop them."""
+
+    def __init__(self, max_threads):
+        self.ll_resolver = c_resolver_new(rffi.cast(rffi.INT, max_threads))
+        if not self.ll_resolver:
+            raise OSError(get_saved_errno(), "cannot create the resolver")
+
+    def fileno(self):
+        """A file descriptor that is readable when collect() may return
+        results."""
+        return intmask(c_resolver_fileno(self.ll_resolver))
+
+    def submit(self, id, host, port_or_service, family=rsocket.AF_UNSPEC,
+               socktype=0, proto=0, flags=0):
+        """Start a getaddrinfo(), whose result collect() returns with the
+        given 'id'."""
+        if (rsocket._c._MACOSX and flags & rsocket.AI_NUMERICSERV and
+                (port_or_service is None or port_or_service == '0')):
+            port_or_service = '00'
+        ll_host = _str2charp_or_null(host)
+        ll_port = _str2charp_or_null(port_or_service)
+        try:
+            res = c_resolver_submit(self.ll_resolver, id, ll_host, ll_port,
+                                    rffi.cast(rffi.INT, family),
+                                    rffi.cast(rffi.INT, socktype),
+                                    rffi.cast(rffi.INT, proto),
+                                    rffi.cast(rffi.INT, flags))
+        finally:
+            _free_charp_or_null(ll_port)
+            _free_charp_or_null(ll_host)
+        if intmask(res) < 0:
+            raise OSError(get_saved_errno(), "cannot submit the request")
+
+    def wakeup(self):
+        """Make fileno() readable."""
+        c_resolver_wakeup(self.ll_resolver)
+
+    def collect(self):
+        """Return the list of the requests that completed so far, as
+        tuples (id, error, result).  'error' is the getaddrinfo() error
+        code, and 'result' is what rsocket.getaddrinfo() would return, or
+        an empty list."""
+        c_resolver_drain(self.ll_resolver)
+        completed = []
+        while True:
+            req = c_resolver_pop_done(self.ll_resolver)
+            if not req:
+                break
+            try:
+                id = intmask(c_request_id(req))
+                error = intmask(c_request_error(req))
+                result = []
+                if error == 0:
+                    res = c_request_take_result(req)
+                    result = rsocket.getaddrinfo_result(
+                        rffi.cast(rsocket._c.addrinfo_ptr, res))
+            finally:
+                c_request_free(req)
+            completed.append((id, error, result))
+        return completed
+
+    def free(self):
+        if self.ll_resolver:
+            c_resolver_free(self.ll_resolver)
+            self.ll_resolver = lltype.nullptr(rffi.VOIDP.TO)
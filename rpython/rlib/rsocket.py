@@ -1220,6 +1220,88 @@ class RSocket(object):
 
         return bytes_sent
 
+    if _c.HAVE_MMSG:
+        @jit.dont_look_inside
+        def sendmmsg(self, buffers, flags=0, address=None):
+            """Send each of the 'buffers' (rlib.buffer.Buffer instances) as
+            a separate datagram with a single sendmmsg() call.  The data is
+            sent from the buffers' raw addresses, without copies.  Return
+            the number of datagrams sent, which may be less than
+            len(buffers)."""
+            self.wait_for_data(True)
+            if address is None:
+                addr = lltype.nullptr(_c.sockaddr)
+                addrlen = 0
+            else:
+                addr = address.lock()
+                addrlen = address.addrlen
+            nbuf = len(buffers)
+            messages = lltype.malloc(rffi.CCHARPP.TO, nbuf, flavor='raw')
+            lengths = lltype.malloc(rffi.SIGNEDP.TO, nbuf, flavor='raw')
+            try:
+                for i in range(nbuf):
+                    messages[i] = buffers[i].get_raw_address()
+                    lengths[i] = buffers[i].getlength()
+                res = _c.sendmmsg(self.fd, addr, addrlen, messages, lengths,
+                                  nbuf, flags)
+                keepalive_until_here(buffers)
+            finally:
+                lltype.free(lengths, flavor='raw')
+                lltype.free(messages, flavor='raw')
+                if address is not None:
+                    address.unlock()
+            if res < 0:
+                raise self.error_handler()
+            return res
+
+        @jit.dont_look_inside
+        def recvmmsg_into(self, buffers, flags=0):
+            """Receive up to len(buffers) datagrams with a single recvmmsg()
+            call, the i-th one directly into buffers[i].  Blocks only until
+            the first datagram arrives.  Return a list of (nbytes,
+            msg_flags, address) tuples, one per datagram received; it may
+            be shorter than 'buffers'.  'address' is None if the
+            socket did not report one, e.g. for connected stream sockets."""
+            self.wait_for_data(False)
+            nbuf = len(buffers)
+            addrsize = instantiate_family(self.family).maxlen
+            messages = lltype.malloc(rffi.CCHARPP.TO, nbuf, flavor='raw')
+            lengths = lltype.malloc(rffi.SIGNEDP.TO, nbuf, flavor='raw')
+            addresses = lltype.malloc(rffi.CCHARP.TO, nbuf * addrsize,
+                                      flavor='raw', zero=True)
+            addrlens = lltype.malloc(_c.socklen_t_array.TO, nbuf,
+                                     flavor='raw')
+            received = lltype.malloc(rffi.SIGNEDP.TO, nbuf, flavor='raw')
+            retflags = lltype.malloc(rffi.SIGNEDP.TO, nbuf, flavor='raw')
+            try:
+                for i in range(nbuf):
+                    messages[i] = buffers[i].get_raw_address()
+                    lengths[i] = buffers[i].getlength()
+                res = _c.recvmmsg(self.fd, messages, lengths, nbuf, flags,
+                                  addresses, addrsize, addrlens, received,
+                                  retflags)
+                keepalive_until_here(buffers)
+                if res < 0:
+                    raise self.error_handler()
+                result = []
+                for i in range(res):
+                    addrlen = rffi.cast(lltype.Signed, addrlens[i])
+                    if addrlen:
+                        addrptr = rffi.cast(_c.sockaddr_ptr,
+                                    rffi.ptradd(addresses, i * addrsize))
+                        address = make_address(addrptr, addrlen)
+                    else:
+                        address = None
+                    result.append((received[i], retflags[i], address))
+                return result
+            finally:
+                lltype.free(retflags, flavor='raw')
+                lltype.free(received, flavor='raw')
+                lltype.free(addrlens, flavor='raw')
+                lltype.free(addresses, flavor='raw')
+                lltype.free(lengths, flavor='raw')
+                lltype.free(messages, flavor='raw')
+
     def setblocking(self, block):
         if block:
             timeout = -1.0
@@ -1598,6 +1680,11 @@ def getaddrinfo(host, port_or_service,
     lltype.free(hints, flavor='raw')
     if error:
         raise GAIError(error)
+    return getaddrinfo_result(res, address_to_fill)
+
+def getaddrinfo_result(res, address_to_fill=None):
+    """Convert and free the linked list of addrinfo structures 'res'
+    returned by the C getaddrinfo()."""
     try:
         result = []
         info = res
@@ -168,17 +168,23 @@ class Lock(object):
 
     def acquire(self, flag):
         if flag:
+            # fast path: take a free lock without releasing the GIL
+            if self._try_acquire():
+                return True
             res = c_thread_acquirelock(self._lock, 1)
             if rffi.cast(lltype.Signed, res) != 1:
                 raise error("lock acquire returned an unexpected error")
             return True
         else:
-            res = c_thread_acquirelock_timed_NOAUTO(
-                self._lock,
-                rffi.cast(rffi.LONGLONG, 0),
-                rffi.cast(rffi.INT, 0))
-            res = rffi.cast(lltype.Signed, res)
-            return bool(res)
+            return self._try_acquire()
+
+    def _try_acquire(self):
+        res = c_thread_acquirelock_timed_NOAUTO(
+            self._lock,
+            rffi.cast(rffi.LONGLONG, 0),
+            rffi.cast(rffi.INT, 0))
+        res = rffi.cast(lltype.Signed, res)
+        return bool(res)
 
     def is_acquired(self):
         """ check if the lock is acquired (does not release the GIL) """
@@ -192,6 +198,10 @@ class Lock(object):
     def acquire_timed(self, timeout):
         """Timeout is in microseconds.  Returns 0 in case of failure,
         1 in case it works, 2 if interrupted by a signal."""
+        if self._try_acquire():
+            return 1
+        if timeout == 0:
+            return 0
         res = c_thread_acquirelock_timed(self._lock, timeout, 1)
         res = rffi.cast(lltype.Signed, res)
         return res
@@ -553,9 +553,13 @@ class BufferingInputStream(Stream):
         self.do_read = base.read   # function to fill buffer some more
         self.do_tell = base.tell   # return a byte offset
         self.do_seek = base.seek   # seek to a byte offset
+        # with the default buffer size, the size of the reads doubles
+        # on sequential access, up to bigsize; seeking resets it
+        self.adaptive = bufsize == -1
         if bufsize == -1:     # Get default from the class
             bufsize = self.bufsize
         self.bufsize = bufsize  # buffer size (hint only)
+        self.readsize = bufsize # size of the next read
         self.buf = ""           # raw data
         self.pos = 0
 
@@ -568,6 +572,14 @@ class BufferingInputStream(Stream):
             else:
                 self.buf = ""
                 self.pos = 0
+                self.readsize = self.bufsize
+
+    def read_next_block(self):
+        # the buffer is exhausted: this is a sequential read
+        data = self.do_read(self.readsize)
+        if self.adaptive and self.readsize < self.bigsize:
+            self.readsize = min(self.readsize * 2, self.bigsize)
+        return data
 
     def tell(self):
         tellpos = self.do_tell()  # This may fail
@@ -618,6 +630,7 @@ class BufferingInputStream(Stream):
             else:
                 self.buf = ""
                 self.pos = 0
+                self.readsize = self.bufsize
             return
         if whence == 2:
             try:
@@ -627,6 +640,7 @@ class BufferingInputStream(Stream):
             else:
                 self.pos = 0
                 self.buf = ""
+                self.readsize = self.bufsize
                 return
             # Skip relative to EOF by reading and saving only just as
             # much as needed
@@ -698,7 +712,7 @@ class BufferingInputStream(Stream):
             builder = StringBuilder(n)
             builder.append_slice(self.buf, start, len(self.buf))
             while 1:
-                self.buf = self.do_read(self.bufsize)
+                self.buf = self.read_next_block()
                 if not self.buf:
                     self.pos = 0
                     break
@@ -727,7 +741,7 @@ class BufferingInputStream(Stream):
             return result
         temp = self.buf[start:]
         # read one buffer and most of the time a new line will be found
-        self.buf = self.do_read(self.bufsize)
+        self.buf = self.read_next_block()
         i = self.buf.find("\n")
         if i >= 0: # new line found
             i += 1
@@ -742,7 +756,7 @@ class BufferingInputStream(Stream):
         builder.append(temp)
         builder.append(self.buf)
         while 1:
-            self.buf = self.do_read(self.bufsize)
+            self.buf = self.read_next_block()
             if not self.buf:
                 self.pos = 0
                 break
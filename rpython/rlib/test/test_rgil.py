@@ -161,6 +161,55 @@ class BaseTestGIL(StandaloneTests):
         assert data == "OK\n"
 
 
+    def test_stats(self):
+        import time
+        from rpython.rlib import rthread
+
+        class Glob:
+            pass
+        glob = Glob()
+
+        def busy(seconds):
+            end_time = time.time() + seconds
+            while time.time() < end_time:
+                rgil.yield_thread()
+
+        def other_thread():
+            busy(0.3)
+            glob.other_stats = rgil.get_stats()
+            glob.finish_lock.release()
+
+        def main(argv):
+            rgil.set_switch_interval(0.01)
+            glob.finish_lock = rthread.allocate_lock()
+            glob.finish_lock.acquire(True)
+            rthread.start_new_thread(other_thread, ())
+            busy(0.3)
+            glob.finish_lock.acquire(True)
+            stats = rgil.get_stats()
+            other = glob.other_stats
+            print stats.switch_interval, stats.fair
+            # both threads got the GIL from the other one many times,
+            # but not more often than every 10 ms
+            print stats.thread_waits > 5, other.thread_waits > 5
+            print stats.switches >= stats.thread_waits + other.thread_waits
+            print stats.yields < 100
+            print stats.thread_hold_time > 0.05, stats.thread_wait_time > 0.05
+            print other.thread_hold_time > 0.05, other.thread_wait_time > 0.05
+            return 0
+
+        self.config = get_combined_translation_config(
+            overrides={"translation.thread": True})
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == ("0.010000 0\n"
+                        "1 1\n"
+                        "1\n"
+                        "1\n"
+                        "1 1\n"
+                        "1 1\n")
+
+
 class TestGILShadowStack(BaseTestGIL):
     gc = 'minimark'
     gcrootfinder = 'shadowstack'
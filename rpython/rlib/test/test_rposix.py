@@ -796,6 +796,34 @@ def test_pwrite():
         os.close(fd)
     py.test.raises(OSError, rposix.pwrite, fd, b'ea', 1)
 
+@rposix_requires('readv')
+def test_readv():
+    fname = str(udir.join('os_test_readv.txt'))
+    fd = os.open(fname, os.O_RDWR | os.O_CREAT, 0777)
+    try:
+        os.write(fd, b'Hello world')
+        os.lseek(fd, 0, 0)
+        assert rposix.readv(fd, [5, 0, 1, 3]) == [b'Hello', b'', b' ', b'wor']
+        assert rposix.readv(fd, [1, 10, 4]) == [b'l', b'd', b'']
+        assert rposix.readv(fd, [4]) == [b'']
+        py.test.raises(OSError, rposix.readv, fd, [-1])
+    finally:
+        os.close(fd)
+    py.test.raises(OSError, rposix.readv, fd, [2])
+
+@rposix_requires('writev')
+def test_writev():
+    fname = str(udir.join('os_test_writev.txt'))
+    fd = os.open(fname, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0777)
+    try:
+        assert rposix.writev(fd, [b'Hello', b'', b' world']) == 11
+        assert rposix.writev(fd, []) == 0
+        os.lseek(fd, 0, 0)
+        assert os.read(fd, 20) == b'Hello world'
+    finally:
+        os.close(fd)
+    py.test.raises(OSError, rposix.writev, fd, [b'x'])
+
 @rposix_requires('posix_fadvise')
 def test_posix_fadvise():
     if sys.maxint <= 2**32:
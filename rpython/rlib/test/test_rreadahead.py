@@ -0,0 +1,64 @@
+import os
+import py
+from rpython.rlib import rreadahead
+from rpython.rtyper.lltypesystem import rffi
+from rpython.tool.udir import udir
+
+if not rreadahead.HAVE_READAHEAD:
+    py.test.skip("no readahead thread on this platform")
+
+
+def test_readahead():
+    fname = str(udir.join('test_readahead.txt'))
+    with open(fname, 'wb') as f:
+        f.write(b'0123456789' * 100)
+    fd = os.open(fname, os.O_RDONLY)
+    ra = rreadahead.ReadAhead()
+    try:
+        assert not ra.is_pending()
+        assert ra.wait() == rreadahead.NO_READ
+        ra.start(fd, 5, 10)
+        assert ra.is_pending()
+        assert ra.pending_offset == 5
+        assert ra.wait() == 10
+        assert not ra.is_pending()
+        assert rffi.charpsize2str(ra.get_buffer(), 10) == b'5678901234'
+        # a larger read than before reallocates the buffer
+        ra.start(fd, 990, 4096)
+        assert ra.wait() == 10
+        assert rffi.charpsize2str(ra.get_buffer(), 10) == b'0123456789'
+        ra.start(fd, 2000, 10)
+        assert ra.wait() == 0
+        # the position of the file descriptor is not changed
+        assert os.lseek(fd, 0, 1) == 0
+    finally:
+        os.close(fd)
+    ra.start(fd, 0, 10)
+    assert ra.wait() == rreadahead.READ_ERROR
+    ra.free()
+    ra.free()
+
+def test_compiled():
+    from rpython.translator.c.test.test_genc import compile
+    fname = str(udir.join('test_readahead_compiled.txt'))
+    with open(fname, 'wb') as f:
+        f.write(b'abcdefghij' * 1000)
+
+    def main(offset):
+        fd = os.open(fname, os.O_RDONLY, 0)
+        ra = rreadahead.ReadAhead()
+        total = 0
+        ra.start(fd, offset, 4096)
+        while True:
+            n = ra.wait()
+            if n <= 0:
+                break
+            total += n
+            ra.start(fd, offset + total, 4096)
+        ra.free()
+        os.close(fd)
+        return total
+
+    fn = compile(main, [int])
+    assert fn(0) == 10000
+    assert fn(9000) == 1000
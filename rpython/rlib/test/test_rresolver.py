@@ -0,0 +1,92 @@
+import py
+import select
+from rpython.rlib import rresolver, rsocket
+
+if not rresolver.HAVE_ASYNC_RESOLVER:
+    py.test.skip("no asynchronous resolver on this platform")
+
+
+def collect_all(resolver, count):
+    results = {}
+    while len(results) < count:
+        r, w, x = select.select([resolver.fileno()], [], [], 10.0)
+        assert r, "timed out"
+        for id, error, result in resolver.collect():
+            results[id] = (error, result)
+    return results
+
+def test_resolve():
+    resolver = rresolver.AsyncResolver(2)
+    try:
+        assert resolver.collect() == []
+        resolver.submit(1, "localhost", "80", rsocket.AF_INET,
+                        rsocket.SOCK_STREAM)
+        resolver.submit(2, "127.0.0.1", None, rsocket.AF_INET,
+                        rsocket.SOCK_DGRAM, 0, rsocket.AI_NUMERICHOST)
+        resolver.submit(3, "not an address", "80", rsocket.AF_INET, 0, 0,
+                        rsocket.AI_NUMERICHOST)
+        results = collect_all(resolver, 3)
+        error, result = results[1]
+        assert error == 0
+        expected = rsocket.getaddrinfo("localhost", "80", rsocket.AF_INET,
+                                       rsocket.SOCK_STREAM)
+        assert [(f, t, p, c, a.get_host(), a.get_port())
+                for (f, t, p, c, a) in result] == \
+               [(f, t, p, c, a.get_host(), a.get_port())
+                for (f, t, p, c, a) in expected]
+        error, result = results[2]
+        assert error == 0
+        assert result[0][4].get_host() == "127.0.0.1"
+        error, result = results[3]
+        assert error == rsocket.EAI_NONAME
+        assert result == []
+        # nothing left, and the pipe is empty again
+        assert resolver.collect() == []
+        assert select.select([resolver.fileno()], [], [], 0.0)[0] == []
+        resolver.wakeup()
+        assert select.select([resolver.fileno()], [], [], 0.0)[0] != []
+        assert resolver.collect() == []
+    finally:
+        resolver.free()
+    resolver.free()
+
+def test_many_requests():
+    resolver = rresolver.AsyncResolver(4)
+    for i in range(50):
+        resolver.submit(i, "127.0.0.%d" % (i + 1,), "%d" % (1000 + i),
+                        rsocket.AF_INET, rsocket.SOCK_STREAM, 0,
+                        rsocket.AI_NUMERICHOST)
+    results = collect_all(resolver, 50)
+    for i in range(50):
+        error, result = results[i]
+        assert error == 0
+        assert result[0][4].get_host() == "127.0.0.%d" % (i + 1,)
+        assert result[0][4].get_port() == 1000 + i
+    resolver.free()
+
+def test_free_with_pending_requests():
+    resolver = rresolver.AsyncResolver(1)
+    for i in range(10):
+        resolver.submit(i, "localhost", None)
+    resolver.free()
+
+def test_compiled():
+    from rpython.translator.c.test.test_genc import compile
+
+    def main(count):
+        resolver = rresolver.AsyncResolver(2)
+        for i in range(count):
+            resolver.submit(i, "127.0.0.1", "%d" % (i,), rsocket.AF_INET,
+                            rsocket.SOCK_STREAM, 0, rsocket.AI_NUMERICHOST)
+        total = 0
+        done = 0
+        while done < count:
+            for id, error, result in resolver.collect():
+                assert error == 0
+                total += result[0][4].get_port()
+                done += 1
+        resolver.free()
+        return total
+
+    fn = compile(main, [int])
+    assert fn(10) == 45
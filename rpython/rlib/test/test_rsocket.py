@@ -324,6 +324,32 @@ def test_simple_udp(do_recv):
     s1.close()
     s2.close()
 
+@pytest.mark.skipif(not rsocket._c.HAVE_MMSG, reason='Linux only')
+def test_sendmmsg_recvmmsg_udp():
+    s1 = RSocket(AF_INET, SOCK_DGRAM)
+    s1.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    s2 = RSocket(AF_INET, SOCK_DGRAM)
+    s2.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    addr2 = s2.getsockname()
+    out = []
+    for data in ['a', 'bb', 'ccc']:
+        buf = RawByteBuffer(len(data))
+        buf.setslice(0, data)
+        out.append(buf)
+    assert s1.sendmmsg(out, 0, addr2) == 3
+    bufs = [RawByteBuffer(2) for i in range(4)]
+    result = s2.recvmmsg_into(bufs)
+    assert len(result) == 3
+    assert [nbytes for nbytes, flags, addr in result] == [1, 2, 2]
+    assert bufs[0].as_str()[:1] == 'a'
+    assert bufs[1].as_str() == 'bb'
+    assert bufs[2].as_str() == 'cc'
+    assert result[2][1] & MSG_TRUNC
+    for nbytes, flags, addr in result:
+        assert addr.eq(s1.getsockname())
+    s1.close()
+    s2.close()
+
 @py.test.mark.skipif("sys.platform == 'darwin'")
 def test_nonblocking(do_recv):
     sock = RSocket()
@@ -192,6 +192,74 @@ class AbstractThreadTests(AbstractGCTestClass):
         res = fn()
         assert res < -1.0
 
+    def test_lock_contended(self):
+        import time
+
+        class State:
+            pass
+        state = State()
+
+        def bootstrap():
+            for i in range(500):
+                state.lock.acquire(True)
+                count = state.count
+                if i % 50 == 0:
+                    time.sleep(0.001)   # releases the GIL, not the lock
+                state.count = count + 1
+                state.lock.release()
+            state.finished += 1
+
+        def f():
+            state.lock = allocate_lock()
+            state.count = 0
+            state.finished = 0
+            for i in range(8):
+                start_new_thread(bootstrap, ())
+            willing_to_wait_more = 2000
+            while state.finished < 8:
+                willing_to_wait_more -= 1
+                if not willing_to_wait_more:
+                    raise Exception("threads didn't finish?")
+                time.sleep(0.01)
+            return state.count
+
+        fn = self.getcompiled(f, [])
+        res = fn()
+        assert res == 8 * 500
+
+    def test_acquire_timed_woken_up(self):
+        import time
+
+        class State:
+            pass
+        state = State()
+
+        def bootstrap():
+            t1 = time.time()
+            state.result = state.lock.acquire_timed(10000000)
+            state.delay = time.time() - t1
+
+        def f():
+            state.lock = allocate_lock()
+            state.lock.acquire(True)
+            state.result = -1
+            start_new_thread(bootstrap, ())
+            time.sleep(0.2)
+            state.lock.release()
+            willing_to_wait_more = 1000
+            while state.result == -1:
+                willing_to_wait_more -= 1
+                if not willing_to_wait_more:
+                    raise Exception("thread didn't wake up?")
+                time.sleep(0.01)
+            if state.result != 1:      # RPY_LOCK_ACQUIRED
+                return -1.0
+            return state.delay
+
+        fn = self.getcompiled(f, [])
+        res = fn()
+        assert 0.1 < res < 5.0
+
     def test_acquire_timed_huge_timeout(self):
         t = r_longlong(2 ** 61)
         def f():
@@ -450,6 +450,27 @@ class TestBufferedRead:
         for want, got, pos in self.source.chunks:
             assert want >= 4
 
+    def test_adaptive_read_size(self):
+        base = TSource(["x" * 100000] * 10)
+        file = streamio.BufferingInputStream(base)
+        while file.read(1000): pass
+        sizes = [want for want, got, pos in base.chunks]
+        bufsize = streamio.BufferingInputStream.bufsize
+        bigsize = streamio.BufferingInputStream.bigsize
+        assert sizes[:3] == [bufsize, bufsize * 2, bufsize * 4]
+        assert sizes[-1] == bigsize
+        # seeking resets the size of the reads
+        file.seek(10, 0)
+        file.read(1)
+        assert base.chunks[-1] == (bufsize, bufsize, 10)
+
+    def test_explicit_bufsize_is_fixed(self):
+        base = TSource(["x" * 100000] * 10)
+        file = streamio.BufferingInputStream(base, 4096)
+        while file.readline(): pass
+        assert [want for want, got, pos in base.chunks] == (
+            [4096] * len(base.chunks))
+
 class BaseTestBufferingOutputStream(BaseRtypingTest):
 
     def test_write(self):
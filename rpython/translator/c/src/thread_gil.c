@@ -90,6 +90,97 @@ static mutex1_t mutex_gil_stealer;
 static mutex2_t mutex_gil;
 
 
+/* Tuning and statistics, see rgil.py.  The global counters are only
+   changed by the thread holding the GIL.  The hold time of a thread is
+   measured from the moment it gets the GIL after waiting, until the next
+   time it has to wait; it includes the time spent in external calls in
+   between if no other thread took the GIL meanwhile. */
+
+#ifdef _MSC_VER
+#  define RPY_GIL_TLS  __declspec(thread)
+#else
+#  define RPY_GIL_TLS  __thread
+#endif
+
+struct rpy_gil_thread_stats_s {
+    double acquired_at;         /* or 0.0 if not known */
+    double wait_time, hold_time;
+    Signed waits, yields;
+};
+
+static double rpy_gil_switch_interval = 0.0;  /* seconds, 0.0 = always */
+static int rpy_gil_fair = 0;
+static double rpy_gil_last_switch = 0.0;
+static double rpy_gil_total_wait = 0.0;
+static Signed rpy_gil_switches = 0, rpy_gil_yields = 0;
+static RPY_GIL_TLS struct rpy_gil_thread_stats_s rpy_gil_tstats;
+
+#ifdef _WIN32
+static double rpy_gil_now(void)
+{
+    LARGE_INTEGER freq, counter;
+    QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)freq.QuadPart;
+}
+#else
+#include <time.h>
+static double rpy_gil_now(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+#endif
+
+static void rpy_gil_start_waiting(struct rpy_gil_thread_stats_s *ts, double now)
+{
+    if (ts->acquired_at != 0.0)
+        ts->hold_time += now - ts->acquired_at;
+    ts->acquired_at = 0.0;
+}
+
+static void rpy_gil_got_it(struct rpy_gil_thread_stats_s *ts,
+                           double waiting_since)
+{
+    /* called with the GIL */
+    double now = rpy_gil_now();
+    ts->wait_time += now - waiting_since;
+    ts->waits++;
+    ts->acquired_at = now;
+    rpy_gil_total_wait += now - waiting_since;
+    rpy_gil_switches++;
+    rpy_gil_last_switch = now;
+}
+
+void RPyGilSetSwitchInterval(double interval)
+{
+    rpy_gil_switch_interval = interval;
+}
+
+void RPyGilSetFair(int fair)
+{
+    rpy_gil_fair = fair;
+}
+
+void RPyGilGetStats(double *result)
+{
+    struct rpy_gil_thread_stats_s *ts = &rpy_gil_tstats;
+    double hold_time = ts->hold_time;
+    if (ts->acquired_at != 0.0)
+        hold_time += rpy_gil_now() - ts->acquired_at;
+    result[0] = rpy_gil_switch_interval;
+    result[1] = rpy_gil_fair;
+    result[2] = rpy_gil_switches;
+    result[3] = rpy_gil_yields;
+    result[4] = rpy_gil_total_wait;
+    result[5] = ts->wait_time;
+    result[6] = hold_time;
+    result[7] = ts->waits;
+    result[8] = ts->yields;
+}
+
+
 static void rpy_init_mutexes(void)
 {
     mutex1_init(&mutex_gil_stealer);
@@ -101,6 +192,7 @@ void RPyGilAllocate(void)
 {
     if (rpy_waiting_threads < 0) {
         assert(rpy_waiting_threads == -42);
+        rpy_gil_tstats.acquired_at = rpy_gil_last_switch = rpy_gil_now();
         rpy_init_mutexes();
 #ifdef HAVE_PTHREAD_ATFORK
         pthread_atfork(NULL, NULL, rpy_init_mutexes);
@@ -120,6 +212,8 @@ void RPyGilAcquireSlowPath(void)
     if (1) {      /* preserve commit history */
         int n;
         Signed old_waiting_threads;
+        struct rpy_gil_thread_stats_s *ts = &rpy_gil_tstats;
+        double waiting_since = rpy_gil_now();
 
         if (rpy_waiting_threads < 0) {
             /* <arigo> I tried to have RPyGilAllocate() called from
@@ -140,6 +234,7 @@ void RPyGilAcquireSlowPath(void)
            for the GIL.  The number of such threads is found in
            rpy_waiting_threads. */
         old_waiting_threads = atomic_increment(&rpy_waiting_threads);
+        rpy_gil_start_waiting(ts, waiting_since);
 
         /* Early polling: before entering the waiting queue, we check
            a certain number of times if the GIL becomes free.  The
@@ -159,6 +254,11 @@ void RPyGilAcquireSlowPath(void)
         while (n >= RPY_GIL_POKE_MAX)
             n -= (RPY_GIL_POKE_MAX - RPY_GIL_POKE_MIN);
         rpy_early_poll_n = n;
+
+        /* In fair mode, don't try to get the GIL before the threads that
+           are already waiting: go directly to the end of the queue. */
+        if (rpy_gil_fair && old_waiting_threads > 0)
+            n = -1;
         while (n >= 0) {
             n--;
             if (old_waiting_threads != rpy_waiting_threads) {
@@ -228,6 +328,7 @@ void RPyGilAcquireSlowPath(void)
         atomic_decrement(&rpy_waiting_threads);
         mutex2_loop_stop(&mutex_gil);
         mutex1_unlock(&mutex_gil_stealer);
+        rpy_gil_got_it(ts, waiting_since);
     }
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
 }
@@ -240,6 +341,15 @@ Signed RPyGilYieldThread(void)
     if (rpy_waiting_threads <= 0)
         return 0;
 
+    /* With a switch interval, keep the GIL until it has been held for
+       that long since it last changed hands. */
+    if (rpy_gil_switch_interval > 0.0 &&
+            rpy_gil_now() - rpy_gil_last_switch < rpy_gil_switch_interval)
+        return 0;
+
+    rpy_gil_yields++;
+    rpy_gil_tstats.yields++;
+
     /* Explicitly release the 'mutex_gil'.
      */
     mutex2_unlock(&mutex_gil);
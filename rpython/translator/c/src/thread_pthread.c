@@ -232,7 +232,125 @@ RPyThread_kill(Signed id, int signal)
 }
 
 /************************************************************/
-#ifdef USE_SEMAPHORES
+#ifdef RPY_USE_FUTEX_LOCKS
+/************************************************************/
+
+#include <linux/futex.h>
+#include <time.h>
+
+/* How many times a contended acquire polls the lock before it sleeps in
+   the kernel.  Python-level locks are usually held for a short time, so
+   a briefly contended lock is often released while we spin. */
+#ifndef RPY_LOCK_SPIN_COUNT
+#  define RPY_LOCK_SPIN_COUNT  100
+#endif
+
+#if defined(__i386__) || defined(__x86_64__)
+#  define rpy_cpu_relax()  __asm__ __volatile__("pause" ::: "memory")
+#elif defined(__aarch64__)
+#  define rpy_cpu_relax()  __asm__ __volatile__("yield" ::: "memory")
+#else
+#  define rpy_cpu_relax()  __asm__ __volatile__("" ::: "memory")
+#endif
+
+static long rpy_futex(int *uaddr, int op, int val,
+                      const struct timespec *timeout)
+{
+    return syscall(SYS_futex, uaddr, op, val, timeout, NULL, 0);
+}
+
+static int rpy_lock_cas(int *state, int oldval, int newval)
+{
+    return __atomic_compare_exchange_n(state, &oldval, newval, 0,
+                                       __ATOMIC_ACQUIRE, __ATOMIC_RELAXED);
+}
+
+void RPyThreadAfterFork(void)
+{
+    /* nothing to do: the state of a lock is a plain word in memory */
+}
+
+int RPyThreadLockInit(struct RPyOpaque_ThreadLock *lock)
+{
+	lock->state = 0;
+	lock->initialized = 1;
+	return 1;
+}
+
+void RPyOpaqueDealloc_ThreadLock(struct RPyOpaque_ThreadLock *lock)
+{
+	lock->initialized = 0;
+}
+
+RPyLockStatus
+RPyThreadAcquireLockTimed(struct RPyOpaque_ThreadLock *lock,
+			  RPY_TIMEOUT_T microseconds, int intr_flag)
+{
+	struct timespec deadline, ts, *pts = NULL;
+	int i;
+
+	/* uncontended: a single compare-and-swap */
+	if (rpy_lock_cas(&lock->state, 0, 1))
+	    return RPY_LOCK_ACQUIRED;
+	if (microseconds == 0)
+	    return RPY_LOCK_FAILURE;
+
+	/* briefly contended: spin, in case the owner releases it soon */
+	for (i = 0; i < RPY_LOCK_SPIN_COUNT; i++) {
+	    rpy_cpu_relax();
+	    if (__atomic_load_n(&lock->state, __ATOMIC_RELAXED) == 0 &&
+		    rpy_lock_cas(&lock->state, 0, 1))
+		return RPY_LOCK_ACQUIRED;
+	}
+
+	if (microseconds > 0) {
+	    clock_gettime(CLOCK_MONOTONIC, &deadline);
+	    deadline.tv_sec += microseconds / 1000000;
+	    deadline.tv_nsec += (microseconds % 1000000) * 1000;
+	    if (deadline.tv_nsec >= 1000000000) {
+		deadline.tv_sec += 1;
+		deadline.tv_nsec -= 1000000000;
+	    }
+	    pts = &ts;
+	}
+
+	/* contended: mark the lock with 2, so that release() knows that it
+	   must wake us up, and sleep until the lock is free */
+	while (__atomic_exchange_n(&lock->state, 2, __ATOMIC_ACQUIRE) != 0) {
+	    if (pts != NULL) {
+		struct timespec now;
+		clock_gettime(CLOCK_MONOTONIC, &now);
+		ts.tv_sec = deadline.tv_sec - now.tv_sec;
+		ts.tv_nsec = deadline.tv_nsec - now.tv_nsec;
+		if (ts.tv_nsec < 0) {
+		    ts.tv_sec -= 1;
+		    ts.tv_nsec += 1000000000;
+		}
+		if (ts.tv_sec < 0)
+		    return RPY_LOCK_FAILURE;
+	    }
+	    if (rpy_futex(&lock->state, FUTEX_WAIT_PRIVATE, 2, pts) < 0) {
+		/* EAGAIN (the state changed meanwhile) and ETIMEDOUT are
+		   handled by the next iteration */
+		if (errno == EINTR && intr_flag)
+		    return RPY_LOCK_INTR;
+	    }
+	}
+	return RPY_LOCK_ACQUIRED;
+}
+
+Signed RPyThreadReleaseLock(struct RPyOpaque_ThreadLock *lock)
+{
+    int previous = __atomic_exchange_n(&lock->state, 0, __ATOMIC_RELEASE);
+    if (previous == 0)
+        return -1;      /* the lock was not acquired so far */
+    if (previous == 2)
+        rpy_futex(&lock->state, FUTEX_WAKE_PRIVATE, 1, NULL);
+    return 0;
+}
+
+/************************************************************/
+#elif defined(USE_SEMAPHORES)
 /************************************************************/
 
 #include <semaphore.h>
@@ -30,10 +30,26 @@
 #  undef USE_SEMAPHORES
 #endif
 
+/* On Linux, locks are a word in user space, taken with an atomic
+   compare-and-swap; the futex() system call is only used to sleep when
+   the lock stays contended.  Define RPY_NO_FUTEX_LOCKS to use the
+   semaphores instead.
+*/
+#if defined(__linux__) && !defined(RPY_NO_FUTEX_LOCKS)
+#  define RPY_USE_FUTEX_LOCKS
+#endif
+
 
 /********************* structs ***********/
 
-#ifdef USE_SEMAPHORES
+#ifdef RPY_USE_FUTEX_LOCKS
+
+struct RPyOpaque_ThreadLock {
+	int state;	/* 0=unlocked, 1=locked, 2=locked, maybe with waiters */
+	int initialized;
+};
+
+#elif defined(USE_SEMAPHORES)
 
 #include <semaphore.h>
 